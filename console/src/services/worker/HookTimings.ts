@@ -0,0 +1,141 @@
+/**
+ * HookTimings
+ *
+ * Summarises the latency records the Python hooks append to
+ * ~/.pilot/sessions/<id>/timings.jsonl (see pilot/hooks/_timings.py).
+ * Each record holds one hook run: its total wall time plus the time spent
+ * in named phases (stdin, session_store, transcript, ...) and external
+ * tools (ruff, eslint, git, ...), all in milliseconds. The files are ring
+ * buffers, so reading them all stays cheap.
+ */
+
+import { readdirSync, readFileSync, statSync } from "fs";
+import { homedir } from "os";
+import path from "path";
+
+export const TIMINGS_FILE = "timings.jsonl";
+
+export interface LatencySummary {
+  count: number;
+  sum: number;
+  p50: number;
+  p95: number;
+  p99: number;
+  max: number;
+}
+
+export interface HookLatency {
+  total: LatencySummary;
+  phases: Record<string, LatencySummary>;
+}
+
+export interface HookTimingMetrics {
+  records: number;
+  byHook: Record<string, HookLatency>;
+  byTool: Record<string, LatencySummary>;
+}
+
+interface TimingRecord {
+  ts: number;
+  hook: string;
+  total: number;
+  phases?: Record<string, number>;
+  tools?: Record<string, number>;
+}
+
+export function getSessionsDir(): string {
+  return path.join(homedir(), ".pilot", "sessions");
+}
+
+/**
+ * Nearest-rank percentile of an ascending list
+ */
+export function percentile(sorted: number[], q: number): number {
+  if (sorted.length === 0) return 0;
+  const rank = Math.ceil(q * sorted.length);
+  return sorted[Math.min(sorted.length, Math.max(rank, 1)) - 1];
+}
+
+export function summarize(values: number[]): LatencySummary {
+  const sorted = [...values].sort((a, b) => a - b);
+  const round = (ms: number) => Math.round(ms * 100) / 100;
+  return {
+    count: sorted.length,
+    sum: round(sorted.reduce((sum, ms) => sum + ms, 0)),
+    p50: round(percentile(sorted, 0.5)),
+    p95: round(percentile(sorted, 0.95)),
+    p99: round(percentile(sorted, 0.99)),
+    max: round(sorted.length ? sorted[sorted.length - 1] : 0),
+  };
+}
+
+function parseRecord(line: string): TimingRecord | null {
+  try {
+    const record = JSON.parse(line);
+    if (typeof record?.hook !== "string" || typeof record.total !== "number" || typeof record.ts !== "number") {
+      return null;
+    }
+    return record as TimingRecord;
+  } catch {
+    return null;
+  }
+}
+
+function readRecords(sessionsDir: string, sinceMs: number): TimingRecord[] {
+  let sessions: string[];
+  try {
+    sessions = readdirSync(sessionsDir);
+  } catch {
+    return [];
+  }
+
+  const records: TimingRecord[] = [];
+  for (const session of sessions) {
+    const file = path.join(sessionsDir, session, TIMINGS_FILE);
+    let content: string;
+    try {
+      if (statSync(file).mtimeMs < sinceMs) continue;
+      content = readFileSync(file, "utf-8");
+    } catch {
+      continue;
+    }
+    for (const line of content.split("\n")) {
+      const record = line ? parseRecord(line) : null;
+      if (record && record.ts * 1000 >= sinceMs) records.push(record);
+    }
+  }
+  return records;
+}
+
+/**
+ * Latency percentiles per hook, per phase of each hook, and per tool,
+ * over the records written since `sinceMs`
+ */
+export function readHookTimings(sessionsDir: string = getSessionsDir(), sinceMs: number = 0): HookTimingMetrics {
+  const records = readRecords(sessionsDir, sinceMs);
+
+  const totals: Record<string, number[]> = {};
+  const phases: Record<string, Record<string, number[]>> = {};
+  const tools: Record<string, number[]> = {};
+  for (const record of records) {
+    (totals[record.hook] ||= []).push(record.total);
+    const hookPhases = (phases[record.hook] ||= {});
+    for (const [name, ms] of Object.entries(record.phases || {})) {
+      if (typeof ms === "number") (hookPhases[name] ||= []).push(ms);
+    }
+    for (const [name, ms] of Object.entries(record.tools || {})) {
+      if (typeof ms === "number") (tools[name] ||= []).push(ms);
+    }
+  }
+
+  const byHook: Record<string, HookLatency> = {};
+  for (const [hook, values] of Object.entries(totals)) {
+    byHook[hook] = {
+      total: summarize(values),
+      phases: Object.fromEntries(Object.entries(phases[hook]).map(([name, ms]) => [name, summarize(ms)])),
+    };
+  }
+  const byTool = Object.fromEntries(Object.entries(tools).map(([name, ms]) => [name, summarize(ms)]));
+
+  return { records: records.length, byHook, byTool };
+}
@@ -3,9 +3,11 @@
  *
  * Collects and exposes metrics for observability.
  * Supports both JSON and Prometheus formats.
+ * Hook latencies come from the timing records written by the Python hooks.
  */
 
 import { DatabaseManager } from "./DatabaseManager.js";
+import { HookTimingMetrics, LatencySummary, readHookTimings } from "./HookTimings.js";
 import { SessionManager } from "./SessionManager.js";
 
 export interface Metrics {
@@ -44,6 +46,20 @@ export interface Metrics {
     observationsPerMinute: number;
     requestsPerMinute: number;
   };
+  hooks: HookTimingMetrics;
+}
+
+type LatencySeries = [labels: Record<string, string>, summary: LatencySummary];
+
+/** Escape a Prometheus label value: backslash, double quote and newline. */
+function escapeLabelValue(value: string): string {
+  return value.replace(/\\/g, "\\\\").replace(/"/g, '\\"').replace(/\n/g, "\\n");
+}
+
+function formatLabels(labels: Record<string, string>): string {
+  return Object.entries(labels)
+    .map(([k, v]) => `${k}="${escapeLabelValue(String(v))}"`)
+    .join(",");
 }
 
 interface RequestMetric {
@@ -65,6 +81,7 @@ export class MetricsService {
   private providerName: string = "unknown";
 
   private readonly METRICS_WINDOW_MS = 5 * 60 * 1000;
+  private readonly HOOK_TIMINGS_WINDOW_MS = 24 * 60 * 60 * 1000;
 
   constructor(dbManager: DatabaseManager, sessionManager: SessionManager, startTime: number) {
     this.dbManager = dbManager;
@@ -198,6 +215,7 @@ export class MetricsService {
         observationsPerMinute: recentObs,
         requestsPerMinute: recentReqs,
       },
+      hooks: readHookTimings(undefined, Date.now() - this.HOOK_TIMINGS_WINDOW_MS),
     };
   }
 
@@ -217,9 +235,7 @@ export class MetricsService {
     ) => {
       lines.push(`# HELP claude_pilot_${name} ${help}`);
       lines.push(`# TYPE claude_pilot_${name} ${type}`);
-      const labelStr = Object.entries(labels)
-        .map(([k, v]) => `${k}="${v}"`)
-        .join(",");
+      const labelStr = formatLabels(labels);
       const labelPart = labelStr ? `{${labelStr}}` : "";
       lines.push(`claude_pilot_${name}${labelPart} ${value}`);
     };
@@ -256,6 +272,43 @@ export class MetricsService {
     addMetric("observations_per_minute", metrics.rates.observationsPerMinute, "Observations created per minute");
     addMetric("requests_per_minute", metrics.rates.requestsPerMinute, "Requests per minute");
 
+    const addSummary = (name: string, help: string, series: LatencySeries[]) => {
+      if (series.length === 0) return;
+      lines.push(`# HELP claude_pilot_${name} ${help}`);
+      lines.push(`# TYPE claude_pilot_${name} summary`);
+      for (const [labels, summary] of series) {
+        const labelStr = formatLabels(labels);
+        for (const [quantile, value] of [
+          ["0.5", summary.p50],
+          ["0.95", summary.p95],
+          ["0.99", summary.p99],
+        ] as const) {
+          lines.push(`claude_pilot_${name}{${labelStr},quantile="${quantile}"} ${value}`);
+        }
+        lines.push(`claude_pilot_${name}_sum{${labelStr}} ${summary.sum}`);
+        lines.push(`claude_pilot_${name}_count{${labelStr}} ${summary.count}`);
+      }
+    };
+
+    const hooks = Object.entries(metrics.hooks.byHook);
+    addSummary(
+      "hook_duration_ms",
+      "Hook wall time per run",
+      hooks.map(([hook, latency]): LatencySeries => [{ hook }, latency.total]),
+    );
+    addSummary(
+      "hook_phase_duration_ms",
+      "Time per hook run spent in a phase",
+      hooks.flatMap(([hook, latency]) =>
+        Object.entries(latency.phases).map(([phase, summary]): LatencySeries => [{ hook, phase }, summary]),
+      ),
+    );
+    addSummary(
+      "hook_tool_duration_ms",
+      "Time per hook run spent in an external tool",
+      Object.entries(metrics.hooks.byTool).map(([tool, summary]): LatencySeries => [{ tool }, summary]),
+    );
+
     return lines.join("\n");
   }
 }
@@ -1,7 +1,330 @@
-import { readFileSync, existsSync } from "fs";
+import { closeSync, existsSync, fstatSync, mkdirSync, openSync, readFileSync, readSync, renameSync, statSync, writeFileSync } from "fs";
+import { createHash } from "crypto";
+import { homedir } from "os";
+import { dirname, join, resolve } from "path";
 
 /**
- * Extract last message of specified role from transcript JSONL file
+ * Incremental transcript state, checkpointed per transcript path under
+ * ~/.pilot/cache/transcripts/ (PILOT_TRANSCRIPT_CURSOR_DIR overrides it) and
+ * shared with the Python hooks (pilot/hooks/_transcript.py). Only lines
+ * appended since the checkpoint are parsed; a transcript that shrank or was
+ * replaced starts over, and a new checkpoint for a large transcript is seeded
+ * from its tail.
+ */
+
+const CURSOR_VERSION = 2;
+const FULL_SCAN_BYTES = 1024 * 1024;
+const CHUNK_SIZE = 64 * 1024;
+const USAGE_KEYS = ["input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens"] as const;
+const ROLES = ["assistant", "user"] as const;
+
+type Role = (typeof ROLES)[number];
+type UsageKey = (typeof USAGE_KEYS)[number];
+type CompactBlock = { type: "text"; text: string } | { type: "tool_use"; name: string };
+
+export interface CompactRecord {
+  type: Role;
+  message: { content: string | CompactBlock[] };
+}
+
+export interface TranscriptState {
+  version: number;
+  path: string;
+  inode: number;
+  offset: number;
+  last: Partial<Record<Role, CompactRecord>>;
+  seen: Role[];
+  last_tool_use: string | null;
+  usage: Record<UsageKey, number>;
+  usage_since: number;
+  usage_message: string | null;
+  usage_counted: Partial<Record<UsageKey, number>>;
+}
+
+function cursorDir(): string {
+  return process.env.PILOT_TRANSCRIPT_CURSOR_DIR || join(homedir(), ".pilot", "cache", "transcripts");
+}
+
+function cursorPath(transcriptPath: string): string {
+  const digest = createHash("sha1").update(transcriptPath).digest("hex").slice(0, 16);
+  return join(cursorDir(), `${digest}.json`);
+}
+
+function emptyState(path: string, inode: number, offset = 0): TranscriptState {
+  return {
+    version: CURSOR_VERSION,
+    path,
+    inode,
+    offset,
+    last: {},
+    seen: [],
+    last_tool_use: null,
+    usage: { input_tokens: 0, output_tokens: 0, cache_creation_input_tokens: 0, cache_read_input_tokens: 0 },
+    usage_since: offset,
+    usage_message: null,
+    usage_counted: {},
+  };
+}
+
+function loadState(path: string): TranscriptState | null {
+  try {
+    const data = JSON.parse(readFileSync(cursorPath(path), "utf-8"));
+    if (
+      data?.version !== CURSOR_VERSION ||
+      data.path !== path ||
+      typeof data.offset !== "number" ||
+      !Array.isArray(data.seen)
+    ) {
+      return null;
+    }
+    return { ...emptyState(path, data.inode), ...data };
+  } catch {
+    return null;
+  }
+}
+
+function saveState(state: TranscriptState): void {
+  const target = cursorPath(state.path);
+  const tmp = join(dirname(target), `.${target.split("/").pop()}.${process.pid}.tmp`);
+  try {
+    mkdirSync(dirname(target), { recursive: true });
+    writeFileSync(tmp, JSON.stringify(state));
+    renameSync(tmp, target);
+  } catch {
+    // A missing checkpoint only costs a re-parse next time.
+  }
+}
+
+/** Keep what readers need of a message record: text blocks and tool_use names. */
+export function compactRecord(record: any): CompactRecord | null {
+  const content = record?.message?.content;
+  if (!content) {
+    return null;
+  }
+  if (typeof content === "string") {
+    return { type: record.type, message: { content } };
+  }
+  if (!Array.isArray(content)) {
+    return null;
+  }
+  const blocks: CompactBlock[] = [];
+  for (const block of content) {
+    if (block?.type === "text") {
+      blocks.push({ type: "text", text: block.text ?? "" });
+    } else if (block?.type === "tool_use") {
+      blocks.push({ type: "tool_use", name: block.name ?? "" });
+    }
+  }
+  return { type: record.type, message: { content: blocks } };
+}
+
+function toolUseNames(compact: CompactRecord): string[] {
+  const content = compact.message.content;
+  return Array.isArray(content) ? content.flatMap((block) => (block.type === "tool_use" ? [block.name] : [])) : [];
+}
+
+function addUsage(state: TranscriptState, message: any): void {
+  const usage = message?.usage;
+  if (!usage || typeof usage !== "object") {
+    return;
+  }
+  const messageId = message.id ?? null;
+  const counted: Partial<Record<UsageKey, number>> = {};
+  for (const key of USAGE_KEYS) {
+    if (Number.isInteger(usage[key])) {
+      counted[key] = usage[key];
+    }
+  }
+  if (messageId !== null && messageId === state.usage_message) {
+    for (const [key, value] of Object.entries(state.usage_counted)) {
+      state.usage[key as UsageKey] -= value ?? 0;
+    }
+  }
+  for (const [key, value] of Object.entries(counted)) {
+    state.usage[key as UsageKey] += value ?? 0;
+  }
+  state.usage_message = messageId;
+  state.usage_counted = counted;
+}
+
+function markSeen(state: TranscriptState, role: Role): void {
+  if (!state.seen.includes(role)) {
+    state.seen.push(role);
+  }
+}
+
+function applyRecord(state: TranscriptState, record: any): void {
+  const role = record?.type;
+  if (!ROLES.includes(role)) {
+    return;
+  }
+  markSeen(state, role);
+  const compact = compactRecord(record);
+  if (compact) {
+    state.last[role as Role] = compact;
+    const names = toolUseNames(compact);
+    if (names.length) {
+      state.last_tool_use = names[names.length - 1];
+    }
+  }
+  if (role === "assistant") {
+    addUsage(state, record.message);
+  }
+}
+
+function parseLine(line: string): any {
+  try {
+    return JSON.parse(line);
+  } catch {
+    return null;
+  }
+}
+
+function consume(fd: number, state: TranscriptState, size: number): boolean {
+  const buffer = Buffer.alloc(size - state.offset);
+  readSync(fd, buffer, 0, buffer.length, state.offset);
+  const end = buffer.lastIndexOf(0x0a);
+  if (end < 0) {
+    return false;
+  }
+  for (const line of buffer.subarray(0, end).toString("utf-8").split("\n")) {
+    if (line.trim()) {
+      applyRecord(state, parseLine(line));
+    }
+  }
+  state.offset += end + 1;
+  return true;
+}
+
+/** Lines of the first `end` bytes of the file, last first, read backwards in chunks. */
+function* linesReversed(fd: number, end: number): Generator<string> {
+  let position = end;
+  let pieces: Buffer[] = [];
+  while (position > 0) {
+    const size = Math.min(CHUNK_SIZE, position);
+    position -= size;
+    const chunk = Buffer.alloc(size);
+    readSync(fd, chunk, 0, size, position);
+    let stop = size;
+    for (;;) {
+      const newline = stop > 0 ? chunk.lastIndexOf(0x0a, stop - 1) : -1;
+      if (newline < 0) {
+        pieces.push(chunk.subarray(0, stop));
+        break;
+      }
+      pieces.push(chunk.subarray(newline + 1, stop));
+      const line = Buffer.concat(pieces.reverse()).toString("utf-8");
+      pieces = [];
+      if (line.trim()) {
+        yield line;
+      }
+      stop = newline;
+    }
+  }
+  const line = Buffer.concat(pieces.reverse()).toString("utf-8");
+  if (line.trim()) {
+    yield line;
+  }
+}
+
+function completeLinesEnd(fd: number, size: number): number {
+  let position = size;
+  while (position > 0) {
+    const start = Math.max(0, position - CHUNK_SIZE);
+    const chunk = Buffer.alloc(position - start);
+    readSync(fd, chunk, 0, chunk.length, start);
+    const newline = chunk.lastIndexOf(0x0a);
+    if (newline >= 0) {
+      return start + newline + 1;
+    }
+    position = start;
+  }
+  return 0;
+}
+
+function seedFromTail(fd: number, state: TranscriptState): void {
+  const wanted = new Set<Role>(ROLES);
+  let wantToolUse = true;
+  for (const line of linesReversed(fd, state.offset)) {
+    const record = parseLine(line);
+    if (!ROLES.includes(record?.type)) {
+      continue;
+    }
+    markSeen(state, record.type);
+    const compact = compactRecord(record);
+    if (!compact) {
+      continue;
+    }
+    if (wanted.has(compact.type)) {
+      state.last[compact.type] = compact;
+      wanted.delete(compact.type);
+    }
+    const names = toolUseNames(compact);
+    if (wantToolUse && names.length) {
+      state.last_tool_use = names[names.length - 1];
+      wantToolUse = false;
+    }
+    if (!wanted.size && !wantToolUse) {
+      return;
+    }
+  }
+}
+
+/**
+ * Bring the transcript's checkpoint up to date with the file and return it.
+ * @param transcriptPath Path to transcript file
+ */
+export function readTranscriptState(transcriptPath: string): TranscriptState {
+  const key = resolve(transcriptPath);
+  const fd = openSync(key, "r");
+  try {
+    const stat = fstatSync(fd);
+    let state = loadState(key);
+    let changed = false;
+    if (!state || state.inode !== stat.ino || stat.size < state.offset) {
+      changed = true;
+      if (stat.size <= FULL_SCAN_BYTES) {
+        state = emptyState(key, stat.ino);
+      } else {
+        state = emptyState(key, stat.ino, completeLinesEnd(fd, stat.size));
+        seedFromTail(fd, state);
+      }
+    }
+    if (stat.size > state.offset && consume(fd, state, stat.size)) {
+      changed = true;
+    }
+    if (changed) {
+      saveState(state);
+    }
+    return state;
+  } finally {
+    closeSync(fd);
+  }
+}
+
+/**
+ * The record on an unterminated last line, which the checkpoint leaves until
+ * its newline arrives. Null if there is none or it is not complete JSON yet.
+ */
+function trailingRecord(state: TranscriptState): any {
+  const fd = openSync(state.path, "r");
+  try {
+    const size = fstatSync(fd).size;
+    if (size <= state.offset) {
+      return null;
+    }
+    const buffer = Buffer.alloc(size - state.offset);
+    readSync(fd, buffer, 0, buffer.length, state.offset);
+    const line = buffer.toString("utf-8");
+    return line.trim() ? parseLine(line) : null;
+  } finally {
+    closeSync(fd);
+  }
+}
+
+/**
+ * Extract last message of specified role from transcript JSONL file.
+ * Returns "" when the role only has records without content.
  * @param transcriptPath Path to transcript file
  * @param role 'user' or 'assistant'
  * @param stripSystemReminders Whether to remove <system-reminder> tags (for assistant)
@@ -15,47 +338,34 @@ export function extractLastMessage(
     throw new Error(`Transcript path missing or file does not exist: ${transcriptPath}`);
   }
 
-  const content = readFileSync(transcriptPath, "utf-8").trim();
-  if (!content) {
+  if (statSync(transcriptPath).size === 0) {
     throw new Error(`Transcript file exists but is empty: ${transcriptPath}`);
   }
 
-  const lines = content.split("\n");
-  let foundMatchingRole = false;
-
-  for (let i = lines.length - 1; i >= 0; i--) {
-    const line = JSON.parse(lines[i]);
-    if (line.type === role) {
-      foundMatchingRole = true;
-
-      if (line.message?.content) {
-        let text = "";
-        const msgContent = line.message.content;
+  const state = readTranscriptState(transcriptPath);
+  const trailing = trailingRecord(state);
 
-        if (typeof msgContent === "string") {
-          text = msgContent;
-        } else if (Array.isArray(msgContent)) {
-          text = msgContent
-            .filter((c: any) => c.type === "text")
-            .map((c: any) => c.text)
-            .join("\n");
-        } else {
-          throw new Error(`Unknown message content format in transcript. Type: ${typeof msgContent}`);
-        }
-
-        if (stripSystemReminders) {
-          text = text.replace(/<system-reminder>[\s\S]*?<\/system-reminder>/g, "");
-          text = text.replace(/\n{3,}/g, "\n\n").trim();
-        }
-
-        return text;
-      }
+  const record = (trailing?.type === role && compactRecord(trailing)) || state.last[role];
+  if (!record) {
+    if (trailing?.type === role || state.seen.includes(role)) {
+      return "";
     }
+    throw new Error(`No message found for role '${role}' in transcript: ${transcriptPath}`);
   }
 
-  if (!foundMatchingRole) {
-    throw new Error(`No message found for role '${role}' in transcript: ${transcriptPath}`);
+  const msgContent = record.message.content;
+  let text =
+    typeof msgContent === "string"
+      ? msgContent
+      : msgContent
+          .filter((c): c is { type: "text"; text: string } => c.type === "text")
+          .map((c) => c.text)
+          .join("\n");
+
+  if (stripSystemReminders) {
+    text = text.replace(/<system-reminder>[\s\S]*?<\/system-reminder>/g, "");
+    text = text.replace(/\n{3,}/g, "\n\n").trim();
   }
 
-  return "";
+  return text;
 }
@@ -0,0 +1,95 @@
+/**
+ * Tests for the incremental transcript reader shared with the Python hooks.
+ *
+ * Uses real transcript files and a temporary checkpoint directory
+ * (PILOT_TRANSCRIPT_CURSOR_DIR), in the format pilot/hooks/_transcript.py uses.
+ *
+ * Value: Keeps extractLastMessage answering like the full-file parser it
+ * replaced: the last message of a role, "" for a role with only empty
+ * records, an error for a missing role, and a final line without a newline.
+ */
+import { describe, it, expect, beforeEach, afterEach } from "bun:test";
+import { appendFileSync, mkdtempSync, readdirSync, rmSync, writeFileSync } from "fs";
+import { tmpdir } from "os";
+import path from "path";
+import { extractLastMessage, readTranscriptState } from "../../src/shared/transcript-parser.js";
+
+function record(type: string, content: unknown): string {
+  return JSON.stringify({ type, message: { content } });
+}
+
+describe("transcript-parser", () => {
+  let dir: string;
+  let transcript: string;
+  const originalCursorDir = process.env.PILOT_TRANSCRIPT_CURSOR_DIR;
+
+  beforeEach(() => {
+    dir = mkdtempSync(path.join(tmpdir(), "transcript-parser-"));
+    transcript = path.join(dir, "transcript.jsonl");
+    process.env.PILOT_TRANSCRIPT_CURSOR_DIR = path.join(dir, "cursors");
+  });
+
+  afterEach(() => {
+    if (originalCursorDir === undefined) {
+      delete process.env.PILOT_TRANSCRIPT_CURSOR_DIR;
+    } else {
+      process.env.PILOT_TRANSCRIPT_CURSOR_DIR = originalCursorDir;
+    }
+    rmSync(dir, { recursive: true, force: true });
+  });
+
+  it("returns the last message of a role without system reminders", () => {
+    writeFileSync(
+      transcript,
+      [
+        record("user", "first question"),
+        record("assistant", [{ type: "text", text: "old answer" }]),
+        record("user", "second question"),
+        record("assistant", [
+          { type: "text", text: "new answer<system-reminder>hidden</system-reminder>" },
+          { type: "tool_use", name: "Read", input: {} },
+        ]),
+      ].join("\n") + "\n",
+    );
+
+    expect(extractLastMessage(transcript, "assistant", true)).toBe("new answer");
+    expect(extractLastMessage(transcript, "user")).toBe("second question");
+  });
+
+  it("returns an empty string when the role only has records without content", () => {
+    writeFileSync(transcript, [record("user", "question"), record("assistant", "")].join("\n") + "\n");
+
+    expect(extractLastMessage(transcript, "assistant")).toBe("");
+    expect(readTranscriptState(transcript).seen).toEqual(["user", "assistant"]);
+  });
+
+  it("throws when the role never appears", () => {
+    writeFileSync(transcript, record("user", "question") + "\n");
+
+    expect(() => extractLastMessage(transcript, "assistant")).toThrow("No message found for role 'assistant'");
+  });
+
+  it("reads a complete final line that has no newline yet", () => {
+    writeFileSync(transcript, record("assistant", "earlier") + "\n" + record("assistant", "latest"));
+
+    expect(extractLastMessage(transcript, "assistant")).toBe("latest");
+    expect(readTranscriptState(transcript).last.assistant?.message.content).toBe("earlier");
+  });
+
+  it("ignores a final line that is still being written", () => {
+    writeFileSync(transcript, record("assistant", "complete") + "\n" + '{"type": "assistant", "mess');
+
+    expect(extractLastMessage(transcript, "assistant")).toBe("complete");
+  });
+
+  it("checkpoints under the cursor directory and parses only appended lines", () => {
+    writeFileSync(transcript, record("assistant", "one") + "\n");
+    const first = readTranscriptState(transcript);
+    appendFileSync(transcript, record("assistant", "two") + "\n");
+    const second = readTranscriptState(transcript);
+
+    expect(readdirSync(path.join(dir, "cursors"))).toHaveLength(1);
+    expect(second.offset).toBeGreaterThan(first.offset);
+    expect(second.last.assistant?.message.content).toBe("two");
+  });
+});
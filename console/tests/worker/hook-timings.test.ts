@@ -0,0 +1,81 @@
+/**
+ * Tests for HookTimings: latency percentiles from the hooks' timing records.
+ *
+ * Uses real timings.jsonl files in a temporary sessions directory, written
+ * in the format pilot/hooks/_timings.py produces.
+ *
+ * Value: Validates per-hook, per-phase and per-tool aggregation and that
+ * stale or malformed records are skipped.
+ */
+import { describe, it, expect, beforeEach, afterEach } from "bun:test";
+import { mkdirSync, mkdtempSync, rmSync, writeFileSync } from "fs";
+import { tmpdir } from "os";
+import path from "path";
+import { percentile, readHookTimings, summarize } from "../../src/services/worker/HookTimings.js";
+
+function writeTimings(sessionsDir: string, session: string, records: object[], extra: string = ""): void {
+  mkdirSync(path.join(sessionsDir, session), { recursive: true });
+  const lines = records.map((record) => JSON.stringify(record)).join("\n");
+  writeFileSync(path.join(sessionsDir, session, "timings.jsonl"), `${lines}\n${extra}`);
+}
+
+describe("HookTimings", () => {
+  let sessionsDir: string;
+  const now = Date.now() / 1000;
+
+  beforeEach(() => {
+    sessionsDir = mkdtempSync(path.join(tmpdir(), "hook-timings-"));
+  });
+
+  afterEach(() => {
+    rmSync(sessionsDir, { recursive: true, force: true });
+  });
+
+  it("uses nearest-rank percentiles", () => {
+    const values = Array.from({ length: 100 }, (_, i) => i + 1);
+    expect(percentile(values, 0.5)).toBe(50);
+    expect(percentile(values, 0.95)).toBe(95);
+    expect(percentile(values, 0.99)).toBe(99);
+    expect(percentile([], 0.5)).toBe(0);
+    expect(summarize([3, 1, 2])).toEqual({ count: 3, sum: 6, p50: 2, p95: 3, p99: 3, max: 3 });
+  });
+
+  it("aggregates hooks, phases and tools across sessions", () => {
+    writeTimings(sessionsDir, "a", [
+      { ts: now, hook: "file_checker", exit: 0, total: 120, phases: { stdin: 1 }, tools: { ruff: 80 } },
+      { ts: now, hook: "file_checker", exit: 2, total: 40, phases: { stdin: 3 }, tools: { ruff: 20, git: 5 } },
+    ]);
+    writeTimings(sessionsDir, "b", [{ ts: now, hook: "tool_redirect", exit: 0, total: 2, phases: {}, tools: {} }]);
+
+    const metrics = readHookTimings(sessionsDir);
+
+    expect(metrics.records).toBe(3);
+    expect(metrics.byHook.file_checker.total).toMatchObject({ count: 2, p50: 40, max: 120 });
+    expect(metrics.byHook.file_checker.phases.stdin).toMatchObject({ count: 2, sum: 4 });
+    expect(metrics.byHook.tool_redirect.total.count).toBe(1);
+    expect(metrics.byTool.ruff).toMatchObject({ count: 2, p50: 20, p99: 80 });
+    expect(metrics.byTool.git.count).toBe(1);
+  });
+
+  it("skips malformed and out-of-window records", () => {
+    writeTimings(
+      sessionsDir,
+      "a",
+      [
+        { ts: now - 7200, hook: "context_monitor", total: 9 },
+        { ts: now, hook: "context_monitor", total: 3 },
+        { ts: now, total: 5 },
+      ],
+      '{"ts": 1, "hook": "trunc',
+    );
+
+    const metrics = readHookTimings(sessionsDir, Date.now() - 3600 * 1000);
+
+    expect(metrics.records).toBe(1);
+    expect(metrics.byHook.context_monitor.total.max).toBe(3);
+  });
+
+  it("returns empty metrics when there are no sessions", () => {
+    expect(readHookTimings(path.join(sessionsDir, "missing"))).toEqual({ records: 0, byHook: {}, byTool: {} });
+  });
+});
@@ -0,0 +1,96 @@
+"""Hook payload capture for the replay benchmark.
+
+With PILOT_HOOK_CAPTURE set, read_hook_stdin() and
+get_edited_file_from_stdin() save every payload they read as one JSON file
+in a corpus directory, along with the hook name, working directory and the
+PILOT_*/CLAUDE_* environment. PILOT_HOOK_CAPTURE=1 captures into the
+session's corpus, ~/.pilot/sessions/<PILOT_SESSION_ID>/corpus/; any other
+value is taken as the corpus directory. Variables whose names mention a
+token, key, secret or password are never saved.
+
+pilot/tests/benchmarks/replay_bench.py replays a corpus through the hooks.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+ENV_PREFIXES = ("PILOT_", "CLAUDE_")
+SECRET_MARKERS = ("TOKEN", "KEY", "SECRET", "PASSWORD")
+CORPUS_NAME = "corpus"
+
+
+def corpus_dir() -> Path | None:
+    """Where captured payloads go, or None when capture is off."""
+    value = os.environ.get("PILOT_HOOK_CAPTURE", "").strip()
+    if value.lower() in ("", "0", "false", "off"):
+        return None
+    if value.lower() in ("1", "true", "on"):
+        from _util import _sessions_base
+
+        session_id = os.environ.get("PILOT_SESSION_ID", "").strip() or "default"
+        return _sessions_base() / session_id / CORPUS_NAME
+    return Path(value).expanduser()
+
+
+def hook_name() -> str:
+    """The running hook: the open timings record's, else the script name (or run_hook.py's argument)."""
+    from _timings import current_hook
+
+    name = current_hook()
+    if name:
+        return name
+    script = Path(sys.argv[0]).stem if sys.argv and sys.argv[0] else "unknown"
+    if script == "run_hook" and len(sys.argv) > 1:
+        return sys.argv[1]
+    return script
+
+
+def captured_env() -> dict[str, str]:
+    return {
+        key: value
+        for key, value in os.environ.items()
+        if key.startswith(ENV_PREFIXES) and not any(marker in key.upper() for marker in SECRET_MARKERS)
+    }
+
+
+def capture(raw: str) -> None:
+    """Save a hook's raw stdin payload to the corpus, if capture is on. Never raises."""
+    directory = corpus_dir()
+    if directory is None:
+        return
+    name = hook_name()
+    try:
+        cwd = os.getcwd()
+    except OSError:
+        cwd = ""
+    entry = {"hook": name, "ts": time.time(), "cwd": cwd, "env": captured_env(), "stdin": raw}
+    path = directory / f"{time.time_ns()}-{os.getpid()}-{name}.json"
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp = directory / f".{path.name}.tmp"
+        tmp.write_text(json.dumps(entry))
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def load_corpus(directory: Path) -> list[dict]:
+    """Captured entries in capture order; unreadable files are skipped."""
+    entries = []
+    try:
+        paths = sorted(path for path in directory.iterdir() if path.suffix == ".json" and not path.name.startswith("."))
+    except OSError:
+        return []
+    for path in paths:
+        try:
+            entry = json.loads(path.read_text())
+        except (OSError, json.JSONDecodeError):
+            continue
+        if isinstance(entry, dict) and isinstance(entry.get("hook"), str) and isinstance(entry.get("stdin"), str):
+            entries.append(entry)
+    return entries
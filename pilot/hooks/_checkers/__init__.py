@@ -1,7 +1,25 @@
-"""Language-specific file checkers."""
+"""Language-specific file checkers.
 
-from _checkers.go import check_go
-from _checkers.python import check_python
-from _checkers.typescript import check_typescript
+Checker modules are imported on first attribute access so that hooks only
+pay for the language they actually check.
+"""
 
-__all__ = ["check_go", "check_python", "check_typescript"]
+from __future__ import annotations
+
+import importlib
+
+TS_EXTENSIONS = {".ts", ".tsx", ".js", ".jsx", ".mjs", ".mts"}
+
+_LAZY_ATTRS = {
+    "check_go": "_checkers.go",
+    "check_python": "_checkers.python",
+    "check_typescript": "_checkers.typescript",
+}
+
+__all__ = ["TS_EXTENSIONS", "check_go", "check_python", "check_typescript"]
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRS:
+        return getattr(importlib.import_module(_LAZY_ATTRS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,343 @@
+"""Content-addressed cache of file checker results.
+
+A check result depends on the file bytes, the tools that ran and their
+configuration. Entries under ~/.pilot/cache/checks/ are keyed on the file
+path and content hash, the identity of each resolved tool binary (path,
+size and mtime, which change whenever the tool is upgraded) and the content
+of the language's config files found above the file. A hit replays the
+stored stderr and result, and restores the file content the checker produced
+(comment stripping and formatting), without running any tool.
+
+Results are also stored under the hash of the checked output, so re-checking
+an unchanged file after a no-op Edit or Write is a hit too. Diagnostics that
+depend on other files (type errors from an import that changed) are not part
+of the key; such a result refreshes the next time the file itself changes.
+A check that timed out or deferred a tool (see scheduler.py) is not stored.
+
+The cache is LRU-bounded by MAX_ENTRIES and MAX_BYTES. Counters in
+stats.json are written once per check, and the directory is scanned for
+eviction only after EVICT_EVERY stores, so it may briefly hold that many
+entries over the limit. Set PILOT_CHECK_CACHE=0 to disable it.
+
+Usage: cache.py [stats|clear]
+"""
+
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import sys
+from collections.abc import Callable
+from pathlib import Path
+
+if __name__ == "__main__":
+    sys.path[0] = str(Path(__file__).resolve().parents[1])
+
+from _util import capture_stderr, which
+
+from _checkers.scheduler import take_partial
+
+CACHE_VERSION = 1
+MAX_ENTRIES = 5000
+MAX_BYTES = 64 * 1024 * 1024
+MAX_CONFIG_DEPTH = 20
+EVICT_EVERY = 100
+
+TOOLS: dict[str, tuple[str, ...]] = {
+    "python": ("ruff", "basedpyright", "basedpyright-langserver"),
+    "typescript": ("prettier", "eslint", "tsc", "tsserver", "node"),
+    "go": ("go", "gofmt", "golangci-lint"),
+}
+
+CONFIG_PATTERNS: dict[str, tuple[str, ...]] = {
+    "python": ("pyproject.toml", "ruff.toml", ".ruff.toml", "pyrightconfig.json", "setup.cfg"),
+    "typescript": (
+        "package.json",
+        "tsconfig*.json",
+        ".eslintrc*",
+        "eslint.config.*",
+        ".prettierrc*",
+        "prettier.config.*",
+        ".prettierignore",
+    ),
+    "go": ("go.mod", "go.sum", ".golangci.*"),
+}
+
+STAT_KEYS = ("hits", "misses", "stores", "evictions")
+
+CheckResult = tuple[int, str]
+
+
+def enabled() -> bool:
+    """Whether the check cache may be used."""
+    return os.environ.get("PILOT_CHECK_CACHE", "").strip().lower() not in ("0", "false", "off")
+
+
+def cache_dir() -> Path:
+    return Path.home() / ".pilot" / "cache" / "checks"
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _tool_path(tool: str, file_path: Path) -> str | None:
+    """Resolve a tool the way the checkers do: project node_modules first, then PATH."""
+    for directory in file_path.parents:
+        local_bin = directory / "node_modules" / ".bin" / tool
+        if local_bin.exists():
+            return str(local_bin)
+        if (directory / "package.json").exists():
+            break
+    return which(tool)
+
+
+def tool_fingerprint(language: str, file_path: Path) -> list:
+    """Resolved path, size and mtime of each tool the language checker may run."""
+    fingerprint = []
+    for tool in TOOLS.get(language, ()):
+        path = _tool_path(tool, file_path)
+        if not path:
+            fingerprint.append([tool, None])
+            continue
+        try:
+            real_path = os.path.realpath(path)
+            stat = os.stat(real_path)
+            fingerprint.append([tool, real_path, stat.st_size, stat.st_mtime_ns])
+        except OSError:
+            fingerprint.append([tool, path])
+    return fingerprint
+
+
+def config_fingerprint(language: str, file_path: Path) -> list:
+    """Content hashes of the language's config files in the file's ancestor directories."""
+    fingerprint = []
+    for depth, directory in enumerate(file_path.parents):
+        if depth > MAX_CONFIG_DEPTH:
+            break
+        for pattern in CONFIG_PATTERNS.get(language, ()):
+            for config in sorted(directory.glob(pattern)):
+                try:
+                    fingerprint.append([str(config), _sha256(config.read_bytes())])
+                except OSError:
+                    continue
+    return fingerprint
+
+
+def cache_key(language: str, file_path: Path, content: bytes, scope: str | None = None) -> str:
+    """Cache key for checking `content` at `file_path` with the current tools and config.
+
+    `scope` identifies an edit-scoped check (see scope.py), whose result differs from a full one.
+    """
+    file_path = file_path.resolve()
+    material = [
+        CACHE_VERSION,
+        language,
+        str(file_path),
+        _sha256(content),
+        tool_fingerprint(language, file_path),
+        config_fingerprint(language, file_path),
+    ]
+    if scope is not None:
+        material.append(scope)
+    return _sha256(json.dumps(material).encode())
+
+
+def _entry_path(key: str) -> Path:
+    return cache_dir() / f"{key}.json"
+
+
+def load(key: str) -> dict | None:
+    """Read an entry and mark it as recently used."""
+    path = _entry_path(key)
+    try:
+        entry = json.loads(path.read_text())
+        os.utime(path)
+    except (OSError, json.JSONDecodeError):
+        return None
+    return entry if isinstance(entry, dict) else None
+
+
+def store(key: str, entry: dict) -> bool:
+    """Write an entry atomically. Returns False if it could not be written."""
+    path = _entry_path(key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(entry))
+        os.replace(tmp, path)
+    except OSError:
+        return False
+    return True
+
+
+def _entries() -> list[tuple[float, int, Path]]:
+    entries = []
+    try:
+        with os.scandir(cache_dir()) as it:
+            for item in it:
+                if not item.name.endswith(".json") or item.name == "stats.json":
+                    continue
+                try:
+                    stat = item.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, Path(item.path)))
+    except OSError:
+        pass
+    return entries
+
+
+def evict(max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES) -> int:
+    """Remove least recently used entries until both limits hold. Returns the number removed."""
+    entries = _entries()
+    total = sum(size for _, size, _ in entries)
+    if len(entries) <= max_entries and total <= max_bytes:
+        return 0
+
+    removed = 0
+    remaining = len(entries)
+    for _, size, path in sorted(entries):
+        if remaining <= max_entries and total <= max_bytes:
+            break
+        try:
+            path.unlink()
+        except OSError:
+            continue
+        remaining -= 1
+        total -= size
+        removed += 1
+    return removed
+
+
+def _record(counts: dict[str, int]) -> None:
+    """Add one check's counters to stats.json, evicting once EVICT_EVERY stores have accumulated."""
+    path = cache_dir() / "stats.json"
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            f.seek(0)
+            try:
+                stats = json.loads(f.read() or "{}")
+            except json.JSONDecodeError:
+                stats = {}
+            for stat, count in counts.items():
+                stats[stat] = stats.get(stat, 0) + count
+            unevicted = stats.get("unevicted", 0) + counts.get("stores", 0)
+            if unevicted >= EVICT_EVERY:
+                stats["evictions"] = stats.get("evictions", 0) + evict()
+                unevicted = 0
+            stats["unevicted"] = unevicted
+            f.seek(0)
+            f.truncate()
+            f.write(json.dumps(stats))
+    except OSError:
+        pass
+
+
+def stats() -> dict:
+    """Hit/miss/store/eviction counters plus current entry count and size."""
+    try:
+        counters = json.loads((cache_dir() / "stats.json").read_text())
+    except (OSError, json.JSONDecodeError):
+        counters = {}
+    entries = _entries()
+    result = {key: counters.get(key, 0) for key in STAT_KEYS}
+    lookups = result["hits"] + result["misses"]
+    result["hit_rate"] = round(result["hits"] / lookups, 3) if lookups else 0.0
+    result["entries"] = len(entries)
+    result["bytes"] = sum(size for _, size, _ in entries)
+    return result
+
+
+def clear() -> None:
+    """Remove all entries and counters."""
+    shutil.rmtree(cache_dir(), ignore_errors=True)
+
+
+def _restore(file_path: Path, output: bytes) -> None:
+    """Put the checked content back atomically, keeping the file's mode."""
+    tmp = file_path.with_name(f".{file_path.name}.{os.getpid()}.tmp")
+    try:
+        tmp.write_bytes(output)
+        try:
+            os.chmod(tmp, file_path.stat().st_mode & 0o7777)
+        except OSError:
+            pass
+        os.replace(tmp, file_path)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+
+
+def _replay(file_path: Path, content: bytes, entry: dict) -> CheckResult:
+    output = entry.get("output")
+    if output is not None and output.encode() != content:
+        _restore(file_path, output.encode())
+    if entry.get("stderr"):
+        sys.stderr.write(entry["stderr"])
+    return entry["exit_code"], entry["reason"]
+
+
+def cached_check(
+    language: str, file_path: Path, check: Callable[[Path], CheckResult], scope: str | None = None
+) -> CheckResult:
+    """Run `check` on the file, or replay its stored result for identical inputs.
+
+    A scoped check is only replayed for the same content and the same scope.
+    """
+    if not enabled():
+        return check(file_path)
+    try:
+        content = file_path.read_bytes()
+        content.decode()
+    except (OSError, UnicodeDecodeError):
+        return check(file_path)
+
+    key = cache_key(language, file_path, content, scope)
+    entry = load(key)
+    if entry is not None:
+        _record({"hits": 1})
+        return _replay(file_path, content, entry)
+
+    counts = {"misses": 1, "stores": 0}
+    try:
+        take_partial()
+        with capture_stderr() as buffer:
+            exit_code, reason = check(file_path)
+        stderr = buffer.getvalue()
+        sys.stderr.write(stderr)
+        if take_partial():
+            return exit_code, reason
+
+        try:
+            output = file_path.read_bytes().decode()
+        except (OSError, UnicodeDecodeError):
+            return exit_code, reason
+
+        entry = {"exit_code": exit_code, "reason": reason, "stderr": stderr}
+        counts["stores"] += store(key, {**entry, "output": output if output.encode() != content else None})
+        if output.encode() != content and scope is None:
+            counts["stores"] += store(cache_key(language, file_path, output.encode()), {**entry, "output": None})
+        return exit_code, reason
+    finally:
+        _record(counts)
+
+
+def main() -> int:
+    command = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    if command == "stats":
+        print(json.dumps(stats(), indent=2))
+        return 0
+    if command == "clear":
+        clear()
+        return 0
+    print("Usage: cache.py [stats|clear]", file=sys.stderr)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
+import os
 import re
-import shutil
 import subprocess
 import sys
+import tempfile
+from functools import partial
 from pathlib import Path
 
 from _util import (
@@ -14,19 +16,36 @@ from _util import (
     RED,
     YELLOW,
     check_file_length,
+    which,
 )
 
+from _checkers.pipeline import Analyzer, SourceBuffer, pipe_through, print_timeouts, run_pipeline
+from _checkers.scope import EditScope
+
+GOFMT_TIMEOUT = 30.0
+VET_TIMEOUT = 60.0
+LINT_TIMEOUT = 120.0
+
 
 def strip_go_comments(file_path: Path) -> bool:
     """Remove inline // comments from Go file."""
-    preserve_patterns = re.compile(r"//\s*nolint|//\s*TODO|//\s*FIXME|//\s*XXX|//\s*NOTE|//\s*go:", re.IGNORECASE)
-
     try:
         content = file_path.read_text()
-        lines = content.splitlines(keepends=True)
     except Exception:
         return False
 
+    new_content = strip_go_comments_text(content)
+    if new_content != content:
+        file_path.write_text(new_content)
+        return True
+    return False
+
+
+def strip_go_comments_text(content: str) -> str:
+    """Return Go source with inline // comments removed, keeping directives."""
+    preserve_patterns = re.compile(r"//\s*nolint|//\s*TODO|//\s*FIXME|//\s*XXX|//\s*NOTE|//\s*go:", re.IGNORECASE)
+
+    lines = content.splitlines(keepends=True)
     new_lines = []
     modified = False
 
@@ -47,62 +66,43 @@ def strip_go_comments(file_path: Path) -> bool:
         else:
             modified = True
 
-    if modified:
-        file_path.write_text("".join(new_lines))
-        return True
-    return False
+    return "".join(new_lines) if modified else content
+
 
+def check_go(file_path: Path, scope: EditScope | None = None) -> tuple[int, str]:
+    """Check Go file with gofmt, go vet, and golangci-lint. Returns (exit_code, reason).
 
-def check_go(file_path: Path) -> tuple[int, str]:
-    """Check Go file with gofmt, go vet, and golangci-lint. Returns (exit_code, reason)."""
-    strip_go_comments(file_path)
+    With a scope, golangci-lint only reports issues in the edit; go vet
+    still reports the whole file.
+    """
+    source = SourceBuffer.read(file_path)
+    if source is None:
+        return 0, ""
+    source.apply(strip_go_comments_text)
 
     if file_path.name.endswith("_test.go"):
+        source.commit()
         return 0, ""
 
-    check_file_length(file_path)
+    check_file_length(file_path, source.text)
 
-    go_bin = shutil.which("go")
-    gofmt_bin = shutil.which("gofmt")
-    golangci_lint_bin = shutil.which("golangci-lint")
+    go_bin = which("go")
+    gofmt_bin = which("gofmt")
+    golangci_lint_bin = which("golangci-lint")
 
     if not go_bin:
+        source.commit()
         return 0, ""
 
-    if gofmt_bin:
-        try:
-            subprocess.run([gofmt_bin, "-w", str(file_path)], capture_output=True, check=False)
-        except Exception:
-            pass
-
-    results: dict[str, tuple] = {}
-    has_issues = False
-
-    try:
-        result = subprocess.run([go_bin, "vet", str(file_path)], capture_output=True, text=True, check=False)
-        output = result.stdout + result.stderr
-        if result.returncode != 0 or output.strip():
-            lines = [line.strip() for line in output.splitlines() if line.strip() and not line.strip().startswith("#")]
-            if lines:
-                has_issues = True
-                results["vet"] = (len(lines), lines)
-    except Exception:
-        pass
-
+    mutators = [partial(_gofmt, gofmt_bin)] if gofmt_bin else []
+    analyzers = [Analyzer("vet", partial(_run_vet, go_bin, file_path), VET_TIMEOUT)]
     if golangci_lint_bin:
-        try:
-            result = subprocess.run(
-                [golangci_lint_bin, "run", "--fast", str(file_path)], capture_output=True, text=True, check=False
-            )
-            output = result.stdout + result.stderr
-            if result.returncode != 0:
-                lines = [line.strip() for line in output.splitlines() if line.strip()]
-                issue_count = len([line for line in lines if ": " in line])
-                if issue_count > 0:
-                    has_issues = True
-                    results["lint"] = (issue_count, lines)
-        except Exception:
-            pass
+        lint = partial(_run_golangci_lint, golangci_lint_bin, file_path, scope=scope)
+        analyzers.append(Analyzer("lint", lint, LINT_TIMEOUT))
+
+    results, timed_out = run_pipeline(source, mutators, analyzers)
+    print_timeouts(timed_out, analyzers)
+    has_issues = bool(results)
 
     if has_issues:
         _print_go_issues(file_path, results)
@@ -119,6 +119,55 @@ def check_go(file_path: Path) -> tuple[int, str]:
     return 2, ""
 
 
+def _gofmt(gofmt_bin: str, text: str) -> str | None:
+    """Format the buffer with gofmt."""
+    return pipe_through([gofmt_bin], text, GOFMT_TIMEOUT)
+
+
+def _run_vet(go_bin: str, file_path: Path, timeout: float) -> dict[str, tuple]:
+    """Run go vet. Returns {"vet": (count, lines)} when it reports problems."""
+    try:
+        result = subprocess.run(
+            [go_bin, "vet", str(file_path)], capture_output=True, text=True, check=False, timeout=timeout
+        )
+    except Exception:
+        return {}
+    output = result.stdout + result.stderr
+    if result.returncode == 0 and not output.strip():
+        return {}
+    lines = [line.strip() for line in output.splitlines() if line.strip() and not line.strip().startswith("#")]
+    return {"vet": (len(lines), lines)} if lines else {}
+
+
+def _run_golangci_lint(
+    golangci_lint_bin: str, file_path: Path, timeout: float, scope: EditScope | None = None
+) -> dict[str, tuple]:
+    """Run golangci-lint. Returns {"lint": (issue_count, lines)} when it reports issues.
+
+    With a scope, the edit is passed as a patch so only new issues are reported.
+    """
+    cmd = [golangci_lint_bin, "run", "--fast", str(file_path)]
+    patch_path = None
+    try:
+        if scope is not None:
+            with tempfile.NamedTemporaryFile("w", suffix=".patch", delete=False) as patch_file:
+                patch_file.write(scope.patch(file_path.read_text()))
+            patch_path = patch_file.name
+            cmd.insert(2, f"--new-from-patch={patch_path}")
+        result = subprocess.run(cmd, capture_output=True, text=True, check=False, timeout=timeout)
+    except Exception:
+        return {}
+    finally:
+        if patch_path:
+            os.unlink(patch_path)
+    if result.returncode == 0:
+        return {}
+    output = result.stdout + result.stderr
+    lines = [line.strip() for line in output.splitlines() if line.strip()]
+    issue_count = len([line for line in lines if ": " in line])
+    return {"lint": (issue_count, lines)} if issue_count > 0 else {}
+
+
 def _print_go_issues(file_path: Path, results: dict[str, tuple]) -> None:
     """Print Go diagnostic issues to stderr."""
     print("", file=sys.stderr)
@@ -0,0 +1,113 @@
+#!/usr/bin/env node
+"use strict";
+/**
+ * Resident ESLint/Prettier worker for one project root.
+ *
+ * Started by _checkers/lint_worker.py. Loads the project's own eslint and
+ * prettier packages once and serves JSON-RPC requests over stdio framed with
+ * Content-Length headers:
+ *   lint   {file} -> ESLint results in `eslint --format json` shape
+ *   format {file, text?} -> {changed, text}; formats `text` as `file`, or
+ *                            the file itself in place when no text is given
+ */
+
+const fs = require("fs");
+const path = require("path");
+const { createRequire } = require("module");
+
+const root = process.argv[2] || process.cwd();
+const projectRequire = createRequire(path.join(root, "package.json"));
+
+let eslint = null;
+let prettier = null;
+
+async function getEslint() {
+  if (!eslint) {
+    const mod = projectRequire("eslint");
+    const ESLintClass = mod.loadESLint ? await mod.loadESLint({ cwd: root }) : mod.ESLint;
+    eslint = new ESLintClass({ cwd: root });
+  }
+  return eslint;
+}
+
+function getPrettier() {
+  if (!prettier) {
+    prettier = projectRequire("prettier");
+  }
+  return prettier;
+}
+
+async function lint({ file }) {
+  const results = await (await getEslint()).lintFiles([file]);
+  return results.map((r) => ({
+    filePath: r.filePath,
+    errorCount: r.errorCount,
+    warningCount: r.warningCount,
+    messages: r.messages,
+  }));
+}
+
+async function format({ file, text }) {
+  const p = getPrettier();
+  const input = text === undefined ? fs.readFileSync(file, "utf8") : text;
+  const info = await p.getFileInfo(file, { ignorePath: path.join(root, ".prettierignore") });
+  if (info.ignored || !info.inferredParser) {
+    return { changed: false, text: input };
+  }
+  const options = (await p.resolveConfig(file, { editorconfig: true })) || {};
+  const output = await p.format(input, { ...options, filepath: file });
+  if (text === undefined && output !== input) {
+    fs.writeFileSync(file, output);
+  }
+  return { changed: output !== input, text: output };
+}
+
+const METHODS = { lint, format, shutdown: async () => null };
+
+function send(message) {
+  const body = Buffer.from(JSON.stringify({ jsonrpc: "2.0", ...message }));
+  process.stdout.write(`Content-Length: ${body.length}\r\n\r\n`);
+  process.stdout.write(body);
+}
+
+async function dispatch(message) {
+  if (message.method === "exit") {
+    process.exit(0);
+  }
+  const method = METHODS[message.method];
+  if (message.id === undefined) {
+    return;
+  }
+  if (!method) {
+    send({ id: message.id, error: { code: -32601, message: `unknown method ${message.method}` } });
+    return;
+  }
+  try {
+    send({ id: message.id, result: await method(message.params || {}) });
+  } catch (err) {
+    send({ id: message.id, error: { code: -32000, message: String((err && err.message) || err) } });
+  }
+}
+
+let buffer = Buffer.alloc(0);
+let queue = Promise.resolve();
+
+process.stdin.on("data", (chunk) => {
+  buffer = Buffer.concat([buffer, chunk]);
+  for (;;) {
+    const headerEnd = buffer.indexOf("\r\n\r\n");
+    if (headerEnd < 0) {
+      return;
+    }
+    const match = /Content-Length:\s*(\d+)/i.exec(buffer.subarray(0, headerEnd).toString());
+    const length = match ? Number(match[1]) : 0;
+    if (buffer.length < headerEnd + 4 + length) {
+      return;
+    }
+    const message = JSON.parse(buffer.subarray(headerEnd + 4, headerEnd + 4 + length).toString());
+    buffer = buffer.subarray(headerEnd + 4 + length);
+    queue = queue.then(() => dispatch(message));
+  }
+});
+
+process.stdin.on("end", () => process.exit(0));
@@ -0,0 +1,99 @@
+"""Resident ESLint/Prettier worker for the TypeScript checker.
+
+LintWorkerSession keeps one Node process per project root (see service.py)
+running lint_worker.cjs. The worker loads the project's own eslint and
+prettier once, so config resolution and plugin loading are not paid per
+edit. The worker is restarted when an ESLint, Prettier, EditorConfig or
+package.json config file changes, or when it dies. Config files are looked
+for in every directory from the checked file up to the root, since both
+tools pick up nested configs.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from _checkers.lsp import LspClient, LspError
+
+WORKER_SCRIPT = Path(__file__).with_name("lint_worker.cjs")
+REQUEST_TIMEOUT = 60.0
+
+CONFIG_PATTERNS = (
+    ".eslintrc*",
+    "eslint.config.*",
+    ".prettierrc*",
+    "prettier.config.*",
+    ".prettierignore",
+    ".editorconfig",
+    "package.json",
+)
+
+
+def config_dirs(root: Path, file_path: Path) -> list[Path]:
+    """Directories from the file's up to the root whose configs apply to it; just the root for files outside it."""
+    directory = file_path.parent
+    if directory != root and root not in directory.parents:
+        return [root]
+    dirs = [directory]
+    while directory != root:
+        directory = directory.parent
+        dirs.append(directory)
+    return dirs
+
+
+def config_fingerprint(directory: Path) -> tuple:
+    """Name, mtime and size of every lint/format config file in one directory."""
+    entries = []
+    for pattern in CONFIG_PATTERNS:
+        for path in directory.glob(pattern):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((path.name, stat.st_mtime_ns, stat.st_size))
+    return tuple(sorted(entries))
+
+
+class LintWorkerSession:
+    """Resident Node lint/format worker for one project root.
+
+    Requests: {"node": node_bin, "op": "lint" | "format", "file": path, "text"?: source}.
+    Replies: {"result": ...} with the worker's answer.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.node = ""
+        self.fingerprints: dict[Path, tuple] = {}
+        self.client: LspClient | None = None
+
+    def _client_for(self, node: str, file_path: Path) -> LspClient:
+        """The running worker, restarted if a config it may have loaded for file_path's directories changed."""
+        current = {directory: config_fingerprint(directory) for directory in config_dirs(self.root, file_path)}
+        changed = any(self.fingerprints.get(directory, value) != value for directory, value in current.items())
+        client = self.client
+        if client is None or not client.alive() or node != self.node or changed:
+            self.close()
+            client = LspClient([node, str(WORKER_SCRIPT), str(self.root)], self.root)
+            self.client = client
+            self.node = node
+            self.fingerprints = {}
+        self.fingerprints.update(current)
+        return client
+
+    def handle(self, request: dict) -> dict:
+        node = request["node"]
+        file_path = Path(request["file"]).resolve()
+        params = {"file": str(file_path)}
+        if "text" in request:
+            params["text"] = request["text"]
+        try:
+            return {"result": self._client_for(node, file_path).request(request["op"], params, REQUEST_TIMEOUT)}
+        except LspError:
+            self.close()
+        return {"result": self._client_for(node, file_path).request(request["op"], params, REQUEST_TIMEOUT)}
+
+    def close(self) -> None:
+        if self.client is not None:
+            self.client.close()
+        self.client = None
@@ -0,0 +1,289 @@
+"""Language server client and the resident basedpyright service.
+
+PyrightSession keeps one `basedpyright-langserver --stdio` process per project
+root (see service.py). Each check opens the file with its current content
+under a new version, waits for the publishDiagnostics of that version and
+closes it again, so only the edited file is re-analysed against the warm
+program. Closing matters: the server trusts an open file's in-memory text
+over the disk, so a file left open would hide later changes made by other
+tools from every check that imports it. Files that were never opened
+change behind the server's back too (git checkout, codegen, edits from
+Bash), so every check first compares the mtimes of the project's Python
+sources with the last check and reports the difference as
+workspace/didChangeWatchedFiles; a changed pyproject.toml or
+pyrightconfig.json restarts the server instead. If the server dies or stops
+answering, it is restarted on the next request.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import queue
+import subprocess
+import threading
+from pathlib import Path
+from typing import Any
+from urllib.parse import unquote, urlparse
+
+INIT_TIMEOUT = 60.0
+DIAGNOSTICS_TIMEOUT = 45.0
+SHUTDOWN_TIMEOUT = 2.0
+
+SEVERITIES = {1: "error", 2: "warning", 3: "information"}
+
+SOURCE_SUFFIXES = (".py", ".pyi")
+CONFIG_FILES = ("pyproject.toml", "pyrightconfig.json")
+SKIPPED_DIRS = {"node_modules", "__pycache__", "venv", "site-packages", "build", "dist"}
+FILE_CREATED, FILE_CHANGED, FILE_DELETED = 1, 2, 3
+
+
+class LspError(Exception):
+    """The language server exited or did not answer in time."""
+
+
+def uri_to_path(uri: str) -> Path:
+    """Filesystem path of a file:// URI."""
+    return Path(unquote(urlparse(uri).path))
+
+
+class LspClient:
+    """Minimal JSON-RPC client for a language server on stdio."""
+
+    def __init__(self, command: list[str], root: Path) -> None:
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=root,
+        )
+        self._messages: queue.Queue[dict | None] = queue.Queue()
+        self._next_id = 0
+        threading.Thread(target=self._read_messages, daemon=True).start()
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def _read_messages(self) -> None:
+        stdout = self.process.stdout
+        assert stdout is not None
+        try:
+            while True:
+                length = 0
+                while True:
+                    line = stdout.readline()
+                    if not line:
+                        return
+                    line = line.strip()
+                    if not line:
+                        break
+                    name, _, value = line.partition(b":")
+                    if name.strip().lower() == b"content-length":
+                        length = int(value)
+                body = stdout.read(length)
+                if len(body) < length:
+                    return
+                self._messages.put(json.loads(body))
+        except (OSError, ValueError):
+            return
+        finally:
+            self._messages.put(None)
+
+    def send(self, message: dict) -> None:
+        body = json.dumps({"jsonrpc": "2.0", **message}).encode()
+        stdin = self.process.stdin
+        assert stdin is not None
+        try:
+            stdin.write(f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+            stdin.flush()
+        except OSError as e:
+            raise LspError(f"language server stdin closed: {e}") from e
+
+    def notify(self, method: str, params: dict) -> None:
+        self.send({"method": method, "params": params})
+
+    def _answer(self, message: dict) -> None:
+        """Reply to a request the server sent us."""
+        result = None
+        if message["method"] == "workspace/configuration":
+            result = [{} for _ in message.get("params", {}).get("items", [])]
+        self.send({"id": message["id"], "result": result})
+
+    def receive(self, timeout: float) -> dict:
+        """Next response or notification; server requests are answered along the way."""
+        while True:
+            try:
+                message = self._messages.get(timeout=timeout)
+            except queue.Empty:
+                raise LspError("language server timed out") from None
+            if message is None:
+                self._messages.put(None)
+                raise LspError("language server exited")
+            if "method" in message and "id" in message:
+                self._answer(message)
+                continue
+            return message
+
+    def request(self, method: str, params: dict, timeout: float) -> Any:
+        self._next_id += 1
+        request_id = self._next_id
+        self.send({"id": request_id, "method": method, "params": params})
+        while True:
+            message = self.receive(timeout)
+            if message.get("id") == request_id:
+                if "error" in message:
+                    raise LspError(str(message["error"].get("message", "request failed")))
+                return message.get("result")
+
+    def close(self) -> None:
+        if self.alive():
+            try:
+                self.request("shutdown", {}, SHUTDOWN_TIMEOUT)
+                self.notify("exit", {})
+                self.process.wait(SHUTDOWN_TIMEOUT)
+            except (LspError, subprocess.TimeoutExpired):
+                pass
+        if self.alive():
+            self.process.kill()
+            self.process.wait()
+
+
+def source_snapshot(root: Path) -> dict[str, int]:
+    """mtime of every Python source and pyright config under root, skipping hidden and environment directories."""
+    snapshot: dict[str, int] = {}
+    pending = [str(root)]
+    while pending:
+        try:
+            entries = list(os.scandir(pending.pop()))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if not entry.name.startswith(".") and entry.name not in SKIPPED_DIRS:
+                        pending.append(entry.path)
+                elif entry.name.endswith(SOURCE_SUFFIXES) or entry.name in CONFIG_FILES:
+                    snapshot[entry.path] = entry.stat().st_mtime_ns
+            except OSError:
+                continue
+    return snapshot
+
+
+def watched_changes(before: dict[str, int], after: dict[str, int]) -> list[dict]:
+    """FileEvents for workspace/didChangeWatchedFiles between two snapshots."""
+    changes = [
+        {"uri": Path(path).as_uri(), "type": FILE_CREATED if path not in before else FILE_CHANGED}
+        for path, mtime in after.items()
+        if before.get(path) != mtime
+    ]
+    changes.extend({"uri": Path(path).as_uri(), "type": FILE_DELETED} for path in before if path not in after)
+    return changes
+
+
+def to_cli_diagnostic(path: Path, diagnostic: dict) -> dict:
+    """Convert an LSP diagnostic to the shape of `basedpyright --outputjson`."""
+    return {
+        "file": str(path),
+        "severity": SEVERITIES.get(diagnostic.get("severity", 1), "error"),
+        "message": diagnostic.get("message", ""),
+        "range": diagnostic.get("range", {}),
+        "rule": diagnostic.get("code", ""),
+    }
+
+
+class PyrightSession:
+    """Resident basedpyright language server for one project root.
+
+    Requests: {"command": [langserver, "--stdio"], "file": path}.
+    Replies: {"diagnostics": [...]} in `basedpyright --outputjson` shape.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.command: list[str] = []
+        self.client: LspClient | None = None
+        self.versions: dict[str, int] = {}
+        self.snapshot: dict[str, int] = {}
+
+    def _start(self, command: list[str], snapshot: dict[str, int]) -> LspClient:
+        self.close()
+        self.snapshot = snapshot
+        client = LspClient(command, self.root)
+        root_uri = self.root.as_uri()
+        client.request(
+            "initialize",
+            {
+                "processId": os.getpid(),
+                "rootUri": root_uri,
+                "workspaceFolders": [{"uri": root_uri, "name": self.root.name}],
+                "capabilities": {
+                    "textDocument": {"publishDiagnostics": {"versionSupport": True}},
+                    "workspace": {
+                        "configuration": True,
+                        "workspaceFolders": True,
+                        "didChangeWatchedFiles": {"dynamicRegistration": True},
+                    },
+                },
+            },
+            INIT_TIMEOUT,
+        )
+        client.notify("initialized", {})
+        self.client = client
+        self.command = command
+        return client
+
+    def _check(self, client: LspClient, path: Path) -> list[dict]:
+        uri = path.as_uri()
+        text = path.read_text()
+        version = self.versions.get(uri, 0) + 1
+        self.versions[uri] = version
+        document = {"uri": uri, "languageId": "python", "version": version, "text": text}
+        client.notify("textDocument/didOpen", {"textDocument": document})
+        try:
+            return self._diagnostics(client, path, version)
+        finally:
+            client.notify("textDocument/didClose", {"textDocument": {"uri": uri}})
+
+    def _diagnostics(self, client: LspClient, path: Path, version: int) -> list[dict]:
+        """Diagnostics published for exactly this version; unversioned ones may describe older text."""
+        while True:
+            message = client.receive(DIAGNOSTICS_TIMEOUT)
+            if message.get("method") != "textDocument/publishDiagnostics":
+                continue
+            params = message.get("params", {})
+            if uri_to_path(params.get("uri", "")) != path or params.get("version") != version:
+                continue
+            return [
+                to_cli_diagnostic(path, diagnostic)
+                for diagnostic in params.get("diagnostics", [])
+                if diagnostic.get("severity", 1) in SEVERITIES
+            ]
+
+    def _client_for(self, command: list[str]) -> LspClient:
+        snapshot = source_snapshot(self.root)
+        if self.client is None or not self.client.alive() or command != self.command:
+            return self._start(command, snapshot)
+        changes = watched_changes(self.snapshot, snapshot)
+        if any(uri_to_path(change["uri"]).name in CONFIG_FILES for change in changes):
+            return self._start(command, snapshot)
+        if changes:
+            self.client.notify("workspace/didChangeWatchedFiles", {"changes": changes})
+        self.snapshot = snapshot
+        return self.client
+
+    def handle(self, request: dict) -> dict:
+        command = list(request["command"])
+        path = Path(request["file"]).resolve()
+        try:
+            return {"diagnostics": self._check(self._client_for(command), path)}
+        except LspError:
+            self.close()
+        return {"diagnostics": self._check(self._client_for(command), path)}
+
+    def close(self) -> None:
+        if self.client is not None:
+            self.client.close()
+        self.client = None
+        self.versions.clear()
+        self.snapshot = {}
@@ -0,0 +1,178 @@
+"""Checker pipeline — ordered mutating steps, then concurrent analyzers.
+
+The file is read once into a SourceBuffer. Comment stripping, fixers and
+formatters are text transforms applied to the buffer in order (external
+formatters are fed through stdin), and the result is written back once,
+atomically, only if it changed. Analyzers only read the file, so once the
+mutating phase is done they run in parallel and a check takes as long as its
+slowest analyzer instead of the sum of all of them. Each analyzer has its own
+deadline; one that overruns is reported as timed out and left out of the
+results. run_pipeline() fits the deadlines into the check's latency budget
+and defers tools that are known to be slow (see scheduler.py).
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from pathlib import Path
+
+from _timings import phase, tool
+from _util import NC, YELLOW
+
+Results = dict[str, tuple]
+Transform = Callable[[str], "str | None"]
+
+
+class SourceBuffer:
+    """File content read once, transformed in memory and written back once."""
+
+    __slots__ = ("original", "path", "text")
+
+    def __init__(self, path: Path, text: str) -> None:
+        self.path = path
+        self.original = text
+        self.text = text
+
+    @classmethod
+    def read(cls, path: Path) -> SourceBuffer | None:
+        try:
+            return cls(path, path.read_text())
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    @property
+    def changed(self) -> bool:
+        return self.text != self.original
+
+    def apply(self, transform: Transform) -> bool:
+        """Apply a transform. A failing transform, or one returning None, leaves the text as is."""
+        try:
+            new_text = transform(self.text)
+        except Exception:
+            return False
+        if new_text is None or new_text == self.text:
+            return False
+        self.text = new_text
+        return True
+
+    def commit(self) -> bool:
+        """Write the text back atomically if it changed. Returns True if the file was written."""
+        if not self.changed:
+            return False
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        try:
+            tmp.write_text(self.text)
+            try:
+                os.chmod(tmp, self.path.stat().st_mode & 0o7777)
+            except OSError:
+                pass
+            os.replace(tmp, self.path)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+            return False
+        self.original = self.text
+        return True
+
+
+def pipe_through(
+    cmd: list[str], text: str, timeout: float, ok_codes: tuple[int, ...] = (0,), cwd: Path | None = None
+) -> str | None:
+    """Run a stdin-to-stdout formatter over text. Returns None if it failed."""
+    result = subprocess.run(cmd, input=text, capture_output=True, text=True, check=False, timeout=timeout, cwd=cwd)
+    if result.returncode not in ok_codes or not isinstance(result.stdout, str):
+        return None
+    if text and not result.stdout:
+        return None
+    return result.stdout
+
+
+class Analyzer:
+    """A read-only tool run: `run(timeout)` returns its entries for the results dict."""
+
+    __slots__ = ("name", "run", "timeout")
+
+    def __init__(self, name: str, run: Callable[[float], Results], timeout: float) -> None:
+        self.name = name
+        self.run = run
+        self.timeout = timeout
+
+
+def run_mutators(source: SourceBuffer, steps: Sequence[Transform]) -> bool:
+    """Apply text transforms in order, then write the file once. A failing step does not stop the others."""
+    for step in steps:
+        with tool(_step_name(step)):
+            source.apply(step)
+    with phase("io"):
+        return source.commit()
+
+
+def _step_name(step: Transform) -> str:
+    """Name of a transform in hook timings: `ruff_format` for partial(_ruff_format, ...)."""
+    func = getattr(step, "func", step)
+    return getattr(func, "__name__", "transform").lstrip("_")
+
+
+def _timed(analyzer: Analyzer) -> tuple[Results, float]:
+    start = time.monotonic()
+    with tool(analyzer.name):
+        try:
+            partial = analyzer.run(analyzer.timeout)
+        except Exception:
+            partial = {}
+    return partial, time.monotonic() - start
+
+
+def run_analyzers(analyzers: Sequence[Analyzer], elapsed: dict[str, float] | None = None) -> tuple[Results, list[str]]:
+    """Run analyzers concurrently. Returns merged results in analyzer order and the names that timed out.
+
+    If `elapsed` is given, it receives each analyzer's run time in seconds;
+    one that timed out counts as taking its whole deadline.
+    """
+    if not analyzers:
+        return {}, []
+
+    results: Results = {}
+    timed_out: list[str] = []
+    start = time.monotonic()
+    pool = ThreadPoolExecutor(max_workers=len(analyzers))
+    try:
+        futures = [(analyzer, pool.submit(_timed, analyzer)) for analyzer in analyzers]
+        for analyzer, future in futures:
+            remaining = analyzer.timeout - (time.monotonic() - start)
+            try:
+                partial, seconds = future.result(timeout=max(remaining, 0) + 1)
+            except FutureTimeoutError:
+                partial, seconds = {}, analyzer.timeout
+            if elapsed is not None:
+                elapsed[analyzer.name] = min(seconds, analyzer.timeout)
+            if seconds >= analyzer.timeout:
+                timed_out.append(analyzer.name)
+                continue
+            results.update(partial)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return results, timed_out
+
+
+def run_pipeline(
+    source: SourceBuffer, mutators: Sequence[Transform], analyzers: Sequence[Analyzer]
+) -> tuple[Results, list[str]]:
+    """Run the mutating phase, then the analysis phase against the written file, within the check budget."""
+    from _checkers.scheduler import schedule
+
+    started = time.monotonic()
+    run_mutators(source, mutators)
+    return schedule(source.path, analyzers, started)
+
+
+def print_timeouts(timed_out: list[str], analyzers: Sequence[Analyzer]) -> None:
+    """Tell the user which analyzers were skipped for overrunning their deadline."""
+    deadlines = {analyzer.name: analyzer.timeout for analyzer in analyzers}
+    for name in timed_out:
+        print(f"{YELLOW}⏱  {name} timed out after {deadlines.get(name, 0):.0f}s — skipped{NC}", file=sys.stderr)
@@ -5,10 +5,11 @@ from __future__ import annotations
 import io
 import json
 import re
-import shutil
 import subprocess
 import sys
+import time
 import tokenize
+from functools import partial
 from pathlib import Path
 
 from _util import (
@@ -16,8 +17,17 @@ from _util import (
     NC,
     RED,
     check_file_length,
+    which,
 )
 
+from _checkers.pipeline import Analyzer, SourceBuffer, Transform, pipe_through, print_timeouts, run_pipeline
+from _checkers.scope import EditScope
+
+RUFF_TIMEOUT = 30.0
+BASEDPYRIGHT_TIMEOUT = 60.0
+
+RUFF_LOCATION = re.compile(r"^(.+?):(\d+):\d+: ")
+
 
 def strip_python_comments(file_path: Path) -> bool:
     """Remove inline comments from Python file using tokenizer."""
@@ -26,6 +36,15 @@ def strip_python_comments(file_path: Path) -> bool:
     except Exception:
         return False
 
+    new_content = strip_python_comments_text(content)
+    if new_content != content:
+        file_path.write_text(new_content)
+        return True
+    return False
+
+
+def strip_python_comments_text(content: str) -> str:
+    """Return Python source with inline comments removed, keeping directives."""
     preserve_patterns = [
         r"#!",
         r"#\s*type:",
@@ -45,7 +64,7 @@ def strip_python_comments(file_path: Path) -> bool:
     try:
         tokens = list(tokenize.generate_tokens(io.StringIO(content).readline))
     except tokenize.TokenError:
-        return False
+        return content
 
     lines = content.splitlines(keepends=True)
     comments_to_remove: list[tuple[int, int, int]] = []
@@ -59,7 +78,7 @@ def strip_python_comments(file_path: Path) -> bool:
             comments_to_remove.append((start_row, start_col, end_col))
 
     if not comments_to_remove:
-        return False
+        return content
 
     new_lines = list(lines)
     lines_to_delete: set[int] = set()
@@ -78,78 +97,49 @@ def strip_python_comments(file_path: Path) -> bool:
     for idx in sorted(lines_to_delete, reverse=True):
         del new_lines[idx]
 
-    new_content = "".join(new_lines)
-    if new_content != content:
-        file_path.write_text(new_content)
-        return True
-    return False
+    return "".join(new_lines)
 
 
-def check_python(file_path: Path) -> tuple[int, str]:
-    """Check Python file with ruff and basedpyright. Returns (exit_code, reason)."""
-    strip_python_comments(file_path)
+def check_python(file_path: Path, scope: EditScope | None = None) -> tuple[int, str]:
+    """Check Python file with ruff and basedpyright. Returns (exit_code, reason).
+
+    With a scope, ruff only reports the edited lines; basedpyright errors
+    are reported for the whole file.
+    """
+    source = SourceBuffer.read(file_path)
+    if source is None:
+        return 0, ""
+    source.apply(strip_python_comments_text)
 
     if "test_" in file_path.name or "spec" in file_path.name:
+        source.commit()
         return 0, ""
 
-    check_file_length(file_path)
+    check_file_length(file_path, source.text)
+
+    ruff_bin = which("ruff")
+    basedpyright_bin = which("basedpyright")
 
-    ruff_bin = shutil.which("ruff")
+    mutators: list[Transform] = []
+    analyzers: list[Analyzer] = []
     if ruff_bin:
-        try:
-            subprocess.run(
-                [ruff_bin, "check", "--select", "I,RUF022", "--fix", str(file_path)], capture_output=True, check=False
-            )
-            subprocess.run([ruff_bin, "format", str(file_path)], capture_output=True, check=False)
-        except Exception:
-            pass
-
-    has_ruff = ruff_bin is not None
-    has_basedpyright = shutil.which("basedpyright") is not None
-
-    if not (has_ruff or has_basedpyright):
+        mutators += [partial(_ruff_fix, ruff_bin, file_path), partial(_ruff_format, ruff_bin, file_path)]
+        analyzers.append(Analyzer("ruff", partial(_run_ruff, ruff_bin, file_path), RUFF_TIMEOUT))
+    if basedpyright_bin:
+        analyzers.append(
+            Analyzer("basedpyright", partial(_basedpyright_results, basedpyright_bin, file_path), BASEDPYRIGHT_TIMEOUT)
+        )
+
+    if not analyzers:
+        source.commit()
         return 0, ""
 
-    results: dict[str, tuple] = {}
-    has_issues = False
-
-    if has_ruff and ruff_bin:
-        try:
-            result = subprocess.run(
-                [ruff_bin, "check", "--output-format=concise", str(file_path)],
-                capture_output=True,
-                text=True,
-                check=False,
-            )
-            output = result.stdout + result.stderr
-            error_pattern = re.compile(r":\d+:\d+: [A-Z]{1,3}\d+")
-            error_lines = [line for line in output.splitlines() if error_pattern.search(line)]
-            if error_lines:
-                has_issues = True
-                results["ruff"] = (len(error_lines), error_lines)
-        except Exception:
-            pass
-
-    basedpyright_bin = shutil.which("basedpyright")
-    if basedpyright_bin:
-        try:
-            result = subprocess.run(
-                [basedpyright_bin, "--outputjson", str(file_path.resolve())],
-                capture_output=True,
-                text=True,
-                check=False,
-            )
-            output = result.stdout + result.stderr
-            try:
-                data = json.loads(output)
-                error_count = data.get("summary", {}).get("errorCount", 0)
-                if error_count > 0:
-                    has_issues = True
-                    results["basedpyright"] = (error_count, data.get("generalDiagnostics", []))
-            except json.JSONDecodeError:
-                pass
-        except Exception:
-            pass
+    results, timed_out = run_pipeline(source, mutators, analyzers)
+    print_timeouts(timed_out, analyzers)
+    if scope is not None:
+        results = _scope_python_results(results, scope.locate(source.text))
+        scope.report()
+    has_issues = bool(results)
 
     if has_issues:
         _print_python_issues(file_path, results)
@@ -164,6 +154,112 @@ def check_python(file_path: Path) -> tuple[int, str]:
     return 2, ""
 
 
+def _ruff_fix(ruff_bin: str, file_path: Path, text: str) -> str | None:
+    """Sort imports and fix __all__ ordering in the buffer."""
+    cmd = [ruff_bin, "check", "--select", "I,RUF022", "--fix", "--stdin-filename", str(file_path), "-"]
+    return pipe_through(cmd, text, RUFF_TIMEOUT, ok_codes=(0, 1))
+
+
+def _ruff_format(ruff_bin: str, file_path: Path, text: str) -> str | None:
+    """Format the buffer with ruff."""
+    return pipe_through([ruff_bin, "format", "--stdin-filename", str(file_path), "-"], text, RUFF_TIMEOUT)
+
+
+def _run_ruff(ruff_bin: str, file_path: Path, timeout: float) -> dict[str, tuple]:
+    """Lint with ruff. Returns {"ruff": (count, lines)} when there are issues."""
+    try:
+        result = subprocess.run(
+            [ruff_bin, "check", "--output-format=concise", str(file_path)],
+            capture_output=True,
+            text=True,
+            check=False,
+            timeout=timeout,
+        )
+    except Exception:
+        return {}
+    output = result.stdout + result.stderr
+    error_pattern = re.compile(r":\d+:\d+: [A-Z]{1,3}\d+")
+    error_lines = [line for line in output.splitlines() if error_pattern.search(line)]
+    return {"ruff": (len(error_lines), error_lines)} if error_lines else {}
+
+
+def _basedpyright_results(basedpyright_bin: str, file_path: Path, timeout: float) -> dict[str, tuple]:
+    """Type-check with basedpyright. Returns {"basedpyright": (errors, diagnostics)} when there are errors."""
+    data = _run_basedpyright(basedpyright_bin, file_path, timeout)
+    if not data:
+        return {}
+    error_count = data.get("summary", {}).get("errorCount", 0)
+    return {"basedpyright": (error_count, data.get("generalDiagnostics", []))} if error_count > 0 else {}
+
+
+def _scope_python_results(results: dict[str, tuple], scope: EditScope) -> dict[str, tuple]:
+    """Keep ruff diagnostics on the edited lines and basedpyright errors anywhere in the file."""
+    scoped: dict[str, tuple] = {}
+    if "ruff" in results:
+        lines = scope.filter_lines(results["ruff"][1], RUFF_LOCATION)
+        if lines:
+            scoped["ruff"] = (len(lines), lines)
+    if "basedpyright" in results:
+        scoped["basedpyright"] = results["basedpyright"]
+    return scoped
+
+
+def find_python_root(file_path: Path) -> Path:
+    """Nearest directory with Python project config, else the file's directory."""
+    markers = ("pyrightconfig.json", "pyproject.toml", "setup.py", "setup.cfg")
+    for directory in file_path.resolve().parents:
+        if any((directory / marker).exists() for marker in markers):
+            return directory
+    return file_path.resolve().parent
+
+
+def _resident_basedpyright(file_path: Path, timeout: float = BASEDPYRIGHT_TIMEOUT) -> dict | None:
+    """Diagnostics from the project's resident basedpyright language server, if running."""
+    langserver_bin = which("basedpyright-langserver")
+    if not langserver_bin:
+        return None
+
+    from _checkers import service
+
+    response = service.request(
+        "basedpyright",
+        find_python_root(file_path),
+        {"command": [langserver_bin, "--stdio"], "file": str(file_path.resolve())},
+        timeout=timeout,
+    )
+    if response is None:
+        return None
+    diagnostics = response.get("diagnostics", [])
+    error_count = sum(1 for diag in diagnostics if diag.get("severity") == "error")
+    return {"summary": {"errorCount": error_count}, "generalDiagnostics": diagnostics}
+
+
+def _run_basedpyright(basedpyright_bin: str, file_path: Path, timeout: float = BASEDPYRIGHT_TIMEOUT) -> dict | None:
+    """Basedpyright report for the file, in `--outputjson` shape.
+
+    The resident server and the CLI fallback share one deadline.
+    """
+    deadline = time.monotonic() + timeout
+    data = _resident_basedpyright(file_path, timeout)
+    if data is not None:
+        return data
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return None
+    try:
+        result = subprocess.run(
+            [basedpyright_bin, "--outputjson", str(file_path.resolve())],
+            capture_output=True,
+            text=True,
+            check=False,
+            timeout=remaining,
+        )
+        data = json.loads(result.stdout + result.stderr)
+    except Exception:
+        return None
+    return data if isinstance(data, dict) else None
+
+
 def _print_python_issues(file_path: Path, results: dict[str, tuple]) -> None:
     """Print Python diagnostic issues to stderr."""
     print("", file=sys.stderr)
@@ -0,0 +1,353 @@
+"""Deadline-aware scheduling of checker analyzers.
+
+Every file check gets a total latency budget, CHECK_BUDGET seconds
+(PILOT_CHECK_BUDGET overrides it), measured from the start of the check so
+the mutating phase uses it up too. Before the analyzers start, each one gets
+a slice of what is left: never more than its own timeout or the remaining
+budget, and, once its typical duration in this project is known, no more
+than SLICE_SLACK times that. An analyzer that overruns its slice is killed
+(the slice is the timeout its subprocess runs with) and reported as timed
+out, while the diagnostics that did complete are still shown.
+
+Typical durations are an exponentially weighted average per project (the
+hook's working directory) and tool, kept in
+~/.pilot/cache/tool-durations.json. A tool whose typical duration is more
+than DEFER_SHARE of the budget is not run inline at all: it is deferred to a
+detached worker process (this module run as a script, in its own session,
+with the pickled analyzers on stdin) that runs it with its full timeout and
+leaves the results in the session store. A fresh interpreter rather than a
+fork, since other stages of the hook may be running on threads. The next
+check of the same file shows those results, marked as coming from the
+previous edit, unless the tool ran inline this time. If no worker can be
+started, the tools run inline with a slice like any other. A deferred tool
+also runs inline once every INLINE_PROBE_INTERVAL seconds, so that a tool
+that has become faster can drop back under DEFER_SHARE.
+
+Checks with a timed-out, deferred or previous-edit result are incomplete and
+are not stored in the check cache.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import pickle
+import subprocess
+import sys
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if __name__ == "__main__":
+    sys.path[0] = str(Path(__file__).resolve().parents[1])
+
+from _util import NC, YELLOW, session_store
+
+if TYPE_CHECKING:
+    from _checkers.pipeline import Analyzer, Results
+
+CHECK_BUDGET = 30.0
+DEFER_SHARE = 0.5
+SLICE_SLACK = 3.0
+MIN_SLICE = 5.0
+EWMA_WEIGHT = 0.3
+DEFERRED_KEY = "deferred_checks"
+DEFERRED_STALE_AFTER = 600.0
+PROBES_KEY = "inline_probes"
+INLINE_PROBE_INTERVAL = 600.0
+
+_partial = False
+
+
+def check_budget() -> float:
+    """Total seconds one file check may take."""
+    try:
+        budget = float(os.environ.get("PILOT_CHECK_BUDGET", ""))
+    except ValueError:
+        return CHECK_BUDGET
+    return budget if budget > 0 else CHECK_BUDGET
+
+
+def durations_path() -> Path:
+    return Path.home() / ".pilot" / "cache" / "tool-durations.json"
+
+
+def _project() -> str:
+    try:
+        return os.getcwd()
+    except OSError:
+        return ""
+
+
+def typical_durations(project: str) -> dict[str, float]:
+    """Learned seconds per tool for a project."""
+    try:
+        data = json.loads(durations_path().read_text())
+    except (OSError, json.JSONDecodeError):
+        return {}
+    durations = data.get(project) if isinstance(data, dict) else None
+    if not isinstance(durations, dict):
+        return {}
+    return {name: float(value) for name, value in durations.items() if isinstance(value, (int, float))}
+
+
+def observe(project: str, elapsed: dict[str, float]) -> None:
+    """Fold measured run times into the project's typical durations. Never raises."""
+    if not elapsed:
+        return
+    path = durations_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            f.seek(0)
+            try:
+                data = json.loads(f.read() or "{}")
+            except json.JSONDecodeError:
+                data = {}
+            if not isinstance(data, dict):
+                data = {}
+            durations = data.setdefault(project, {})
+            for name, seconds in elapsed.items():
+                previous = durations.get(name)
+                if isinstance(previous, (int, float)):
+                    seconds = previous + EWMA_WEIGHT * (seconds - previous)
+                durations[name] = round(seconds, 3)
+            f.seek(0)
+            f.truncate()
+            f.write(json.dumps(data))
+    except OSError:
+        pass
+
+
+def plan(
+    analyzers: Sequence[Analyzer], remaining: float, typical: dict[str, float]
+) -> tuple[list[Analyzer], list[Analyzer]]:
+    """Split analyzers into those run now, with their timeouts cut to a slice, and those deferred."""
+    inline: list[Analyzer] = []
+    deferred: list[Analyzer] = []
+    defer_after = check_budget() * DEFER_SHARE
+    for analyzer in analyzers:
+        expected = typical.get(analyzer.name)
+        if expected is not None and expected > defer_after:
+            deferred.append(analyzer)
+            continue
+        limit = min(analyzer.timeout, max(remaining, 0.0))
+        if expected is not None:
+            limit = min(limit, max(MIN_SLICE, expected * SLICE_SLACK))
+        analyzer.timeout = limit
+        inline.append(analyzer)
+    return inline, deferred
+
+
+def mark_partial() -> None:
+    """Note that the running check left something out, so its result must not be cached."""
+    global _partial
+    _partial = True
+
+
+def take_partial() -> bool:
+    """Whether the last check was incomplete, clearing the flag."""
+    global _partial
+    partial, _partial = _partial, False
+    return partial
+
+
+def _entry_key(file_path: Path) -> str:
+    return str(file_path.resolve())
+
+
+def pending_tools(file_path: Path) -> set[str]:
+    """Tools still running in the background for this file."""
+    entry = (session_store().get(DEFERRED_KEY) or {}).get(_entry_key(file_path))
+    if not isinstance(entry, dict) or not entry.get("pending"):
+        return set()
+    if time.time() - entry.get("started", 0) > DEFERRED_STALE_AFTER:
+        return set()
+    return set(entry.get("tools", []))
+
+
+def take_deferred(file_path: Path) -> tuple[Results, list[str]]:
+    """Results a finished background run left for this file, and the tools it ran. Removes them."""
+    key = _entry_key(file_path)
+    taken: dict = {}
+
+    def pop(value):
+        checks = value if isinstance(value, dict) else {}
+        entry = checks.get(key)
+        if isinstance(entry, dict) and not entry.get("pending"):
+            taken.update(entry)
+            checks.pop(key)
+        return checks or None
+
+    session_store().update(DEFERRED_KEY, pop)
+    results = {name: tuple(value) for name, value in (taken.get("results") or {}).items()}
+    return results, list(taken.get("tools", []))
+
+
+def _save_deferred(file_path: Path, entry: dict | None) -> None:
+    """Record a background run for the file; None forgets it."""
+    key = _entry_key(file_path)
+
+    def put(value):
+        checks = value if isinstance(value, dict) else {}
+        if entry is None:
+            checks.pop(key, None)
+        else:
+            checks[key] = entry
+        return checks or None
+
+    session_store().update(DEFERRED_KEY, put)
+
+
+def due_probes(project: str, names: Sequence[str]) -> set[str]:
+    """Deferred tools due for an inline run. The first deferral of a tool starts its clock."""
+    now = time.time()
+    due: set[str] = set()
+
+    def tick(value):
+        probes = value if isinstance(value, dict) else {}
+        clocks = probes.get(project)
+        if not isinstance(clocks, dict):
+            clocks = probes[project] = {}
+        for name in names:
+            last = clocks.get(name)
+            if not isinstance(last, (int, float)):
+                clocks[name] = now
+            elif now - last >= INLINE_PROBE_INTERVAL:
+                due.add(name)
+                clocks[name] = now
+        return probes
+
+    if names:
+        session_store().update(PROBES_KEY, tick)
+    return due
+
+
+def _spawn_worker(job: dict) -> bool:
+    """Hand a job to a detached worker process. Returns False if no worker could be started."""
+    try:
+        payload = pickle.dumps(job)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return False
+    try:
+        worker = subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve())],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError:
+        return False
+    assert worker.stdin is not None
+    try:
+        with worker.stdin:
+            worker.stdin.write(payload)
+    except OSError:
+        return False
+    return True
+
+
+def run_job(job: dict) -> None:
+    """Run a deferred job's analyzers and leave their results for the next check of the file."""
+    from _checkers.pipeline import run_analyzers
+
+    analyzers = job["analyzers"]
+    elapsed: dict[str, float] = {}
+    results, timed_out = run_analyzers(analyzers, elapsed)
+    observe(job["project"], elapsed)
+    _save_deferred(
+        Path(job["file"]),
+        {
+            "pending": False,
+            "finished": time.time(),
+            "tools": [analyzer.name for analyzer in analyzers],
+            "results": results,
+            "timed_out": timed_out,
+        },
+    )
+
+
+def run_deferred(file_path: Path, analyzers: Sequence[Analyzer], timeouts: dict[str, float]) -> bool:
+    """Start a background run of deferred analyzers with their full timeouts."""
+    tools = [analyzer.name for analyzer in analyzers]
+    _save_deferred(file_path, {"pending": True, "started": time.time(), "tools": tools})
+    for analyzer in analyzers:
+        analyzer.timeout = timeouts[analyzer.name]
+    if _spawn_worker({"file": str(file_path), "project": _project(), "analyzers": list(analyzers)}):
+        return True
+    _save_deferred(file_path, None)
+    return False
+
+
+def schedule(file_path: Path, analyzers: Sequence[Analyzer], started: float) -> tuple[Results, list[str]]:
+    """Run the analysis phase of one check within its budget.
+
+    Returns the merged results and the names that timed out, like
+    run_analyzers(), with results of an earlier background run filled in
+    for tools that did not run now.
+    """
+    from _checkers.pipeline import run_analyzers
+
+    project = _project()
+    timeouts = {analyzer.name: analyzer.timeout for analyzer in analyzers}
+    remaining = check_budget() - (time.monotonic() - started)
+    inline, deferred = plan(analyzers, remaining, typical_durations(project))
+
+    previous, previous_tools = take_deferred(file_path)
+    promoted: list[Analyzer] = []
+    if deferred:
+        running = pending_tools(file_path)
+        fresh = [analyzer for analyzer in deferred if analyzer.name not in running]
+        probes = due_probes(project, [analyzer.name for analyzer in fresh])
+        background = [analyzer for analyzer in fresh if analyzer.name not in probes]
+        if background and not run_deferred(file_path, background, timeouts):
+            background = []
+        promoted = [analyzer for analyzer in fresh if analyzer not in background]
+        for analyzer in promoted:
+            analyzer.timeout = min(timeouts[analyzer.name], max(remaining, 0.0))
+        if background or running:
+            mark_partial()
+            print_deferred([analyzer.name for analyzer in background] or sorted(running))
+
+    elapsed: dict[str, float] = {}
+    results, timed_out = run_analyzers([*inline, *promoted], elapsed)
+    for analyzer in promoted:
+        # A slow tool cut off at its slice would drag its typical duration down.
+        if analyzer.name in timed_out:
+            elapsed.pop(analyzer.name, None)
+    observe(project, elapsed)
+    if timed_out:
+        mark_partial()
+
+    ran = {analyzer.name for analyzer in [*inline, *promoted]}
+    stale = [name for name in previous_tools if name not in ran]
+    if stale:
+        mark_partial()
+        print_previous(stale)
+    carried = {name: value for name, value in previous.items() if name in stale}
+    return {**carried, **results}, timed_out
+
+
+def print_deferred(names: Sequence[str]) -> None:
+    """Tell the user which slow tools run in the background instead."""
+    for name in names:
+        print(f"{YELLOW}⏳ {name} deferred to a background run — results follow on the next edit{NC}", file=sys.stderr)
+
+
+def print_previous(names: Sequence[str]) -> None:
+    """Mark results that come from the background run after the previous edit."""
+    if names:
+        print(f"{YELLOW}⏳ {', '.join(names)} results are from the previous edit{NC}", file=sys.stderr)
+
+
+def main() -> int:
+    run_job(pickle.load(sys.stdin.buffer))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
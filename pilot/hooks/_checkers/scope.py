@@ -0,0 +1,281 @@
+"""Edit-scoped diagnostics.
+
+A PostToolUse payload says what an edit changed, so on a large file the
+checkers report only what the edit touched instead of every pre-existing
+issue. EditScope holds the file's content before the edit, taken from the
+first of:
+
+- the `originalFile` that Edit and Write return in tool_response,
+- the snapshot this session took when it last checked the file, if the
+  edit applies to it,
+- the current file with the edit's old_string/new_string pairs undone.
+
+Once the checker has stripped and formatted the file, locate() diffs the
+pre-edit content against the checked text for the changed line ranges.
+Tools that can scope themselves get the change as a patch (golangci-lint
+--new-from-patch); the output of the other linters is filtered to those
+lines. Type checkers (basedpyright, tsc, go vet) keep their errors for the
+whole edited file, since an edit such as a rename breaks lines it did not
+touch. tsc checks the whole project, so its errors in other files are kept
+only for files that import the edited one.
+
+A Write whose pre-edit content is unknown (a new file) and an edit that
+cannot be undone are checked in full. Set PILOT_EDIT_SCOPE=0 to always
+check whole files.
+"""
+
+from __future__ import annotations
+
+import difflib
+import hashlib
+import os
+import re
+import sys
+from pathlib import Path
+
+from _util import NC, YELLOW
+
+SNAPSHOT_DIR = "snapshots"
+MAX_SNAPSHOT_BYTES = 1024 * 1024
+
+_TS_IMPORT = re.compile(r"""(?:\bfrom\s+|\bimport\s*\(\s*|\brequire\s*\(\s*|^\s*import\s+)["']([^"']+)["']""", re.M)
+_JS_SUFFIXES = (".js", ".jsx", ".mjs", ".cjs")
+
+Range = tuple[int, int]
+
+
+def enabled() -> bool:
+    """Whether checks may be scoped to the edited lines."""
+    return os.environ.get("PILOT_EDIT_SCOPE", "").strip().lower() not in ("0", "false", "off")
+
+
+def snapshot_path(file_path: Path) -> Path:
+    """Where this session keeps the content a file had when it was last checked."""
+    from _util import _sessions_base
+
+    session_id = os.environ.get("PILOT_SESSION_ID", "").strip() or "default"
+    digest = hashlib.sha256(str(file_path.resolve()).encode()).hexdigest()[:24]
+    return _sessions_base() / session_id / SNAPSHOT_DIR / digest
+
+
+def remember(file_path: Path) -> None:
+    """Snapshot the checked file as the pre-edit content of its next edit. Never raises."""
+    try:
+        content = file_path.read_bytes()
+        if len(content) > MAX_SNAPSHOT_BYTES:
+            return
+        path = snapshot_path(file_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(content)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def _snapshot(file_path: Path) -> str | None:
+    try:
+        return snapshot_path(file_path).read_text()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def _edits(tool_name: str, tool_input: dict) -> list[tuple[str, str, bool]]:
+    """The (old_string, new_string, replace_all) replacements an Edit or MultiEdit made, in order."""
+    if tool_name == "Edit":
+        raw = [tool_input]
+    elif tool_name == "MultiEdit":
+        raw = tool_input.get("edits") if isinstance(tool_input.get("edits"), list) else []
+    else:
+        return []
+    edits = []
+    for edit in raw:
+        if not isinstance(edit, dict):
+            return []
+        old, new = edit.get("old_string"), edit.get("new_string")
+        if not isinstance(old, str) or not isinstance(new, str):
+            return []
+        edits.append((old, new, bool(edit.get("replace_all"))))
+    return edits
+
+
+def apply_edits(text: str, edits: list[tuple[str, str, bool]]) -> str | None:
+    """Make the replacements the way the Edit tool does, or None if one does not apply."""
+    for old, new, replace_all in edits:
+        if not old or old not in text:
+            return None
+        text = text.replace(old, new) if replace_all else text.replace(old, new, 1)
+    return text
+
+
+def undo_edits(text: str, edits: list[tuple[str, str, bool]]) -> str | None:
+    """Reverse the replacements, or None where the edited text cannot be found unambiguously."""
+    for old, new, replace_all in reversed(edits):
+        count = text.count(new) if new else 0
+        if count == 0 or (count > 1 and not replace_all):
+            return None
+        text = text.replace(new, old)
+    return text
+
+
+def pre_edit_content(payload: dict, file_path: Path, text: str) -> str | None:
+    """The file's content before the edit in `payload`, or None if it cannot be known."""
+    tool_name = payload.get("tool_name", "")
+    tool_input = payload.get("tool_input") if isinstance(payload.get("tool_input"), dict) else {}
+    response = payload.get("tool_response") if isinstance(payload.get("tool_response"), dict) else {}
+    original = response.get("originalFile")
+    if isinstance(original, str) and (original or tool_name != "Write"):
+        return original
+
+    edits = _edits(tool_name, tool_input)
+    snapshot = _snapshot(file_path)
+    if snapshot is not None and (tool_name == "Write" or (edits and apply_edits(snapshot, edits) == text)):
+        return snapshot
+    return undo_edits(text, edits) if edits else None
+
+
+def edit_scope(payload: dict, file_path: Path) -> EditScope | None:
+    """Scope for checking the file an edit payload touched; None means check the whole file."""
+    if not enabled() or not payload:
+        return None
+    try:
+        text = file_path.read_text()
+    except (OSError, UnicodeDecodeError):
+        return None
+    before = pre_edit_content(payload, file_path, text)
+    return None if before is None else EditScope(file_path, before)
+
+
+def changed_ranges(before: str, after: str) -> list[Range]:
+    """1-based inclusive line ranges of `after` that differ from `before`.
+
+    A deletion marks the lines on either side of the gap it left.
+    """
+    old_lines = before.splitlines()
+    new_lines = after.splitlines()
+    ranges: list[Range] = []
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, _i1, _i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        if j2 > j1:
+            start, end = j1 + 1, j2
+        elif new_lines:
+            start, end = max(j1, 1), min(j1 + 1, len(new_lines))
+        else:
+            continue
+        if ranges and start <= ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], max(end, ranges[-1][1]))
+        else:
+            ranges.append((start, end))
+    return ranges
+
+
+def imports_file(importer: Path, target: Path) -> bool:
+    """Whether a JS/TS module imports `target` through a relative specifier."""
+    try:
+        text = importer.read_text()
+    except (OSError, UnicodeDecodeError):
+        return False
+    target = target.resolve()
+    stem = target.with_suffix("")
+    for specifier in _TS_IMPORT.findall(text):
+        if not specifier.startswith("."):
+            continue
+        candidate = (importer.parent / specifier).resolve()
+        if candidate.suffix in _JS_SUFFIXES:
+            candidate = candidate.with_suffix("")
+        if candidate in (target, stem) or candidate / "index" == stem:
+            return True
+    return False
+
+
+class EditScope:
+    """The lines of one file an edit changed, and the diagnostics left out for lying elsewhere."""
+
+    __slots__ = ("_dependents", "before", "file_path", "hidden", "ranges")
+
+    def __init__(self, file_path: Path, before: str) -> None:
+        self.file_path = file_path
+        self.before = before
+        self.ranges: list[Range] = []
+        self.hidden = 0
+        self._dependents: dict[Path, bool] = {}
+
+    def key(self) -> str:
+        """Identity of the scope for the check cache."""
+        return hashlib.sha256(self.before.encode()).hexdigest()
+
+    def locate(self, text: str) -> EditScope:
+        """Find the changed lines in the checked text."""
+        self.ranges = changed_ranges(self.before, text)
+        return self
+
+    def covers(self, line: int) -> bool:
+        return any(start <= line <= end for start, end in self.ranges)
+
+    def keep(self, reported: str | None, line: int | None, base: Path | None = None, whole_file: bool = False) -> bool:
+        """Whether a diagnostic at `reported`:`line` is in scope, counting the ones left out.
+
+        Relative paths are taken from `base`, by default the working
+        directory. Diagnostics without a location are always kept, and so
+        are all of the edited file's with `whole_file`.
+        """
+        if reported is None or line is None:
+            kept = True
+        else:
+            path = Path(reported) if os.path.isabs(reported) else (base or Path.cwd()) / reported
+            if path.resolve() == self.file_path.resolve():
+                kept = whole_file or self.covers(line)
+            else:
+                kept = self._depends(path)
+        if not kept:
+            self.hidden += 1
+        return kept
+
+    def _depends(self, path: Path) -> bool:
+        if path not in self._dependents:
+            self._dependents[path] = imports_file(path, self.file_path)
+        return self._dependents[path]
+
+    def filter_lines(
+        self, lines: list[str], pattern: re.Pattern[str], base: Path | None = None, whole_file: bool = False
+    ) -> list[str]:
+        """Keep tool output lines in scope; `pattern` captures the file and line of a located line."""
+        kept = []
+        for line in lines:
+            match = pattern.search(line)
+            if match is None or self.keep(match.group(1), int(match.group(2)), base, whole_file):
+                kept.append(line)
+        return kept
+
+    def patch(self, text: str) -> str:
+        """Unified diff of the edit, with paths relative to the working directory."""
+        try:
+            name = os.path.relpath(self.file_path)
+        except ValueError:
+            name = str(self.file_path)
+        return "".join(
+            difflib.unified_diff(
+                self.before.splitlines(keepends=True),
+                text.splitlines(keepends=True),
+                f"a/{name}",
+                f"b/{name}",
+                n=0,
+            )
+        )
+
+    def describe(self) -> str:
+        if not self.ranges:
+            return "no changed lines"
+        parts = [str(start) if start == end else f"{start}-{end}" for start, end in self.ranges]
+        return ("line " if len(parts) == 1 and "-" not in parts[0] else "lines ") + ", ".join(parts)
+
+    def report(self) -> None:
+        """Tell the user the check was scoped, if that left anything out."""
+        if self.hidden:
+            plural = "issue" if self.hidden == 1 else "issues"
+            print(
+                f"{YELLOW}🔎 Scoped to the edit ({self.describe()}): {self.hidden} {plural} elsewhere not shown{NC}",
+                file=sys.stderr,
+            )
@@ -0,0 +1,170 @@
+"""Resident checker services - warm per-project analysis processes.
+
+Type checkers and linters spend most of their time loading the project, not
+checking the edited file. A service keeps one warm instance per (kind,
+project root) inside a detached broker process that listens on a Unix socket
+under ~/.pilot/run/. Hooks send one JSON line per request and read one JSON
+line back.
+
+When no broker is reachable, request() starts one in the background and
+returns None so the caller can fall back to its one-shot command. Brokers
+exit after IDLE_TIMEOUT seconds without requests. Set
+PILOT_RESIDENT_CHECKERS=0 to disable them.
+
+A service handler is a class taking the project root, with
+handle(request) -> dict and close() methods. Handlers are registered in
+SERVICES.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import importlib
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+from pathlib import Path
+
+SERVICES: dict[str, tuple[str, str]] = {
+    "basedpyright": ("_checkers.lsp", "PyrightSession"),
+    "lint": ("_checkers.lint_worker", "LintWorkerSession"),
+    "tsserver": ("_checkers.tsserver", "TsserverSession"),
+}
+
+IDLE_TIMEOUT = 15 * 60
+CONNECT_TIMEOUT = 0.5
+REQUEST_TIMEOUT = 60.0
+MAX_LINE_BYTES = 16 * 1024 * 1024
+
+
+def enabled() -> bool:
+    """Whether resident services may be used."""
+    return os.environ.get("PILOT_RESIDENT_CHECKERS", "").strip().lower() not in ("0", "false", "off")
+
+
+def _run_dir() -> Path:
+    return Path.home() / ".pilot" / "run"
+
+
+def socket_path(kind: str, root: Path) -> Path:
+    """Socket path of the broker serving `kind` for a project root."""
+    digest = hashlib.sha1(str(root).encode()).hexdigest()[:12]
+    return _run_dir() / f"{kind}-{digest}.sock"
+
+
+def _read_line(conn: socket.socket) -> bytes:
+    data = b""
+    while not data.endswith(b"\n") and len(data) < MAX_LINE_BYTES:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def request(kind: str, root: Path, payload: dict, timeout: float = REQUEST_TIMEOUT) -> dict | None:
+    """Send a request to the broker for (kind, root).
+
+    Returns the reply, or None when the service is disabled, not running yet
+    (a broker is started for next time), or failed to answer.
+    """
+    if not enabled():
+        return None
+
+    path = socket_path(kind, root)
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.settimeout(CONNECT_TIMEOUT)
+            conn.connect(str(path))
+            conn.settimeout(timeout)
+            conn.sendall(json.dumps(payload).encode() + b"\n")
+            reply = _read_line(conn)
+    except (FileNotFoundError, ConnectionRefusedError):
+        spawn(kind, root)
+        return None
+    except OSError:
+        return None
+
+    try:
+        response = json.loads(reply)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(response, dict) or "error" in response:
+        return None
+    return response
+
+
+def spawn(kind: str, root: Path) -> None:
+    """Start a detached broker for (kind, root)."""
+    try:
+        subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve()), kind, str(root)],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+            close_fds=True,
+        )
+    except OSError:
+        pass
+
+
+def _serve_one(conn: socket.socket, handler) -> None:
+    try:
+        payload = json.loads(_read_line(conn))
+        response = handler.handle(payload)
+    except Exception as e:
+        response = {"error": f"{type(e).__name__}: {e}"}
+    try:
+        conn.sendall(json.dumps(response).encode() + b"\n")
+    except OSError:
+        pass
+
+
+def serve(kind: str, root: Path) -> int:
+    """Run the broker for (kind, root) until it goes idle."""
+    path = socket_path(kind, root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with path.with_suffix(".lock").open("a+") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return 0
+        lock_file.truncate(0)
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+
+        module_name, class_name = SERVICES[kind]
+        handler = getattr(importlib.import_module(module_name), class_name)(root)
+
+        path.unlink(missing_ok=True)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            server.bind(str(path))
+            os.chmod(path, 0o600)
+            server.listen(16)
+            server.settimeout(IDLE_TIMEOUT)
+            while True:
+                try:
+                    conn, _ = server.accept()
+                except TimeoutError:
+                    break
+                with conn:
+                    conn.settimeout(None)
+                    _serve_one(conn, handler)
+        finally:
+            handler.close()
+            server.close()
+            path.unlink(missing_ok=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.path[0] = str(Path(__file__).resolve().parents[1])
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    sys.exit(serve(sys.argv[1], Path(sys.argv[2])))
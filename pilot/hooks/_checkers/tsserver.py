@@ -0,0 +1,180 @@
+"""Resident TypeScript checking through tsserver.
+
+TsserverSession keeps one tsserver per project root (see service.py), so the
+program stays in memory between edits. Each check reloads the edited file
+and asks for syntactic and semantic diagnostics of that file plus the other
+files the session has checked recently, which are the ones an edit is most
+likely to affect. Files that import the edited one but were never opened
+are not in that list, so the first check, and then one check every
+PROJECT_CHECK_INTERVAL seconds, asks for the whole project's diagnostics
+(geterrForProject) the way the `tsc --noEmit` run it replaces did. tsserver
+does not watch open files, so before asking, every open file whose mtime or
+size changed on disk is reloaded too (and closed if it was deleted);
+otherwise its errors would describe old contents. Errors are returned
+formatted like `tsc` output.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import time
+from pathlib import Path
+
+from _checkers.lsp import LspClient, LspError
+
+START_TIMEOUT = 120.0
+DIAGNOSTICS_TIMEOUT = 60.0
+MAX_OPEN_FILES = 32
+PROJECT_CHECK_INTERVAL = 5 * 60
+
+DIAGNOSTIC_EVENTS = ("syntaxDiag", "semanticDiag")
+
+
+class TsserverClient(LspClient):
+    """tsserver speaks one JSON request per line and answers with framed messages."""
+
+    def __init__(self, command: list[str], root: Path) -> None:
+        super().__init__(command, root)
+        self._seq = 0
+
+    def send(self, message: dict) -> None:
+        stdin = self.process.stdin
+        assert stdin is not None
+        try:
+            stdin.write(json.dumps(message).encode() + b"\n")
+            stdin.flush()
+        except OSError as e:
+            raise LspError(f"tsserver stdin closed: {e}") from e
+
+    def command(self, command: str, arguments: dict) -> int:
+        """Send a request without waiting for its response. Returns its seq."""
+        self._seq += 1
+        self.send({"seq": self._seq, "type": "request", "command": command, "arguments": arguments})
+        return self._seq
+
+    def request(self, method: str, params: dict, timeout: float) -> dict:
+        seq = self.command(method, params)
+        while True:
+            message = self.receive(timeout)
+            if message.get("type") == "response" and message.get("request_seq") == seq:
+                if not message.get("success", True):
+                    raise LspError(message.get("message", f"{method} failed"))
+                return message.get("body") or {}
+
+    def close(self) -> None:
+        if self.alive():
+            try:
+                self.command("exit", {})
+                self.process.wait(2)
+            except (LspError, subprocess.TimeoutExpired):
+                pass
+        if self.alive():
+            self.process.kill()
+            self.process.wait()
+
+
+def _stamp(file_name: str) -> tuple[int, int] | None:
+    """mtime and size of a file, or None if it is gone."""
+    try:
+        stat = os.stat(file_name)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def format_diagnostic(root: Path, file_name: str, diagnostic: dict) -> str:
+    """Format a tsserver diagnostic the way `tsc` prints it."""
+    try:
+        display = Path(file_name).relative_to(root)
+    except ValueError:
+        display = Path(file_name)
+    start = diagnostic.get("start", {})
+    return (
+        f"{display}({start.get('line', 0)},{start.get('offset', 0)}): "
+        f"error TS{diagnostic.get('code', 0)}: {diagnostic.get('text', '')}"
+    )
+
+
+class TsserverSession:
+    """Resident tsserver for one project root.
+
+    Requests: {"command": [tsserver, ...], "file": path}.
+    Replies: {"errors": ["file(line,col): error TSxxxx: message", ...]}.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root.resolve()
+        self.command: list[str] = []
+        self.client: TsserverClient | None = None
+        self.open_files: dict[str, tuple[int, int] | None] = {}
+        self.project_checked: float | None = None
+
+    def _client_for(self, command: list[str]) -> TsserverClient:
+        if self.client is None or not self.client.alive() or command != self.command:
+            self.close()
+            self.client = TsserverClient(command, self.root)
+            self.client.request("configure", {"preferences": {}}, START_TIMEOUT)
+            self.command = command
+        return self.client
+
+    def _sync(self, client: TsserverClient, file_name: str) -> None:
+        """Bring tsserver's copies of the edited file and the other open files up to date with the disk."""
+        opened = file_name not in self.open_files
+        if opened:
+            client.command("open", {"file": file_name, "projectRootPath": str(self.root)})
+            self.open_files[file_name] = _stamp(file_name)
+        for name, stamp in list(self.open_files.items()):
+            current = _stamp(name)
+            if current is None and name != file_name:
+                client.command("close", {"file": name})
+                del self.open_files[name]
+            elif current != stamp or (name == file_name and not opened):
+                client.request("reload", {"file": name, "tmpfile": name}, DIAGNOSTICS_TIMEOUT)
+                self.open_files[name] = current
+        self.open_files[file_name] = self.open_files.pop(file_name)
+        while len(self.open_files) > MAX_OPEN_FILES:
+            oldest = next(iter(self.open_files))
+            client.command("close", {"file": oldest})
+            del self.open_files[oldest]
+
+    def _check(self, client: TsserverClient, file_name: str) -> list[str]:
+        self._sync(client, file_name)
+        now = time.monotonic()
+        if self.project_checked is None or now - self.project_checked >= PROJECT_CHECK_INTERVAL:
+            self.project_checked = now
+            seq = client.command("geterrForProject", {"file": file_name, "delay": 0})
+        else:
+            seq = client.command("geterr", {"files": list(reversed(self.open_files)), "delay": 0})
+        errors: list[str] = []
+        while True:
+            message = client.receive(DIAGNOSTICS_TIMEOUT)
+            if message.get("type") != "event":
+                continue
+            event = message.get("event")
+            body = message.get("body") or {}
+            if event == "requestCompleted" and body.get("request_seq") == seq:
+                return errors
+            if event in DIAGNOSTIC_EVENTS:
+                errors.extend(
+                    format_diagnostic(self.root, body.get("file", ""), diagnostic)
+                    for diagnostic in body.get("diagnostics", [])
+                    if diagnostic.get("category", "error") == "error"
+                )
+
+    def handle(self, request: dict) -> dict:
+        command = list(request["command"])
+        file_name = str(Path(request["file"]).resolve())
+        try:
+            return {"errors": self._check(self._client_for(command), file_name)}
+        except LspError:
+            self.close()
+        return {"errors": self._check(self._client_for(command), file_name)}
+
+    def close(self) -> None:
+        if self.client is not None:
+            self.client.close()
+        self.client = None
+        self.open_files.clear()
+        self.project_checked = None
@@ -5,10 +5,12 @@ from __future__ import annotations
 import json
 import os
 import re
-import shutil
 import subprocess
 import sys
+import time
+from functools import partial
 from pathlib import Path
+from typing import Any
 
 from _util import (
     BLUE,
@@ -16,11 +18,21 @@ from _util import (
     NC,
     RED,
     check_file_length,
+    which,
 )
 
-TS_EXTENSIONS = {".ts", ".tsx", ".js", ".jsx", ".mjs", ".mts"}
+from _checkers import TS_EXTENSIONS
+from _checkers.pipeline import Analyzer, SourceBuffer, pipe_through, print_timeouts, run_mutators, run_pipeline
+from _checkers.scope import EditScope
+
 DEBUG = os.environ.get("HOOK_DEBUG", "").lower() == "true"
 
+PRETTIER_TIMEOUT = 30.0
+ESLINT_TIMEOUT = 60.0
+TSC_TIMEOUT = 120.0
+
+TSC_LOCATION = re.compile(r"^(.+?)\((\d+),\d+\): error TS")
+
 
 def debug_log(message: str) -> None:
     """Print debug message if enabled."""
@@ -30,17 +42,26 @@ def debug_log(message: str) -> None:
 
 def strip_typescript_comments(file_path: Path) -> bool:
     """Remove inline // comments from TypeScript/JavaScript file."""
-    preserve_patterns = re.compile(
-        r"//\s*@ts-|//\s*eslint-|//\s*prettier-|//\s*TODO|//\s*FIXME|//\s*XXX|//\s*NOTE|//\s*@type|//\s*@param|//\s*@returns",
-        re.IGNORECASE,
-    )
-
     try:
         content = file_path.read_text()
-        lines = content.splitlines(keepends=True)
     except Exception:
         return False
 
+    new_content = strip_typescript_comments_text(content)
+    if new_content != content:
+        file_path.write_text(new_content)
+        return True
+    return False
+
+
+def strip_typescript_comments_text(content: str) -> str:
+    """Return TypeScript/JavaScript source with inline // comments removed, keeping directives."""
+    preserve_patterns = re.compile(
+        r"//\s*@ts-|//\s*eslint-|//\s*prettier-|//\s*TODO|//\s*FIXME|//\s*XXX|//\s*NOTE|//\s*@type|//\s*@param|//\s*@returns",
+        re.IGNORECASE,
+    )
+
+    lines = content.splitlines(keepends=True)
     new_lines = []
     modified = False
 
@@ -61,10 +82,7 @@ def strip_typescript_comments(file_path: Path) -> bool:
         else:
             modified = True
 
-    if modified:
-        file_path.write_text("".join(new_lines))
-        return True
-    return False
+    return "".join(new_lines) if modified else content
 
 
 def find_project_root(file_path: Path) -> Path | None:
@@ -87,43 +105,51 @@ def find_tool(tool_name: str, project_root: Path | None) -> str | None:
         local_bin = project_root / "node_modules" / ".bin" / tool_name
         if local_bin.exists():
             return str(local_bin)
-    return shutil.which(tool_name)
+    return which(tool_name)
+
 
+def check_typescript(file_path: Path, scope: EditScope | None = None) -> tuple[int, str]:
+    """Check TypeScript file with eslint and tsc. Returns (exit_code, reason).
 
-def check_typescript(file_path: Path) -> tuple[int, str]:
-    """Check TypeScript file with eslint and tsc. Returns (exit_code, reason)."""
-    strip_typescript_comments(file_path)
+    With a scope, eslint only reports the edited lines; tsc errors are
+    reported for the whole file and for files that import it.
+    """
+    source = SourceBuffer.read(file_path)
+    if source is None:
+        return 0, ""
+    source.apply(strip_typescript_comments_text)
 
     if ".test." in file_path.name or ".spec." in file_path.name:
+        source.commit()
         return 0, ""
 
-    check_file_length(file_path)
+    check_file_length(file_path, source.text)
 
     project_root = find_project_root(file_path)
 
     prettier_bin = find_tool("prettier", project_root)
-    if prettier_bin:
-        try:
-            subprocess.run(
-                [prettier_bin, "--write", str(file_path)], capture_output=True, check=False, cwd=project_root
-            )
-        except Exception:
-            pass
-
     eslint_bin = find_tool("eslint", project_root)
     tsc_bin = find_tool("tsc", project_root) if file_path.suffix in {".ts", ".tsx", ".mts"} else None
 
-    if not (eslint_bin or tsc_bin):
-        return 0, ""
-
-    results: dict[str, tuple] = {}
-    has_issues = False
-
+    mutators = [partial(_prettier_format, prettier_bin, file_path, project_root)] if prettier_bin else []
+    analyzers = []
     if eslint_bin:
-        has_issues, results = _run_eslint(eslint_bin, file_path, project_root, has_issues, results)
-
+        analyzers.append(
+            Analyzer("eslint", partial(_eslint_results, eslint_bin, file_path, project_root), ESLINT_TIMEOUT)
+        )
     if tsc_bin:
-        has_issues, results = _run_tsc(tsc_bin, file_path, project_root, has_issues, results)
+        analyzers.append(Analyzer("tsc", partial(_tsc_results, tsc_bin, file_path, project_root), TSC_TIMEOUT))
+
+    if not analyzers:
+        run_mutators(source, mutators)
+        return 0, ""
+
+    results, timed_out = run_pipeline(source, mutators, analyzers)
+    print_timeouts(timed_out, analyzers)
+    if scope is not None:
+        results = _scope_typescript_results(results, scope.locate(source.text), project_root)
+        scope.report()
+    has_issues = bool(results)
 
     if has_issues:
         _print_typescript_issues(file_path, results)
@@ -142,44 +168,128 @@ def check_typescript(file_path: Path) -> tuple[int, str]:
     return 2, ""
 
 
+def _prettier_format(prettier_bin: str, file_path: Path, project_root: Path | None, text: str) -> str | None:
+    """Format the buffer with prettier. The resident worker and the CLI fallback share one deadline."""
+    deadline = time.monotonic() + PRETTIER_TIMEOUT
+    formatted = _resident_lint("format", prettier_bin, file_path, project_root, PRETTIER_TIMEOUT, text=text)
+    if formatted is not None:
+        return formatted.get("text")
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return None
+    return pipe_through([prettier_bin, "--stdin-filepath", str(file_path)], text, remaining, cwd=project_root)
+
+
+def _eslint_results(eslint_bin: str, file_path: Path, project_root: Path | None, timeout: float) -> dict[str, tuple]:
+    """Analyzer entry for eslint."""
+    return _run_eslint(eslint_bin, file_path, project_root, timeout)
+
+
+def _tsc_results(tsc_bin: str, file_path: Path, project_root: Path | None, timeout: float) -> dict[str, tuple]:
+    """Analyzer entry for tsc."""
+    return _run_tsc(tsc_bin, file_path, project_root, timeout)
+
+
+def _scope_typescript_results(
+    results: dict[str, tuple], scope: EditScope, project_root: Path | None
+) -> dict[str, tuple]:
+    """Keep eslint messages on the edited lines and tsc errors in the file or in files that import it."""
+    scoped: dict[str, tuple] = {}
+    if "eslint" in results:
+        data = []
+        for file_result in results["eslint"][2]:
+            reported = file_result.get("filePath") or str(scope.file_path)
+            messages = [msg for msg in file_result.get("messages", []) if scope.keep(reported, msg.get("line"))]
+            if messages:
+                errors = sum(1 for msg in messages if msg.get("severity", 0) == 2)
+                data.append(
+                    {**file_result, "messages": messages, "errorCount": errors, "warningCount": len(messages) - errors}
+                )
+        total_errors = sum(f["errorCount"] for f in data)
+        total_warnings = sum(f["warningCount"] for f in data)
+        if total_errors or total_warnings:
+            scoped["eslint"] = (total_errors, total_warnings, data)
+    if "tsc" in results:
+        lines = scope.filter_lines(results["tsc"][1], TSC_LOCATION, project_root, whole_file=True)
+        if lines:
+            scoped["tsc"] = (len(lines), lines)
+    return scoped
+
+
 def _run_eslint(
     eslint_bin: str,
     file_path: Path,
     project_root: Path | None,
-    has_issues: bool,
-    results: dict[str, tuple],
-) -> tuple[bool, dict[str, tuple]]:
-    """Run eslint and collect results."""
-    try:
-        result = subprocess.run(
-            [eslint_bin, "--format", "json", str(file_path)],
-            capture_output=True,
-            text=True,
-            check=False,
-            cwd=project_root,
-        )
+    timeout: float = ESLINT_TIMEOUT,
+) -> dict[str, tuple]:
+    """Run eslint and collect results. The resident worker and the CLI fallback share one deadline."""
+    deadline = time.monotonic() + timeout
+    data = _resident_lint("lint", eslint_bin, file_path, project_root, timeout)
+    if data is None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return {}
         try:
+            result = subprocess.run(
+                [eslint_bin, "--format", "json", str(file_path)],
+                capture_output=True,
+                text=True,
+                check=False,
+                cwd=project_root,
+                timeout=remaining,
+            )
             data = json.loads(result.stdout)
-            total_errors = sum(f.get("errorCount", 0) for f in data)
-            total_warnings = sum(f.get("warningCount", 0) for f in data)
-            if total_errors > 0 or total_warnings > 0:
-                has_issues = True
-                results["eslint"] = (total_errors, total_warnings, data)
-        except json.JSONDecodeError:
-            pass
-    except Exception:
-        pass
-    return has_issues, results
+        except Exception:
+            return {}
+    if not isinstance(data, list):
+        return {}
+
+    total_errors = sum(f.get("errorCount", 0) for f in data)
+    total_warnings = sum(f.get("warningCount", 0) for f in data)
+    if total_errors > 0 or total_warnings > 0:
+        return {"eslint": (total_errors, total_warnings, data)}
+    return {}
+
+
+def _resident_lint(
+    op: str,
+    tool_bin: str,
+    file_path: Path,
+    project_root: Path | None,
+    timeout: float = ESLINT_TIMEOUT,
+    text: str | None = None,
+) -> Any:
+    """Run a lint/format request on the project's resident ESLint/Prettier worker.
+
+    Only used for tools installed in the project's node_modules, since the
+    worker loads them from there. Returns None when the worker is not
+    available, so the caller runs the CLI instead.
+    """
+    if project_root is None or Path(tool_bin).parent.name != ".bin":
+        return None
+    node_bin = which("node")
+    if not node_bin:
+        return None
+
+    from _checkers import service
+
+    payload = {"node": node_bin, "op": op, "file": str(file_path)}
+    if text is not None:
+        payload["text"] = text
+    response = service.request("lint", project_root, payload, timeout=timeout)
+    if response is None:
+        return None
+    return response.get("result")
 
 
 def _run_tsc(
     tsc_bin: str,
     file_path: Path,
     project_root: Path | None,
-    has_issues: bool,
-    results: dict[str, tuple],
-) -> tuple[bool, dict[str, tuple]]:
-    """Run tsc and collect results."""
+    timeout: float = TSC_TIMEOUT,
+) -> dict[str, tuple]:
+    """Run tsc and collect results. The resident tsserver and the CLI fallback share one deadline."""
+    deadline = time.monotonic() + timeout
     tsconfig_path = None
     if project_root:
         for tsconfig_name in ["tsconfig.json", "tsconfig.app.json"]:
@@ -188,23 +298,56 @@ def _run_tsc(
                 tsconfig_path = potential
                 break
 
-    try:
-        cmd = [tsc_bin, "--noEmit"]
-        if tsconfig_path:
-            cmd.extend(["--project", str(tsconfig_path)])
-        else:
-            cmd.append(str(file_path))
-
-        result = subprocess.run(cmd, capture_output=True, text=True, check=False, cwd=project_root)
-        output = result.stdout + result.stderr
-        if result.returncode != 0:
-            error_lines = [line for line in output.splitlines() if "error TS" in line]
-            if error_lines:
-                has_issues = True
-                results["tsc"] = (len(error_lines), error_lines)
-    except Exception:
-        pass
-    return has_issues, results
+    error_lines = _resident_tsc(tsc_bin, file_path, project_root, timeout)
+    if error_lines is None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return {}
+        try:
+            cmd = [tsc_bin, "--noEmit"]
+            if tsconfig_path:
+                cmd.extend(["--project", str(tsconfig_path)])
+            else:
+                cmd.append(str(file_path))
+
+            result = subprocess.run(
+                cmd, capture_output=True, text=True, check=False, cwd=project_root, timeout=remaining
+            )
+            output = result.stdout + result.stderr
+            error_lines = [line for line in output.splitlines() if "error TS" in line] if result.returncode else []
+        except Exception:
+            error_lines = []
+
+    if error_lines:
+        return {"tsc": (len(error_lines), error_lines)}
+    return {}
+
+
+def _resident_tsc(
+    tsc_bin: str, file_path: Path, project_root: Path | None, timeout: float = TSC_TIMEOUT
+) -> list[str] | None:
+    """tsc-style error lines from the project's resident tsserver, if running.
+
+    Uses the tsserver installed next to tsc. Returns None when there is no
+    project, no tsserver, or the service is not available yet.
+    """
+    if project_root is None:
+        return None
+    tsserver_bin = Path(tsc_bin).with_name("tsserver")
+    if not tsserver_bin.exists():
+        return None
+
+    from _checkers import service
+
+    response = service.request(
+        "tsserver",
+        project_root,
+        {"command": [str(tsserver_bin), "--disableAutomaticTypingAcquisition"], "file": str(file_path)},
+        timeout=timeout,
+    )
+    if response is None:
+        return None
+    return response.get("errors", [])
 
 
 def _print_typescript_issues(file_path: Path, results: dict[str, tuple]) -> None:
@@ -0,0 +1,99 @@
+"""Header metadata of the session's active plan.
+
+A plan file opens with `Key: Value` lines (Status, Approved, Iterations,
+Worktree, ...) or an equivalent front matter block, followed by its body
+sections. Hooks only need those header fields, so the file is read line by
+line up to the first `## ` section and the rest of the document is never
+read.
+
+active_plan.json is written by the pilot binary; a relative `plan_path` in
+it is resolved against CLAUDE_PROJECT_ROOT, falling back to the cwd.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import NamedTuple
+
+from _util import get_session_plan_path
+
+MAX_HEADER_LINES = 200
+ACTIVE_STATUSES = ("PENDING", "COMPLETE")
+
+_FIELD = re.compile(r"^(\w+):[ \t]*(.*?)\s*$")
+
+
+class PlanInfo(NamedTuple):
+    """Header fields of a plan file."""
+
+    path: Path
+    status: str | None
+    approved: bool
+    iterations: int
+    worktree: bool
+
+    @property
+    def is_active(self) -> bool:
+        """Whether the /spec workflow is still running on this plan."""
+        return self.status in ACTIVE_STATUSES
+
+
+def _parse_header(path: Path) -> dict[str, str]:
+    """`Key: Value` lines before the first body section, keys lowercased; the first occurrence wins."""
+    fields: dict[str, str] = {}
+    with path.open(encoding="utf-8", errors="replace") as f:
+        for number, line in enumerate(f):
+            if number >= MAX_HEADER_LINES or line.startswith("## "):
+                break
+            match = _FIELD.match(line)
+            if match:
+                fields.setdefault(match.group(1).lower(), match.group(2))
+    return fields
+
+
+def _is_yes(value: str) -> bool:
+    return value.lower().startswith("yes")
+
+
+def read_plan(path: Path) -> PlanInfo | None:
+    """Header of a plan file. None if it cannot be read."""
+    try:
+        fields = _parse_header(path)
+    except OSError:
+        return None
+
+    status_words = fields.get("status", "").split()
+    iterations = fields.get("iterations", "")
+    return PlanInfo(
+        path=path,
+        status=status_words[0].upper() if status_words else None,
+        approved=_is_yes(fields.get("approved", "")),
+        iterations=int(iterations) if iterations.isdigit() else 0,
+        worktree=_is_yes(fields.get("worktree", "")),
+    )
+
+
+def active_plan_path() -> Path | None:
+    """The plan file this session's active_plan.json points at, if any."""
+    try:
+        data = json.loads(get_session_plan_path().read_text())
+        plan_path_str = data.get("plan_path", "")
+    except (json.JSONDecodeError, OSError, AttributeError):
+        return None
+    if not plan_path_str:
+        return None
+
+    plan_file = Path(plan_path_str)
+    if not plan_file.is_absolute():
+        project_root = os.environ.get("CLAUDE_PROJECT_ROOT", str(Path.cwd()))
+        plan_file = Path(project_root) / plan_file
+    return plan_file
+
+
+def active_plan() -> PlanInfo | None:
+    """Header of this session's active plan. None if there is none or it cannot be read."""
+    plan_file = active_plan_path()
+    return read_plan(plan_file) if plan_file is not None else None
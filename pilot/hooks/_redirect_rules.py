@@ -0,0 +1,207 @@
+"""Declarative redirect rules for tool_redirect.
+
+Rules are read from redirect_rules.json next to this module, followed by
+org-specific rules from ~/.pilot/redirect_rules.json when it exists. Each
+rule names a tool and, optionally, a `field` of its tool_input and a
+`match` type:
+
+- always (default): every call to the tool is redirected
+- in / not_in: the field's value is in `values` / missing from the
+  `values` allow-list
+- contains: the lowercased field contains any of `values`, unless it
+  contains any of `unless`
+- regex: the field matches any of the regular expressions in `values`
+
+The first matching rule for a tool wins. Substring sets are compiled into
+a single trie-shaped regex, so a `contains` rule costs one scan of the
+field however many phrases it lists, and `in`/`not_in` are set lookups.
+Compiled tables are cached under ~/.pilot/cache/redirect-rules/, keyed by
+a checksum of the rule files, and kept in memory until the files change.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import zlib
+from pathlib import Path
+
+COMPILER_VERSION = 1
+MATCH_TYPES = ("always", "in", "not_in", "contains", "regex")
+MESSAGE_KEYS = ("message", "alternative", "example")
+BUNDLED_RULES = Path(__file__).parent / "redirect_rules.json"
+
+_compiled: tuple[tuple, dict[str, list[Rule]]] | None = None
+
+
+def user_rules_path() -> Path:
+    return Path.home() / ".pilot" / "redirect_rules.json"
+
+
+def cache_dir() -> Path:
+    return Path.home() / ".pilot" / "cache" / "redirect-rules"
+
+
+def trie_regex(words: list[str]) -> str:
+    """A regex matching any of `words`, factored into a trie so each position tries one branch per next character."""
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        if "" not in node:
+            return body
+        return f"(?:{body})?" if len(branches) == 1 else f"{body}?"
+
+    if not words:
+        return "(?!)"
+    if "" in trie:
+        return ""
+    return build(trie)
+
+
+class Rule:
+    """One compiled redirect rule."""
+
+    def __init__(self, spec: dict) -> None:
+        self.spec = spec
+        self.tool: str = spec["tool"]
+        self.field: str | None = spec.get("field")
+        self.match: str = spec.get("match", "always")
+        self.info = {key: spec[key] for key in MESSAGE_KEYS}
+        self._values = frozenset(spec.get("values", ()))
+        self._pattern = re.compile(spec["pattern"]) if spec.get("pattern") is not None else None
+        self._unless = re.compile(spec["unless"]) if spec.get("unless") is not None else None
+
+    def value(self, tool_input: dict) -> str:
+        value = tool_input.get(self.field, "") if self.field else ""
+        return value if isinstance(value, str) else ""
+
+    def matches(self, tool_input: dict) -> bool:
+        if self.match == "always":
+            return True
+        value = self.value(tool_input)
+        if self.match == "in":
+            return value in self._values
+        if self.match == "not_in":
+            return value not in self._values
+        if self.match == "contains":
+            lowered = value.lower()
+            if self._unless is not None and self._unless.search(lowered):
+                return False
+            return self._pattern is not None and self._pattern.search(lowered) is not None
+        return self._pattern is not None and self._pattern.search(value) is not None
+
+
+def compile_rule(raw: dict) -> dict:
+    """Validate a rule from a config file and reduce it to its compiled, JSON-serialisable form."""
+    match = raw.get("match", "always")
+    if match not in MATCH_TYPES:
+        raise ValueError(f"unknown match type {match!r} for {raw.get('tool')!r}")
+    if not isinstance(raw.get("tool"), str) or not all(isinstance(raw.get(key), str) for key in MESSAGE_KEYS):
+        raise ValueError(f"rule needs tool, message, alternative and example: {raw!r}")
+    if match != "always" and not isinstance(raw.get("field"), str):
+        raise ValueError(f"{match!r} rule for {raw['tool']!r} needs a field")
+
+    spec = {key: raw[key] for key in ("tool", "field", *MESSAGE_KEYS) if key in raw}
+    spec["match"] = match
+    values = [str(value) for value in raw.get("values", [])]
+    if match in ("in", "not_in"):
+        spec["values"] = values
+    elif match == "contains":
+        spec["pattern"] = trie_regex([value.lower() for value in values])
+        unless = [str(value).lower() for value in raw.get("unless", [])]
+        if unless:
+            spec["unless"] = trie_regex(unless)
+    elif match == "regex":
+        for value in values:
+            re.compile(value)
+        spec["pattern"] = "|".join(f"(?:{value})" for value in values) or "(?!)"
+    return spec
+
+
+def _rule_files() -> tuple[list[Path], tuple]:
+    """Existing rule files, bundled first, and their (path, mtime_ns, size) signature."""
+    files, signature = [], []
+    for path in (BUNDLED_RULES, user_rules_path()):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        files.append(path)
+        signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+    return files, tuple(signature)
+
+
+def _compile_files(files: list[Path]) -> list[dict]:
+    """Compiled rules of all files, read from the on-disk cache when the same config was compiled before."""
+    contents = []
+    for path in files:
+        try:
+            contents.append(path.read_bytes())
+        except OSError:
+            continue
+    checksum = 0
+    for content in contents:
+        checksum = zlib.crc32(content, checksum)
+    size = sum(len(content) for content in contents)
+    cache_path = cache_dir() / f"v{COMPILER_VERSION}-{checksum:08x}-{size}.json"
+    try:
+        cached = json.loads(cache_path.read_text())
+        if isinstance(cached, list):
+            return cached
+    except (OSError, json.JSONDecodeError):
+        pass
+
+    specs = []
+    for content in contents:
+        try:
+            rules = json.loads(content).get("rules", [])
+        except (json.JSONDecodeError, UnicodeDecodeError, AttributeError):
+            continue
+        for raw in rules if isinstance(rules, list) else []:
+            try:
+                specs.append(compile_rule(raw))
+            except (ValueError, re.error, TypeError, AttributeError):
+                continue
+
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_path.with_name(f".{cache_path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(specs))
+        os.replace(tmp, cache_path)
+    except OSError:
+        pass
+    return specs
+
+
+def compiled_rules() -> dict[str, list[Rule]]:
+    """Rules by tool name, recompiled only when a rule file changes."""
+    global _compiled
+    files, signature = _rule_files()
+    if _compiled is None or _compiled[0] != signature:
+        by_tool: dict[str, list[Rule]] = {}
+        for spec in _compile_files(files):
+            try:
+                rule = Rule(spec)
+            except (KeyError, re.error, TypeError):
+                continue
+            by_tool.setdefault(rule.tool, []).append(rule)
+        _compiled = (signature, by_tool)
+    return _compiled[1]
+
+
+def find_redirect(tool_name: str, tool_input: dict) -> Rule | None:
+    """The first rule redirecting this tool call, if any."""
+    for rule in compiled_rules().get(tool_name, ()):
+        if rule.matches(tool_input):
+            return rule
+    return None
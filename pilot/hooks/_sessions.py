@@ -0,0 +1,33 @@
+"""Locations of per-session hook state.
+
+Kept free of anything but os and pathlib so run_hook.py can find the
+daemon socket and heartbeat without importing _util.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+SOCKET_NAME = "hookd.sock"
+DAEMON_LOCK_NAME = "hookd.lock"
+HEARTBEAT_NAME = "heartbeat"
+
+
+def sessions_base() -> Path:
+    """Get base sessions directory."""
+    return Path.home() / ".pilot" / "sessions"
+
+
+def session_id() -> str:
+    return os.environ.get("PILOT_SESSION_ID", "").strip() or "default"
+
+
+def socket_path() -> Path:
+    """Get session-scoped hook daemon socket path."""
+    return sessions_base() / session_id() / SOCKET_NAME
+
+
+def heartbeat_path() -> Path:
+    """Get session-scoped heartbeat path."""
+    return sessions_base() / session_id() / HEARTBEAT_NAME
@@ -0,0 +1,159 @@
+"""Persisted index of the files under a test directory.
+
+tdd_enforcer asks, per edit, whether any test directory above the edited
+file contains a test named after it. Answering that with recursive globs
+walks every test tree once per candidate name and extension. Instead, each
+test directory gets an index under ~/.pilot/cache/test-index/ recording,
+for every directory below it, its mtime and the names of its files and
+subdirectories.
+
+A directory's mtime changes whenever an entry is added, removed or renamed
+in it, so refreshing an index only stats each directory and re-lists the
+ones that changed. Each hook process refreshes a directory's index once, on
+first use, since the tree will not change under a single check; name lookups
+then hit in-memory sets. Directories
+modified in the last RACY_WINDOW seconds are re-listed on the next refresh
+too, since a coarse mtime cannot tell a listing from a later change within
+the same tick.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+INDEX_VERSION = 1
+RACY_WINDOW = 2.0
+
+_indexes: dict[str, TestDirIndex] = {}
+
+
+def index_dir() -> Path:
+    return Path.home() / ".pilot" / "cache" / "test-index"
+
+
+def _index_path(root: Path) -> Path:
+    return index_dir() / f"{hashlib.sha1(str(root).encode()).hexdigest()[:16]}.json"
+
+
+def _list(path: Path) -> tuple[list[str], list[str]]:
+    files: list[str] = []
+    subdirs: list[str] = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                (subdirs if is_dir else files).append(entry.name)
+    except OSError:
+        pass
+    return files, subdirs
+
+
+class TestDirIndex:
+    """File names under one test directory, kept current from directory mtimes."""
+
+    __test__ = False
+
+    def __init__(self, root: Path, dirs: dict[str, list] | None = None) -> None:
+        self.root = root
+        self.dirs: dict[str, list] = dirs or {}
+        self._names: set[str] | None = None
+        self._prefixed: dict[str, set[str]] | None = None
+
+    @classmethod
+    def load(cls, root: Path) -> TestDirIndex:
+        try:
+            data = json.loads(_index_path(root).read_text())
+        except (OSError, json.JSONDecodeError):
+            return cls(root)
+        if not isinstance(data, dict) or data.get("version") != INDEX_VERSION or data.get("root") != str(root):
+            return cls(root)
+        dirs = data.get("dirs")
+        return cls(root, dirs if isinstance(dirs, dict) else None)
+
+    def save(self) -> None:
+        path = _index_path(self.root)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps({"version": INDEX_VERSION, "root": str(self.root), "dirs": self.dirs}))
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    def refresh(self) -> bool:
+        """Re-list directories whose mtime changed. Returns True if the index changed."""
+        changed = False
+        now = time.time()
+        seen: set[str] = set()
+        stack = [""]
+        while stack:
+            rel = stack.pop()
+            seen.add(rel)
+            path = self.root / rel if rel else self.root
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            entry = self.dirs.get(rel)
+            if entry is None or entry[0] != mtime:
+                files, subdirs = _list(path)
+                stamp = 0 if now - mtime / 1e9 < RACY_WINDOW else mtime
+                if entry is None or entry[1] != files or entry[2] != subdirs or entry[0] != stamp:
+                    changed = True
+                entry = [stamp, files, subdirs]
+                self.dirs[rel] = entry
+            stack.extend(f"{rel}/{name}" if rel else name for name in entry[2])
+
+        for rel in set(self.dirs) - seen:
+            del self.dirs[rel]
+            changed = True
+
+        if changed:
+            self._names = None
+            self._prefixed = None
+        return changed
+
+    def names(self) -> set[str]:
+        if self._names is None:
+            self._names = {name for entry in self.dirs.values() for name in entry[1]}
+        return self._names
+
+    def has_any(self, names: list[str]) -> bool:
+        """Whether a file with any of these names exists anywhere under the root."""
+        indexed = self.names()
+        return any(name in indexed for name in names)
+
+    def has_prefixed(self, prefix: str, extension: str) -> bool:
+        """Whether a file named `<prefix><ext>` or `<prefix>-*<ext>` exists under the root."""
+        if f"{prefix}{extension}" in self.names():
+            return True
+        if self._prefixed is None:
+            prefixed: dict[str, set[str]] = {}
+            for name in self.names():
+                for index, char in enumerate(name):
+                    if char == "-":
+                        prefixed.setdefault(name[:index], set()).add(name)
+            self._prefixed = prefixed
+        return any(
+            name.endswith(extension) and len(name) >= len(prefix) + 1 + len(extension)
+            for name in self._prefixed.get(prefix, ())
+        )
+
+
+def index_for(test_dir: Path) -> TestDirIndex:
+    """The index of a test directory, loaded and refreshed once per process."""
+    key = str(test_dir)
+    index = _indexes.get(key)
+    if index is None:
+        index = TestDirIndex.load(test_dir)
+        if index.refresh():
+            index.save()
+        _indexes[key] = index
+    return index
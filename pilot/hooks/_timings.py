@@ -0,0 +1,178 @@
+"""Per-hook latency records.
+
+Each hook run records where its wall time went: parsing stdin, every
+external tool it runs (ruff, eslint, git, ...), session file I/O, and the
+total. begin() starts the record, phase() and tool() time parts of it from
+anywhere in the hook, and finish() appends it as one JSON line to
+~/.pilot/sessions/<PILOT_SESSION_ID>/timings.jsonl. That file is a ring
+buffer: once it grows past MAX_BYTES, only the newest half of its records
+is kept. Appends and trims hold an exclusive flock on a sibling
+timings.jsonl.lock, so a record appended by a parallel hook is never lost
+to a trim. The console worker reads these files for the per-hook and per-tool
+latency percentiles in /api/metrics and /metrics.
+
+phase() and tool() cost nothing when no record is open, so library code can
+use them unconditionally. Set PILOT_HOOK_TIMINGS=0 to record nothing.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+TIMINGS_NAME = "timings.jsonl"
+MAX_BYTES = 256 * 1024
+
+
+class _Span:
+    """Adds the time spent inside a `with` block to one entry of a record."""
+
+    __slots__ = ("_bucket", "_name", "_record", "_start")
+
+    def __init__(self, record: HookTimings, bucket: str, name: str) -> None:
+        self._record = record
+        self._bucket = bucket
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc: object) -> None:
+        self._record.add(self._bucket, self._name, time.perf_counter() - self._start)
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+
+_NO_SPAN = _NoSpan()
+
+
+class HookTimings:
+    """Milliseconds spent in the phases and tools of one hook run."""
+
+    def __init__(self, hook: str) -> None:
+        self.hook = hook
+        self.started = time.time()
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self.phases: dict[str, float] = {}
+        self.tools: dict[str, float] = {}
+
+    def add(self, bucket: str, name: str, seconds: float) -> None:
+        """Add to a phase or tool; stages of post_tool_use run on threads, so this locks."""
+        target = self.tools if bucket == "tools" else self.phases
+        with self._lock:
+            target[name] = target.get(name, 0.0) + seconds * 1000
+
+    def record(self, exit_code: int) -> dict:
+        total = (time.perf_counter() - self._start) * 1000
+        with self._lock:
+            return {
+                "ts": round(self.started, 3),
+                "hook": self.hook,
+                "exit": exit_code,
+                "total": round(total, 3),
+                "phases": {name: round(ms, 3) for name, ms in self.phases.items()},
+                "tools": {name: round(ms, 3) for name, ms in self.tools.items()},
+            }
+
+
+_current: HookTimings | None = None
+
+
+def _enabled() -> bool:
+    return os.environ.get("PILOT_HOOK_TIMINGS", "").strip().lower() not in ("0", "false", "off")
+
+
+def timings_path() -> Path:
+    """Get session-scoped timings ring buffer path."""
+    from _util import _sessions_base
+
+    session_id = os.environ.get("PILOT_SESSION_ID", "").strip() or "default"
+    return _sessions_base() / session_id / TIMINGS_NAME
+
+
+def begin(hook: str) -> HookTimings | None:
+    """Open the record for this process's hook run."""
+    global _current
+    _current = HookTimings(hook) if _enabled() else None
+    return _current
+
+
+def current_hook() -> str | None:
+    """Name of the hook whose record is open."""
+    return None if _current is None else _current.hook
+
+
+def phase(name: str) -> _Span | _NoSpan:
+    """Time a `with` block as a phase of the open record, if any."""
+    return _NO_SPAN if _current is None else _Span(_current, "phases", name)
+
+
+def tool(name: str) -> _Span | _NoSpan:
+    """Time a `with` block as a run of an external tool, if a record is open."""
+    return _NO_SPAN if _current is None else _Span(_current, "tools", name)
+
+
+def finish(exit_code: int) -> None:
+    """Close the open record and append it to the session's ring buffer. Never raises."""
+    global _current
+    timings, _current = _current, None
+    if timings is None:
+        return
+    try:
+        append(timings_path(), timings.record(exit_code))
+    except OSError:
+        pass
+
+
+def append(path: Path, record: dict) -> None:
+    """Append one record, dropping the oldest half of the file once it passes MAX_BYTES."""
+    line = (json.dumps(record, separators=(",", ":")) + "\n").encode()
+    with _locked(path):
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, line)
+            size = os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+        if size > MAX_BYTES:
+            _trim(path)
+
+
+@contextmanager
+def _locked(path: Path) -> Iterator[None]:
+    """Hold the ring buffer's lock; the lock file outlives the trims that replace the buffer."""
+    lock_path = path.with_name(f"{path.name}.lock")
+    try:
+        lock = lock_path.open("a")
+    except FileNotFoundError:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lock = lock_path.open("a")
+    with lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def _trim(path: Path) -> None:
+    """Keep the newest half of the records. The caller holds _locked(path)."""
+    data = path.read_bytes()
+    keep = data[len(data) // 2 :]
+    keep = keep[keep.find(b"\n") + 1 :]
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(keep)
+    os.replace(tmp, path)
@@ -0,0 +1,266 @@
+"""Incremental transcript state shared by the hooks and the console.
+
+A Claude transcript only ever grows, so its derived state is checkpointed
+per transcript path under ~/.pilot/cache/transcripts/ (PILOT_TRANSCRIPT_CURSOR_DIR
+overrides it): the byte offset and inode it was read up to, the last
+assistant and user records (compacted to their text and tool_use names), the
+roles seen at all, the last tool_use name and the cumulative token usage. Each reader parses only the complete lines appended since the
+checkpoint. A transcript that shrank or was replaced starts over.
+
+A new checkpoint for a transcript larger than FULL_SCAN_BYTES is seeded
+from its tail instead of a full pass, so the first read of a long session
+stays cheap. Its usage then counts from `usage_since` rather than from the
+start of the file.
+
+Checkpoints untouched for CURSOR_MAX_AGE are removed by prune_cursors(),
+which the SessionEnd hook runs.
+
+console/src/shared/transcript-parser.ts reads and writes the same files.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from _util import complete_lines_end, read_lines_reversed
+
+CURSOR_VERSION = 2
+CURSOR_MAX_AGE = 7 * 24 * 60 * 60
+FULL_SCAN_BYTES = 1024 * 1024
+USAGE_KEYS = ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")
+ROLES = ("assistant", "user")
+
+
+def cursor_dir() -> Path:
+    override = os.environ.get("PILOT_TRANSCRIPT_CURSOR_DIR", "").strip()
+    return Path(override) if override else Path.home() / ".pilot" / "cache" / "transcripts"
+
+
+def _cursor_path(transcript: str) -> Path:
+    return cursor_dir() / f"{hashlib.sha1(transcript.encode()).hexdigest()[:16]}.json"
+
+
+def prune_cursors(max_age: float = CURSOR_MAX_AGE) -> int:
+    """Remove checkpoints not written for max_age seconds. Returns how many were removed."""
+    cutoff = time.time() - max_age
+    removed = 0
+    try:
+        entries = list(os.scandir(cursor_dir()))
+    except OSError:
+        return 0
+    for entry in entries:
+        if not entry.name.endswith(".json"):
+            continue
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.unlink(entry.path)
+                removed += 1
+        except OSError:
+            continue
+    return removed
+
+
+def compact_record(record: dict) -> dict | None:
+    """Keep what readers need of a message record: text blocks and tool_use names. None if it has no content."""
+    message = record.get("message")
+    content = message.get("content") if isinstance(message, dict) else None
+    if not content:
+        return None
+    if isinstance(content, list):
+        blocks = []
+        for block in content:
+            if not isinstance(block, dict):
+                continue
+            if block.get("type") == "text":
+                blocks.append({"type": "text", "text": block.get("text", "")})
+            elif block.get("type") == "tool_use":
+                blocks.append({"type": "tool_use", "name": block.get("name", "")})
+        content = blocks
+    elif not isinstance(content, str):
+        return None
+    return {"type": record.get("type"), "message": {"content": content}}
+
+
+def _tool_use_names(compact: dict) -> list[str]:
+    content = compact["message"]["content"]
+    if not isinstance(content, list):
+        return []
+    return [block["name"] for block in content if block.get("type") == "tool_use"]
+
+
+class TranscriptState:
+    """Derived state of a transcript up to `offset`."""
+
+    def __init__(self, path: str, inode: int, offset: int = 0, usage_since: int = 0) -> None:
+        self.path = path
+        self.inode = inode
+        self.offset = offset
+        self.last: dict[str, dict] = {}
+        self.seen: list[str] = []
+        self.last_tool_use: str | None = None
+        self.usage = dict.fromkeys(USAGE_KEYS, 0)
+        self.usage_since = usage_since
+        self._usage_message: str | None = None
+        self._usage_counted: dict[str, int] = {}
+
+    @classmethod
+    def load(cls, path: str) -> TranscriptState | None:
+        try:
+            data = json.loads(_cursor_path(path).read_text())
+        except (OSError, json.JSONDecodeError):
+            return None
+        if not isinstance(data, dict) or data.get("version") != CURSOR_VERSION or data.get("path") != path:
+            return None
+        try:
+            state = cls(path, int(data["inode"]), int(data["offset"]), int(data.get("usage_since", 0)))
+            state.last = {role: data["last"][role] for role in ROLES if data["last"].get(role)}
+            state.seen = [role for role in ROLES if role in data["seen"]]
+            state.last_tool_use = data.get("last_tool_use")
+            state.usage.update({key: int(data["usage"].get(key, 0)) for key in USAGE_KEYS})
+            state._usage_message = data.get("usage_message")
+            state._usage_counted = {key: int(value) for key, value in data.get("usage_counted", {}).items()}
+        except (KeyError, TypeError, ValueError, AttributeError):
+            return None
+        return state
+
+    def save(self) -> None:
+        target = _cursor_path(self.path)
+        data = {
+            "version": CURSOR_VERSION,
+            "path": self.path,
+            "inode": self.inode,
+            "offset": self.offset,
+            "last": self.last,
+            "seen": self.seen,
+            "last_tool_use": self.last_tool_use,
+            "usage": self.usage,
+            "usage_since": self.usage_since,
+            "usage_message": self._usage_message,
+            "usage_counted": self._usage_counted,
+        }
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(data))
+            os.replace(tmp, target)
+        except OSError:
+            pass
+
+    @property
+    def last_assistant(self) -> dict | None:
+        return self.last.get("assistant")
+
+    def apply(self, record: dict) -> None:
+        """Fold one transcript record into the state."""
+        role = record.get("type")
+        if role not in ROLES:
+            return
+        if role not in self.seen:
+            self.seen.append(role)
+        compact = compact_record(record)
+        if compact is not None:
+            self.last[role] = compact
+            names = _tool_use_names(compact)
+            if names:
+                self.last_tool_use = names[-1]
+        if role == "assistant":
+            self._add_usage(record.get("message"))
+
+    def _add_usage(self, message: object) -> None:
+        """Add a message's usage once; streamed records of the same message id replace its earlier count."""
+        if not isinstance(message, dict) or not isinstance(message.get("usage"), dict):
+            return
+        usage = message["usage"]
+        message_id = message.get("id")
+        counted = {key: value for key in USAGE_KEYS if isinstance(value := usage.get(key), int)}
+        if message_id is not None and message_id == self._usage_message:
+            for key, value in self._usage_counted.items():
+                self.usage[key] -= value
+        for key, value in counted.items():
+            self.usage[key] += value
+        self._usage_message = message_id
+        self._usage_counted = counted
+
+    def consume(self, path: Path, size: int) -> bool:
+        """Parse the complete lines between the checkpoint and `size`. Returns True if it advanced."""
+        try:
+            with path.open("rb") as f:
+                f.seek(self.offset)
+                data = f.read(size - self.offset)
+        except OSError:
+            return False
+        end = data.rfind(b"\n")
+        if end < 0:
+            return False
+        for line in data[:end].split(b"\n"):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            if isinstance(record, dict):
+                self.apply(record)
+        self.offset += end + 1
+        return True
+
+    def seed_from_tail(self, path: Path) -> None:
+        """Fill the last-record fields by scanning backwards from the checkpoint offset."""
+        wanted = set(ROLES)
+        want_tool_use = True
+        for line in read_lines_reversed(path, end=self.offset):
+            try:
+                record = json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            role = record.get("type") if isinstance(record, dict) else None
+            if role not in ROLES:
+                continue
+            if role not in self.seen:
+                self.seen.append(role)
+            compact = compact_record(record)
+            if compact is None:
+                continue
+            if role in wanted:
+                self.last[role] = compact
+                wanted.discard(role)
+            names = _tool_use_names(compact)
+            if want_tool_use and names:
+                self.last_tool_use = names[-1]
+                want_tool_use = False
+            if not wanted and not want_tool_use:
+                return
+
+
+def read_transcript_state(transcript_path: str) -> TranscriptState | None:
+    """Bring the transcript's checkpoint up to date and return it. None if the transcript is unreadable."""
+    key = os.path.abspath(transcript_path)
+    path = Path(key)
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+
+    state = TranscriptState.load(key)
+    changed = False
+    if state is None or state.inode != stat.st_ino or stat.st_size < state.offset:
+        changed = True
+        if stat.st_size <= FULL_SCAN_BYTES:
+            state = TranscriptState(key, stat.st_ino)
+        else:
+            try:
+                offset = complete_lines_end(path, stat.st_size)
+            except OSError:
+                return None
+            state = TranscriptState(key, stat.st_ino, offset, usage_since=offset)
+            state.seed_from_tail(path)
+
+    if stat.st_size > state.offset and state.consume(path, stat.st_size):
+        changed = True
+    if changed:
+        state.save()
+    return state
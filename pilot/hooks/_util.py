@@ -1,16 +1,24 @@
 """Shared utilities for hook scripts.
 
 This module provides common constants, color codes, session path helpers,
-and utility functions used across all hook scripts.
+the per-session state store and utility functions used across all hook
+scripts.
 """
 
 from __future__ import annotations
 
+import io
 import json
 import os
-import subprocess
 import sys
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Any
+
+from _sessions import sessions_base
+from _timings import phase, tool
 
 RED = "\033[0;31m"
 YELLOW = "\033[0;33m"
@@ -26,15 +34,13 @@ FILE_LENGTH_CRITICAL = 500
 
 def _sessions_base() -> Path:
     """Get base sessions directory."""
-    return Path.home() / ".pilot" / "sessions"
+    return sessions_base()
 
 
-def get_session_cache_path() -> Path:
-    """Get session-scoped context cache path."""
+def get_session_store_path() -> Path:
+    """Get session-scoped state store path."""
     session_id = os.environ.get("PILOT_SESSION_ID", "").strip() or "default"
-    cache_dir = _sessions_base() / session_id
-    cache_dir.mkdir(parents=True, exist_ok=True)
-    return cache_dir / "context-cache.json"
+    return _sessions_base() / session_id / "state.db"
 
 
 def get_session_plan_path() -> Path:
@@ -43,97 +49,386 @@ def get_session_plan_path() -> Path:
     return _sessions_base() / session_id / "active_plan.json"
 
 
+class SessionStoreError(OSError):
+    """The session store could not be opened, read or written."""
+
+
+class SessionTransaction:
+    """Reads and writes inside one SessionStore.transaction()."""
+
+    def __init__(self, conn: Any) -> None:
+        self._conn = conn
+
+    def get(self, key: str, default: Any = None) -> Any:
+        row = self._conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return default
+        try:
+            return json.loads(row[0])
+        except json.JSONDecodeError:
+            return default
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a JSON-serialisable value; None deletes the key."""
+        if value is None:
+            self._conn.execute("DELETE FROM state WHERE key = ?", (key,))
+        else:
+            self._conn.execute(
+                "INSERT INTO state (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, json.dumps(value)),
+            )
+
+
+class SessionStore:
+    """Hook-owned state of one session, in a WAL-mode SQLite file.
+
+    Hooks of the same session run in parallel, so their state lives in one
+    transactional key/value table instead of loose JSON files: a read-modify-
+    write inside transaction() cannot interleave with another hook's. Files
+    written by other processes (context-pct.json, active_plan.json,
+    continuation.md) stay where they are and are only read by the hooks.
+
+    get(), set() and update() never raise; when the store is unavailable they
+    behave as if it were empty and drop writes.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Any = None
+        try:
+            import sqlite3
+        except ImportError:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(path), timeout=2.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        except (OSError, sqlite3.Error):
+            return
+        self._conn = conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[SessionTransaction]:
+        """Hold the write lock for a group of reads and writes, committed together.
+
+        Raises SessionStoreError if the store is unavailable or the
+        transaction fails; nothing is written in that case.
+        """
+        if self._conn is None:
+            raise SessionStoreError(f"session store unavailable: {self.path}")
+        import sqlite3
+
+        with self._lock, phase("session_store"):
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+            except sqlite3.Error as e:
+                raise SessionStoreError(str(e)) from e
+            try:
+                yield SessionTransaction(self._conn)
+                self._conn.execute("COMMIT")
+            except BaseException as e:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                if isinstance(e, sqlite3.Error):
+                    raise SessionStoreError(str(e)) from e
+                raise
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Read one key outside a write transaction, so readers never wait on the write lock."""
+        if self._conn is None:
+            return default
+        import sqlite3
+
+        with self._lock, phase("session_store"):
+            try:
+                return SessionTransaction(self._conn).get(key, default)
+            except sqlite3.Error:
+                return default
+
+    def set(self, key: str, value: Any) -> None:
+        try:
+            with self.transaction() as txn:
+                txn.set(key, value)
+        except SessionStoreError:
+            pass
+
+    def update(self, key: str, fn: Callable[[Any], Any]) -> Any:
+        """Atomically replace a key's value with fn(current value) and return it (None deletes)."""
+        try:
+            with self.transaction() as txn:
+                value = fn(txn.get(key))
+                txn.set(key, value)
+                return value
+        except SessionStoreError:
+            return None
+
+
+_stores: dict[tuple[int, str], SessionStore] = {}
+
+
+def session_store() -> SessionStore:
+    """This session's store, opened once per process."""
+    path = get_session_store_path()
+    key = (os.getpid(), str(path))
+    store = _stores.get(key)
+    if store is None:
+        store = SessionStore(path)
+        _stores[key] = store
+    return store
+
+
+def _discovery_enabled() -> bool:
+    """Whether git root and tool lookups may be memoised in the session."""
+    return os.environ.get("PILOT_DISCOVERY_CACHE", "").strip().lower() not in ("0", "false", "off")
+
+
+_discovery: dict | None = None
+
+
+def _load_discovery() -> dict:
+    """Session discovery cache: {"git_roots": {cwd: root}, "tools": {key: path}}."""
+    global _discovery
+    if _discovery is None:
+        data = session_store().get("discovery")
+        if not isinstance(data, dict):
+            data = {}
+        data.setdefault("git_roots", {})
+        data.setdefault("tools", {})
+        _discovery = data
+    return _discovery
+
+
+def _save_discovery() -> None:
+    """Merge this process's lookups into the stored ones, keeping entries other hooks added meanwhile."""
+    if _discovery is None:
+        return
+    found = _discovery
+
+    def merge(stored: Any) -> dict:
+        merged = stored if isinstance(stored, dict) else {}
+        for section in ("git_roots", "tools"):
+            current = merged.get(section)
+            merged[section] = {**(current if isinstance(current, dict) else {}), **found[section]}
+        return merged
+
+    session_store().update("discovery", merge)
+
+
+def _git_root_still_valid(cwd: Path, root: Path) -> bool:
+    """The remembered root is still a repository and no nested one appeared below it."""
+    if not (root / ".git").exists():
+        return False
+    current = cwd
+    while current != root:
+        if (current / ".git").exists() or current == current.parent:
+            return False
+        current = current.parent
+    return True
+
+
 def find_git_root() -> Path | None:
-    """Find git repository root."""
+    """Find git repository root, remembering it per working directory for the session."""
+    import subprocess
+
     try:
-        result = subprocess.run(
-            ["git", "rev-parse", "--show-toplevel"],
-            capture_output=True,
-            text=True,
-            check=False,
-        )
+        cwd = os.getcwd()
+    except OSError:
+        return None
+
+    cached = _load_discovery()["git_roots"].get(cwd) if _discovery_enabled() else None
+    if cached and _git_root_still_valid(Path(cwd), Path(cached)):
+        return Path(cached)
+
+    try:
+        with tool("git"):
+            result = subprocess.run(
+                ["git", "rev-parse", "--show-toplevel"],
+                capture_output=True,
+                text=True,
+                check=False,
+            )
         if result.returncode == 0:
-            return Path(result.stdout.strip())
+            root = Path(result.stdout.strip())
+            if _discovery_enabled():
+                _load_discovery()["git_roots"][cwd] = str(root)
+                _save_discovery()
+            return root
     except Exception:
         pass
     return None
 
 
+def which(tool: str) -> str | None:
+    """shutil.which, remembered per session for the current PATH.
+
+    A remembered binary is reused while it is still executable; misses are
+    not remembered, so a tool installed mid-session is found on the next call.
+    """
+    import shutil
+
+    if not _discovery_enabled():
+        return shutil.which(tool)
+
+    import hashlib
+
+    key = f"{tool}:{hashlib.sha1(os.environ.get('PATH', '').encode()).hexdigest()[:12]}"
+    tools = _load_discovery()["tools"]
+    cached = tools.get(key)
+    if cached and os.access(cached, os.X_OK) and not os.path.isdir(cached):
+        return cached
+
+    path = shutil.which(tool)
+    if path and path != cached:
+        tools[key] = path
+        _save_discovery()
+    return path
+
+
+def _capture_enabled() -> bool:
+    return os.environ.get("PILOT_HOOK_CAPTURE", "").strip().lower() not in ("", "0", "false", "off")
+
+
 def read_hook_stdin() -> dict:
     """Read and parse JSON from stdin.
 
-    Returns empty dict on error or invalid JSON.
+    Returns empty dict on error or invalid JSON. With PILOT_HOOK_CAPTURE set
+    the payload is also saved for replay (see _capture).
     """
     try:
-        content = sys.stdin.read()
-        if not content:
-            return {}
-        return json.loads(content)
+        with phase("stdin"):
+            content = sys.stdin.read()
+            if content and _capture_enabled():
+                from _capture import capture
+
+                capture(content)
+            return json.loads(content) if content else {}
     except (json.JSONDecodeError, OSError):
         return {}
 
 
 def get_edited_file_from_stdin() -> Path | None:
     """Get the edited file path from PostToolUse hook stdin."""
+    return get_edit_from_stdin()[0]
+
+
+def get_edit_from_stdin() -> tuple[Path | None, dict]:
+    """Get the edited file path and the decoded payload from PostToolUse hook stdin."""
     try:
         import select
 
         if select.select([sys.stdin], [], [], 0)[0]:
-            data = json.load(sys.stdin)
+            with phase("stdin"):
+                content = sys.stdin.read()
+                if content and _capture_enabled():
+                    from _capture import capture
+
+                    capture(content)
+                data = json.loads(content)
             tool_input = data.get("tool_input", {})
             file_path = tool_input.get("file_path")
             if file_path:
-                return Path(file_path)
+                return Path(file_path), data
     except Exception:
         pass
-    return None
+    return None, {}
 
 
-def is_waiting_for_user_input(transcript_path: str) -> bool:
-    """Check if Claude's last action was asking the user a question."""
-    try:
-        transcript = Path(transcript_path)
-        if not transcript.exists():
-            return False
+def read_lines_reversed(path: Path, chunk_size: int = 64 * 1024, end: int | None = None) -> Iterator[bytes]:
+    """Yield the non-empty lines of a file (or of its first `end` bytes) from last to first.
 
-        last_assistant_msg = None
-        with transcript.open() as f:
-            for line in f:
-                try:
-                    msg = json.loads(line)
-                    if msg.get("type") == "assistant":
-                        last_assistant_msg = msg
-                except json.JSONDecodeError:
-                    continue
-
-        if not last_assistant_msg:
-            return False
+    Reads backwards from EOF in chunks, so finding something near the end
+    costs the size of the tail rather than the whole file.
+    """
+    with path.open("rb") as f:
+        position = f.seek(0, os.SEEK_END) if end is None else end
+        pieces: list[bytes] = []
+        while position > 0:
+            size = min(chunk_size, position)
+            position -= size
+            f.seek(position)
+            chunk = f.read(size)
+            end = len(chunk)
+            while True:
+                newline = chunk.rfind(b"\n", 0, end)
+                if newline < 0:
+                    pieces.append(chunk[:end])
+                    break
+                pieces.append(chunk[newline + 1 : end])
+                line = b"".join(reversed(pieces))
+                pieces = []
+                if line.strip():
+                    yield line
+                end = newline
+        line = b"".join(reversed(pieces))
+        if line.strip():
+            yield line
 
-        message = last_assistant_msg.get("message", {})
-        if not isinstance(message, dict):
-            return False
 
-        content = message.get("content", [])
-        if not isinstance(content, list):
-            return False
+def complete_lines_end(path: Path, size: int, chunk_size: int = 64 * 1024) -> int:
+    """Offset just past the last newline in the first `size` bytes of a file (0 if there is none)."""
+    position = size
+    with path.open("rb") as f:
+        while position > 0:
+            start = max(0, position - chunk_size)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b"\n")
+            if newline >= 0:
+                return start + newline + 1
+            position = start
+    return 0
+
 
-        for block in content:
-            if isinstance(block, dict) and block.get("type") == "tool_use":
-                if block.get("name") == "AskUserQuestion":
-                    return True
+def read_last_line(path: Path) -> bytes | None:
+    """Last complete (newline-terminated), non-empty line of a file, read from the end."""
+    with path.open("rb") as f:
+        size = f.seek(0, os.SEEK_END)
+    return next(read_lines_reversed(path, end=complete_lines_end(path, size)), None)
 
+
+def is_waiting_for_user_input(transcript_path: str) -> bool:
+    """Check if Claude's last action was asking the user a question."""
+    from _transcript import read_transcript_state
+
+    with phase("transcript"):
+        state = read_transcript_state(transcript_path)
+    last_assistant_msg = state.last_assistant if state else None
+    if not last_assistant_msg:
         return False
-    except OSError:
+
+    message = last_assistant_msg.get("message", {})
+    if not isinstance(message, dict):
         return False
 
+    content = message.get("content", [])
+    if not isinstance(content, list):
+        return False
+
+    for block in content:
+        if isinstance(block, dict) and block.get("type") == "tool_use":
+            if block.get("name") == "AskUserQuestion":
+                return True
+
+    return False
+
+
+def send_notification(title: str, message: str) -> None:
+    """Queue an OS notification, importing the notifier only when needed."""
+    from notify import send_notification as _send_notification
 
-def check_file_length(file_path: Path) -> bool:
+    _send_notification(title, message)
+
+
+def check_file_length(file_path: Path, content: str | None = None) -> bool:
     """Warn if file exceeds length thresholds.
 
+    Counts lines of `content` when given, otherwise reads the file.
     Returns True if warning was emitted, False otherwise.
     """
     try:
-        line_count = len(file_path.read_text().splitlines())
+        line_count = len((file_path.read_text() if content is None else content).splitlines())
     except Exception:
         return False
 
@@ -154,3 +449,63 @@ def check_file_length(file_path: Path) -> bool:
         print("   Consider splitting before it grows further.", file=sys.stderr)
         return True
     return False
+
+
+class StderrRouter(io.TextIOBase):
+    """sys.stderr replacement that routes each thread's writes to its own buffer.
+
+    Threads without an active capture write straight through to the wrapped
+    stream, so the router is safe to leave installed while stages run.
+    """
+
+    def __init__(self, target) -> None:
+        import threading
+
+        self.target = target
+        self._local = threading.local()
+
+    def _buffers(self) -> list[io.StringIO]:
+        if not hasattr(self._local, "buffers"):
+            self._local.buffers = []
+        return self._local.buffers
+
+    def write(self, s: str) -> int:
+        buffers = self._buffers()
+        if buffers:
+            return buffers[-1].write(s)
+        return self.target.write(s)
+
+    def flush(self) -> None:
+        if not self._buffers():
+            self.target.flush()
+
+    @contextmanager
+    def capture(self) -> Iterator[io.StringIO]:
+        """Capture the calling thread's stderr writes into a buffer."""
+        buffer = io.StringIO()
+        self._buffers().append(buffer)
+        try:
+            yield buffer
+        finally:
+            self._buffers().pop()
+
+
+@contextmanager
+def capture_stderr() -> Iterator[io.StringIO]:
+    """Capture the calling thread's writes to sys.stderr.
+
+    Reuses an installed StderrRouter, or installs one for the duration of the block.
+    """
+    router = sys.stderr
+    if isinstance(router, StderrRouter):
+        with router.capture() as buffer:
+            yield buffer
+        return
+
+    router = StderrRouter(sys.stderr)
+    sys.stderr = router
+    try:
+        with router.capture() as buffer:
+            yield buffer
+    finally:
+        sys.stderr = router.target
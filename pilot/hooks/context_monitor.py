@@ -5,7 +5,6 @@ from __future__ import annotations
 
 import json
 import os
-import re
 import sys
 import time
 from pathlib import Path
@@ -17,8 +16,8 @@ from _util import (
     NC,
     RED,
     YELLOW,
-    get_session_cache_path,
-    get_session_plan_path,
+    read_last_line,
+    session_store,
 )
 
 THRESHOLD_WARN = 80
@@ -29,38 +28,12 @@ LEARN_THRESHOLDS = [40, 60, 80]
 
 def find_active_spec() -> tuple[Path | None, str | None]:
     """Find the active spec for THIS session via session-scoped active_plan.json."""
-    plan_json = get_session_plan_path()
-    if not plan_json.exists():
-        return None, None
-
-    try:
-        data = json.loads(plan_json.read_text())
-        plan_path_str = data.get("plan_path", "")
-    except (json.JSONDecodeError, OSError):
-        return None, None
-
-    if not plan_path_str:
-        return None, None
+    from _plan import active_plan
 
-    plan_file = Path(plan_path_str)
-    if not plan_file.is_absolute():
-        project_root = os.environ.get("CLAUDE_PROJECT_ROOT", str(Path.cwd()))
-        plan_file = Path(project_root) / plan_file
-    if not plan_file.exists():
+    plan = active_plan()
+    if plan is None or not plan.is_active:
         return None, None
-
-    try:
-        content = plan_file.read_text()
-        status_match = re.search(r"^Status:\s*(\w+)", content, re.MULTILINE)
-        if not status_match:
-            return None, None
-        status = status_match.group(1).upper()
-        if status in ("PENDING", "COMPLETE"):
-            return plan_file, status
-    except OSError:
-        pass
-
-    return None, None
+    return plan.path, plan.status
 
 
 def print_spec_warning(spec_path: Path, spec_status: str) -> None:
@@ -87,69 +60,112 @@ def print_spec_warning(spec_path: Path, spec_status: str) -> None:
 
 
 def get_current_session_id() -> str:
-    """Get current session ID from history."""
+    """Get current session ID from the last complete line of history.
+
+    The answer is remembered against the history file's inode, size and
+    mtime, so an unchanged history is not reopened.
+    """
     history = Path.home() / ".claude" / "history.jsonl"
-    if not history.exists():
-        return ""
     try:
-        with history.open() as f:
-            lines = f.readlines()
-            if lines:
-                return json.loads(lines[-1]).get("sessionId", "")
-    except (json.JSONDecodeError, OSError):
-        pass
-    return ""
-
-
-def get_session_flags(session_id: str) -> tuple[list[int], bool]:
-    """Get shown flags for this session (learn thresholds, 80% warning)."""
-    if get_session_cache_path().exists():
-        try:
-            with get_session_cache_path().open() as f:
-                cache = json.load(f)
-                if cache.get("session_id") == session_id:
-                    return cache.get("shown_learn", []), cache.get("shown_80_warn", False)
-        except (json.JSONDecodeError, OSError):
-            pass
-    return [], False
-
-
-def save_cache(
-    tokens: int, session_id: str, shown_learn: list[int] | None = None, shown_80_warn: bool | None = None
-) -> None:
-    """Save context calculation to cache with session ID."""
-    existing_shown: list[int] = []
-    existing_80_warn = False
-    if get_session_cache_path().exists():
-        try:
-            with get_session_cache_path().open() as f:
-                cache = json.load(f)
-                if cache.get("session_id") == session_id:
-                    existing_shown = cache.get("shown_learn", [])
-                    existing_80_warn = cache.get("shown_80_warn", False)
-        except (json.JSONDecodeError, OSError):
-            pass
-
-    if shown_learn:
-        existing_shown = list(set(existing_shown + shown_learn))
-    if shown_80_warn:
-        existing_80_warn = True
+        stat = history.stat()
+    except OSError:
+        return ""
+
+    key = [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+    store = session_store()
+    cached = store.get("history_tail")
+    if isinstance(cached, dict) and cached.get("key") == key:
+        return cached.get("session_id", "")
 
+    session_id = ""
     try:
-        with get_session_cache_path().open("w") as f:
-            json.dump(
-                {
-                    "tokens": tokens,
-                    "timestamp": time.time(),
-                    "session_id": session_id,
-                    "shown_learn": existing_shown,
-                    "shown_80_warn": existing_80_warn,
-                },
-                f,
-            )
-    except OSError:
+        line = read_last_line(history)
+        if line:
+            session_id = json.loads(line).get("sessionId", "")
+    except (json.JSONDecodeError, UnicodeDecodeError, OSError, AttributeError):
         pass
 
+    store.set("history_tail", {"key": key, "session_id": session_id})
+    return session_id
+
+
+class SessionState:
+    """This session's context cache, loaded once per run and written back once.
+
+    Holds the last measured tokens and check time (for throttling) and the
+    learn thresholds and 80% warning already shown. Changes accumulate in
+    memory until flush(), which merges them into the session store.
+    """
+
+    KEY = "context_cache"
+
+    def __init__(self, session_id: str) -> None:
+        self.session_id = session_id
+        self.tokens = 0
+        self.timestamp: float | None = None
+        self.shown_learn: list[int] = []
+        self.shown_80_warn = False
+        self._dirty = False
+
+    @classmethod
+    def load(cls, session_id: str) -> SessionState:
+        state = cls(session_id)
+        cache = session_store().get(cls.KEY)
+        if isinstance(cache, dict) and cache.get("session_id") == session_id:
+            state.tokens = cache.get("tokens", 0)
+            state.timestamp = cache.get("timestamp")
+            state.shown_learn = list(cache.get("shown_learn", []))
+            state.shown_80_warn = bool(cache.get("shown_80_warn", False))
+        return state
+
+    def is_throttled(self) -> bool:
+        """Check if context monitoring should be throttled (skipped).
+
+        Returns True if:
+        - Last check was < 30 seconds ago AND
+        - Last cached context was < 80%
+
+        Always returns False at 80%+ context (never throttle high context).
+        """
+        if self.timestamp is None or time.time() - self.timestamp >= 30:
+            return False
+        percentage = (self.tokens / 200000) * 100
+        return percentage < THRESHOLD_WARN
+
+    def record(self, tokens: int, shown_learn: list[int] | None = None, shown_80_warn: bool = False) -> None:
+        """Record a context measurement and any warnings shown for it."""
+        self.tokens = tokens
+        self.timestamp = time.time()
+        if shown_learn:
+            self.shown_learn = list(set(self.shown_learn + shown_learn))
+        if shown_80_warn:
+            self.shown_80_warn = True
+        self._dirty = True
+
+    def flush(self) -> None:
+        """Write recorded changes in one transaction.
+
+        Warnings another hook of this session recorded since load() are kept,
+        so a warning is never shown twice.
+        """
+        if not self._dirty:
+            return
+
+        def merge(stored: object) -> dict:
+            if isinstance(stored, dict) and stored.get("session_id") == self.session_id:
+                self.shown_learn = sorted(set(self.shown_learn) | set(stored.get("shown_learn", [])))
+                self.shown_80_warn = self.shown_80_warn or bool(stored.get("shown_80_warn", False))
+            return {
+                "tokens": self.tokens,
+                "timestamp": self.timestamp,
+                "session_id": self.session_id,
+                "shown_learn": self.shown_learn,
+                "shown_80_warn": self.shown_80_warn,
+            }
+
+        if session_store().update(self.KEY, merge) is not None:
+            self._dirty = False
+
 
 def _get_continuation_path() -> str:
     """Get the absolute continuation file path for the current Pilot session."""
@@ -182,41 +198,7 @@ def _read_statusline_context_pct() -> float | None:
         return None
 
 
-def _is_throttled(session_id: str) -> bool:
-    """Check if context monitoring should be throttled (skipped).
-
-    Returns True if:
-    - Last check was < 30 seconds ago AND
-    - Last cached context was < 80%
-
-    Always returns False at 80%+ context (never throttle high context).
-    """
-    cache_path = get_session_cache_path()
-    if not cache_path.exists():
-        return False
-
-    try:
-        with cache_path.open() as f:
-            cache = json.load(f)
-            if cache.get("session_id") != session_id:
-                return False
-
-            timestamp = cache.get("timestamp")
-            if timestamp is None:
-                return False
-
-            if time.time() - timestamp < 30:
-                tokens = cache.get("tokens", 0)
-                percentage = (tokens / 200000) * 100
-                if percentage < THRESHOLD_WARN:
-                    return True
-
-            return False
-    except (json.JSONDecodeError, OSError, KeyError):
-        return False
-
-
-def _resolve_context(session_id: str) -> tuple[float, int, list[int], bool] | None:
+def _resolve_context(state: SessionState) -> tuple[float, int, list[int], bool] | None:
     """Resolve context percentage and tokens. Returns (pct, tokens, shown_learn, shown_80) or None.
     Uses the session-scoped statusline cache (context-pct.json) which is
     written by the statusline process for this specific Pilot session.
@@ -225,24 +207,30 @@ def _resolve_context(session_id: str) -> tuple[float, int, list[int], bool] | No
     if statusline_pct is None:
         return None
 
-    shown_learn, shown_80_warn = get_session_flags(session_id)
-    return statusline_pct, int(statusline_pct / 100 * 200000), shown_learn, shown_80_warn
+    return statusline_pct, int(statusline_pct / 100 * 200000), list(state.shown_learn), state.shown_80_warn
 
 
 def run_context_monitor() -> int:
     """Run context monitoring and return exit code."""
-    session_id = get_current_session_id() or "unknown"
+    state = SessionState.load(get_current_session_id() or "unknown")
+    try:
+        return _check_context(state)
+    finally:
+        state.flush()
+
 
-    if _is_throttled(session_id):
+def _check_context(state: SessionState) -> int:
+    """Warn about the current context level, recording what was shown in `state`."""
+    if state.is_throttled():
         return 0
 
-    resolved = _resolve_context(session_id)
+    resolved = _resolve_context(state)
     if resolved is None:
         return 0
 
     percentage, total_tokens, shown_learn, shown_80_warn = resolved
 
-    save_cache(total_tokens, session_id)
+    state.record(total_tokens)
 
     new_learn_shown: list[int] = []
     for threshold in LEARN_THRESHOLDS:
@@ -282,7 +270,7 @@ def run_context_monitor() -> int:
     continuation_path = _get_continuation_path()
 
     if percentage >= THRESHOLD_CRITICAL:
-        save_cache(total_tokens, session_id, new_learn_shown if new_learn_shown else None)
+        state.record(total_tokens, new_learn_shown)
         print("", file=sys.stderr)
         print(f"{RED}🚨 CONTEXT {percentage:.0f}% - CRITICAL: HANDOFF NOW IN THIS TURN{NC}", file=sys.stderr)
         print(f"{RED}Do NOT write code, fix errors, or run commands.{NC}", file=sys.stderr)
@@ -295,7 +283,7 @@ def run_context_monitor() -> int:
         return 2
 
     if percentage >= THRESHOLD_STOP:
-        save_cache(total_tokens, session_id, new_learn_shown if new_learn_shown else None)
+        state.record(total_tokens, new_learn_shown)
         print("", file=sys.stderr)
 
         spec_path, spec_status = find_active_spec()
@@ -314,7 +302,7 @@ def run_context_monitor() -> int:
         return 2
 
     if percentage >= THRESHOLD_WARN and not shown_80_warn:
-        save_cache(total_tokens, session_id, new_learn_shown if new_learn_shown else None, shown_80_warn=True)
+        state.record(total_tokens, new_learn_shown, shown_80_warn=True)
         print("", file=sys.stderr)
         print(f"{YELLOW}⚠️  CONTEXT {percentage:.0f}% - PREPARE FOR HANDOFF{NC}", file=sys.stderr)
         print(
@@ -325,12 +313,12 @@ def run_context_monitor() -> int:
 
     if percentage >= THRESHOLD_WARN and shown_80_warn:
         if new_learn_shown:
-            save_cache(total_tokens, session_id, new_learn_shown)
+            state.record(total_tokens, new_learn_shown)
         print(f"{YELLOW}Context: {percentage:.0f}%{NC}", file=sys.stderr)
         return 2
 
     if new_learn_shown:
-        save_cache(total_tokens, session_id, new_learn_shown)
+        state.record(total_tokens, new_learn_shown)
 
     return 0
 
@@ -5,13 +5,70 @@ from __future__ import annotations
 import json
 import os
 import sys
+from functools import partial
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 sys.path.insert(0, str(Path(__file__).parent))
-from _checkers.go import check_go
-from _checkers.python import check_python
-from _checkers.typescript import TS_EXTENSIONS, check_typescript
-from _util import find_git_root, get_edited_file_from_stdin
+from _checkers import TS_EXTENSIONS
+from _util import find_git_root, get_edit_from_stdin
+
+if TYPE_CHECKING:
+    from _checkers.scope import EditScope
+
+
+def check_python(file_path: Path, scope: EditScope | None = None) -> tuple[int, str]:
+    """Run the Python checker, importing it on first use."""
+    from _checkers.python import check_python as _check_python
+
+    return _check_python(file_path, scope)
+
+
+def check_typescript(file_path: Path, scope: EditScope | None = None) -> tuple[int, str]:
+    """Run the TypeScript checker, importing it on first use."""
+    from _checkers.typescript import check_typescript as _check_typescript
+
+    return _check_typescript(file_path, scope)
+
+
+def check_go(file_path: Path, scope: EditScope | None = None) -> tuple[int, str]:
+    """Run the Go checker, importing it on first use."""
+    from _checkers.go import check_go as _check_go
+
+    return _check_go(file_path, scope)
+
+
+def check_file(target_file: Path, payload: dict | None = None) -> tuple[int, str] | None:
+    """Run the language checker for target_file. Returns None for unsupported files.
+
+    Results are served from the check cache when the file, tools and config
+    are unchanged since an earlier check. With the edit's hook payload, only
+    diagnostics on the lines it changed are reported (see _checkers/scope.py).
+    """
+    if target_file.suffix == ".py":
+        language, checker = "python", check_python
+    elif target_file.suffix in TS_EXTENSIONS:
+        language, checker = "typescript", check_typescript
+    elif target_file.suffix == ".go":
+        language, checker = "go", check_go
+    else:
+        return None
+
+    from _checkers.cache import cached_check
+    from _checkers.scope import edit_scope, remember
+
+    scope = edit_scope(payload or {}, target_file)
+    if scope is None:
+        result = cached_check(language, target_file, checker)
+    else:
+        result = cached_check(language, target_file, partial(checker, scope=scope), scope.key())
+    remember(target_file)
+    return result
+
+
+def decision_for(reason: str) -> dict:
+    """Build the PostToolUse decision JSON for a checker reason."""
+    return {"decision": "block", "reason": reason} if reason else {}
 
 
 def main() -> int:
@@ -20,24 +77,16 @@ def main() -> int:
     if git_root:
         os.chdir(git_root)
 
-    target_file = get_edited_file_from_stdin()
+    target_file, payload = get_edit_from_stdin()
     if not target_file or not target_file.exists():
         return 0
 
-    if target_file.suffix == ".py":
-        exit_code, reason = check_python(target_file)
-    elif target_file.suffix in TS_EXTENSIONS:
-        exit_code, reason = check_typescript(target_file)
-    elif target_file.suffix == ".go":
-        exit_code, reason = check_go(target_file)
-    else:
+    result = check_file(target_file, payload)
+    if result is None:
         return 0
 
-    if reason:
-        print(json.dumps({"decision": "block", "reason": reason}))
-    else:
-        print(json.dumps({}))
-
+    exit_code, reason = result
+    print(json.dumps(decision_for(reason)))
     return exit_code
 
 
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""Hook daemon - keeps hook modules imported between tool calls.
+
+One daemon runs per Pilot session and listens on a Unix domain socket under
+~/.pilot/sessions/<PILOT_SESSION_ID>/. The run_hook.py client passes its
+stdin/stdout/stderr file descriptors over the socket; the daemon forks a
+child that runs the requested hook directly against those descriptors and
+replies with the exit code. Forking keeps every invocation isolated (cwd,
+environment, module state) while skipping interpreter startup and imports.
+
+The daemon exits after IDLE_TIMEOUT seconds without requests, and restarts
+itself when any hook source file changes.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import importlib
+import json
+import os
+import signal
+import socket
+import socketserver
+import subprocess
+import sys
+import time
+import traceback
+from pathlib import Path
+
+HOOKS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(HOOKS_DIR))
+import _timings  # noqa: E402
+from _sessions import DAEMON_LOCK_NAME, SOCKET_NAME, session_id  # noqa: E402
+from _util import _sessions_base  # noqa: E402
+
+HOOKS: dict[str, tuple[str, str]] = {
+    "context_monitor": ("context_monitor", "run_context_monitor"),
+    "file_checker": ("file_checker", "main"),
+    "post_tool_use": ("post_tool_use", "main"),
+    "spec_stop_guard": ("spec_stop_guard", "main"),
+    "tdd_enforcer": ("tdd_enforcer", "run_tdd_enforcer"),
+    "tool_redirect": ("tool_redirect", "run_tool_redirect"),
+}
+
+PRELOAD = ("_checkers.go", "_checkers.python", "_checkers.typescript", "notify")
+
+IDLE_TIMEOUT = 30 * 60
+POLL_INTERVAL = 60
+MAX_HEADER_BYTES = 1024 * 1024
+RESTART_REPLY = b'{"restart": true}\n'
+
+
+def get_socket_path() -> Path:
+    """Get session-scoped hook daemon socket path."""
+    return _sessions_base() / session_id() / SOCKET_NAME
+
+
+def run_hook(name: str) -> int:
+    """Import and run a registered hook in the current process, recording its timings. Returns its exit code."""
+    if name not in HOOKS:
+        print(f"[Pilot] Unknown hook: {name}", file=sys.stderr)
+        return 1
+
+    _timings.begin(name)
+    exit_code = _call_hook(*HOOKS[name])
+    _timings.finish(exit_code)
+    return exit_code
+
+
+def _call_hook(module_name: str, func_name: str) -> int:
+    try:
+        module = importlib.import_module(module_name)
+        result = getattr(module, func_name)()
+    except SystemExit as e:
+        result = e.code
+    except Exception:
+        traceback.print_exc()
+        return 1
+
+    if result is None:
+        return 0
+    return result if isinstance(result, int) else 1
+
+
+def spawn_daemon() -> None:
+    """Start a detached hook daemon for the current session."""
+    try:
+        subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve())],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+            close_fds=True,
+        )
+    except OSError:
+        pass
+
+
+def _source_fingerprint() -> float:
+    """Latest modification time across all hook sources."""
+    latest = 0.0
+    for path in HOOKS_DIR.glob("**/*.py"):
+        try:
+            latest = max(latest, path.stat().st_mtime)
+        except OSError:
+            continue
+    return latest
+
+
+def _read_header(conn: socket.socket) -> tuple[dict, list[int]]:
+    """Receive the JSON request line and the client's stdio descriptors."""
+    data, fds, _flags, _addr = socket.recv_fds(conn, MAX_HEADER_BYTES, 3)
+    while data and not data.endswith(b"\n") and len(data) < MAX_HEADER_BYTES:
+        chunk = conn.recv(MAX_HEADER_BYTES)
+        if not chunk:
+            break
+        data += chunk
+    try:
+        return json.loads(data), fds
+    except ValueError:
+        for fd in fds:
+            os.close(fd)
+        raise
+
+
+class _HookHandler(socketserver.BaseRequestHandler):
+    """Runs one hook invocation inside a forked child."""
+
+    def handle(self) -> None:
+        request, fds = _read_header(self.request)
+        if len(fds) != 3:
+            for fd in fds:
+                os.close(fd)
+            return
+
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        for target, fd in enumerate(fds):
+            os.dup2(fd, target)
+            os.close(fd)
+        sys.stdin = open(0, encoding="utf-8", closefd=False)
+        sys.stdout = open(1, "w", encoding="utf-8", closefd=False)
+        sys.stderr = open(2, "w", encoding="utf-8", closefd=False)
+
+        os.environ.clear()
+        os.environ.update(request.get("env", {}))
+        try:
+            os.chdir(request.get("cwd", "/"))
+        except OSError:
+            pass
+
+        exit_code = run_hook(request.get("hook", ""))
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+        self.request.sendall(json.dumps({"exit_code": exit_code}).encode() + b"\n")
+
+
+class _HookServer(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    """Forking server that tracks idleness and source changes."""
+
+    def __init__(self, socket_path: Path) -> None:
+        self.last_request = time.monotonic()
+        self.fingerprint = _source_fingerprint()
+        self.stale = False
+        super().__init__(str(socket_path), _HookHandler)
+        self.timeout = POLL_INTERVAL
+
+    def process_request(self, request, client_address) -> None:  # type: ignore[override]
+        self.last_request = time.monotonic()
+        if _source_fingerprint() != self.fingerprint:
+            self.stale = True
+            try:
+                request.sendall(RESTART_REPLY)
+            except OSError:
+                pass
+            self.shutdown_request(request)
+            return
+        super().process_request(request, client_address)
+
+    @property
+    def should_exit(self) -> bool:
+        return self.stale or time.monotonic() - self.last_request > IDLE_TIMEOUT
+
+
+def _acquire_lock(lock_file) -> bool:
+    """Take the per-session daemon lock, waiting briefly for a stale daemon to exit."""
+    deadline = time.monotonic() + 2
+    while True:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+
+
+def serve() -> int:
+    """Run the hook daemon until it goes idle or its sources change."""
+    socket_path = get_socket_path()
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with socket_path.with_name(DAEMON_LOCK_NAME).open("a+") as lock_file:
+        if not _acquire_lock(lock_file):
+            return 0
+        lock_file.truncate(0)
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+        socket_path.unlink(missing_ok=True)
+        for module_name in [module for module, _ in HOOKS.values()] + list(PRELOAD):
+            try:
+                importlib.import_module(module_name)
+            except Exception:
+                pass
+
+        server = _HookServer(socket_path)
+        try:
+            os.chmod(socket_path, 0o600)
+            while not server.should_exit:
+                server.handle_request()
+                server.collect_children()
+        finally:
+            server.server_close()
+            socket_path.unlink(missing_ok=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(serve())
@@ -1,22 +1,50 @@
 """OS-native notification support for hooks.
 
-Sends cross-platform notifications with thread-based timeout protection.
-Plays sound via afplay (macOS) or paplay (Linux) independently of notification
-permissions, ensuring audible alerts even when notification banners are blocked.
+send_notification() only drops the notification into a spool directory
+(~/.pilot/notify/spool/) and makes sure the delivery daemon is running, so
+Stop and SessionEnd hooks return immediately. The daemon is this module run
+with --serve, one per user. It drops a notification identical to one it
+delivered for the same session within COALESCE_WINDOW seconds, delivers at
+most RATE_LIMIT per session every RATE_WINDOW seconds, and exits after
+IDLE_TIMEOUT seconds with nothing to deliver.
+
+The daemon also owns sound playback: afplay (macOS) or paplay (Linux) runs
+independently of notification permissions, ensuring audible alerts even
+when notification banners are blocked.
 """
 
 from __future__ import annotations
 
+import json
+import os
 import platform
 import shutil
 import subprocess
 import sys
-from concurrent.futures import ThreadPoolExecutor, TimeoutError
+import time
+from pathlib import Path
 
 _warning_shown = False
 
 _MACOS_SOUND = "/System/Library/Sounds/Glass.aiff"
 _LINUX_SOUND = "/usr/share/sounds/freedesktop/stereo/complete.oga"
+_COMMANDS = {"Darwin": "osascript", "Linux": "notify-send"}
+
+COALESCE_WINDOW = 30.0
+RATE_LIMIT = 5
+RATE_WINDOW = 60.0
+IDLE_TIMEOUT = 60.0
+POLL_INTERVAL = 0.2
+DELIVERY_TIMEOUT = 3
+LOCK_NAME = "notifyd.lock"
+
+
+def notify_dir() -> Path:
+    return Path.home() / ".pilot" / "notify"
+
+
+def spool_dir() -> Path:
+    return notify_dir() / "spool"
 
 
 def _play_sound(system: str) -> None:
@@ -38,30 +66,22 @@ def _play_sound(system: str) -> None:
         pass
 
 
-def send_notification(title: str, message: str) -> None:
-    """Send OS-native notification with sound.
-
-    Args:
-        title: Notification title
-        message: Notification message
+def deliver(title: str, message: str) -> None:
+    """Show an OS-native notification with sound, waiting at most DELIVERY_TIMEOUT seconds.
 
-    Returns silently if platform unsupported or command not available.
-    Thread-based timeout ensures function returns within 3 seconds.
-    Sound is played independently via afplay/paplay as a fallback.
+    Returns silently if platform unsupported or command not available;
+    the sound is still played in that case.
     """
-    global _warning_shown
-
     system = platform.system()
+    cmd_name = _COMMANDS.get(system)
+    if cmd_name is None:
+        return
 
-    if system == "Darwin":
-        cmd_name = "osascript"
-        if not shutil.which(cmd_name):
-            if not _warning_shown:
-                print(f"[Pilot] Notifications disabled: {cmd_name} not found", file=sys.stderr)
-                _warning_shown = True
-            _play_sound(system)
-            return
+    _play_sound(system)
+    if not shutil.which(cmd_name):
+        return
 
+    if system == "Darwin":
         safe_title = title.replace("\\", "\\\\").replace('"', '\\"')
         safe_message = message.replace("\\", "\\\\").replace('"', '\\"')
         cmd = [
@@ -69,34 +89,185 @@ def send_notification(title: str, message: str) -> None:
             "-e",
             f'display notification "{safe_message}" with title "{safe_title}" sound name "Glass"',
         ]
-    elif system == "Linux":
-        cmd_name = "notify-send"
-        if not shutil.which(cmd_name):
-            if not _warning_shown:
-                print(f"[Pilot] Notifications disabled: {cmd_name} not found", file=sys.stderr)
-                _warning_shown = True
-            _play_sound(system)
-            return
-
+    else:
         cmd = ["notify-send", "--urgency=critical", title, message]
+
+    try:
+        subprocess.run(cmd, capture_output=True, check=False, timeout=DELIVERY_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        pass
+    except Exception as e:
+        print(f"[Pilot] Notification failed: {e}", file=sys.stderr)
+
+
+def _warn_if_unavailable() -> None:
+    """Tell the user once per process that banners cannot be shown (the daemon has no terminal)."""
+    global _warning_shown
+
+    cmd_name = _COMMANDS.get(platform.system())
+    if _warning_shown or cmd_name is None or shutil.which(cmd_name):
+        return
+    print(f"[Pilot] Notifications disabled: {cmd_name} not found", file=sys.stderr)
+    _warning_shown = True
+
+
+def _daemon_running() -> bool:
+    """Whether a delivery daemon holds the lock."""
+    import fcntl
+
+    try:
+        fd = os.open(notify_dir() / LOCK_NAME, os.O_RDWR | os.O_CREAT, 0o600)
+    except OSError:
+        return False
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return True
     else:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        return False
+    finally:
+        os.close(fd)
+
+
+def _spawn_daemon() -> bool:
+    """Start a detached delivery daemon. Returns False if it could not be started."""
+    try:
+        subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve()), "--serve"],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+            close_fds=True,
+        )
+    except OSError:
+        return False
+    return True
+
+
+def send_notification(title: str, message: str) -> None:
+    """Queue an OS-native notification with sound for the delivery daemon.
+
+    Args:
+        title: Notification title
+        message: Notification message
+
+    Returns without waiting for delivery. If the notification cannot be
+    queued or no daemon can be started, it is delivered inline instead.
+    """
+    if platform.system() not in _COMMANDS:
         return
+    _warn_if_unavailable()
 
-    _play_sound(system)
+    entry = {
+        "title": title,
+        "message": message,
+        "session": os.environ.get("PILOT_SESSION_ID", "").strip() or "default",
+        "ts": time.time(),
+    }
+    spool = spool_dir()
+    path = spool / f"{time.time_ns()}-{os.getpid()}.json"
+    try:
+        spool.mkdir(parents=True, exist_ok=True)
+        tmp = spool / f".{path.name}.tmp"
+        tmp.write_text(json.dumps(entry))
+        os.replace(tmp, path)
+    except OSError:
+        deliver(title, message)
+        return
 
-    def _run_notification():
-        subprocess.run(cmd, capture_output=True, check=False)
+    if not _daemon_running() and not _spawn_daemon():
+        try:
+            path.unlink()
+        except OSError:
+            return
+        deliver(title, message)
+
+
+class Coalescer:
+    """Decides which spooled notifications are worth showing."""
+
+    def __init__(self) -> None:
+        self._last_shown: dict[tuple[str, str, str], float] = {}
+        self._shown: dict[str, list[float]] = {}
+
+    def admit(self, session: str, title: str, message: str, ts: float) -> bool:
+        """Whether to deliver; drops repeats within COALESCE_WINDOW and anything over the session's rate."""
+        key = (session, title, message)
+        last = self._last_shown.get(key)
+        if last is not None and ts - last < COALESCE_WINDOW:
+            return False
+        recent = [shown for shown in self._shown.get(session, []) if ts - shown < RATE_WINDOW]
+        self._shown[session] = recent
+        if len(recent) >= RATE_LIMIT:
+            return False
+        recent.append(ts)
+        self._last_shown[key] = ts
+        return True
 
+
+def _pending() -> list[Path]:
     try:
-        with ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(_run_notification)
-            future.result(timeout=3)
-    except TimeoutError:
-        pass
-    except Exception as e:
-        print(f"[Pilot] Notification failed: {e}", file=sys.stderr)
+        return sorted(path for path in spool_dir().iterdir() if not path.name.startswith("."))
+    except OSError:
+        return []
+
+
+def drain(coalescer: Coalescer) -> bool:
+    """Deliver everything in the spool, oldest first. Returns True if anything was spooled."""
+    entries = _pending()
+    for path in entries:
+        try:
+            entry = json.loads(path.read_text())
+            path.unlink()
+        except FileNotFoundError:
+            continue
+        except (OSError, json.JSONDecodeError):
+            path.unlink(missing_ok=True)
+            continue
+        if not isinstance(entry, dict):
+            continue
+        title, message = str(entry.get("title", "")), str(entry.get("message", ""))
+        if coalescer.admit(str(entry.get("session", "")), title, message, float(entry.get("ts", time.time()))):
+            deliver(title, message)
+    return bool(entries)
+
+
+def serve() -> int:
+    """Run the delivery daemon until it has been idle for IDLE_TIMEOUT seconds.
+
+    A client that sees the lock held does not start a daemon, so before
+    exiting the daemon releases the lock and looks at the spool once more.
+    """
+    import fcntl
+
+    notify_dir().mkdir(parents=True, exist_ok=True)
+    with (notify_dir() / LOCK_NAME).open("a+") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return 0
+
+        coalescer = Coalescer()
+        idle_since = time.monotonic()
+        while True:
+            if drain(coalescer):
+                idle_since = time.monotonic()
+            elif time.monotonic() - idle_since > IDLE_TIMEOUT:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+                if not _pending():
+                    return 0
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    return 0
+                idle_since = time.monotonic()
+            time.sleep(POLL_INTERVAL)
 
 
 if __name__ == "__main__":
+    if sys.argv[1:] == ["--serve"]:
+        sys.exit(serve())
     send_notification("Pilot Test", "Notification system working!")
     print("Test notification sent (check your notification center)")
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""PostToolUse dispatcher - runs every Python check for Write/Edit/MultiEdit in one process.
+
+Decodes the hook payload once and runs file_checker, tdd_enforcer and
+context_monitor as stages over a shared HookContext. Stages run concurrently;
+each stage's stderr is buffered and emitted in stage order, so the output
+reads the same as running the hooks one after another.
+
+The standalone hook scripts keep working on their own.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _timings import phase
+from _util import StderrRouter, find_git_root, read_hook_stdin
+
+
+class HookContext:
+    """Decoded PostToolUse payload shared by all stages."""
+
+    __slots__ = ("data", "file_path", "tool_input", "tool_name")
+
+    def __init__(self, data: dict, tool_name: str, tool_input: dict, file_path: Path | None) -> None:
+        self.data = data
+        self.tool_name = tool_name
+        self.tool_input = tool_input
+        self.file_path = file_path
+
+
+class StageResult:
+    """Outcome of one stage: exit code, captured stderr and optional decision JSON."""
+
+    __slots__ = ("decision", "exit_code", "name", "stderr")
+
+    def __init__(self, name: str, exit_code: int, stderr: str = "", decision: dict | None = None) -> None:
+        self.name = name
+        self.exit_code = exit_code
+        self.stderr = stderr
+        self.decision = decision
+
+
+Stage = Callable[[HookContext], "tuple[int, dict | None]"]
+
+
+def build_context(hook_data: dict) -> HookContext:
+    """Build the shared stage context from a decoded payload."""
+    tool_input = hook_data.get("tool_input", {})
+    if not isinstance(tool_input, dict):
+        tool_input = {}
+    file_path = tool_input.get("file_path")
+    return HookContext(
+        data=hook_data,
+        tool_name=hook_data.get("tool_name", ""),
+        tool_input=tool_input,
+        file_path=Path(file_path) if file_path else None,
+    )
+
+
+def file_checker_stage(ctx: HookContext) -> tuple[int, dict | None]:
+    """Lint and type-check the edited file."""
+    from file_checker import check_file, decision_for
+
+    if not ctx.file_path or not ctx.file_path.exists():
+        return 0, None
+    result = check_file(ctx.file_path, ctx.data)
+    if result is None:
+        return 0, None
+    exit_code, reason = result
+    return exit_code, decision_for(reason)
+
+
+def tdd_stage(ctx: HookContext) -> tuple[int, dict | None]:
+    """Remind about missing tests for the edited file."""
+    from tdd_enforcer import check_tdd
+
+    return check_tdd(ctx.data), None
+
+
+def context_stage(ctx: HookContext) -> tuple[int, dict | None]:
+    """Warn when context usage is high."""
+    from context_monitor import run_context_monitor
+
+    return run_context_monitor(), None
+
+
+STAGES: list[tuple[str, Stage]] = [
+    ("file_checker", file_checker_stage),
+    ("tdd_enforcer", tdd_stage),
+    ("context_monitor", context_stage),
+]
+
+
+def _run_stage(router: StderrRouter, name: str, stage: Stage, ctx: HookContext) -> StageResult:
+    with router.capture() as buffer, phase(name):
+        try:
+            exit_code, decision = stage(ctx)
+        except Exception:
+            import traceback
+
+            traceback.print_exc()
+            exit_code, decision = 1, None
+    return StageResult(name, exit_code, buffer.getvalue(), decision)
+
+
+def run_stages(ctx: HookContext, stages: list[tuple[str, Stage]] | None = None) -> list[StageResult]:
+    """Run stages concurrently. Results are returned in stage order."""
+    stages = STAGES if stages is None else stages
+    results: list[StageResult | None] = [None] * len(stages)
+
+    def worker(index: int, name: str, stage: Stage) -> None:
+        results[index] = _run_stage(router, name, stage, ctx)
+
+    router = StderrRouter(sys.stderr)
+    sys.stderr = router
+    try:
+        threads = [
+            threading.Thread(target=worker, args=(index, name, stage), daemon=True)
+            for index, (name, stage) in enumerate(stages)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.stderr = router.target
+    return [result for result in results if result is not None]
+
+
+def merge_exit_codes(codes: list[int]) -> int:
+    """Blocking feedback (2) wins over other errors, which win over success."""
+    if 2 in codes:
+        return 2
+    return next((code for code in codes if code != 0), 0)
+
+
+def merge_decisions(decisions: list[dict]) -> dict:
+    """Combine stage decisions; block reasons are joined in stage order."""
+    reasons = [d["reason"] for d in decisions if d.get("decision") == "block" and d.get("reason")]
+    if not reasons:
+        return {}
+    return {"decision": "block", "reason": "; ".join(reasons)}
+
+
+def main() -> int:
+    """Decode stdin once, run all stages, and merge their output."""
+    hook_data = read_hook_stdin()
+    if not hook_data:
+        return 0
+    ctx = build_context(hook_data)
+
+    os.environ.setdefault("CLAUDE_PROJECT_ROOT", str(Path.cwd()))
+    git_root = find_git_root()
+    if git_root:
+        os.chdir(git_root)
+
+    results = run_stages(ctx)
+
+    for result in results:
+        if result.stderr:
+            sys.stderr.write(result.stderr)
+    sys.stderr.flush()
+
+    decisions = [result.decision for result in results if result.decision is not None]
+    if decisions:
+        print(json.dumps(merge_decisions(decisions)))
+
+    return merge_exit_codes([result.exit_code for result in results])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Hook client - forwards a hook invocation to the session's hook daemon.
+
+Usage: run_hook.py <hook-name>
+
+Hands this process's stdin/stdout/stderr to the daemon (see hook_daemon.py)
+and exits with the hook's exit code. When the daemon is not reachable the
+hook runs in-process and a daemon is started for the next call. Set
+PILOT_HOOK_DAEMON=0 to always run in-process.
+
+hooks.json starts it with python3 rather than `uv run`: the hooks only need
+the standard library, and uv would resolve the project's environment first.
+
+Every run also touches the session's heartbeat file, which session_end.py
+reads to count live sessions.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _sessions import heartbeat_path, socket_path  # noqa: E402
+
+
+def touch_heartbeat() -> None:
+    """Mark this Pilot session as live."""
+    if not os.environ.get("PILOT_SESSION_ID", "").strip():
+        return
+    path = heartbeat_path()
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.touch()
+        except OSError:
+            pass
+    except OSError:
+        pass
+
+
+def _daemon_enabled() -> bool:
+    return os.environ.get("PILOT_HOOK_DAEMON", "").strip().lower() not in ("0", "false", "off")
+
+
+def forward(hook_name: str) -> int | None:
+    """Run the hook through the daemon. Returns None if the daemon is unavailable.
+
+    Once the daemon holds this process's descriptors it may already have run
+    the hook, so a failure after that is an error exit, never a second run.
+    """
+    header = json.dumps({"hook": hook_name, "cwd": os.getcwd(), "env": dict(os.environ)}).encode() + b"\n"
+    try:
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conn.connect(str(socket_path()))
+        sent = socket.send_fds(conn, [header], [0, 1, 2])
+    except OSError:
+        return None
+
+    reply = b""
+    with conn:
+        try:
+            conn.sendall(header[sent:])
+            while not reply.endswith(b"\n"):
+                chunk = conn.recv(4096)
+                if not chunk:
+                    break
+                reply += chunk
+        except OSError:
+            pass
+
+    try:
+        data = json.loads(reply)
+    except json.JSONDecodeError:
+        print("[Pilot] Hook daemon closed the connection", file=sys.stderr)
+        return 1
+
+    if data.get("restart"):
+        return None
+    return int(data.get("exit_code", 0))
+
+
+def main() -> int:
+    if len(sys.argv) < 2:
+        print("Usage: run_hook.py <hook-name>", file=sys.stderr)
+        return 1
+
+    hook_name = sys.argv[1]
+    touch_heartbeat()
+    if _daemon_enabled():
+        exit_code = forward(hook_name)
+        if exit_code is not None:
+            return exit_code
+
+    from hook_daemon import run_hook, spawn_daemon
+
+    if _daemon_enabled():
+        spawn_daemon()
+    return run_hook(hook_name)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,33 +3,85 @@
 
 Skips worker stop during endless mode handoffs (continuation file present)
 or when an active spec plan is in progress (PENDING/COMPLETE status).
+
+A recent heartbeat file, which run_hook.py touches on every Python hook run,
+proves another session is live without asking the pilot binary. Missing
+heartbeats prove nothing (a session may not have run a Python hook yet, or
+runs without PILOT_SESSION_ID), so then the pilot binary counts. The worker is asked to shut down over its HTTP API
+without waiting for it to exit; `bun worker-service.cjs stop` is the
+fallback when the worker cannot be reached.
+
+The session's hook daemon (hook_daemon.py) is sent SIGTERM instead of
+being left to idle out. Transcript checkpoints that have not been written for a week are pruned on
+every session end.
 """
 
 from __future__ import annotations
 
+import fcntl
 import json
 import os
+import signal
 import subprocess
 import sys
+import time
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
-from _util import _sessions_base
-from notify import send_notification
+import _timings
+from _sessions import DAEMON_LOCK_NAME, HEARTBEAT_NAME, session_id
+from _transcript import prune_cursors
+from _util import _sessions_base, send_notification
 
 PILOT_BIN = Path.home() / ".pilot" / "bin" / "pilot"
+SESSION_TTL = 30 * 60
+DEFAULT_WORKER_PORT = 41777
+
+
+def _recent_other_heartbeats() -> int:
+    """Number of sessions other than this one with a heartbeat younger than SESSION_TTL."""
+    own = session_id()
+    now = time.time()
+    recent = 0
+    try:
+        entries = list(os.scandir(_sessions_base()))
+    except OSError:
+        return 0
+    for entry in entries:
+        if entry.name == own:
+            continue
+        try:
+            mtime = os.stat(os.path.join(entry.path, HEARTBEAT_NAME)).st_mtime
+        except OSError:
+            continue
+        if now - mtime < SESSION_TTL:
+            recent += 1
+    return recent
 
 
 def _get_active_session_count() -> int:
+    """Get active session count, this session included.
+
+    Recent heartbeats of other sessions are conclusive; without any, the
+    pilot binary is asked, since live sessions can lack a heartbeat.
+    """
+    recent = _recent_other_heartbeats()
+    if recent:
+        return 1 + recent
+    return _pilot_session_count()
+
+
+def _pilot_session_count() -> int:
     """Get active session count from the pilot binary."""
     try:
-        result = subprocess.run(
-            [str(PILOT_BIN), "sessions", "--json"],
-            capture_output=True,
-            text=True,
-            check=False,
-            timeout=10,
-        )
+        with _timings.tool("pilot"):
+            result = subprocess.run(
+                [str(PILOT_BIN), "sessions", "--json"],
+                capture_output=True,
+                text=True,
+                check=False,
+                timeout=10,
+            )
         if result.returncode == 0:
             data = json.loads(result.stdout)
             return data.get("count", 0)
@@ -38,14 +90,25 @@ def _get_active_session_count() -> int:
     return 0
 
 
+def _stop_hook_daemon() -> None:
+    """SIGTERM this session's hook daemon, if one holds its lock."""
+    try:
+        with (_sessions_base() / session_id() / DAEMON_LOCK_NAME).open("r") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_SH | fcntl.LOCK_NB)
+            except OSError:
+                os.kill(int(lock_file.read().strip()), signal.SIGTERM)
+    except (OSError, ValueError):
+        pass
+
+
 def _is_session_handing_off() -> bool:
     """Check if this session is doing an endless mode handoff.
 
     Returns True if a continuation file exists or an active spec plan
     has PENDING/COMPLETE status (meaning the workflow will resume).
     """
-    session_id = os.environ.get("PILOT_SESSION_ID", "").strip() or "default"
-    session_dir = _sessions_base() / session_id
+    session_dir = _sessions_base() / session_id()
 
     if (session_dir / "continuation.md").exists():
         return True
@@ -65,8 +128,7 @@ def _is_session_handing_off() -> bool:
 
 def _is_plan_verified() -> bool:
     """Check if active plan has VERIFIED status."""
-    session_id = os.environ.get("PILOT_SESSION_ID", "").strip() or "default"
-    session_dir = _sessions_base() / session_id
+    session_dir = _sessions_base() / session_id()
     plan_file = session_dir / "active_plan.json"
 
     if not plan_file.exists():
@@ -80,11 +142,65 @@ def _is_plan_verified() -> bool:
         return False
 
 
+def _worker_address() -> tuple[str, int]:
+    """Host and port of the worker, from its PID file or the console settings."""
+    data_dir = Path(os.environ.get("CLAUDE_PILOT_DATA_DIR") or Path.home() / ".pilot" / "memory")
+    settings: dict = {}
+    try:
+        settings = json.loads((data_dir / "settings.json").read_text())
+    except (json.JSONDecodeError, OSError):
+        pass
+    port = settings.get("CLAUDE_PILOT_WORKER_PORT", DEFAULT_WORKER_PORT)
+    try:
+        port = json.loads((data_dir / "worker.pid").read_text()).get("port", port)
+    except (json.JSONDecodeError, OSError, AttributeError):
+        pass
+    return str(settings.get("CLAUDE_PILOT_WORKER_HOST") or "127.0.0.1"), int(port)
+
+
+def _request_worker_shutdown() -> bool:
+    """Ask the worker to shut down gracefully without waiting for it to exit. Returns True if it accepted."""
+    import http.client
+
+    try:
+        host, port = _worker_address()
+        conn = http.client.HTTPConnection(host, port, timeout=1)
+        try:
+            conn.request("POST", "/api/admin/shutdown")
+            return conn.getresponse().status == 200
+        finally:
+            conn.close()
+    except (OSError, ValueError, http.client.HTTPException):
+        return False
+
+
+def _stop_worker(plugin_root: str) -> int:
+    """Stop the worker, falling back to the bundled CLI when its API is unreachable."""
+    if _request_worker_shutdown():
+        return 0
+    stop_script = Path(plugin_root) / "scripts" / "worker-service.cjs"
+    with _timings.tool("bun"):
+        result = subprocess.run(
+            ["bun", str(stop_script), "stop"],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    return result.returncode
+
+
 def main() -> int:
     plugin_root = os.environ.get("CLAUDE_PLUGIN_ROOT", "")
     if not plugin_root:
         return 1
 
+    try:
+        (_sessions_base() / session_id() / HEARTBEAT_NAME).unlink(missing_ok=True)
+    except OSError:
+        pass
+    _stop_hook_daemon()
+    prune_cursors()
+
     count = _get_active_session_count()
     if count > 1:
         return 0
@@ -92,21 +208,18 @@ def main() -> int:
     if _is_session_handing_off():
         return 0
 
-    stop_script = Path(plugin_root) / "scripts" / "worker-service.cjs"
-    result = subprocess.run(
-        ["bun", str(stop_script), "stop"],
-        capture_output=True,
-        text=True,
-        check=False,
-    )
+    returncode = _stop_worker(plugin_root)
 
     if _is_plan_verified():
         send_notification("Pilot", "Spec complete — all checks passed")
     else:
         send_notification("Pilot", "Claude session ended")
 
-    return result.returncode
+    return returncode
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    _timings.begin("session_end")
+    exit_code = main()
+    _timings.finish(exit_code)
+    raise SystemExit(exit_code)
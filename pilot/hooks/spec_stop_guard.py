@@ -10,63 +10,52 @@ Only allows stopping when:
 
 from __future__ import annotations
 
-import json
-import os
-import re
 import sys
 import time
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
-from _util import CYAN, NC, RED, YELLOW, _sessions_base, get_session_plan_path, is_waiting_for_user_input
-from notify import send_notification
+from _util import (
+    CYAN,
+    NC,
+    RED,
+    YELLOW,
+    is_waiting_for_user_input,
+    read_hook_stdin,
+    send_notification,
+    session_store,
+)
 
 COOLDOWN_SECONDS = 60
 
 
-def get_stop_guard_path() -> Path:
-    """Get session-scoped stop guard state path."""
-    session_id = os.environ.get("PILOT_SESSION_ID", "").strip() or "default"
-    guard_dir = _sessions_base() / session_id
-    guard_dir.mkdir(parents=True, exist_ok=True)
-    return guard_dir / "spec-stop-guard"
+def claim_stop_cooldown(now: float) -> bool:
+    """Whether this stop follows a blocked one within the cooldown.
 
+    Read and update the last blocked stop in one transaction. A stop inside
+    the cooldown consumes the mark; any other stop records `now` as blocked.
+    """
+    within = False
 
-def find_active_plan() -> tuple[Path | None, str | None, bool]:
-    """Find the active plan for THIS session via session-scoped active_plan.json."""
-    plan_json = get_session_plan_path()
-    if not plan_json.exists():
-        return None, None, False
+    def claim(last_block: object) -> float | None:
+        nonlocal within
+        if isinstance(last_block, (int, float)) and now - last_block < COOLDOWN_SECONDS:
+            within = True
+            return None
+        return now
 
-    try:
-        data = json.loads(plan_json.read_text())
-        plan_path_str = data.get("plan_path", "")
-    except (json.JSONDecodeError, OSError):
-        return None, None, False
+    session_store().update("stop_guard", claim)
+    return within
 
-    if not plan_path_str:
-        return None, None, False
 
-    plan_file = Path(plan_path_str)
-    if not plan_file.is_absolute():
-        project_root = os.environ.get("CLAUDE_PROJECT_ROOT", str(Path.cwd()))
-        plan_file = Path(project_root) / plan_file
-    if not plan_file.exists():
-        return None, None, False
+def find_active_plan() -> tuple[Path | None, str | None, bool]:
+    """Find the active plan for THIS session via session-scoped active_plan.json."""
+    from _plan import active_plan
 
-    try:
-        content = plan_file.read_text()
-        status_match = re.search(r"^Status:\s*(\w+)", content, re.MULTILINE)
-        if not status_match:
-            return None, None, False
-        status = status_match.group(1).upper()
-        if status not in ("PENDING", "COMPLETE"):
-            return None, None, False
-        approved_match = re.search(r"^Approved:\s*(Yes|No)", content, re.MULTILINE | re.IGNORECASE)
-        approved = bool(approved_match and approved_match.group(1).lower() == "yes")
-        return plan_file, status, approved
-    except OSError:
+    plan = active_plan()
+    if plan is None or not plan.is_active:
         return None, None, False
+    return plan.path, plan.status, plan.approved
 
 
 def get_next_phase(status: str, approved: bool) -> str:
@@ -82,9 +71,8 @@ def get_next_phase(status: str, approved: bool) -> str:
 
 def main() -> int:
     """Check if stopping is allowed based on /spec workflow state."""
-    try:
-        input_data = json.load(sys.stdin)
-    except json.JSONDecodeError:
+    input_data = read_hook_stdin()
+    if not input_data:
         return 0
 
     if input_data.get("stop_hook_active", False):
@@ -99,22 +87,9 @@ def main() -> int:
         send_notification("Pilot", "Waiting for your input")
         return 0
 
-    now = time.time()
-    state_file = get_stop_guard_path()
-    if state_file.exists():
-        try:
-            last_block = float(state_file.read_text().strip())
-            if now - last_block < COOLDOWN_SECONDS:
-                state_file.unlink(missing_ok=True)
-                send_notification("Pilot", "Waiting for your input")
-                return 0
-        except (ValueError, OSError):
-            pass
-
-    try:
-        state_file.write_text(str(now))
-    except OSError:
-        pass
+    if claim_stop_cooldown(time.time()):
+        send_notification("Pilot", "Waiting for your input")
+        return 0
 
     next_phase = get_next_phase(status, approved)
 
@@ -4,8 +4,6 @@
 from __future__ import annotations
 
 import json
-import os
-import re
 import sys
 from pathlib import Path
 
@@ -24,24 +22,12 @@ def main() -> int:
     transcript_path = input_data.get("transcript_path", "")
     if transcript_path and is_waiting_for_user_input(transcript_path):
         return 0
-    session_id = os.environ.get("PILOT_SESSION_ID", "").strip() or "default"
-    plan_json = Path.home() / ".pilot" / "sessions" / session_id / "active_plan.json"
-    if not plan_json.exists():
-        return 0
-    try:
-        data = json.loads(plan_json.read_text())
-        plan_path_str = data.get("plan_path", "")
-        if not plan_path_str:
-            return 0
-        plan_file = Path(plan_path_str)
-        if not plan_file.is_absolute():
-            plan_file = Path(os.environ.get("CLAUDE_PROJECT_ROOT", str(Path.cwd()))) / plan_file
-        if not plan_file.exists():
-            return 0
-        status_match = re.search(r"^Status:\s*(\w+)", plan_file.read_text(), re.MULTILINE)
-        status = status_match.group(1).upper() if status_match else None
-    except (json.JSONDecodeError, OSError):
+    from _plan import active_plan
+
+    plan = active_plan()
+    if plan is None:
         return 0
+    status = plan.status
     if status == "COMPLETE":
         print(
             f"{RED}⛔ Plan status was not updated{NC}\nspec-verify must update status from COMPLETE to VERIFIED or PENDING",
@@ -14,7 +14,7 @@ import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
-from _util import NC, YELLOW
+from _util import NC, YELLOW, read_hook_stdin, session_store
 
 EXCLUDED_EXTENSIONS = [
     ".md",
@@ -93,6 +93,72 @@ def is_test_file(file_path: str) -> bool:
     return False
 
 
+FAILING_STEMS_KEY = "failing_test_stems"
+
+TS_TEST_SUFFIXES = (".test.ts", ".spec.ts", ".test.tsx", ".spec.tsx", ".test.js", ".spec.js", ".test.jsx", ".spec.jsx")
+
+
+def _pytest_failing_files(data: object) -> list[str]:
+    """Test files named in a pytest lastfailed cache ({"path::test": true})."""
+    if not isinstance(data, dict):
+        return []
+    return [node_id.split("::")[0] for node_id in data]
+
+
+def _vitest_failing_files(data: object) -> list[str]:
+    """Test files marked failed in a vitest results.json ({"results": {path: {"failed": bool}}})."""
+    results = data.get("results") if isinstance(data, dict) else None
+    if isinstance(results, list):
+        results = dict(item for item in results if isinstance(item, list) and len(item) == 2)
+    if not isinstance(results, dict):
+        return []
+    return [path for path, result in results.items() if isinstance(result, dict) and result.get("failed")]
+
+
+def _test_module_stem(test_file: str) -> str | None:
+    """Module a test file is named after (test_foo.py, foo_test.py, foo.test.ts -> foo), or None."""
+    name = Path(test_file).name
+    for suffix in TS_TEST_SUFFIXES:
+        if name.endswith(suffix):
+            return name[: -len(suffix)]
+    stem = Path(name).stem
+    if stem.startswith("test_"):
+        return stem[5:]
+    if stem.endswith("_test"):
+        return stem[:-5]
+    return None
+
+
+def failing_test_stems(cache_file: Path, failing_files=_pytest_failing_files) -> frozenset[str]:
+    """Module stems with failing tests in a test-runner cache.
+
+    The stems are kept in the session store under the cache file's path,
+    mtime and size, so later hook processes re-parse it only after it changed.
+    """
+    try:
+        stat = cache_file.stat()
+    except OSError:
+        return frozenset()
+    key = str(cache_file)
+    stamp = [stat.st_mtime_ns, stat.st_size]
+    cached = (session_store().get(FAILING_STEMS_KEY) or {}).get(key)
+    if isinstance(cached, list) and len(cached) == 3 and cached[:2] == stamp:
+        return frozenset(cached[2])
+    try:
+        data = json.loads(cache_file.read_text())
+    except (json.JSONDecodeError, OSError, UnicodeDecodeError):
+        data = None
+    stems = frozenset(filter(None, map(_test_module_stem, failing_files(data))))
+
+    def put(value):
+        entries = value if isinstance(value, dict) else {}
+        entries[key] = [*stamp, sorted(stems)]
+        return entries
+
+    session_store().update(FAILING_STEMS_KEY, put)
+    return stems
+
+
 def has_related_failing_test(project_dir: str, impl_file: str) -> bool:
     """Check if there's a failing test specifically for this module.
 
@@ -101,30 +167,32 @@ def has_related_failing_test(project_dir: str, impl_file: str) -> bool:
     that appears to be for the module being edited.
     """
     cache_file = Path(project_dir) / ".pytest_cache" / "v" / "cache" / "lastfailed"
+    return Path(impl_file).stem in failing_test_stems(cache_file)
 
-    if not cache_file.exists():
-        return False
 
-    impl_path = Path(impl_file)
-    module_name = impl_path.stem
+def _vitest_result_files(project_dir: Path) -> list[Path]:
+    """Vitest results caches: node_modules/.vite/vitest/results.json, or per-config hashed dirs below it."""
+    vitest_dir = project_dir / "node_modules" / ".vite" / "vitest"
+    if not vitest_dir.is_dir():
+        return []
+    return [vitest_dir / "results.json", *vitest_dir.glob("*/results.json")]
 
-    try:
-        with cache_file.open() as f:
-            lastfailed = json.load(f)
-
-        if not lastfailed:
-            return False
 
-        for test_path in lastfailed:
-            test_file = test_path.split("::")[0]
-            test_name = Path(test_file).stem
+def has_related_failing_ts_test(impl_file: str) -> bool:
+    """Check the nearest vitest results caches for a failing test of this module or its kebab-case name."""
+    path = Path(impl_file)
+    base_name = path.name.removesuffix(".tsx").removesuffix(".ts")
+    names = {base_name, _pascal_to_kebab(base_name)}
 
-            if test_name == f"test_{module_name}" or test_name == f"{module_name}_test":
+    current = path.parent
+    for _ in range(10):
+        for results in _vitest_result_files(current):
+            if names & failing_test_stems(results, _vitest_failing_files):
                 return True
-
-        return False
-    except (json.JSONDecodeError, OSError):
-        return False
+        if (current / "package.json").exists() or current.parent == current:
+            break
+        current = current.parent
+    return False
 
 
 def _find_test_dirs(start: Path) -> list[Path]:
@@ -144,20 +212,20 @@ def _find_test_dirs(start: Path) -> list[Path]:
 
 def _search_test_dirs(test_dirs: list[Path], base_name: str, extensions: list[str]) -> bool:
     """Search test directories for files matching base_name with any of the given extensions."""
-    patterns = [f"**/{base_name}{ext}" for ext in extensions]
-    for test_dir in test_dirs:
-        for pattern in patterns:
-            if list(test_dir.glob(pattern)):
-                return True
-    return False
+    from _test_index import index_for
+
+    names = [f"{base_name}{ext}" for ext in extensions]
+    return any(index_for(test_dir).has_any(names) for test_dir in test_dirs)
 
 
 def _search_test_dirs_prefix(test_dirs: list[Path], prefix: str, extensions: list[str]) -> bool:
     """Search test directories for files whose name starts with prefix (e.g. 'vault' matches 'vault-view.test.ts')."""
+    from _test_index import index_for
+
     for test_dir in test_dirs:
-        for ext in extensions:
-            if list(test_dir.glob(f"**/{prefix}{ext}")) or list(test_dir.glob(f"**/{prefix}-*{ext}")):
-                return True
+        index = index_for(test_dir)
+        if any(index.has_prefixed(prefix, ext) for ext in extensions):
+            return True
     return False
 
 
@@ -289,13 +357,8 @@ def warn(message: str, suggestion: str) -> int:
     return 2
 
 
-def run_tdd_enforcer() -> int:
-    """Run TDD enforcement and return exit code."""
-    try:
-        hook_data = json.load(sys.stdin)
-    except (json.JSONDecodeError, OSError):
-        return 0
-
+def check_tdd(hook_data: dict) -> int:
+    """Check an already-parsed PostToolUse payload and return exit code."""
     tool_name = hook_data.get("tool_name", "")
     if tool_name not in ("Write", "Edit"):
         return 0
@@ -339,6 +402,9 @@ def run_tdd_enforcer() -> int:
         )
 
     if file_path.endswith((".ts", ".tsx")):
+        if has_related_failing_ts_test(file_path):
+            return 0
+
         if has_typescript_test_file(file_path):
             return 0
 
@@ -361,5 +427,10 @@ def run_tdd_enforcer() -> int:
     return 0
 
 
+def run_tdd_enforcer() -> int:
+    """Run TDD enforcement and return exit code."""
+    return check_tdd(read_hook_stdin())
+
+
 if __name__ == "__main__":
     sys.exit(run_tdd_enforcer())
@@ -0,0 +1,43 @@
+"""Shared fixtures for hook tests."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+@pytest.fixture(autouse=True)
+def _isolate_test_index(tmp_path, monkeypatch):
+    """Keep test-file indexes out of the user's cache directory."""
+    import _test_index
+
+    monkeypatch.setattr(_test_index, "index_dir", lambda: tmp_path / "test-index")
+    monkeypatch.setattr(_test_index, "_indexes", {})
+
+
+@pytest.fixture(autouse=True)
+def _isolate_session_store(tmp_path, monkeypatch):
+    """Keep session state out of the user's sessions directory."""
+    import _util
+
+    monkeypatch.setattr(_util, "_sessions_base", lambda: tmp_path / "sessions")
+    monkeypatch.setattr(_util, "_stores", {})
+
+
+@pytest.fixture(autouse=True)
+def _isolate_notifications(tmp_path, monkeypatch):
+    """Spool notifications under tmp_path and never start the delivery daemon."""
+    import notify
+
+    monkeypatch.setattr(notify, "notify_dir", lambda: tmp_path / "notify")
+    monkeypatch.setattr(notify, "_spawn_daemon", lambda: True)
+
+
+@pytest.fixture(autouse=True)
+def _isolate_transcript_cursors(tmp_path, monkeypatch):
+    """Keep transcript checkpoints out of the user's cache directory."""
+    monkeypatch.setenv("PILOT_TRANSCRIPT_CURSOR_DIR", str(tmp_path / "transcripts"))
@@ -2,41 +2,41 @@
 
 from __future__ import annotations
 
+import json
+import subprocess
 import sys
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
+
+import pytest
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 import notify
-from notify import send_notification
+from notify import Coalescer, deliver, drain, send_notification
 
 
-class TestSendNotification:
-    def setup_method(self):
-        """Reset module-level state before each test."""
-        notify._warning_shown = False
+@pytest.fixture(autouse=True)
+def _notify_dir(tmp_path, monkeypatch):
+    """Spool into a temporary directory and reset module-level state."""
+    monkeypatch.setattr(notify, "notify_dir", lambda: tmp_path / "notify")
+    monkeypatch.setattr(notify, "_warning_shown", False)
+
+
+def _spooled() -> list[dict]:
+    return [json.loads(path.read_text()) for path in notify._pending()]
 
+
+class TestDeliver:
     @patch("notify._play_sound")
     @patch("notify.platform.system")
     @patch("notify.shutil.which")
     @patch("notify.subprocess.run")
-    @patch("notify.ThreadPoolExecutor")
-    def test_sends_notification_on_macos(self, mock_executor, mock_run, mock_which, mock_platform, _mock_sound):
+    def test_sends_notification_on_macos(self, mock_run, mock_which, mock_platform, _mock_sound):
         """Should call osascript with sound on macOS."""
         mock_platform.return_value = "Darwin"
         mock_which.return_value = "/usr/bin/osascript"
 
-        mock_future = MagicMock()
-        mock_future.result.return_value = None
-        mock_executor.return_value.__enter__.return_value.submit.return_value = mock_future
-
-        send_notification("Test Title", "Test Message")
-
-        assert mock_executor.return_value.__enter__.return_value.submit.called
-        call_args = mock_executor.return_value.__enter__.return_value.submit.call_args
-
-        submitted_func = call_args[0][0]
-        submitted_func()
+        deliver("Test Title", "Test Message")
 
         mock_run.assert_called_once()
         cmd = mock_run.call_args[0][0]
@@ -51,23 +51,12 @@ class TestSendNotification:
     @patch("notify.platform.system")
     @patch("notify.shutil.which")
     @patch("notify.subprocess.run")
-    @patch("notify.ThreadPoolExecutor")
-    def test_sends_notification_on_linux(self, mock_executor, mock_run, mock_which, mock_platform, _mock_sound):
+    def test_sends_notification_on_linux(self, mock_run, mock_which, mock_platform, _mock_sound):
         """Should call notify-send with urgency on Linux."""
         mock_platform.return_value = "Linux"
         mock_which.return_value = "/usr/bin/notify-send"
 
-        mock_future = MagicMock()
-        mock_future.result.return_value = None
-        mock_executor.return_value.__enter__.return_value.submit.return_value = mock_future
-
-        send_notification("Test Title", "Test Message")
-
-        assert mock_executor.return_value.__enter__.return_value.submit.called
-        call_args = mock_executor.return_value.__enter__.return_value.submit.call_args
-
-        submitted_func = call_args[0][0]
-        submitted_func()
+        deliver("Test Title", "Test Message")
 
         mock_run.assert_called_once()
         cmd = mock_run.call_args[0][0]
@@ -76,98 +65,42 @@ class TestSendNotification:
         assert "Test Title" in cmd
         assert "Test Message" in cmd
 
-    @patch("notify.platform.system")
-    def test_returns_silently_on_unsupported_platform(self, mock_platform):
-        """Should return silently on Windows or other unsupported platforms."""
-        mock_platform.return_value = "Windows"
-
-        send_notification("Test", "Message")
-
     @patch("notify._play_sound")
     @patch("notify.platform.system")
     @patch("notify.shutil.which")
-    @patch("sys.stderr")
-    def test_warns_when_command_not_found(self, mock_stderr, mock_which, mock_platform, _mock_sound):
-        """Should print one-time warning when command not available."""
-        mock_platform.return_value = "Darwin"
-        mock_which.return_value = None
-
-        send_notification("Test", "Message")
-
-        assert mock_stderr.write.called
-        stderr_output = "".join([call[0][0] for call in mock_stderr.write.call_args_list])
-        assert "Notifications disabled" in stderr_output
-        assert "osascript" in stderr_output
-
-    @patch("notify._play_sound")
-    @patch("notify.platform.system")
-    @patch("notify.shutil.which")
-    @patch("sys.stderr")
-    def test_warns_only_once_when_command_not_found(self, mock_stderr, mock_which, mock_platform, _mock_sound):
-        """Should print warning only on first call, not subsequent calls."""
-        mock_platform.return_value = "Darwin"
-        mock_which.return_value = None
-
-        send_notification("Test", "First")
-
-        mock_stderr.reset_mock()
-        send_notification("Test", "Second")
-
-        assert mock_stderr.write.call_count == 0 or all(
-            "Notifications disabled" not in str(call) for call in mock_stderr.write.call_args_list
-        )
-
-    @patch("notify._play_sound")
-    @patch("notify.platform.system")
-    @patch("notify.shutil.which")
-    @patch("notify.ThreadPoolExecutor")
-    def test_timeout_protection(self, mock_executor, mock_which, mock_platform, _mock_sound):
-        """Should use thread-based timeout to prevent hanging."""
+    @patch("notify.subprocess.run")
+    def test_timeout_protection(self, mock_run, mock_which, mock_platform, _mock_sound):
+        """Should bound the notifier with a timeout and swallow its expiry."""
         mock_platform.return_value = "Darwin"
         mock_which.return_value = "/usr/bin/osascript"
+        mock_run.side_effect = subprocess.TimeoutExpired("osascript", 3)
 
-        mock_future = MagicMock()
-        mock_future.result.side_effect = TimeoutError("Timeout")
-        mock_executor.return_value.__enter__.return_value.submit.return_value = mock_future
+        deliver("Test", "Message")
 
-        send_notification("Test", "Message")
-
-        mock_future.result.assert_called_once_with(timeout=3)
+        assert mock_run.call_args.kwargs["timeout"] == 3
 
     @patch("notify._play_sound")
     @patch("notify.platform.system")
     @patch("notify.shutil.which")
-    @patch("notify.ThreadPoolExecutor")
-    def test_handles_unexpected_exception_gracefully(self, mock_executor, mock_which, mock_platform, _mock_sound):
+    @patch("notify.subprocess.run")
+    def test_handles_unexpected_exception_gracefully(self, mock_run, mock_which, mock_platform, _mock_sound):
         """Should handle non-timeout exceptions without raising."""
         mock_platform.return_value = "Darwin"
         mock_which.return_value = "/usr/bin/osascript"
+        mock_run.side_effect = RuntimeError("Unexpected error")
 
-        mock_future = MagicMock()
-        mock_future.result.side_effect = RuntimeError("Unexpected error")
-        mock_executor.return_value.__enter__.return_value.submit.return_value = mock_future
-
-        send_notification("Test", "Message")
+        deliver("Test", "Message")
 
     @patch("notify._play_sound")
     @patch("notify.platform.system")
     @patch("notify.shutil.which")
     @patch("notify.subprocess.run")
-    @patch("notify.ThreadPoolExecutor")
-    def test_escapes_quotes_in_applescript(self, mock_executor, mock_run, mock_which, mock_platform, _mock_sound):
+    def test_escapes_quotes_in_applescript(self, mock_run, mock_which, mock_platform, _mock_sound):
         """Should escape quotes in title/message to prevent AppleScript injection."""
         mock_platform.return_value = "Darwin"
         mock_which.return_value = "/usr/bin/osascript"
 
-        mock_future = MagicMock()
-        mock_future.result.return_value = None
-        mock_executor.return_value.__enter__.return_value.submit.return_value = mock_future
-
-        send_notification('Title with "quotes"', 'Message with "quotes"')
-
-        call_args = mock_executor.return_value.__enter__.return_value.submit.call_args
-        submitted_func = call_args[0][0]
-        submitted_func()
+        deliver('Title with "quotes"', 'Message with "quotes"')
 
         cmd = mock_run.call_args[0][0]
         assert '\\"quotes\\"' in cmd[2]
@@ -176,17 +109,12 @@ class TestSendNotification:
     @patch("notify.shutil.which")
     @patch("notify.subprocess.Popen")
     @patch("notify.subprocess.run")
-    @patch("notify.ThreadPoolExecutor")
-    def test_plays_sound_via_afplay_on_macos(self, mock_executor, mock_run, mock_popen, mock_which, mock_platform):
+    def test_plays_sound_via_afplay_on_macos(self, mock_run, mock_popen, mock_which, mock_platform):
         """Should play sound via afplay on macOS independently of notification."""
         mock_platform.return_value = "Darwin"
         mock_which.return_value = "/usr/bin/osascript"
 
-        mock_future = MagicMock()
-        mock_future.result.return_value = None
-        mock_executor.return_value.__enter__.return_value.submit.return_value = mock_future
-
-        send_notification("Test", "Message")
+        deliver("Test", "Message")
 
         mock_popen.assert_called_once()
         popen_cmd = mock_popen.call_args[0][0]
@@ -197,8 +125,21 @@ class TestSendNotification:
     @patch("notify.shutil.which")
     @patch("notify.subprocess.Popen")
     @patch("notify.subprocess.run")
-    @patch("notify.ThreadPoolExecutor")
-    def test_plays_sound_via_paplay_on_linux(self, mock_executor, mock_run, mock_popen, mock_which, mock_platform):
+    def test_plays_sound_without_notifier(self, mock_run, mock_popen, mock_which, mock_platform):
+        """Should still play the sound when notification banners are unavailable."""
+        mock_platform.return_value = "Darwin"
+        mock_which.return_value = None
+
+        deliver("Test", "Message")
+
+        mock_popen.assert_called_once()
+        mock_run.assert_not_called()
+
+    @patch("notify.platform.system")
+    @patch("notify.shutil.which")
+    @patch("notify.subprocess.Popen")
+    @patch("notify.subprocess.run")
+    def test_plays_sound_via_paplay_on_linux(self, mock_run, mock_popen, mock_which, mock_platform):
         """Should play sound via paplay on Linux if available."""
         mock_platform.return_value = "Linux"
 
@@ -210,11 +151,7 @@ class TestSendNotification:
 
         mock_which.side_effect = which_side_effect
 
-        mock_future = MagicMock()
-        mock_future.result.return_value = None
-        mock_executor.return_value.__enter__.return_value.submit.return_value = mock_future
-
-        send_notification("Test", "Message")
+        deliver("Test", "Message")
 
         mock_popen.assert_called_once()
         popen_cmd = mock_popen.call_args[0][0]
@@ -224,8 +161,7 @@ class TestSendNotification:
     @patch("notify.shutil.which")
     @patch("notify.subprocess.Popen")
     @patch("notify.subprocess.run")
-    @patch("notify.ThreadPoolExecutor")
-    def test_no_sound_on_linux_without_paplay(self, mock_executor, mock_run, mock_popen, mock_which, mock_platform):
+    def test_no_sound_on_linux_without_paplay(self, mock_run, mock_popen, mock_which, mock_platform):
         """Should skip sound on Linux when paplay is not available."""
         mock_platform.return_value = "Linux"
 
@@ -236,10 +172,111 @@ class TestSendNotification:
 
         mock_which.side_effect = which_side_effect
 
-        mock_future = MagicMock()
-        mock_future.result.return_value = None
-        mock_executor.return_value.__enter__.return_value.submit.return_value = mock_future
+        deliver("Test", "Message")
+
+        mock_popen.assert_not_called()
+
+
+class TestSendNotification:
+    @patch("notify.deliver")
+    @patch("notify._spawn_daemon", return_value=True)
+    @patch("notify.shutil.which", return_value="/usr/bin/notify-send")
+    @patch("notify.platform.system", return_value="Linux")
+    def test_queues_and_starts_daemon_without_delivering(
+        self, _mock_platform, _mock_which, mock_spawn, mock_deliver, monkeypatch
+    ):
+        """Should spool the notification and return without running the notifier."""
+        monkeypatch.setenv("PILOT_SESSION_ID", "s1")
+
+        send_notification("Pilot", "Waiting for your input")
+
+        assert [(e["title"], e["message"], e["session"]) for e in _spooled()] == [
+            ("Pilot", "Waiting for your input", "s1")
+        ]
+        mock_spawn.assert_called_once()
+        mock_deliver.assert_not_called()
+
+    @patch("notify.deliver")
+    @patch("notify._spawn_daemon")
+    @patch("notify._daemon_running", return_value=True)
+    @patch("notify.shutil.which", return_value="/usr/bin/osascript")
+    @patch("notify.platform.system", return_value="Darwin")
+    def test_running_daemon_is_not_started_again(self, _mock_platform, _mock_which, _running, mock_spawn, _deliver):
+        send_notification("Pilot", "Message")
+
+        mock_spawn.assert_not_called()
+        assert len(_spooled()) == 1
+
+    @patch("notify.deliver")
+    @patch("notify._spawn_daemon", return_value=False)
+    @patch("notify.shutil.which", return_value="/usr/bin/osascript")
+    @patch("notify.platform.system", return_value="Darwin")
+    def test_delivers_inline_when_daemon_cannot_start(self, _mock_platform, _mock_which, _spawn, mock_deliver):
+        send_notification("Pilot", "Message")
+
+        mock_deliver.assert_called_once_with("Pilot", "Message")
+        assert _spooled() == []
+
+    @patch("notify.platform.system")
+    def test_returns_silently_on_unsupported_platform(self, mock_platform):
+        """Should return silently on Windows or other unsupported platforms."""
+        mock_platform.return_value = "Windows"
 
         send_notification("Test", "Message")
 
-        mock_popen.assert_not_called()
+        assert _spooled() == []
+
+    @patch("notify._spawn_daemon", return_value=True)
+    @patch("notify.platform.system")
+    @patch("notify.shutil.which")
+    @patch("sys.stderr")
+    def test_warns_only_once_when_command_not_found(self, mock_stderr, mock_which, mock_platform, _spawn):
+        """Should print a one-time warning when the notifier is not available."""
+        mock_platform.return_value = "Darwin"
+        mock_which.return_value = None
+
+        send_notification("Test", "First")
+        stderr_output = "".join([call[0][0] for call in mock_stderr.write.call_args_list])
+        assert "Notifications disabled" in stderr_output
+        assert "osascript" in stderr_output
+
+        mock_stderr.reset_mock()
+        send_notification("Test", "Second")
+
+        assert all("Notifications disabled" not in str(call) for call in mock_stderr.write.call_args_list)
+
+
+class TestDelivery:
+    def test_repeats_within_window_are_coalesced(self):
+        coalescer = Coalescer()
+
+        assert coalescer.admit("s", "Pilot", "Waiting for your input", 100.0)
+        assert not coalescer.admit("s", "Pilot", "Waiting for your input", 110.0)
+        assert coalescer.admit("other", "Pilot", "Waiting for your input", 110.0)
+        assert coalescer.admit("s", "Pilot", "Waiting for your input", 100.0 + notify.COALESCE_WINDOW)
+
+    def test_rate_limited_per_session(self):
+        coalescer = Coalescer()
+
+        admitted = [coalescer.admit("s", "Pilot", f"message {i}", 100.0 + i) for i in range(notify.RATE_LIMIT + 2)]
+
+        assert admitted == [True] * notify.RATE_LIMIT + [False, False]
+        assert coalescer.admit("s", "Pilot", "later", 100.0 + notify.RATE_WINDOW + 1)
+
+    @patch("notify.deliver")
+    @patch("notify._spawn_daemon", return_value=True)
+    @patch("notify.shutil.which", return_value="/usr/bin/osascript")
+    @patch("notify.platform.system", return_value="Darwin")
+    def test_drain_delivers_spool_once_in_order(self, _mock_platform, _mock_which, _spawn, mock_deliver):
+        send_notification("Pilot", "Waiting for your input")
+        send_notification("Pilot", "Waiting for your input")
+        send_notification("Pilot", "Claude session ended")
+
+        assert drain(Coalescer()) is True
+
+        assert [c.args for c in mock_deliver.call_args_list] == [
+            ("Pilot", "Waiting for your input"),
+            ("Pilot", "Claude session ended"),
+        ]
+        assert _spooled() == []
+        assert drain(Coalescer()) is False
@@ -16,6 +16,7 @@ class TestSessionEndNotifications:
     @patch("session_end._get_active_session_count")
     @patch("session_end._is_session_handing_off")
     @patch("session_end._sessions_base")
+    @patch("session_end._request_worker_shutdown", new=MagicMock(return_value=False))
     @patch("session_end.subprocess.run")
     @patch("session_end.send_notification")
     @patch("os.environ", {"CLAUDE_PLUGIN_ROOT": "/plugin"})
@@ -46,6 +47,7 @@ class TestSessionEndNotifications:
     @patch("session_end._get_active_session_count")
     @patch("session_end._is_session_handing_off")
     @patch("session_end._sessions_base")
+    @patch("session_end._request_worker_shutdown", new=MagicMock(return_value=False))
     @patch("session_end.subprocess.run")
     @patch("session_end.send_notification")
     @patch("os.environ", {"CLAUDE_PLUGIN_ROOT": "/plugin", "PILOT_SESSION_ID": "test123"})
@@ -79,9 +81,7 @@ class TestSessionEndNotifications:
     @patch("session_end._is_session_handing_off")
     @patch("session_end.send_notification")
     @patch("os.environ", {"CLAUDE_PLUGIN_ROOT": "/plugin"})
-    def test_no_notification_during_endless_mode_restart(
-        self, mock_notify, mock_handoff, mock_count
-    ):
+    def test_no_notification_during_endless_mode_restart(self, mock_notify, mock_handoff, mock_count):
         """Should NOT send notification during endless mode handoff."""
         mock_count.return_value = 1
         mock_handoff.return_value = True
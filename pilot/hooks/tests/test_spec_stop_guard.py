@@ -4,11 +4,11 @@ from __future__ import annotations
 
 import json
 import sys
-import tempfile
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
+from _util import session_store
 from spec_stop_guard import main
 
 
@@ -35,33 +35,25 @@ class TestSpecStopGuardNotifications:
     @patch("spec_stop_guard.find_active_plan")
     @patch("spec_stop_guard.is_waiting_for_user_input")
     @patch("spec_stop_guard.send_notification")
-    @patch("spec_stop_guard.get_stop_guard_path")
     @patch("spec_stop_guard.time.time")
     @patch("sys.stdin")
     def test_notifies_when_cooldown_allows_stop(
-        self, mock_stdin, mock_time, mock_guard_path, mock_notify, mock_waiting, mock_find_plan
+        self, mock_stdin, mock_time, mock_notify, mock_waiting, mock_find_plan
     ):
         """Should send notification when stop allowed due to cooldown escape hatch."""
         mock_find_plan.return_value = (Path("/plan.md"), "PENDING", True)
         mock_waiting.return_value = False
         mock_time.return_value = 100.0
-
-        with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".state") as f:
-            f.write("50.0")
-            state_path = Path(f.name)
-
-        mock_guard_path.return_value = state_path
+        session_store().set("stop_guard", 50.0)
         mock_stdin.read.return_value = json.dumps(
             {"transcript_path": "/transcript.jsonl", "stop_hook_active": False}
         )
 
-        try:
-            result = main()
+        result = main()
 
-            assert result == 0
-            mock_notify.assert_called_once_with("Pilot", "Waiting for your input")
-        finally:
-            state_path.unlink(missing_ok=True)
+        assert result == 0
+        mock_notify.assert_called_once_with("Pilot", "Waiting for your input")
+        assert session_store().get("stop_guard") is None
 
     @patch("spec_stop_guard.find_active_plan")
     @patch("spec_stop_guard.send_notification")
@@ -81,30 +73,22 @@ class TestSpecStopGuardNotifications:
     @patch("spec_stop_guard.find_active_plan")
     @patch("spec_stop_guard.is_waiting_for_user_input")
     @patch("spec_stop_guard.send_notification")
-    @patch("spec_stop_guard.get_stop_guard_path")
     @patch("spec_stop_guard.time.time")
     @patch("sys.stdin")
     def test_no_notification_when_stop_blocked(
-        self, mock_stdin, mock_time, mock_guard_path, mock_notify, mock_waiting, mock_find_plan
+        self, mock_stdin, mock_time, mock_notify, mock_waiting, mock_find_plan
     ):
         """Should NOT send notification when stop is blocked."""
         mock_find_plan.return_value = (Path("/plan.md"), "PENDING", True)
         mock_waiting.return_value = False
         mock_time.return_value = 200.0
-
-        with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".state") as f:
-            f.write("100.0")
-            state_path = Path(f.name)
-
-        mock_guard_path.return_value = state_path
+        session_store().set("stop_guard", 100.0)
         mock_stdin.read.return_value = json.dumps(
             {"transcript_path": "/transcript.jsonl", "stop_hook_active": False}
         )
 
-        try:
-            result = main()
+        result = main()
 
-            assert result == 2
-            mock_notify.assert_not_called()
-        finally:
-            state_path.unlink(missing_ok=True)
+        assert result == 2
+        mock_notify.assert_not_called()
+        assert session_store().get("stop_guard") == 200.0
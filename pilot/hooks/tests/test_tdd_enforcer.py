@@ -2,18 +2,24 @@
 
 from __future__ import annotations
 
+import json
+import os
+import sys
 import tempfile
 from pathlib import Path
 
-import sys
-
 sys.path.insert(0, str(Path(__file__).parent.parent))
+from _util import session_store
 from tdd_enforcer import (
     _find_test_dirs,
     _pascal_to_kebab,
     _search_test_dirs,
+    check_tdd,
+    failing_test_stems,
     has_go_test_file,
     has_python_test_file,
+    has_related_failing_test,
+    has_related_failing_ts_test,
     has_typescript_test_file,
     is_test_file,
     is_trivial_edit,
@@ -141,6 +147,76 @@ class TestSearchTestDirs:
             assert _search_test_dirs([tests], "Foo", [".test.ts"]) is False
 
 
+class TestTestDirIndex:
+    def _age(self, root: Path) -> None:
+        """Push directory mtimes out of the racy window so listings are trusted."""
+        for path in [root, *root.rglob("*")]:
+            os.utime(path, (1_000_000_000, 1_000_000_000))
+
+    def test_picks_up_added_and_removed_test_files(self, tmp_path, monkeypatch):
+        """A new hook process sees test files added or removed since the index was saved."""
+        import _test_index
+
+        tests = tmp_path / "tests"
+        (tests / "unit").mkdir(parents=True)
+        self._age(tests)
+        assert _search_test_dirs([tests], "test_app", [".py"]) is False
+
+        (tests / "unit" / "test_app.py").touch()
+        monkeypatch.setattr(_test_index, "_indexes", {})
+        assert _search_test_dirs([tests], "test_app", [".py"]) is True
+
+        (tests / "unit" / "test_app.py").unlink()
+        monkeypatch.setattr(_test_index, "_indexes", {})
+        assert _search_test_dirs([tests], "test_app", [".py"]) is False
+
+    def test_refreshes_once_per_process(self, tmp_path, monkeypatch):
+        import _test_index
+
+        tests = tmp_path / "tests"
+        (tests / "unit").mkdir(parents=True)
+        refreshes: list[Path] = []
+        real_refresh = _test_index.TestDirIndex.refresh
+        monkeypatch.setattr(
+            _test_index.TestDirIndex, "refresh", lambda index: refreshes.append(index.root) or real_refresh(index)
+        )
+
+        first = _test_index.index_for(tests)
+        (tests / "unit" / "test_app.py").touch()
+
+        assert _test_index.index_for(tests) is first
+        assert refreshes == [tests]
+
+    def test_unchanged_directories_are_not_relisted(self, tmp_path, monkeypatch):
+        import _test_index
+
+        tests = tmp_path / "tests"
+        (tests / "unit").mkdir(parents=True)
+        (tests / "unit" / "test_app.py").touch()
+        self._age(tests)
+        assert _search_test_dirs([tests], "test_app", [".py"]) is True
+
+        monkeypatch.setattr(_test_index, "_indexes", {})
+        listed: list[Path] = []
+        real_list = _test_index._list
+        monkeypatch.setattr(_test_index, "_list", lambda path: listed.append(path) or real_list(path))
+
+        assert _search_test_dirs([tests], "test_app", [".py"]) is True
+        assert listed == []
+
+    def test_prefix_lookup_matches_kebab_variants(self, tmp_path):
+        import _test_index
+
+        tests = tmp_path / "tests"
+        tests.mkdir()
+        (tests / "vault-view.test.ts").touch()
+        index = _test_index.index_for(tests)
+
+        assert index.has_prefixed("vault", ".test.ts") is True
+        assert index.has_prefixed("vault", ".spec.ts") is False
+        assert index.has_prefixed("vau", ".test.ts") is False
+
+
 class TestHasPythonTestFile:
     def test_finds_sibling_test(self):
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -405,3 +481,66 @@ class TestIsTrivialEdit:
             "old_string": "return x + 1",
             "new_string": "return x + 2",
         }) is False
+
+
+class TestRelatedFailingTests:
+    def _lastfailed(self, project: Path, node_ids: list[str]) -> Path:
+        cache_file = project / ".pytest_cache" / "v" / "cache" / "lastfailed"
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        cache_file.write_text(json.dumps(dict.fromkeys(node_ids, True)))
+        return cache_file
+
+    def test_pytest_failure_for_module(self, tmp_path):
+        self._lastfailed(tmp_path, ["tests/test_billing.py::test_total", "tests/api_test.py::test_get"])
+
+        assert has_related_failing_test(str(tmp_path), str(tmp_path / "src" / "billing.py")) is True
+        assert has_related_failing_test(str(tmp_path), str(tmp_path / "src" / "api.py")) is True
+        assert has_related_failing_test(str(tmp_path), str(tmp_path / "src" / "users.py")) is False
+
+    def test_cache_is_reparsed_only_when_it_changes(self, tmp_path):
+        """Parsed stems persist in the session store, keyed by the file's mtime and size."""
+        cache_file = self._lastfailed(tmp_path, ["tests/test_billing.py::test_total"])
+        os.utime(cache_file, (1_000_000_000, 1_000_000_000))
+        assert failing_test_stems(cache_file) == {"billing"}
+        assert session_store().get("failing_test_stems")[str(cache_file)][2] == ["billing"]
+
+        cache_file.write_text(json.dumps({"tests/test_payment.py::test_total": True}))
+        os.utime(cache_file, (1_000_000_000, 1_000_000_000))
+        assert failing_test_stems(cache_file) == {"billing"}
+
+        os.utime(cache_file, (1_000_000_100, 1_000_000_100))
+        assert failing_test_stems(cache_file) == {"payment"}
+
+        cache_file.write_text(json.dumps({"tests/test_users.py::test_x": True}))
+        os.utime(cache_file, (1_000_000_100, 1_000_000_100))
+        assert failing_test_stems(cache_file) == {"users"}
+
+    def test_vitest_failure_for_module(self, tmp_path):
+        (tmp_path / "package.json").write_text("{}")
+        results = tmp_path / "node_modules" / ".vite" / "vitest" / "results.json"
+        results.parent.mkdir(parents=True)
+        results.write_text(
+            json.dumps(
+                {
+                    "version": "1.6.0",
+                    "results": {
+                        ":src/user-card.test.tsx": {"duration": 12, "failed": True},
+                        ":src/api.test.ts": {"duration": 3, "failed": False},
+                    },
+                }
+            )
+        )
+        (tmp_path / "src").mkdir()
+
+        assert has_related_failing_ts_test(str(tmp_path / "src" / "UserCard.tsx")) is True
+        assert has_related_failing_ts_test(str(tmp_path / "src" / "api.ts")) is False
+
+    def test_failing_vitest_test_skips_reminder(self, tmp_path):
+        (tmp_path / "package.json").write_text("{}")
+        results = tmp_path / "node_modules" / ".vite" / "vitest" / "results.json"
+        results.parent.mkdir(parents=True)
+        results.write_text(json.dumps({"results": {":src/cart.test.ts": {"failed": True}}}))
+        impl = tmp_path / "src" / "cart.ts"
+
+        assert check_tdd({"tool_name": "Write", "tool_input": {"file_path": str(impl)}}) == 0
+
@@ -0,0 +1,12 @@
+"""Make the benchmark harness and the hook modules importable from its tests."""
+
+import sys
+from pathlib import Path
+
+_bench_dir = str(Path(__file__).resolve().parent)
+if _bench_dir not in sys.path:
+    sys.path.insert(0, _bench_dir)
+
+_hooks_dir = str(Path(__file__).resolve().parents[2] / "hooks")
+if _hooks_dir not in sys.path:
+    sys.path.insert(0, _hooks_dir)
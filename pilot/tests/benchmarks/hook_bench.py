@@ -0,0 +1,155 @@
+"""Cold-start benchmark harness for hook entry points.
+
+Runs each hook script as a fresh interpreter against a recorded stdin
+fixture and measures wall-clock startup and `-X importtime` cost. Used by
+test_hook_budgets.py and runnable directly for a report:
+
+    uv run python pilot/tests/benchmarks/hook_bench.py
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+HOOKS_DIR = BENCH_DIR.parents[1] / "hooks"
+FIXTURES_DIR = BENCH_DIR / "fixtures"
+BUDGETS_FILE = BENCH_DIR / "budgets.json"
+
+ENTRY_POINTS: dict[str, list[str]] = {
+    "tool_redirect": ["tool_redirect.py"],
+    "file_checker": ["file_checker.py"],
+    "tdd_enforcer": ["tdd_enforcer.py"],
+    "context_monitor": ["context_monitor.py"],
+    "post_tool_use": ["post_tool_use.py"],
+    "spec_stop_guard": ["spec_stop_guard.py"],
+    "spec_plan_validator": ["spec_plan_validator.py"],
+    "spec_verify_validator": ["spec_verify_validator.py"],
+    "session_end": ["session_end.py"],
+    "run_hook": ["run_hook.py", "tool_redirect"],
+}
+
+FIXTURE_FOR = {"run_hook": "tool_redirect"}
+
+
+@dataclass
+class Budget:
+    """Millisecond budgets for one entry point."""
+
+    startup_ms: float
+    import_ms: float
+
+
+def load_budgets(path: Path = BUDGETS_FILE) -> dict[str, Budget]:
+    """Load per-hook budgets, applying defaults and PILOT_HOOK_BUDGET_SCALE."""
+    config = json.loads(path.read_text())
+    scale = float(os.environ.get("PILOT_HOOK_BUDGET_SCALE", "1") or 1)
+    default = config.get("default", {})
+    budgets = {}
+    for name in ENTRY_POINTS:
+        merged = {**default, **config.get("hooks", {}).get(name, {})}
+        budgets[name] = Budget(merged["startup_ms"] * scale, merged["import_ms"] * scale)
+    return budgets
+
+
+def fixture_payload(name: str) -> str:
+    """Recorded stdin payload for an entry point."""
+    return (FIXTURES_DIR / f"{FIXTURE_FOR.get(name, name)}.json").read_text()
+
+
+def _bench_env(home: Path) -> dict[str, str]:
+    env = {k: v for k, v in os.environ.items() if not k.startswith(("PILOT_", "CLAUDE_"))}
+    env.update({"HOME": str(home), "PILOT_SESSION_ID": "bench", "PILOT_HOOK_DAEMON": "0"})
+    return env
+
+
+def _run(name: str, extra_args: list[str], home: Path, workdir: Path) -> subprocess.CompletedProcess:
+    script, *args = ENTRY_POINTS[name]
+    return subprocess.run(
+        [sys.executable, *extra_args, str(HOOKS_DIR / script), *args],
+        input=fixture_payload(name),
+        capture_output=True,
+        text=True,
+        env=_bench_env(home),
+        cwd=workdir,
+        timeout=60,
+    )
+
+
+def measure_startup(name: str, runs: int = 5) -> float:
+    """Median wall-clock milliseconds for a cold run of the hook."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        home = Path(tmpdir)
+        _run(name, [], home, home)
+        samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            _run(name, [], home, home)
+            samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def parse_importtime(stderr: str) -> dict[str, float]:
+    """Map top-level imported module to cumulative import milliseconds."""
+    modules: dict[str, float] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, package = line.split("|", 2)
+        if package.startswith("  "):
+            continue
+        modules[package.strip()] = int(cumulative) / 1000
+    return modules
+
+
+def imported_modules(stderr: str) -> set[str]:
+    """All module names reported by -X importtime, nested ones included."""
+    names = set()
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and "cumulative" not in line:
+            names.add(line.rsplit("|", 1)[1].strip())
+    return names
+
+
+def _startup_modules() -> set[str]:
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "pass"], capture_output=True, text=True)
+    return imported_modules(result.stderr)
+
+
+def measure_imports(name: str) -> tuple[float, set[str]]:
+    """Import milliseconds attributable to the hook, and every module it imported."""
+    baseline = _startup_modules()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        home = Path(tmpdir)
+        _run(name, ["-X", "importtime"], home, home)
+        result = _run(name, ["-X", "importtime"], home, home)
+    top_level = parse_importtime(result.stderr)
+    cost = sum(ms for module, ms in top_level.items() if module not in baseline)
+    return cost, imported_modules(result.stderr) - baseline
+
+
+def main() -> int:
+    budgets = load_budgets()
+    print(f"{'hook':<24}{'startup ms':>12}{'budget':>9}{'import ms':>12}{'budget':>9}")
+    failed = False
+    for name in ENTRY_POINTS:
+        startup = measure_startup(name)
+        import_ms, _ = measure_imports(name)
+        budget = budgets[name]
+        over = startup > budget.startup_ms or import_ms > budget.import_ms
+        failed = failed or over
+        marker = "  OVER" if over else ""
+        print(f"{name:<24}{startup:>12.1f}{budget.startup_ms:>9.0f}{import_ms:>12.1f}{budget.import_ms:>9.0f}{marker}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
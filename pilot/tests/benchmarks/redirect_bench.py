@@ -0,0 +1,101 @@
+"""Redirect rule matching benchmark for tool_redirect.
+
+Writes org rule files with a growing number of semantic Grep phrases and
+measures one `find_redirect` call against a pattern none of them match,
+which is the common case. Compiled phrase sets are a single trie-shaped
+regex, so the cost should follow the length of the pattern rather than
+the number of phrases. The report also times the naive any-substring loop
+the rules replaced. Used by test_redirect_rule_scale.py and runnable
+directly for a report:
+
+    uv run python pilot/tests/benchmarks/redirect_bench.py
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HOOKS_DIR = Path(__file__).resolve().parents[2] / "hooks"
+if str(HOOKS_DIR) not in sys.path:
+    sys.path.insert(0, str(HOOKS_DIR))
+
+import _redirect_rules  # noqa: E402
+
+SIZES = (10, 100, 1_000)
+PATTERN = r"def handle_request\(self, request: Request\) -> Response: return self\.dispatch"
+CALLS = 200
+
+
+def phrases(count: int, seed: int = 0) -> list[str]:
+    """Distinct two-word lowercase phrases, like the bundled semantic ones."""
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < count:
+        first = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 7)))
+        second = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(2, 6)))
+        words.add(f"{first} {second}")
+    return sorted(words)
+
+
+def write_rules(path: Path, count: int) -> list[str]:
+    """An org rule file blocking Grep patterns containing any of `count` phrases."""
+    values = phrases(count)
+    rule = {
+        "tool": "Grep",
+        "field": "pattern",
+        "match": "contains",
+        "values": values,
+        "message": "Grep with semantic pattern detected",
+        "alternative": "Use `vexor search`",
+        "example": 'vexor search "<pattern>"',
+    }
+    path.write_text(json.dumps({"version": 1, "rules": [rule]}))
+    return values
+
+
+def measure_match(runs: int = 7) -> float:
+    """Median microseconds for one find_redirect call on PATTERN, rules already compiled."""
+    tool_input = {"pattern": PATTERN}
+    _redirect_rules.find_redirect("Grep", tool_input)
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for _ in range(CALLS):
+            _redirect_rules.find_redirect("Grep", tool_input)
+        samples.append((time.perf_counter() - start) * 1e6 / CALLS)
+    return statistics.median(samples)
+
+
+def measure_naive(values: list[str], runs: int = 7) -> float:
+    """Median microseconds for the any-substring loop over the same phrases."""
+    lowered = PATTERN.lower()
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for _ in range(CALLS):
+            any(value in lowered for value in values)
+        samples.append((time.perf_counter() - start) * 1e6 / CALLS)
+    return statistics.median(samples)
+
+
+def main() -> int:
+    print(f"{'phrases':>10}{'rules us':>12}{'naive us':>12}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.environ["HOME"] = tmpdir
+        rules_path = _redirect_rules.user_rules_path()
+        rules_path.parent.mkdir(parents=True, exist_ok=True)
+        for count in SIZES:
+            values = write_rules(rules_path, count)
+            print(f"{count:>10}{measure_match():>12.2f}{measure_naive(values):>12.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
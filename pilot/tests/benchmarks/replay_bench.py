@@ -0,0 +1,212 @@
+"""Replay benchmark for captured hook traffic.
+
+Feeds a corpus of hook payloads captured with PILOT_HOOK_CAPTURE (see
+pilot/hooks/_capture.py) through the hook entry points, each payload in a
+fresh interpreter as Claude Code would run it, against a scratch copy of a
+fixture repository. Paths under a payload's captured working directory are
+rewritten to point into the copy. Reports throughput and per-hook latency
+percentiles, and compares exit codes and output with a saved baseline so
+a performance change that alters behaviour shows up as a divergence.
+Without a corpus, the recorded stdin fixtures are replayed against a small
+generated repository. Used by test_replay.py and runnable directly:
+
+    uv run python pilot/tests/benchmarks/replay_bench.py [CORPUS] [--repo DIR]
+        [--concurrency N] [--rounds N] [--save-baseline FILE | --baseline FILE]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+HOOKS_DIR = BENCH_DIR.parents[1] / "hooks"
+FIXTURES_DIR = BENCH_DIR / "fixtures"
+FIXTURE_CWD = "/tmp/pilot-bench"
+REPO_MARKER = "<repo>"
+# Never replayed: capture would record the replay itself, and without a
+# plugin root session_end cannot stop the worker that is actually running.
+UNSAFE_ENV = ("PILOT_HOOK_CAPTURE", "CLAUDE_PLUGIN_ROOT", "CLAUDE_PILOT_DATA_DIR")
+
+if str(HOOKS_DIR) not in sys.path:
+    sys.path.insert(0, str(HOOKS_DIR))
+
+from _capture import load_corpus  # noqa: E402
+from hook_daemon import HOOKS  # noqa: E402
+
+
+@dataclass
+class ReplayResult:
+    """Outcome of replaying one captured payload."""
+
+    index: int
+    hook: str
+    exit_code: int
+    output: str
+    elapsed_ms: float
+
+
+def fixture_corpus() -> list[dict]:
+    """The recorded stdin fixtures as a corpus captured in FIXTURE_CWD."""
+    return [
+        {"hook": path.stem, "cwd": FIXTURE_CWD, "env": {}, "stdin": path.read_text()}
+        for path in sorted(FIXTURES_DIR.glob("*.json"))
+    ]
+
+
+def write_fixture_repo(path: Path) -> None:
+    """A small project with the files the recorded fixtures edit."""
+    (path / "src").mkdir(parents=True, exist_ok=True)
+    (path / "src" / "config.py").write_text('import os\nimport sys\n\nDEBUG = os.environ.get("DEBUG") == "1"\n')
+    (path / "README.md").write_text("# Bench\n")
+    (path / "transcript.jsonl").write_text("")
+
+
+def _command(hook: str) -> list[str] | None:
+    if hook in HOOKS:
+        return [sys.executable, str(HOOKS_DIR / "run_hook.py"), hook]
+    script = HOOKS_DIR / f"{hook}.py"
+    return [sys.executable, str(script)] if script.is_file() else None
+
+
+def _replay_env(entry: dict, home: Path, old: str, new: str) -> dict[str, str]:
+    env = {k: v for k, v in os.environ.items() if not k.startswith(("PILOT_", "CLAUDE_"))}
+    captured = entry.get("env") if isinstance(entry.get("env"), dict) else {}
+    env.update({key: str(value).replace(old, new) for key, value in captured.items()})
+    env.update({"HOME": str(home), "PILOT_SESSION_ID": "replay", "PILOT_HOOK_DAEMON": "0"})
+    for key in UNSAFE_ENV:
+        env.pop(key, None)
+    return env
+
+
+def replay_entry(index: int, entry: dict, repo: Path, home: Path) -> ReplayResult:
+    """Run one captured payload against the repository copy."""
+    hook = entry["hook"]
+    command = _command(hook)
+    if command is None:
+        return ReplayResult(index, hook, -1, f"unknown hook {hook}", 0.0)
+    old = entry.get("cwd") or FIXTURE_CWD
+    new = str(repo)
+    start = time.perf_counter()
+    try:
+        result = subprocess.run(
+            command,
+            input=entry["stdin"].replace(old, new),
+            capture_output=True,
+            text=True,
+            env=_replay_env(entry, home, old, new),
+            cwd=repo,
+            timeout=120,
+        )
+        exit_code, output = result.returncode, result.stdout + result.stderr
+    except subprocess.TimeoutExpired:
+        exit_code, output = -1, "timed out"
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return ReplayResult(index, hook, exit_code, output.replace(new, REPO_MARKER), elapsed_ms)
+
+
+def replay(entries: list[dict], repo: Path, concurrency: int = 4, rounds: int = 1) -> tuple[list[ReplayResult], float]:
+    """Replay the corpus `rounds` times against a scratch copy of `repo`. Returns results and wall seconds."""
+    with tempfile.TemporaryDirectory(prefix="pilot-replay-") as tmpdir:
+        copy = Path(tmpdir) / "repo"
+        home = Path(tmpdir) / "home"
+        shutil.copytree(repo, copy, symlinks=True)
+        home.mkdir()
+        jobs = [(index, entry) for _ in range(rounds) for index, entry in enumerate(entries)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as pool:
+            results = list(pool.map(lambda job: replay_entry(job[0], job[1], copy, home), jobs))
+        return results, time.perf_counter() - start
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered), max(math.ceil(q * len(ordered)), 1)) - 1]
+
+
+def outcomes(results: list[ReplayResult]) -> list[dict]:
+    """The behaviour a baseline records: one exit code and output per corpus entry (first round)."""
+    first: dict[int, ReplayResult] = {}
+    for result in results:
+        first.setdefault(result.index, result)
+    return [{"hook": r.hook, "exit": r.exit_code, "output": r.output} for _, r in sorted(first.items())]
+
+
+def divergences(results: list[ReplayResult], baseline: list[dict]) -> list[str]:
+    """Runs whose exit code or output differ from the baseline entry they replayed, every round included."""
+    found = []
+    expected = dict(enumerate(baseline))
+    for result in results:
+        want = expected.get(result.index)
+        if want is None:
+            continue
+        if want["exit"] != result.exit_code:
+            found.append(f"#{result.index} {result.hook}: exit {result.exit_code}, baseline {want['exit']}")
+        elif want["output"] != result.output:
+            found.append(f"#{result.index} {result.hook}: output differs from baseline")
+    return sorted(set(found))
+
+
+def report(results: list[ReplayResult], wall: float) -> list[str]:
+    lines = [f"{len(results)} runs in {wall:.2f}s ({len(results) / wall if wall else 0:.1f} runs/s)"]
+    lines.append(f"{'hook':<24}{'runs':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    by_hook: dict[str, list[float]] = {}
+    for result in results:
+        by_hook.setdefault(result.hook, []).append(result.elapsed_ms)
+    for hook, samples in sorted(by_hook.items()):
+        p50, p95, p99 = (percentile(samples, q) for q in (0.5, 0.95, 0.99))
+        lines.append(f"{hook:<24}{len(samples):>6}{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}")
+    return lines
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("corpus", nargs="?", type=Path, help="captured corpus directory (default: recorded fixtures)")
+    parser.add_argument("--repo", type=Path, help="fixture repository, copied before replay")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=1)
+    baseline_group = parser.add_mutually_exclusive_group()
+    baseline_group.add_argument("--save-baseline", type=Path)
+    baseline_group.add_argument("--baseline", type=Path)
+    args = parser.parse_args(argv)
+
+    entries = load_corpus(args.corpus) if args.corpus else fixture_corpus()
+    if not entries:
+        print("No captured payloads to replay", file=sys.stderr)
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        repo = args.repo
+        if repo is None:
+            repo = Path(tmpdir) / "repo"
+            write_fixture_repo(repo)
+        results, wall = replay(entries, repo, args.concurrency, args.rounds)
+
+    print("\n".join(report(results, wall)))
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(outcomes(results), indent=2))
+        print(f"Baseline saved to {args.save_baseline}")
+    if args.baseline:
+        found = divergences(results, json.loads(args.baseline.read_text()))
+        for line in found:
+            print(f"DIVERGED {line}")
+        print(f"{len(found)} divergences")
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
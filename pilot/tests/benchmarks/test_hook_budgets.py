@@ -0,0 +1,51 @@
+"""Cold-start and import-time budgets for every hook entry point.
+
+Budgets live in budgets.json; scale them on slow machines with
+PILOT_HOOK_BUDGET_SCALE (e.g. 2 doubles every budget).
+"""
+
+from __future__ import annotations
+
+import pytest
+from hook_bench import ENTRY_POINTS, load_budgets, measure_imports, measure_startup, parse_importtime
+
+BUDGETS = load_budgets()
+
+LAZY_MODULES = {
+    "file_checker": {"_checkers.python", "_checkers.typescript", "_checkers.go"},
+    "post_tool_use": {"_checkers.python", "_checkers.typescript", "_checkers.go"},
+    "spec_stop_guard": {"notify", "concurrent.futures", "platform"},
+    "session_end": {"notify", "concurrent.futures"},
+    "tool_redirect": {"subprocess"},
+}
+
+
+@pytest.mark.parametrize("name", sorted(ENTRY_POINTS))
+def test_startup_within_budget(name):
+    """Median cold start of the hook stays within its wall-clock budget."""
+    elapsed = measure_startup(name)
+    assert elapsed <= BUDGETS[name].startup_ms, f"{name} took {elapsed:.1f}ms (budget {BUDGETS[name].startup_ms:.0f}ms)"
+
+
+@pytest.mark.parametrize("name", sorted(ENTRY_POINTS))
+def test_imports_within_budget(name):
+    """Imports added on top of interpreter startup stay within budget."""
+    cost, _ = measure_imports(name)
+    assert cost <= BUDGETS[name].import_ms, f"{name} imports took {cost:.1f}ms (budget {BUDGETS[name].import_ms:.0f}ms)"
+
+
+@pytest.mark.parametrize("name", sorted(LAZY_MODULES))
+def test_heavy_modules_load_lazily(name):
+    """Modules only needed on other branches are not imported for the recorded payload."""
+    _, modules = measure_imports(name)
+    assert not (LAZY_MODULES[name] & modules)
+
+
+def test_parse_importtime_keeps_top_level_entries():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       100 |        100 |   re._parser\n"
+        "import time:       500 |       1500 | re\n"
+        "import time:       250 |       2250 | json\n"
+    )
+    assert parse_importtime(stderr) == {"re": 1.5, "json": 2.25}
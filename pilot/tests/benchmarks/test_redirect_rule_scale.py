@@ -0,0 +1,25 @@
+"""Redirect rule matching costs the length of the input, not the number of rules."""
+
+from __future__ import annotations
+
+import os
+
+import _redirect_rules
+from redirect_bench import measure_match, write_rules
+
+SCALE = float(os.environ.get("PILOT_HOOK_BUDGET_SCALE", "1") or 1)
+
+
+def test_match_time_does_not_grow_with_phrase_count(tmp_path, monkeypatch):
+    rules_path = tmp_path / "redirect_rules.json"
+    monkeypatch.setattr(_redirect_rules, "user_rules_path", lambda: rules_path)
+    monkeypatch.setattr(_redirect_rules, "cache_dir", lambda: tmp_path / "cache")
+    monkeypatch.setattr(_redirect_rules, "_compiled", None)
+
+    write_rules(rules_path, 10)
+    small_us = measure_match()
+    write_rules(rules_path, 1_000)
+    large_us = measure_match()
+
+    assert large_us <= max(small_us * 3, small_us + 20 * SCALE), f"{large_us:.2f}us vs {small_us:.2f}us"
+    assert large_us <= 200 * SCALE
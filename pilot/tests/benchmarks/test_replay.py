@@ -0,0 +1,71 @@
+"""Captured hook traffic replays with the behaviour it was captured with."""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+
+from _capture import load_corpus
+from replay_bench import HOOKS_DIR, ReplayResult, divergences, fixture_corpus, outcomes, replay, write_fixture_repo
+
+
+def test_captured_payload_replays_against_fixture_repo(tmp_path):
+    project = tmp_path / "project"
+    write_fixture_repo(project)
+    corpus = tmp_path / "corpus"
+    env = {k: v for k, v in os.environ.items() if not k.startswith(("PILOT_", "CLAUDE_"))}
+    env.update(HOME=str(tmp_path), PILOT_SESSION_ID="cap", PILOT_HOOK_DAEMON="0", PILOT_HOOK_CAPTURE=str(corpus))
+    payload = {"tool_name": "Grep", "tool_input": {"pattern": "where is config loaded", "path": str(project / "src")}}
+
+    captured = subprocess.run(
+        [sys.executable, str(HOOKS_DIR / "run_hook.py"), "tool_redirect"],
+        input=json.dumps(payload),
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=project,
+        timeout=30,
+    )
+    entries = load_corpus(corpus)
+
+    assert captured.returncode == 2
+    assert [(entry["hook"], entry["cwd"]) for entry in entries] == [("tool_redirect", str(project))]
+
+    results, _ = replay(entries, project, concurrency=1)
+
+    assert [(r.hook, r.exit_code) for r in results] == [("tool_redirect", 2)]
+    assert "vexor search" in results[0].output
+
+
+def test_fixture_corpus_replays_deterministically(tmp_path):
+    """The recorded fixtures run clean and give the same outcome every round at any concurrency."""
+    repo = tmp_path / "repo"
+    write_fixture_repo(repo)
+    entries = fixture_corpus()
+
+    baseline, _ = replay(entries, repo, concurrency=1)
+    results, wall = replay(entries, repo, concurrency=4, rounds=2)
+
+    assert len(results) == 2 * len(entries)
+    assert wall > 0
+    assert not [r for r in baseline if "Traceback" in r.output]
+    assert divergences(results, outcomes(baseline)) == []
+
+
+def test_divergences_report_changed_exit_codes_and_output():
+    baseline = [
+        {"hook": "tool_redirect", "exit": 2, "output": "blocked"},
+        {"hook": "tdd_enforcer", "exit": 0, "output": ""},
+    ]
+    results = [
+        ReplayResult(0, "tool_redirect", 0, "", 1.0),
+        ReplayResult(1, "tdd_enforcer", 0, "reminder", 1.0),
+        ReplayResult(1, "tdd_enforcer", 0, "reminder", 1.0),
+    ]
+
+    assert divergences(results, baseline) == [
+        "#0 tool_redirect: exit 0, baseline 2",
+        "#1 tdd_enforcer: output differs from baseline",
+    ]
@@ -0,0 +1,23 @@
+"""Stop-hook transcript scans cost the tail of the transcript, not its length."""
+
+from __future__ import annotations
+
+import os
+
+from transcript_bench import measure_scan, write_transcript
+
+SCALE = float(os.environ.get("PILOT_HOOK_BUDGET_SCALE", "1") or 1)
+
+
+def test_scan_time_does_not_grow_with_transcript(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    small = tmp_path / "small.jsonl"
+    large = tmp_path / "large.jsonl"
+    write_transcript(small, 1_000)
+    write_transcript(large, 100_000)
+
+    small_ms = measure_scan(small)
+    large_ms = measure_scan(large)
+
+    assert large_ms <= max(small_ms * 3, small_ms + 2 * SCALE), f"{large_ms:.2f}ms vs {small_ms:.2f}ms"
+    assert large_ms <= 10 * SCALE
@@ -0,0 +1,76 @@
+"""Transcript scan benchmark for Stop hooks.
+
+Builds synthetic Claude transcripts of increasing size and measures how
+long `is_waiting_for_user_input` takes on each. The last assistant message
+sits a fixed distance from the end, so the scan should cost the same no
+matter how long the session has run. The first call per transcript seeds
+its checkpoint from the tail; later calls only stat it. Used by test_transcript_scan.py and
+runnable directly for a report:
+
+    uv run python pilot/tests/benchmarks/transcript_bench.py
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HOOKS_DIR = Path(__file__).resolve().parents[2] / "hooks"
+if str(HOOKS_DIR) not in sys.path:
+    sys.path.insert(0, str(HOOKS_DIR))
+
+from _util import is_waiting_for_user_input  # noqa: E402
+
+SIZES = (1_000, 10_000, 100_000)
+TAIL_RECORDS = 20
+
+
+def _record(kind: str, index: int) -> dict:
+    if kind == "assistant":
+        content = [
+            {"type": "text", "text": f"Step {index}: editing the module."},
+            {"type": "tool_use", "id": f"toolu_{index}", "name": "Edit", "input": {"file_path": "src/app.py"}},
+        ]
+    else:
+        content = [{"type": "tool_result", "tool_use_id": f"toolu_{index}", "content": "ok " * 40}]
+    return {"type": kind, "uuid": f"uuid-{index}", "message": {"role": kind, "content": content}}
+
+
+def write_transcript(path: Path, records: int) -> None:
+    """Alternating assistant/user records, ending with TAIL_RECORDS user records after the last assistant one."""
+    with path.open("w") as f:
+        for index in range(records - TAIL_RECORDS):
+            f.write(json.dumps(_record("assistant" if index % 2 == 0 else "user", index)) + "\n")
+        for index in range(records - TAIL_RECORDS, records):
+            f.write(json.dumps(_record("user", index)) + "\n")
+
+
+def measure_scan(path: Path, runs: int = 7) -> float:
+    """Median milliseconds for one is_waiting_for_user_input call."""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        is_waiting_for_user_input(str(path))
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> int:
+    print(f"{'records':>10}{'size MB':>10}{'scan ms':>10}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.environ["HOME"] = tmpdir
+        for records in SIZES:
+            path = Path(tmpdir) / f"transcript-{records}.jsonl"
+            write_transcript(path, records)
+            size_mb = path.stat().st_size / 1024 / 1024
+            print(f"{records:>10}{size_mb:>10.1f}{measure_scan(path):>10.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,67 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 _hooks_dir = str(Path(__file__).resolve().parents[2] / "hooks")
 if _hooks_dir not in sys.path:
     sys.path.insert(0, _hooks_dir)
+
+
+@pytest.fixture(autouse=True)
+def _isolate_check_cache(monkeypatch):
+    """Keep checker tests off the user's check cache; cache tests opt back in."""
+    monkeypatch.setenv("PILOT_CHECK_CACHE", "0")
+
+
+@pytest.fixture(autouse=True)
+def _isolate_discovery_cache(monkeypatch):
+    """Keep tool and git root lookups uncached; discovery tests opt back in."""
+    import _util
+
+    monkeypatch.setenv("PILOT_DISCOVERY_CACHE", "0")
+    monkeypatch.setattr(_util, "_discovery", None)
+
+
+@pytest.fixture(autouse=True)
+def _isolate_transcript_cursors(tmp_path, monkeypatch):
+    """Keep transcript checkpoints out of the user's cache directory, in hook subprocesses too."""
+    monkeypatch.setenv("PILOT_TRANSCRIPT_CURSOR_DIR", str(tmp_path / "transcripts"))
+
+
+@pytest.fixture(autouse=True)
+def _isolate_session_store(tmp_path, monkeypatch):
+    """Keep session state out of the user's sessions directory."""
+    import _util
+
+    monkeypatch.setattr(_util, "_sessions_base", lambda: tmp_path / "sessions")
+    monkeypatch.setattr(_util, "_stores", {})
+
+
+@pytest.fixture(autouse=True)
+def _isolate_notifications(tmp_path, monkeypatch):
+    """Spool notifications under tmp_path and never start the delivery daemon."""
+    import notify
+
+    monkeypatch.setattr(notify, "notify_dir", lambda: tmp_path / "notify")
+    monkeypatch.setattr(notify, "_spawn_daemon", lambda: True)
+
+
+@pytest.fixture(autouse=True)
+def _isolate_redirect_rules(tmp_path, monkeypatch):
+    """Compile redirect rules without the user's org rules or compiled-rule cache."""
+    import _redirect_rules
+
+    monkeypatch.setattr(_redirect_rules, "user_rules_path", lambda: tmp_path / "redirect_rules.json")
+    monkeypatch.setattr(_redirect_rules, "cache_dir", lambda: tmp_path / "redirect-rules")
+    monkeypatch.setattr(_redirect_rules, "_compiled", None)
+
+
+@pytest.fixture(autouse=True)
+def _isolate_tool_durations(tmp_path, monkeypatch):
+    """Start every check without learned tool durations and never start a background worker."""
+    from _checkers import scheduler
+
+    monkeypatch.setattr(scheduler, "durations_path", lambda: tmp_path / "tool-durations.json")
+    monkeypatch.setattr(scheduler, "_spawn_worker", lambda _job: False)
+    monkeypatch.setattr(scheduler, "_partial", False)
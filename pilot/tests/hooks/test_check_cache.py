@@ -0,0 +1,220 @@
+"""Tests for the content-addressed check result cache."""
+
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from _checkers import cache
+
+
+@pytest.fixture
+def cache_home(tmp_path, monkeypatch) -> Path:
+    home = tmp_path / "home"
+    home.mkdir()
+    monkeypatch.setenv("HOME", str(home))
+    monkeypatch.setenv("PILOT_CHECK_CACHE", "1")
+    return home
+
+
+@pytest.fixture
+def project(tmp_path) -> Path:
+    root = tmp_path / "project"
+    root.mkdir()
+    (root / "pyproject.toml").write_text("[tool.ruff]\n")
+    return root
+
+
+def _formatting_checker(calls: list[Path]):
+    """Fake checker that strips a comment, reports on stderr and blocks."""
+
+    def check(file_path: Path) -> tuple[int, str]:
+        calls.append(file_path)
+        file_path.write_text(file_path.read_text().replace("  # note", ""))
+        print("🛑 Python Issues found", file=sys.stderr)
+        return 2, f"Python: 1 ruff in {file_path.name}"
+
+    return check
+
+
+class TestCachedCheck:
+    def test_hit_replays_result_stderr_and_output(self, cache_home, project, capsys):
+        """Identical input skips the checker and reproduces its output, stderr and file content."""
+        py_file = project / "app.py"
+        py_file.write_text("x = 1  # note\n")
+        calls: list[Path] = []
+        check = _formatting_checker(calls)
+
+        first = cache.cached_check("python", py_file, check)
+        first_err = capsys.readouterr().err
+        py_file.write_text("x = 1  # note\n")
+        second = cache.cached_check("python", py_file, check)
+
+        assert first == second == (2, "Python: 1 ruff in app.py")
+        assert len(calls) == 1
+        assert capsys.readouterr().err == first_err == "🛑 Python Issues found\n"
+        assert py_file.read_text() == "x = 1\n"
+
+    def test_replay_replaces_the_file_atomically(self, cache_home, project):
+        """Restored output goes through a temporary file and keeps the file's mode."""
+        py_file = project / "app.py"
+        py_file.write_text("x = 1  # note\n")
+        check = _formatting_checker([])
+        cache.cached_check("python", py_file, check)
+        py_file.write_text("x = 1  # note\n")
+        py_file.chmod(0o755)
+        inode = py_file.stat().st_ino
+
+        cache.cached_check("python", py_file, check)
+
+        assert py_file.read_text() == "x = 1\n"
+        assert py_file.stat().st_mode & 0o777 == 0o755
+        assert py_file.stat().st_ino != inode
+        assert sorted(p.name for p in project.iterdir()) == ["app.py", "pyproject.toml"]
+
+    def test_checked_output_is_a_hit(self, cache_home, project):
+        """Re-checking the file the checker produced (a no-op edit) is served from cache."""
+        py_file = project / "app.py"
+        py_file.write_text("x = 1  # note\n")
+        calls: list[Path] = []
+        check = _formatting_checker(calls)
+
+        cache.cached_check("python", py_file, check)
+        cache.cached_check("python", py_file, check)
+
+        assert len(calls) == 1
+        assert cache.stats()["hits"] == 1
+
+    def test_changed_content_misses(self, cache_home, project):
+        py_file = project / "app.py"
+        py_file.write_text("x = 1\n")
+        calls: list[Path] = []
+        check = _formatting_checker(calls)
+
+        cache.cached_check("python", py_file, check)
+        py_file.write_text("x = 2\n")
+        cache.cached_check("python", py_file, check)
+
+        assert len(calls) == 2
+
+    def test_config_change_misses(self, cache_home, project):
+        """Editing pyproject.toml invalidates results for files below it."""
+        py_file = project / "app.py"
+        py_file.write_text("x = 1\n")
+        calls: list[Path] = []
+        check = _formatting_checker(calls)
+
+        cache.cached_check("python", py_file, check)
+        (project / "pyproject.toml").write_text("[tool.ruff]\nline-length = 100\n")
+        cache.cached_check("python", py_file, check)
+
+        assert len(calls) == 2
+
+    def test_tool_change_misses(self, cache_home, project, tmp_path):
+        """An upgraded tool binary (new size/mtime) invalidates results."""
+        py_file = project / "app.py"
+        py_file.write_text("x = 1\n")
+        ruff = tmp_path / "ruff"
+        ruff.write_text("v1")
+        calls: list[Path] = []
+        check = _formatting_checker(calls)
+
+        with patch("_checkers.cache.which", side_effect=lambda name: str(ruff) if name == "ruff" else None):
+            cache.cached_check("python", py_file, check)
+            ruff.write_text("v2.0")
+            cache.cached_check("python", py_file, check)
+
+        assert len(calls) == 2
+
+    def test_disabled_cache_always_runs_checker(self, cache_home, project, monkeypatch):
+        monkeypatch.setenv("PILOT_CHECK_CACHE", "0")
+        py_file = project / "app.py"
+        py_file.write_text("x = 1\n")
+        calls: list[Path] = []
+        check = _formatting_checker(calls)
+
+        cache.cached_check("python", py_file, check)
+        cache.cached_check("python", py_file, check)
+
+        assert len(calls) == 2
+        assert not cache.cache_dir().exists()
+
+    def test_incomplete_check_is_not_stored(self, cache_home, project):
+        """A check that timed out or deferred a tool runs again next time."""
+        from _checkers import scheduler
+
+        py_file = project / "app.py"
+        py_file.write_text("x = 1\n")
+        calls: list[Path] = []
+
+        def check(file_path: Path) -> tuple[int, str]:
+            calls.append(file_path)
+            scheduler.mark_partial()
+            return 0, ""
+
+        cache.cached_check("python", py_file, check)
+        cache.cached_check("python", py_file, check)
+
+        assert len(calls) == 2
+        assert cache.stats()["stores"] == 0
+
+
+class TestEvictionAndStats:
+    def test_evicts_least_recently_used(self, cache_home):
+        for index, key in enumerate(["old", "used", "new"]):
+            cache.store(key, {"exit_code": 0, "reason": "", "stderr": ""})
+            os.utime(cache.cache_dir() / f"{key}.json", (1000 + index, 1000 + index))
+        os.utime(cache.cache_dir() / "used.json", (2000, 2000))
+
+        assert cache.evict(max_entries=2) == 1
+
+        remaining = sorted(p.stem for p in cache.cache_dir().glob("*.json") if p.name != "stats.json")
+        assert remaining == ["new", "used"]
+
+    def test_evicts_by_size(self, cache_home):
+        cache.store("a", {"stderr": "x" * 1000})
+        cache.store("b", {"stderr": "y" * 1000})
+
+        assert cache.evict(max_bytes=1500) == 1
+
+    def test_stats_report_counters_and_size(self, cache_home, project):
+        py_file = project / "app.py"
+        py_file.write_text("x = 1\n")
+        check = _formatting_checker([])
+
+        cache.cached_check("python", py_file, check)
+        cache.cached_check("python", py_file, check)
+        stats = cache.stats()
+
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["stores"] == 1
+        assert stats["hit_rate"] == 0.5
+        assert stats["entries"] == 1
+        assert stats["bytes"] > 0
+
+    def test_eviction_waits_for_enough_stores(self, cache_home, project, monkeypatch):
+        """The directory is only scanned once EVICT_EVERY stores have accumulated."""
+        monkeypatch.setattr(cache, "EVICT_EVERY", 2)
+        evict = cache.evict
+        monkeypatch.setattr(cache, "evict", lambda: evict(max_entries=1))
+        py_file = project / "app.py"
+        check = _formatting_checker([])
+
+        py_file.write_text("x = 1\n")
+        cache.cached_check("python", py_file, check)
+        assert cache.stats()["entries"] == 1
+        py_file.write_text("x = 2\n")
+        cache.cached_check("python", py_file, check)
+
+        stats = cache.stats()
+        assert stats["entries"] == 1
+        assert stats["evictions"] == 1
+
+    def test_clear_removes_everything(self, cache_home):
+        cache.store("a", {"exit_code": 0})
+        cache.clear()
+        assert cache.stats()["entries"] == 0
@@ -0,0 +1,208 @@
+"""Tests for the checker pipeline."""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+from _checkers.pipeline import (
+    Analyzer,
+    SourceBuffer,
+    pipe_through,
+    print_timeouts,
+    run_analyzers,
+    run_mutators,
+    run_pipeline,
+)
+
+
+class TestSourceBuffer:
+    def test_unchanged_buffer_is_not_written(self, tmp_path):
+        path = tmp_path / "app.py"
+        path.write_text("x = 1\n")
+        mtime = path.stat().st_mtime_ns
+
+        source = SourceBuffer.read(path)
+        assert source is not None
+        assert source.commit() is False
+        assert path.stat().st_mtime_ns == mtime
+
+    def test_commit_replaces_file_and_keeps_mode(self, tmp_path):
+        path = tmp_path / "run.py"
+        path.write_text("old\n")
+        path.chmod(0o755)
+
+        source = SourceBuffer.read(path)
+        assert source is not None
+        source.apply(lambda text: text.replace("old", "new"))
+
+        assert source.commit() is True
+        assert path.read_text() == "new\n"
+        assert path.stat().st_mode & 0o777 == 0o755
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["run.py"]
+
+    def test_failing_transform_keeps_text(self, tmp_path):
+        source = SourceBuffer(tmp_path / "app.py", "x")
+
+        def broken(_text):
+            raise RuntimeError("formatter crashed")
+
+        assert source.apply(broken) is False
+        assert source.apply(lambda _text: None) is False
+        assert source.text == "x"
+
+    def test_unreadable_file_gives_none(self, tmp_path):
+        assert SourceBuffer.read(tmp_path / "missing.py") is None
+
+
+class TestPipeThrough:
+    def test_returns_formatter_stdout(self):
+        cmd = [sys.executable, "-c", "import sys; sys.stdout.write(sys.stdin.read().upper())"]
+        assert pipe_through(cmd, "abc", 10) == "ABC"
+
+    def test_failure_or_empty_output_gives_none(self):
+        assert pipe_through([sys.executable, "-c", "import sys; sys.exit(2)"], "abc", 10) is None
+        assert pipe_through([sys.executable, "-c", "pass"], "abc", 10) is None
+
+    def test_accepted_exit_codes(self):
+        cmd = [sys.executable, "-c", "import sys; sys.stdout.write('ok'); sys.exit(1)"]
+        assert pipe_through(cmd, "abc", 10, ok_codes=(0, 1)) == "ok"
+
+
+class TestRunMutators:
+    def test_runs_steps_in_order_on_the_buffer(self, tmp_path):
+        path = tmp_path / "app.py"
+        path.write_text("a")
+        source = SourceBuffer.read(path)
+        assert source is not None
+
+        assert run_mutators(source, [lambda text: text + "b", lambda text: text + "c"]) is True
+        assert path.read_text() == "abc"
+
+    def test_failing_step_does_not_stop_later_steps(self, tmp_path):
+        path = tmp_path / "app.py"
+        path.write_text("a")
+        source = SourceBuffer.read(path)
+        assert source is not None
+
+        def broken(_text):
+            raise RuntimeError("formatter crashed")
+
+        run_mutators(source, [broken, lambda text: text + "b"])
+        assert path.read_text() == "ab"
+
+    def test_file_is_written_once(self, tmp_path):
+        path = tmp_path / "app.py"
+        path.write_text("a")
+        source = SourceBuffer.read(path)
+        assert source is not None
+
+        with patch("_checkers.pipeline.os.replace", wraps=os.replace) as replace:
+            run_mutators(source, [lambda text: text + "b", lambda text: text + "c", lambda text: text + "d"])
+
+        assert replace.call_count == 1
+        assert path.read_text() == "abcd"
+
+
+class TestRunAnalyzers:
+    def test_analyzers_run_concurrently(self):
+        """Analyzers overlap, so the phase takes as long as the slowest one."""
+        barrier = threading.Barrier(2, timeout=5)
+
+        def analyzer(name):
+            def run(_timeout):
+                barrier.wait()
+                return {name: (1, [name])}
+
+            return Analyzer(name, run, 10)
+
+        results, timed_out = run_analyzers([analyzer("ruff"), analyzer("basedpyright")])
+
+        assert results == {"ruff": (1, ["ruff"]), "basedpyright": (1, ["basedpyright"])}
+        assert timed_out == []
+
+    def test_results_merge_in_analyzer_order(self):
+        """Merged results keep analyzer order even when later analyzers finish first."""
+
+        def slow(_timeout):
+            time.sleep(0.05)
+            return {"eslint": (0, 1, [])}
+
+        results, _ = run_analyzers([Analyzer("eslint", slow, 10), Analyzer("tsc", lambda _t: {"tsc": (1, [])}, 10)])
+
+        assert list(results) == ["eslint", "tsc"]
+
+    def test_analyzer_gets_its_deadline(self):
+        seen: list[float] = []
+        run_analyzers([Analyzer("vet", lambda timeout: seen.append(timeout) or {}, 42)])
+        assert seen == [42]
+
+    def test_overrunning_analyzer_is_reported_and_dropped(self):
+        """An analyzer past its deadline is left out; the others still report."""
+        release = threading.Event()
+
+        def hangs(_timeout):
+            release.wait(5)
+            return {"lint": (1, ["late"])}
+
+        start = time.monotonic()
+        results, timed_out = run_analyzers(
+            [Analyzer("vet", lambda _t: {"vet": (1, ["x"])}, 10), Analyzer("lint", hangs, 0.05)]
+        )
+        release.set()
+
+        assert time.monotonic() - start < 3
+        assert results == {"vet": (1, ["x"])}
+        assert timed_out == ["lint"]
+
+    def test_crashing_analyzer_contributes_nothing(self):
+        def broken(_timeout):
+            raise RuntimeError("boom")
+
+        results, timed_out = run_analyzers([Analyzer("ruff", broken, 10)])
+
+        assert results == {}
+        assert timed_out == []
+
+
+def test_pipeline_runs_analyzers_after_the_write(tmp_path):
+    path = tmp_path / "app.py"
+    path.write_text("raw")
+    source = SourceBuffer.read(path)
+    assert source is not None
+    seen: list[str] = []
+
+    results, _ = run_pipeline(
+        source,
+        [lambda _text: "formatted"],
+        [Analyzer("ruff", lambda _t: seen.append(path.read_text()) or {}, 10)],
+    )
+
+    assert seen == ["formatted"]
+    assert results == {}
+
+
+def test_pipeline_records_tool_timings(tmp_path, monkeypatch):
+    import _timings
+
+    monkeypatch.setattr(_timings, "_current", None)
+    path = tmp_path / "mod.py"
+    path.write_text("x\n")
+    timings = _timings.begin("file_checker")
+
+    def _ruff_format(text):
+        return text + "y\n"
+
+    run_pipeline(SourceBuffer(path, path.read_text()), [_ruff_format], [Analyzer("ruff", lambda _t: {}, 10)])
+
+    assert timings is not None
+    assert set(timings.tools) == {"ruff_format", "ruff"}
+    assert set(timings.phases) == {"io", "session_store"}
+
+
+def test_print_timeouts_names_skipped_analyzers(capsys):
+    print_timeouts(["tsc"], [Analyzer("tsc", lambda _t: {}, 120)])
+    assert "tsc timed out after 120s" in capsys.readouterr().err
@@ -0,0 +1,224 @@
+"""Tests for deadline-aware analyzer scheduling."""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from functools import partial
+
+import _util
+from _checkers import scheduler
+from _checkers.go import _run_vet
+from _checkers.pipeline import Analyzer, SourceBuffer, print_timeouts, run_pipeline
+
+_spawn_worker = scheduler._spawn_worker
+
+
+def _run_inline(job: dict) -> bool:
+    scheduler.run_job(job)
+    return True
+
+
+def _source(tmp_path):
+    path = tmp_path / "app.ts"
+    path.write_text("const x = 1;\n")
+    source = SourceBuffer.read(path)
+    assert source is not None
+    return source
+
+
+def _learn(durations: dict[str, float]) -> None:
+    scheduler.observe(os.getcwd(), durations)
+
+
+class TestBudget:
+    def test_default_and_override(self, monkeypatch):
+        monkeypatch.delenv("PILOT_CHECK_BUDGET", raising=False)
+        assert scheduler.check_budget() == scheduler.CHECK_BUDGET
+        monkeypatch.setenv("PILOT_CHECK_BUDGET", "12")
+        assert scheduler.check_budget() == 12
+        monkeypatch.setenv("PILOT_CHECK_BUDGET", "soon")
+        assert scheduler.check_budget() == scheduler.CHECK_BUDGET
+
+
+class TestPlan:
+    def test_slices_never_exceed_timeout_or_remaining_budget(self):
+        eslint = Analyzer("eslint", lambda _t: {}, 60)
+        tsc = Analyzer("tsc", lambda _t: {}, 10)
+
+        inline, deferred = scheduler.plan([eslint, tsc], 25, {})
+
+        assert inline == [eslint, tsc]
+        assert deferred == []
+        assert (eslint.timeout, tsc.timeout) == (25, 10)
+
+    def test_known_tools_get_a_multiple_of_their_typical_duration(self):
+        ruff = Analyzer("ruff", lambda _t: {}, 30)
+        vet = Analyzer("vet", lambda _t: {}, 60)
+
+        scheduler.plan([ruff, vet], 30, {"ruff": 0.2, "vet": 4})
+
+        assert ruff.timeout == scheduler.MIN_SLICE
+        assert vet.timeout == 4 * scheduler.SLICE_SLACK
+
+    def test_tools_slower_than_their_share_of_the_budget_are_deferred(self):
+        eslint = Analyzer("eslint", lambda _t: {}, 60)
+        tsc = Analyzer("tsc", lambda _t: {}, 120)
+
+        inline, deferred = scheduler.plan([eslint, tsc], 30, {"eslint": 2, "tsc": 40})
+
+        assert inline == [eslint]
+        assert deferred == [tsc]
+        assert tsc.timeout == 120
+
+
+class TestDurations:
+    def test_observations_are_averaged_per_project(self):
+        scheduler.observe("/a", {"tsc": 10})
+        scheduler.observe("/a", {"tsc": 20})
+        scheduler.observe("/b", {"tsc": 1})
+
+        assert scheduler.typical_durations("/a") == {"tsc": 10 + scheduler.EWMA_WEIGHT * 10}
+        assert scheduler.typical_durations("/b") == {"tsc": 1}
+        assert scheduler.typical_durations("/c") == {}
+
+    def test_pipeline_learns_from_each_run(self, tmp_path):
+        run_pipeline(_source(tmp_path), [], [Analyzer("eslint", lambda _t: {}, 10)])
+
+        assert set(scheduler.typical_durations(os.getcwd())) == {"eslint"}
+
+
+class TestRunPipeline:
+    def test_overrun_is_killed_and_completed_results_kept(self, tmp_path, monkeypatch, capsys):
+        """A tool past its slice is reported as timed out; the others' diagnostics still show."""
+        monkeypatch.setenv("PILOT_CHECK_BUDGET", "0.2")
+        release = threading.Event()
+
+        def hangs(timeout):
+            release.wait(timeout)
+            return {"tsc": (1, ["late"])}
+
+        analyzers = [Analyzer("eslint", lambda _t: {"eslint": (1, 0, ["x"])}, 60), Analyzer("tsc", hangs, 120)]
+        start = time.monotonic()
+        results, timed_out = run_pipeline(_source(tmp_path), [], analyzers)
+        release.set()
+        print_timeouts(timed_out, analyzers)
+
+        assert time.monotonic() - start < 3
+        assert results == {"eslint": (1, 0, ["x"])}
+        assert timed_out == ["tsc"]
+        assert "tsc timed out after 0s" in capsys.readouterr().err
+        assert scheduler.take_partial() is True
+
+    def test_complete_run_is_not_partial(self, tmp_path):
+        run_pipeline(_source(tmp_path), [], [Analyzer("eslint", lambda _t: {}, 10)])
+        assert scheduler.take_partial() is False
+
+    def test_slow_tool_is_deferred_and_surfaces_on_next_edit(self, tmp_path, monkeypatch, capsys):
+        monkeypatch.setattr(scheduler, "_spawn_worker", _run_inline)
+        _learn({"tsc": 45})
+        seen: list[float] = []
+
+        def tsc(timeout):
+            seen.append(timeout)
+            return {"tsc": (2, ["a", "b"])}
+
+        source = _source(tmp_path)
+        first, _ = run_pipeline(source, [], [Analyzer("eslint", lambda _t: {}, 60), Analyzer("tsc", tsc, 120)])
+        first_err = capsys.readouterr().err
+        second, _ = run_pipeline(source, [], [Analyzer("eslint", lambda _t: {}, 60), Analyzer("tsc", tsc, 120)])
+        second_err = capsys.readouterr().err
+
+        assert first == {}
+        assert "tsc deferred to a background run" in first_err
+        assert seen[0] == 120
+        assert second["tsc"] == (2, ["a", "b"])
+        assert "tsc results are from the previous edit" in second_err
+        assert scheduler.take_partial() is True
+
+    def test_tool_still_running_is_not_started_again(self, tmp_path, monkeypatch):
+        starts: list[object] = []
+        monkeypatch.setattr(scheduler, "_spawn_worker", lambda job: starts.append(job) or True)
+        _learn({"tsc": 45})
+        source = _source(tmp_path)
+
+        for _ in range(2):
+            results, _ = run_pipeline(source, [], [Analyzer("tsc", lambda _t: {"tsc": (1, [])}, 120)])
+            assert results == {}
+
+        assert len(starts) == 1
+        assert scheduler.pending_tools(source.path) == {"tsc"}
+
+    def test_tool_runs_inline_when_no_worker_starts(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(scheduler, "_spawn_worker", lambda _job: False)
+        monkeypatch.setenv("PILOT_CHECK_BUDGET", "40")
+        _learn({"tsc": 45})
+        seen: list[float] = []
+
+        def tsc(timeout):
+            seen.append(timeout)
+            return {"tsc": (1, ["a"])}
+
+        source = _source(tmp_path)
+        results, timed_out = run_pipeline(source, [], [Analyzer("tsc", tsc, 120)])
+
+        assert results == {"tsc": (1, ["a"])}
+        assert timed_out == []
+        assert 39 < seen[0] <= 40
+        assert scheduler.pending_tools(source.path) == set()
+        assert scheduler.take_partial() is False
+
+    def test_deferred_tool_is_rerun_inline_periodically(self, tmp_path, monkeypatch):
+        """An inline probe lets a tool that got faster come back from the background."""
+        starts: list[object] = []
+        monkeypatch.setattr(scheduler, "_spawn_worker", lambda job: starts.append(job) or True)
+        monkeypatch.setattr(scheduler, "INLINE_PROBE_INTERVAL", 0)
+        _learn({"tsc": 45})
+        other = tmp_path / "other"
+        other.mkdir()
+        first_source = _source(tmp_path)
+        second_source = _source(other)
+
+        first, _ = run_pipeline(first_source, [], [Analyzer("tsc", lambda _t: {"tsc": (1, [])}, 120)])
+        second, _ = run_pipeline(second_source, [], [Analyzer("tsc", lambda _t: {"tsc": (1, [])}, 120)])
+
+        assert first == {}
+        assert len(starts) == 1
+        assert second == {"tsc": (1, [])}
+        assert scheduler.typical_durations(os.getcwd())["tsc"] < 45
+
+    def test_inline_results_replace_previous_edit(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(scheduler, "_spawn_worker", _run_inline)
+        _learn({"tsc": 45})
+        source = _source(tmp_path)
+        run_pipeline(source, [], [Analyzer("tsc", lambda _t: {"tsc": (3, [])}, 120)])
+        scheduler.durations_path().unlink()
+
+        results, _ = run_pipeline(source, [], [Analyzer("tsc", lambda _t: {}, 120)])
+
+        assert results == {}
+        assert scheduler.take_deferred(source.path) == ({}, [])
+
+    def test_background_run_in_a_worker_process(self, tmp_path, monkeypatch):
+        """The worker is a separate interpreter that rebuilds the analyzers and reports through the session store."""
+        home = tmp_path / "home"
+        monkeypatch.setenv("HOME", str(home))
+        monkeypatch.setenv("PILOT_SESSION_ID", "worker")
+        monkeypatch.setattr(_util, "_sessions_base", lambda: home / ".pilot" / "sessions")
+        monkeypatch.setattr(_util, "_stores", {})
+        monkeypatch.setattr(scheduler, "_spawn_worker", _spawn_worker)
+        fake_go = tmp_path / "go"
+        fake_go.write_text('#!/bin/sh\necho "app.go:1:1: unreachable code"\nexit 1\n')
+        fake_go.chmod(0o755)
+        source = _source(tmp_path)
+        vet = Analyzer("vet", partial(_run_vet, str(fake_go), source.path), 1)
+
+        assert scheduler.run_deferred(source.path, [vet], {"vet": 10})
+
+        deadline = time.monotonic() + 10
+        results: dict = {}
+        while time.monotonic() < deadline and not results:
+            time.sleep(0.05)
+            results, _ = scheduler.take_deferred(source.path)
+        assert results == {"vet": (1, ["app.go:1:1: unreachable code"])}
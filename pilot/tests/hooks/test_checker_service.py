@@ -0,0 +1,448 @@
+"""Tests for resident checker services and the basedpyright language server session."""
+
+from __future__ import annotations
+
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from _checkers import service
+from _checkers.lint_worker import LintWorkerSession
+from _checkers.lsp import PyrightSession
+from _checkers.tsserver import TsserverSession
+
+FAKE_LANGSERVER = r"""
+import json
+import sys
+
+
+def read():
+    length = 0
+    while True:
+        line = sys.stdin.buffer.readline()
+        if not line:
+            sys.exit(0)
+        if not line.strip():
+            break
+        if line.lower().startswith(b"content-length"):
+            length = int(line.split(b":")[1])
+    return json.loads(sys.stdin.buffer.read(length))
+
+
+def send(message):
+    body = json.dumps({"jsonrpc": "2.0", **message}).encode()
+    sys.stdout.buffer.write(b"Content-Length: %d\r\n\r\n" % len(body) + body)
+    sys.stdout.buffer.flush()
+
+
+closed = []
+while True:
+    message = read()
+    method = message.get("method")
+    if method == "initialize":
+        send({"id": 900, "method": "workspace/configuration", "params": {"items": [{"section": "python"}]}})
+        answer = read()
+        assert answer["id"] == 900 and answer["result"] == [{}]
+        send({"id": message["id"], "result": {"capabilities": {}}})
+    elif method == "textDocument/didClose":
+        closed.append(message["params"]["textDocument"]["uri"])
+        send({"method": "textDocument/publishDiagnostics",
+              "params": {"uri": message["params"]["textDocument"]["uri"], "diagnostics": [
+                  {"severity": 1, "message": f"closed {len(closed)}x", "range": {}}]}})
+    elif method in ("textDocument/didOpen", "textDocument/didChange"):
+        params = message["params"]
+        document = params["textDocument"]
+        text = document["text"] if "text" in document else params["contentChanges"][0]["text"]
+        kind = method.split("/")[1]
+        if document["version"] > 1:
+            stale = [{"severity": 1, "message": "stale", "range": {}}]
+            send({"method": "textDocument/publishDiagnostics",
+                  "params": {"uri": document["uri"], "version": document["version"] - 1, "diagnostics": stale}})
+        diagnostics = [{"severity": 4, "message": "unused hint", "range": {}}]
+        if "bad" in text:
+            diagnostics.append({
+                "severity": 1,
+                "message": f"bad is not defined ({kind}, closed {len(closed)}x)",
+                "range": {"start": {"line": 0, "character": 0}},
+                "code": "reportUndefinedVariable",
+            })
+        send({"method": "textDocument/publishDiagnostics",
+              "params": {"uri": document["uri"], "version": document["version"], "diagnostics": diagnostics}})
+    elif method == "shutdown":
+        send({"id": message["id"], "result": None})
+    elif method == "exit":
+        sys.exit(0)
+"""
+
+FAKE_TSSERVER = r"""
+import glob
+import json
+import os
+import sys
+
+
+def send(message):
+    body = json.dumps(message).encode() + b"\n"
+    sys.stdout.buffer.write(b"Content-Length: %d\r\n\r\n" % len(body) + body)
+    sys.stdout.buffer.flush()
+
+
+opened = []
+contents = {}
+for line in sys.stdin:
+    request = json.loads(line)
+    command, arguments = request["command"], request["arguments"]
+    if command == "reload":
+        contents[arguments["file"]] = open(arguments["tmpfile"]).read()
+    if command in ("configure", "reload"):
+        send({"type": "response", "request_seq": request["seq"], "success": True, "command": command})
+    elif command == "open":
+        opened.append(arguments["file"])
+        contents[arguments["file"]] = open(arguments["file"]).read()
+    elif command == "close":
+        contents.pop(arguments["file"])
+    elif command in ("geterr", "geterrForProject"):
+        if command == "geterr":
+            files = arguments["files"]
+        else:
+            files = sorted(os.path.abspath(name) for name in glob.glob("**/*.ts", recursive=True))
+        for file_name in files:
+            send({"type": "event", "event": "syntaxDiag", "body": {"file": file_name, "diagnostics": []}})
+            diagnostics = [{"start": {"line": 1, "offset": 1}, "text": "hint", "code": 80001, "category": "suggestion"}]
+            if "bad" in contents.get(file_name, open(file_name).read()):
+                diagnostics.append({
+                    "start": {"line": 1, "offset": 7},
+                    "text": f"Cannot find name 'bad' (opened {opened.count(file_name)}x).",
+                    "code": 2304,
+                    "category": "error",
+                })
+            send({"type": "event", "event": "semanticDiag", "body": {"file": file_name, "diagnostics": diagnostics}})
+        send({"type": "event", "event": "requestCompleted", "body": {"request_seq": request["seq"]}})
+    elif command == "exit":
+        sys.exit(0)
+"""
+
+
+@pytest.fixture
+def langserver(tmp_path: Path) -> list[str]:
+    script = tmp_path / "fake_langserver.py"
+    script.write_text(FAKE_LANGSERVER)
+    return [sys.executable, str(script)]
+
+
+@pytest.fixture
+def session(tmp_path: Path):
+    session = PyrightSession(tmp_path)
+    yield session
+    session.close()
+
+
+class TestPyrightSession:
+    def test_reports_diagnostics_in_cli_shape(self, tmp_path, langserver, session):
+        """Errors come back shaped like `basedpyright --outputjson`; hints are dropped."""
+        py_file = tmp_path / "app.py"
+        py_file.write_text("bad\n")
+
+        response = session.handle({"command": langserver, "file": str(py_file)})
+
+        assert response == {
+            "diagnostics": [
+                {
+                    "file": str(py_file.resolve()),
+                    "severity": "error",
+                    "message": "bad is not defined (didOpen, closed 0x)",
+                    "range": {"start": {"line": 0, "character": 0}},
+                    "rule": "reportUndefinedVariable",
+                }
+            ]
+        }
+
+    def test_later_checks_reuse_server_and_close_the_file(self, tmp_path, langserver, session):
+        """Each check reopens the file in the same process and closes it after, skipping stale diagnostics."""
+        py_file = tmp_path / "app.py"
+        py_file.write_text("x = 1\n")
+        assert session.handle({"command": langserver, "file": str(py_file)}) == {"diagnostics": []}
+        assert session.client is not None
+        pid = session.client.process.pid
+
+        py_file.write_text("bad\n")
+        response = session.handle({"command": langserver, "file": str(py_file)})
+
+        assert session.client.process.pid == pid
+        assert [d["message"] for d in response["diagnostics"]] == ["bad is not defined (didOpen, closed 1x)"]
+
+    def test_restarts_crashed_server(self, tmp_path, langserver, session):
+        """A dead language server is replaced on the next request."""
+        py_file = tmp_path / "app.py"
+        py_file.write_text("bad\n")
+        session.handle({"command": langserver, "file": str(py_file)})
+        assert session.client is not None
+        session.client.process.kill()
+        session.client.process.wait()
+
+        response = session.handle({"command": langserver, "file": str(py_file)})
+
+        assert [d["message"] for d in response["diagnostics"]] == ["bad is not defined (didOpen, closed 0x)"]
+
+    def test_reports_files_changed_outside_the_session(self, tmp_path, langserver, session):
+        """Source changes made by other tools are sent as watched-file events; a config change restarts."""
+        py_file = tmp_path / "app.py"
+        helper = tmp_path / "pkg" / "helper.py"
+        helper.parent.mkdir()
+        for path in (py_file, helper):
+            path.write_text("x = 1\n")
+        session.handle({"command": langserver, "file": str(py_file)})
+        assert session.client is not None
+        pid = session.client.process.pid
+
+        helper.write_text("x = 2\n")
+        os.utime(helper, ns=(0, 0))
+        (tmp_path / "pkg" / "new.py").write_text("")
+        with patch.object(session.client, "notify", wraps=session.client.notify) as notify:
+            session.handle({"command": langserver, "file": str(py_file)})
+        [watched] = [
+            call.args[1] for call in notify.call_args_list if call.args[0] == "workspace/didChangeWatchedFiles"
+        ]
+        assert sorted(watched["changes"], key=lambda change: change["uri"]) == [
+            {"uri": helper.as_uri(), "type": 2},
+            {"uri": (tmp_path / "pkg" / "new.py").as_uri(), "type": 1},
+        ]
+
+        (tmp_path / "pyproject.toml").write_text("[tool.basedpyright]\n")
+        session.handle({"command": langserver, "file": str(py_file)})
+        assert session.client.process.pid != pid
+
+
+class TestTsserverSession:
+    @pytest.fixture
+    def tsserver(self, tmp_path: Path) -> list[str]:
+        script = tmp_path / "fake_tsserver.py"
+        script.write_text(FAKE_TSSERVER)
+        return [sys.executable, str(script)]
+
+    def test_reports_errors_like_tsc(self, tmp_path, tsserver):
+        """Errors are formatted as tsc output relative to the project; suggestions are dropped."""
+        ts_file = tmp_path / "src" / "app.ts"
+        ts_file.parent.mkdir()
+        ts_file.write_text("const x = bad;\n")
+        session = TsserverSession(tmp_path)
+        try:
+            response = session.handle({"command": tsserver, "file": str(ts_file)})
+        finally:
+            session.close()
+
+        assert response == {"errors": ["src/app.ts(1,7): error TS2304: Cannot find name 'bad' (opened 1x)."]}
+
+    def test_rechecks_previously_opened_files_without_reopening(self, tmp_path, tsserver):
+        """Edits reload open files in the warm server; earlier files are rechecked too."""
+        first = tmp_path / "a.ts"
+        second = tmp_path / "b.ts"
+        first.write_text("export const a = 1;\n")
+        second.write_text("const b = 1;\n")
+        session = TsserverSession(tmp_path)
+        try:
+            assert session.handle({"command": tsserver, "file": str(first)}) == {"errors": []}
+            session.handle({"command": tsserver, "file": str(second)})
+            first.write_text("export const a = bad;\n")
+            response = session.handle({"command": tsserver, "file": str(first)})
+        finally:
+            session.close()
+
+        assert response == {"errors": ["a.ts(1,7): error TS2304: Cannot find name 'bad' (opened 1x)."]}
+        assert session.client is None
+
+    def test_checks_the_whole_project_first_and_periodically(self, tmp_path, tsserver, monkeypatch):
+        """Errors in files that were never opened are found by the periodic project-wide pass."""
+        import _checkers.tsserver as tsserver_module
+
+        edited = tmp_path / "a.ts"
+        importer = tmp_path / "b.ts"
+        edited.write_text("export const a = 1;\n")
+        importer.write_text("import { a } from './a';\nexport const b = bad;\n")
+        session = TsserverSession(tmp_path)
+        try:
+            first = session.handle({"command": tsserver, "file": str(edited)})
+            second = session.handle({"command": tsserver, "file": str(edited)})
+            monkeypatch.setattr(tsserver_module, "PROJECT_CHECK_INTERVAL", 0)
+            third = session.handle({"command": tsserver, "file": str(edited)})
+        finally:
+            session.close()
+
+        project_error = "b.ts(1,7): error TS2304: Cannot find name 'bad' (opened 0x)."
+        assert first == third == {"errors": [project_error]}
+        assert second == {"errors": []}
+
+    def test_reloads_open_files_changed_on_disk(self, tmp_path, tsserver):
+        """Another open file changed outside the edit is reloaded; a deleted one is closed."""
+        first = tmp_path / "a.ts"
+        second = tmp_path / "b.ts"
+        third = tmp_path / "c.ts"
+        for path in (first, second, third):
+            path.write_text("export const x = 1;\n")
+        session = TsserverSession(tmp_path)
+        try:
+            for path in (first, second, third):
+                session.handle({"command": tsserver, "file": str(path)})
+            second.write_text("export const x = bad;\n")
+            third.unlink()
+            response = session.handle({"command": tsserver, "file": str(first)})
+            open_files = list(session.open_files)
+        finally:
+            session.close()
+
+        assert response == {"errors": ["b.ts(1,7): error TS2304: Cannot find name 'bad' (opened 1x)."]}
+        assert open_files == [str(second.resolve()), str(first.resolve())]
+
+
+STUB_ESLINT = """
+let created = 0;
+class ESLint {
+  constructor() { created += 1; this.generation = created; }
+  async lintFiles(files) {
+    const text = require("fs").readFileSync(files[0], "utf8");
+    const messages = text.includes("var ")
+      ? [{ line: 1, ruleId: "no-var", message: `Unexpected var (instance ${this.generation})`, severity: 2 }]
+      : [];
+    return [{ filePath: files[0], errorCount: messages.length, warningCount: 0, messages, source: text }];
+  }
+}
+module.exports = { ESLint };
+"""
+
+STUB_PRETTIER = """
+module.exports = {
+  async getFileInfo() { return { ignored: false, inferredParser: "typescript" }; },
+  async resolveConfig() { return {}; },
+  async format(text) { return text.replace(/\\s+$/, "") + "\\n"; },
+};
+"""
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node not installed")
+class TestLintWorkerSession:
+    @pytest.fixture
+    def project(self, tmp_path: Path) -> Path:
+        (tmp_path / "package.json").write_text("{}")
+        for name, source in (("eslint", STUB_ESLINT), ("prettier", STUB_PRETTIER)):
+            package = tmp_path / "node_modules" / name
+            package.mkdir(parents=True)
+            (package / "index.js").write_text(source)
+        return tmp_path
+
+    def _request(self, session: LintWorkerSession, op: str, file_path: Path) -> dict:
+        return session.handle({"node": shutil.which("node"), "op": op, "file": str(file_path)})
+
+    def test_lints_and_formats_with_project_packages(self, project):
+        """The worker loads the project's eslint and prettier and answers in CLI shape."""
+        ts_file = project / "app.ts"
+        ts_file.write_text("var x = 1;   \n\n")
+        session = LintWorkerSession(project)
+        try:
+            formatted = self._request(session, "format", ts_file)
+            lint = self._request(session, "lint", ts_file)["result"]
+        finally:
+            session.close()
+
+        assert formatted == {"result": {"changed": True, "text": "var x = 1;\n"}}
+        assert ts_file.read_text() == "var x = 1;\n"
+        assert lint[0]["errorCount"] == 1
+        assert lint[0]["messages"][0]["ruleId"] == "no-var"
+        assert "source" not in lint[0]
+
+    def test_formats_given_text_without_touching_the_file(self, project):
+        ts_file = project / "app.ts"
+        ts_file.write_text("on disk   \n")
+        session = LintWorkerSession(project)
+        try:
+            reply = session.handle(
+                {"node": shutil.which("node"), "op": "format", "file": str(ts_file), "text": "in memory   \n\n"}
+            )
+        finally:
+            session.close()
+
+        assert reply == {"result": {"changed": True, "text": "in memory\n"}}
+        assert ts_file.read_text() == "on disk   \n"
+
+    def test_keeps_worker_warm_until_config_changes(self, project):
+        """ESLint is created once per worker; a config change starts a fresh worker."""
+        ts_file = project / "app.ts"
+        ts_file.write_text("var x = 1;\n")
+        session = LintWorkerSession(project)
+        try:
+            first = self._request(session, "lint", ts_file)["result"]
+            second = self._request(session, "lint", ts_file)["result"]
+            assert session.client is not None
+            pid = session.client.process.pid
+
+            (project / "eslint.config.js").write_text("module.exports = [];\n")
+            third = self._request(session, "lint", ts_file)["result"]
+            assert session.client.process.pid != pid
+        finally:
+            session.close()
+
+        messages = [result[0]["messages"][0]["message"] for result in (first, second, third)]
+        assert messages == ["Unexpected var (instance 1)"] * 3
+
+    def test_nested_config_change_restarts_worker(self, project):
+        """Configs between the file and the root count; files in other directories do not restart the worker."""
+        nested = project / "src" / "feature"
+        nested.mkdir(parents=True)
+        (nested / "widget.ts").write_text("var x = 1;\n")
+        (project / "app.ts").write_text("var y = 1;\n")
+        session = LintWorkerSession(project)
+        try:
+            self._request(session, "lint", nested / "widget.ts")
+            assert session.client is not None
+            pid = session.client.process.pid
+            self._request(session, "lint", project / "app.ts")
+            self._request(session, "lint", nested / "widget.ts")
+            assert session.client.process.pid == pid
+
+            (project / "src" / ".prettierrc").write_text("{}\n")
+            self._request(session, "lint", nested / "widget.ts")
+            assert session.client.process.pid != pid
+        finally:
+            session.close()
+
+
+class TestServiceBroker:
+    def test_disabled_services_are_not_started(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("PILOT_RESIDENT_CHECKERS", "0")
+        monkeypatch.setattr(service, "spawn", lambda *_: pytest.fail("broker spawned"))
+
+        assert service.request("basedpyright", tmp_path, {}) is None
+
+    def test_first_request_starts_broker_and_later_requests_use_it(self, tmp_path, langserver, monkeypatch):
+        """No broker yet: None and a broker is spawned; then requests are answered by it."""
+        py_file = tmp_path / "app.py"
+        py_file.write_text("bad\n")
+        payload = {"command": langserver, "file": str(py_file)}
+
+        with tempfile.TemporaryDirectory(prefix="svc-", dir="/tmp") as home:
+            monkeypatch.setenv("HOME", home)
+            monkeypatch.delenv("PILOT_RESIDENT_CHECKERS", raising=False)
+            socket_path = service.socket_path("basedpyright", tmp_path)
+
+            assert service.request("basedpyright", tmp_path, payload) is None
+            try:
+                deadline = time.monotonic() + 10
+                while not socket_path.exists() and time.monotonic() < deadline:
+                    time.sleep(0.05)
+
+                response = service.request("basedpyright", tmp_path, payload)
+                assert response is not None
+                assert [d["message"] for d in response["diagnostics"]] == ["bad is not defined (didOpen, closed 0x)"]
+            finally:
+                pid = int(socket_path.with_suffix(".lock").read_text())
+                os.kill(pid, signal.SIGTERM)
+                deadline = time.monotonic() + 5
+                while socket_path.exists() and time.monotonic() < deadline:
+                    time.sleep(0.05)
+
+            assert not socket_path.exists()
@@ -3,96 +3,88 @@
 import json
 import time
 
-from context_monitor import _is_throttled, _resolve_context
+from _util import session_store
+from context_monitor import SessionState, _resolve_context, get_current_session_id, run_context_monitor
 
 
-def test_throttle_skips_when_recent_and_low_context(tmp_path, monkeypatch):
+def test_throttle_skips_when_recent_and_low_context():
     """Throttle returns True when last check was < 30s ago and context < 80%."""
-    cache_file = tmp_path / "context_cache.json"
-    monkeypatch.setattr("context_monitor.get_session_cache_path", lambda: cache_file)
-
     session_id = "test-session-123"
-    cache_file.write_text(json.dumps({
-        "session_id": session_id,
-        "tokens": 100000,
-        "timestamp": time.time() - 5,
-    }))
+    session_store().set(
+        "context_cache",
+        {
+            "session_id": session_id,
+            "tokens": 100000,
+            "timestamp": time.time() - 5,
+        },
+    )
 
-    assert _is_throttled(session_id) is True
+    assert SessionState.load(session_id).is_throttled() is True
 
 
-def test_throttle_allows_when_high_context(tmp_path, monkeypatch):
+def test_throttle_allows_when_high_context():
     """Throttle returns False when context >= 80% (never skip high context)."""
-    cache_file = tmp_path / "context_cache.json"
-    monkeypatch.setattr("context_monitor.get_session_cache_path", lambda: cache_file)
-
     session_id = "test-session-123"
-    cache_file.write_text(json.dumps({
-        "session_id": session_id,
-        "tokens": 170000,
-        "timestamp": time.time() - 5,
-    }))
+    session_store().set(
+        "context_cache",
+        {
+            "session_id": session_id,
+            "tokens": 170000,
+            "timestamp": time.time() - 5,
+        },
+    )
 
-    assert _is_throttled(session_id) is False
+    assert SessionState.load(session_id).is_throttled() is False
 
 
-def test_throttle_allows_when_stale_timestamp(tmp_path, monkeypatch):
+def test_throttle_allows_when_stale_timestamp():
     """Throttle returns False when last check was > 30s ago."""
-    cache_file = tmp_path / "context_cache.json"
-    monkeypatch.setattr("context_monitor.get_session_cache_path", lambda: cache_file)
-
     session_id = "test-session-123"
-    cache_file.write_text(json.dumps({
-        "session_id": session_id,
-        "tokens": 100000,
-        "timestamp": time.time() - 35,
-    }))
+    session_store().set(
+        "context_cache",
+        {
+            "session_id": session_id,
+            "tokens": 100000,
+            "timestamp": time.time() - 35,
+        },
+    )
 
-    assert _is_throttled(session_id) is False
+    assert SessionState.load(session_id).is_throttled() is False
 
 
-def test_throttle_allows_when_no_cache(tmp_path, monkeypatch):
+def test_throttle_allows_when_no_cache():
     """Throttle returns False when no cache file exists."""
-    cache_file = tmp_path / "context_cache.json"
-    monkeypatch.setattr("context_monitor.get_session_cache_path", lambda: cache_file)
+    assert SessionState.load("test-session-123").is_throttled() is False
 
-    assert _is_throttled("test-session-123") is False
 
-
-def test_throttle_allows_when_different_session(tmp_path, monkeypatch):
+def test_throttle_allows_when_different_session():
     """Throttle returns False when cache is for a different session."""
-    cache_file = tmp_path / "context_cache.json"
-    monkeypatch.setattr("context_monitor.get_session_cache_path", lambda: cache_file)
-
-    cache_file.write_text(json.dumps({
-        "session_id": "other-session-456",
-        "tokens": 100000,
-        "timestamp": time.time() - 5,
-    }))
+    session_store().set(
+        "context_cache",
+        {
+            "session_id": "other-session-456",
+            "tokens": 100000,
+            "timestamp": time.time() - 5,
+        },
+    )
 
-    assert _is_throttled("test-session-123") is False
+    assert SessionState.load("test-session-123").is_throttled() is False
 
 
-
-
-def test_resolve_context_returns_none_when_statusline_cache_missing(tmp_path, monkeypatch):
+def test_resolve_context_returns_none_when_statusline_cache_missing(monkeypatch):
     """Returns None when no statusline cache exists (no racy fallback)."""
-    cache_file = tmp_path / "context_cache.json"
-    monkeypatch.setattr("context_monitor.get_session_cache_path", lambda: cache_file)
     monkeypatch.setattr("context_monitor._read_statusline_context_pct", lambda: None)
 
-    result = _resolve_context("test-session-123")
+    result = _resolve_context(SessionState.load("test-session-123"))
 
     assert result is None
 
 
-def test_resolve_context_returns_statusline_percentage(tmp_path, monkeypatch):
+def test_resolve_context_returns_statusline_percentage(monkeypatch):
     """Returns percentage from statusline cache when available."""
-    cache_file = tmp_path / "context_cache.json"
-    monkeypatch.setattr("context_monitor.get_session_cache_path", lambda: cache_file)
     monkeypatch.setattr("context_monitor._read_statusline_context_pct", lambda: 45.0)
 
-    result = _resolve_context("test-session-123")
+    result = _resolve_context(SessionState.load("test-session-123"))
 
     assert result is not None
     pct, tokens, shown_learn, shown_80 = result
@@ -102,22 +94,23 @@ def test_resolve_context_returns_statusline_percentage(tmp_path, monkeypatch):
     assert shown_80 is False
 
 
-def test_resolve_context_includes_session_flags(tmp_path, monkeypatch):
+def test_resolve_context_includes_session_flags(monkeypatch):
     """Returns session flags (learn thresholds, 80% warning) from cache."""
-    cache_file = tmp_path / "context_cache.json"
-    monkeypatch.setattr("context_monitor.get_session_cache_path", lambda: cache_file)
     monkeypatch.setattr("context_monitor._read_statusline_context_pct", lambda: 85.0)
 
     session_id = "test-session-123"
-    cache_file.write_text(json.dumps({
-        "session_id": session_id,
-        "tokens": 170000,
-        "timestamp": time.time() - 5,
-        "shown_learn": [40, 60],
-        "shown_80_warn": True,
-    }))
-
-    result = _resolve_context(session_id)
+    session_store().set(
+        "context_cache",
+        {
+            "session_id": session_id,
+            "tokens": 170000,
+            "timestamp": time.time() - 5,
+            "shown_learn": [40, 60],
+            "shown_80_warn": True,
+        },
+    )
+
+    result = _resolve_context(SessionState.load(session_id))
 
     assert result is not None
     pct, tokens, shown_learn, shown_80 = result
@@ -125,3 +118,114 @@ def test_resolve_context_includes_session_flags(tmp_path, monkeypatch):
     assert tokens == 170000
     assert shown_learn == [40, 60]
     assert shown_80 is True
+
+
+def test_session_state_merges_flags_and_writes_once():
+    """Recorded changes stay in memory until flush, which writes them in one transaction."""
+    store = session_store()
+    store.set("context_cache", {"session_id": "s", "tokens": 1, "timestamp": 0, "shown_learn": [40]})
+
+    state = SessionState.load("s")
+    state.record(120000, [60])
+    state.record(130000, shown_80_warn=True)
+    assert store.get("context_cache")["tokens"] == 1
+
+    state.flush()
+
+    cache = store.get("context_cache")
+    assert cache["tokens"] == 130000
+    assert sorted(cache["shown_learn"]) == [40, 60]
+    assert cache["shown_80_warn"] is True
+
+
+def test_flush_keeps_warnings_recorded_by_a_parallel_hook():
+    """Flags another run stored after this one loaded are merged, not overwritten."""
+    store = session_store()
+    state = SessionState.load("s")
+    store.set(
+        "context_cache", {"session_id": "s", "tokens": 1, "timestamp": 0, "shown_learn": [40], "shown_80_warn": True}
+    )
+
+    state.record(150000, [60])
+    state.flush()
+
+    cache = store.get("context_cache")
+    assert cache["tokens"] == 150000
+    assert cache["shown_learn"] == [40, 60]
+    assert cache["shown_80_warn"] is True
+
+
+def test_run_loads_and_writes_session_cache_once(monkeypatch, capsys):
+    """A run that shows warnings reads the context cache once and writes it once."""
+    monkeypatch.setattr("context_monitor.get_current_session_id", lambda: "s")
+    monkeypatch.setattr("context_monitor._read_statusline_context_pct", lambda: 82.0)
+    monkeypatch.setattr("context_monitor.find_active_spec", lambda: (None, None))
+
+    loads = []
+    real_load = SessionState.load.__func__
+    monkeypatch.setattr(SessionState, "load", classmethod(lambda cls, sid: loads.append(sid) or real_load(cls, sid)))
+    writes = []
+    real_flush = SessionState.flush
+    monkeypatch.setattr(SessionState, "flush", lambda self: writes.append(self._dirty) or real_flush(self))
+
+    assert run_context_monitor() == 2
+
+    assert loads == ["s"]
+    assert writes == [True]
+    cache = session_store().get("context_cache")
+    assert cache["shown_80_warn"] is True
+    assert cache["shown_learn"] == [40]
+
+
+def test_throttled_run_does_not_write(monkeypatch):
+    monkeypatch.setattr("context_monitor.get_current_session_id", lambda: "s")
+    store = session_store()
+    store.set("context_cache", {"session_id": "s", "tokens": 1000, "timestamp": time.time()})
+    writes = []
+    monkeypatch.setattr(store, "update", lambda key, fn: writes.append(key))
+
+    assert run_context_monitor() == 0
+    assert writes == []
+
+
+def _history_home(tmp_path, monkeypatch, lines: str):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    history = tmp_path / ".claude" / "history.jsonl"
+    history.parent.mkdir()
+    history.write_text(lines)
+    return history
+
+
+def test_current_session_id_comes_from_last_complete_history_line(tmp_path, monkeypatch):
+    """A partially written trailing entry is ignored."""
+    _history_home(
+        tmp_path,
+        monkeypatch,
+        json.dumps({"sessionId": "old"}) + "\n" + json.dumps({"sessionId": "current"}) + '\n{"sessionId": "par',
+    )
+
+    assert get_current_session_id() == "current"
+
+
+def test_current_session_id_does_not_reopen_unchanged_history(tmp_path, monkeypatch):
+    import context_monitor
+
+    history = _history_home(tmp_path, monkeypatch, json.dumps({"sessionId": "a"}) + "\n")
+    reads = []
+    real_read_last_line = context_monitor.read_last_line
+    monkeypatch.setattr("context_monitor.read_last_line", lambda path: reads.append(path) or real_read_last_line(path))
+
+    assert get_current_session_id() == "a"
+    assert get_current_session_id() == "a"
+    assert len(reads) == 1
+
+    with history.open("a") as f:
+        f.write(json.dumps({"sessionId": "b"}) + "\n")
+
+    assert get_current_session_id() == "b"
+    assert len(reads) == 2
+
+
+def test_current_session_id_without_history(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    assert get_current_session_id() == ""
@@ -0,0 +1,221 @@
+"""Tests for edit-scoped diagnostics."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from _checkers import scope
+from _checkers.go import _run_golangci_lint
+from _checkers.python import check_python
+from _checkers.scope import EditScope, changed_ranges, edit_scope, pre_edit_content, remember
+from _checkers.typescript import TSC_LOCATION
+
+
+def _edit(path: Path, old: str, new: str, **extra) -> dict:
+    return {"tool_name": "Edit", "tool_input": {"file_path": str(path), "old_string": old, "new_string": new, **extra}}
+
+
+class TestChangedRanges:
+    def test_insertions_and_replacements(self):
+        before = "a\nb\nc\nd\n"
+        after = "a\nB\nc\nnew\nd\n"
+        assert changed_ranges(before, after) == [(2, 2), (4, 4)]
+
+    def test_adjacent_changes_merge(self):
+        assert changed_ranges("a\nb\nc\n", "x\ny\nc\n") == [(1, 2)]
+
+    def test_deletion_marks_the_lines_around_the_gap(self):
+        assert changed_ranges("a\nb\nc\nd\n", "a\nd\n") == [(1, 2)]
+
+    def test_unchanged_text_has_no_ranges(self):
+        assert changed_ranges("a\n", "a\n") == []
+
+
+class TestPreEditContent:
+    def test_original_file_from_tool_response_wins(self, tmp_path):
+        path = tmp_path / "app.py"
+        payload = {**_edit(path, "1", "2"), "tool_response": {"originalFile": "x = 0\n"}}
+        assert pre_edit_content(payload, path, "x = 2\n") == "x = 0\n"
+
+    def test_edit_is_undone_on_the_current_text(self, tmp_path):
+        path = tmp_path / "app.py"
+        assert pre_edit_content(_edit(path, "x = 1", "x = 2"), path, "y = 0\nx = 2\n") == "y = 0\nx = 1\n"
+
+    def test_multi_edit_is_undone_in_reverse(self, tmp_path):
+        path = tmp_path / "app.py"
+        payload = {
+            "tool_name": "MultiEdit",
+            "tool_input": {
+                "file_path": str(path),
+                "edits": [{"old_string": "a", "new_string": "b"}, {"old_string": "b", "new_string": "c"}],
+            },
+        }
+        assert pre_edit_content(payload, path, "c\n") == "a\n"
+
+    def test_ambiguous_edit_falls_back_to_snapshot(self, tmp_path):
+        path = tmp_path / "app.py"
+        path.write_text("x = 1\ny = 2\n")
+        remember(path)
+        path.write_text("x = 2\ny = 2\n")
+
+        assert pre_edit_content(_edit(path, "x = 1", "x = 2"), path, "x = 2\ny = 2\n") == "x = 1\ny = 2\n"
+
+    def test_write_uses_snapshot_or_checks_in_full(self, tmp_path):
+        path = tmp_path / "app.py"
+        payload = {"tool_name": "Write", "tool_input": {"file_path": str(path), "content": "new\n"}}
+        assert pre_edit_content(payload, path, "new\n") is None
+
+        path.write_text("old\n")
+        remember(path)
+        assert pre_edit_content(payload, path, "new\n") == "old\n"
+
+    def test_scope_can_be_disabled(self, tmp_path, monkeypatch):
+        path = tmp_path / "app.py"
+        path.write_text("x = 2\n")
+        assert edit_scope(_edit(path, "x = 1", "x = 2"), path) is not None
+        monkeypatch.setenv("PILOT_EDIT_SCOPE", "0")
+        assert edit_scope(_edit(path, "x = 1", "x = 2"), path) is None
+
+
+class TestFiltering:
+    def test_tsc_keeps_edited_lines_and_importing_files(self, tmp_path):
+        (tmp_path / "src").mkdir()
+        target = tmp_path / "src" / "util.ts"
+        target.write_text("export const a = 1;\nexport const b = 2;\n")
+        (tmp_path / "src" / "main.ts").write_text('import { a } from "./util";\n')
+        (tmp_path / "src" / "other.ts").write_text('import { x } from "./elsewhere";\n')
+        edit = EditScope(target, "export const a = 1;\nexport const b = 1;\n").locate(target.read_text())
+        lines = [
+            "src/util.ts(1,1): error TS1: old",
+            "src/util.ts(2,1): error TS2: new",
+            "src/main.ts(1,10): error TS3: dependent",
+            "src/other.ts(1,10): error TS4: unrelated",
+            "error TS5023: Unknown compiler option",
+        ]
+
+        kept = edit.filter_lines(lines, TSC_LOCATION, tmp_path)
+
+        assert kept == [lines[1], lines[2], lines[4]]
+        assert edit.hidden == 2
+
+        edit.hidden = 0
+        assert edit.filter_lines(lines, TSC_LOCATION, tmp_path, whole_file=True) == [lines[0], *kept]
+        assert edit.hidden == 1
+
+    def test_report_names_the_scope(self, tmp_path, capsys):
+        edit = EditScope(tmp_path / "a.py", "a\nb\n").locate("a\nc\n")
+        edit.hidden = 3
+        edit.report()
+        assert "Scoped to the edit (line 2): 3 issues elsewhere not shown" in capsys.readouterr().err
+
+
+def test_python_check_scopes_ruff_to_the_edited_lines(tmp_path):
+    py_file = tmp_path / "app.py"
+    py_file.write_text("import os\nimport sys\nx = 1\n")
+    edit = edit_scope(_edit(py_file, "x = 0", "x = 1"), py_file)
+    assert edit is not None
+    ruff = MagicMock(
+        returncode=1, stdout=f"{py_file}:1:8: F401 `os` imported but unused\n{py_file}:3:1: E1 new\n", stderr=""
+    )
+    pyright = MagicMock(
+        returncode=1,
+        stdout=json.dumps(
+            {
+                "summary": {"errorCount": 2},
+                "generalDiagnostics": [
+                    {"severity": "error", "range": {"start": {"line": 1}}, "message": "old"},
+                    {"severity": "error", "range": {"start": {"line": 2}}, "message": "new"},
+                ],
+            }
+        ),
+        stderr="",
+    )
+
+    with (
+        patch("_checkers.python.check_file_length"),
+        patch("_checkers.python.which", side_effect=lambda name: f"/usr/bin/{name}"),
+        patch("_checkers.python._resident_basedpyright", return_value=None),
+        patch("_checkers.python.pipe_through", return_value=None),
+        patch(
+            "_checkers.python.subprocess.run",
+            side_effect=lambda cmd, **_kw: pyright if "basedpyright" in cmd[0] else ruff,
+        ),
+    ):
+        exit_code, reason = check_python(py_file, edit)
+
+    assert exit_code == 2
+    assert reason == "Python: 1 ruff, 2 basedpyright in app.py"
+    assert edit.hidden == 1
+
+
+def test_rename_keeps_type_errors_at_untouched_call_sites(tmp_path):
+    """basedpyright errors the edit caused further down the file are not hidden by the scope."""
+    before = "def old_name():\n    return 1\n\n\nx = 1\ny = 2\nz = old_name()\n"
+    py_file = tmp_path / "app.py"
+    py_file.write_text(before.replace("def old_name", "def new_name"))
+    edit = edit_scope(_edit(py_file, "def old_name():", "def new_name():"), py_file)
+    assert edit is not None
+    pyright = {
+        "summary": {"errorCount": 1},
+        "generalDiagnostics": [
+            {"severity": "error", "range": {"start": {"line": 6}}, "message": '"old_name" is not defined'}
+        ],
+    }
+
+    with (
+        patch("_checkers.python.check_file_length"),
+        patch("_checkers.python.which", side_effect=lambda name: f"/usr/bin/{name}"),
+        patch("_checkers.python._resident_basedpyright", return_value=pyright),
+        patch("_checkers.python.pipe_through", return_value=None),
+        patch("_checkers.python.subprocess.run", return_value=MagicMock(returncode=0, stdout="", stderr="")),
+    ):
+        exit_code, reason = check_python(py_file, edit)
+
+    assert edit.ranges == [(1, 1)]
+    assert exit_code == 2
+    assert reason == "Python: 1 basedpyright in app.py"
+    assert edit.hidden == 0
+
+
+def test_golangci_lint_gets_the_edit_as_a_patch(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    go_file = tmp_path / "main.go"
+    go_file.write_text("package main\n\nfunc main() {}\n")
+    edit = EditScope(go_file, "package main\n")
+    seen: list[str] = []
+
+    def run(cmd, **_kw):
+        flag = next(arg for arg in cmd if arg.startswith("--new-from-patch="))
+        seen.append(Path(flag.split("=", 1)[1]).read_text())
+        return MagicMock(returncode=0, stdout="", stderr="")
+
+    with patch("_checkers.go.subprocess.run", side_effect=run):
+        assert _run_golangci_lint("golangci-lint", go_file, 10, scope=edit) == {}
+
+    assert seen[0].startswith("--- a/main.go\n+++ b/main.go\n")
+    assert "+func main() {}" in seen[0]
+
+
+def test_file_checker_scopes_cached_results_per_edit(tmp_path, monkeypatch):
+    """A scoped result is cached under its edit, and the checked file becomes the next pre-edit snapshot."""
+    from file_checker import check_file
+
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.setenv("PILOT_CHECK_CACHE", "1")
+    py_file = tmp_path / "app.py"
+    py_file.write_text("x = 2\n")
+    seen: list[object] = []
+
+    def fake_check(file_path, scope=None):
+        seen.append(scope)
+        return 0, ""
+
+    with patch("file_checker.check_python", side_effect=fake_check):
+        check_file(py_file, _edit(py_file, "x = 1", "x = 2"))
+        check_file(py_file, _edit(py_file, "x = 1", "x = 2"))
+        check_file(py_file)
+
+    assert [type(s) for s in seen] == [EditScope, type(None)]
+    assert scope.snapshot_path(py_file).read_text() == "x = 2\n"
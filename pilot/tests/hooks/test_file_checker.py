@@ -14,7 +14,7 @@ def test_python_file_dispatches_to_python_checker(tmp_path):
     py_file = tmp_path / "test.py"
     py_file.write_text("print('hello')\n")
 
-    with patch("pilot.hooks.file_checker.get_edited_file_from_stdin", return_value=py_file):
+    with patch("pilot.hooks.file_checker.get_edit_from_stdin", return_value=(py_file, {})):
         with patch("pilot.hooks.file_checker.check_python") as mock_check:
             mock_check.return_value = (0, "")
             result = main()
@@ -28,7 +28,7 @@ def test_typescript_file_dispatches_to_typescript_checker(tmp_path):
     ts_file = tmp_path / "test.ts"
     ts_file.write_text("const x = 1;\n")
 
-    with patch("pilot.hooks.file_checker.get_edited_file_from_stdin", return_value=ts_file):
+    with patch("pilot.hooks.file_checker.get_edit_from_stdin", return_value=(ts_file, {})):
         with patch("pilot.hooks.file_checker.check_typescript") as mock_check:
             mock_check.return_value = (0, "")
             result = main()
@@ -42,7 +42,7 @@ def test_go_file_dispatches_to_go_checker(tmp_path):
     go_file = tmp_path / "test.go"
     go_file.write_text("package main\n")
 
-    with patch("pilot.hooks.file_checker.get_edited_file_from_stdin", return_value=go_file):
+    with patch("pilot.hooks.file_checker.get_edit_from_stdin", return_value=(go_file, {})):
         with patch("pilot.hooks.file_checker.check_go") as mock_check:
             mock_check.return_value = (0, "")
             result = main()
@@ -56,14 +56,14 @@ def test_unsupported_file_returns_zero(tmp_path):
     md_file = tmp_path / "test.md"
     md_file.write_text("# Heading\n")
 
-    with patch("pilot.hooks.file_checker.get_edited_file_from_stdin", return_value=md_file):
+    with patch("pilot.hooks.file_checker.get_edit_from_stdin", return_value=(md_file, {})):
         result = main()
         assert result == 0
 
 
 def test_nonexistent_file_returns_zero():
     """Nonexistent files return 0."""
-    with patch("pilot.hooks.file_checker.get_edited_file_from_stdin", return_value=Path("/nonexistent/file.py")):
+    with patch("pilot.hooks.file_checker.get_edit_from_stdin", return_value=(Path("/nonexistent/file.py"), {})):
         result = main()
         assert result == 0
 
@@ -76,7 +76,7 @@ class TestJsonDecisionOutput:
         py_file = tmp_path / "app.py"
         py_file.write_text("x = 1\n")
 
-        with patch("pilot.hooks.file_checker.get_edited_file_from_stdin", return_value=py_file):
+        with patch("pilot.hooks.file_checker.get_edit_from_stdin", return_value=(py_file, {})):
             with patch("pilot.hooks.file_checker.check_python") as mock_check:
                 mock_check.return_value = (2, "Python: 3 ruff issues in app.py")
                 main()
@@ -91,7 +91,7 @@ class TestJsonDecisionOutput:
         py_file = tmp_path / "app.py"
         py_file.write_text("x = 1\n")
 
-        with patch("pilot.hooks.file_checker.get_edited_file_from_stdin", return_value=py_file):
+        with patch("pilot.hooks.file_checker.get_edit_from_stdin", return_value=(py_file, {})):
             with patch("pilot.hooks.file_checker.check_python") as mock_check:
                 mock_check.return_value = (2, "")
                 main()
@@ -105,8 +105,23 @@ class TestJsonDecisionOutput:
         md_file = tmp_path / "readme.md"
         md_file.write_text("# Hello\n")
 
-        with patch("pilot.hooks.file_checker.get_edited_file_from_stdin", return_value=md_file):
+        with patch("pilot.hooks.file_checker.get_edit_from_stdin", return_value=(md_file, {})):
             main()
 
         captured = capsys.readouterr()
         assert captured.out == ""
+
+
+def test_unchanged_file_is_served_from_check_cache(tmp_path, monkeypatch):
+    """A second check of identical content replays the cached result."""
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.setenv("PILOT_CHECK_CACHE", "1")
+    py_file = tmp_path / "app.py"
+    py_file.write_text("x = 1\n")
+
+    with patch("pilot.hooks.file_checker.get_edit_from_stdin", return_value=(py_file, {})):
+        with patch("pilot.hooks.file_checker.check_python", return_value=(2, "Python: 1 ruff in app.py")) as mock_check:
+            assert main() == 2
+            assert main() == 2
+
+    mock_check.assert_called_once_with(py_file)
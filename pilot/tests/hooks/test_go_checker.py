@@ -27,7 +27,7 @@ class TestCheckGoVetCounting:
         with (
             patch("_checkers.go.strip_go_comments"),
             patch("_checkers.go.check_file_length"),
-            patch("_checkers.go.shutil.which", side_effect=lambda name: f"/usr/bin/{name}" if name == "go" else None),
+            patch("_checkers.go.which", side_effect=lambda name: f"/usr/bin/{name}" if name == "go" else None),
             patch("_checkers.go.subprocess.run", return_value=mock_result),
         ):
             exit_code, reason = check_go(go_file)
@@ -52,7 +52,7 @@ class TestCheckGoVetCounting:
         with (
             patch("_checkers.go.strip_go_comments"),
             patch("_checkers.go.check_file_length"),
-            patch("_checkers.go.shutil.which", side_effect=lambda name: f"/usr/bin/{name}" if name == "go" else None),
+            patch("_checkers.go.which", side_effect=lambda name: f"/usr/bin/{name}" if name == "go" else None),
             patch("_checkers.go.subprocess.run", return_value=mock_result),
         ):
             exit_code, reason = check_go(go_file)
@@ -73,7 +73,7 @@ class TestCheckGoVetCounting:
         with (
             patch("_checkers.go.strip_go_comments"),
             patch("_checkers.go.check_file_length"),
-            patch("_checkers.go.shutil.which", side_effect=lambda name: f"/usr/bin/{name}" if name == "go" else None),
+            patch("_checkers.go.which", side_effect=lambda name: f"/usr/bin/{name}" if name == "go" else None),
             patch("_checkers.go.subprocess.run", return_value=mock_vet),
         ):
             _, reason = check_go(go_file)
@@ -112,7 +112,7 @@ class TestCheckGoCleanFile:
         with (
             patch("_checkers.go.strip_go_comments"),
             patch("_checkers.go.check_file_length"),
-            patch("_checkers.go.shutil.which", side_effect=lambda name: f"/usr/bin/{name}" if name == "go" else None),
+            patch("_checkers.go.which", side_effect=lambda name: f"/usr/bin/{name}" if name == "go" else None),
             patch("_checkers.go.subprocess.run", return_value=mock_result),
         ):
             exit_code, reason = check_go(go_file)
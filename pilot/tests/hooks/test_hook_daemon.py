@@ -0,0 +1,216 @@
+"""Tests for the persistent hook daemon and its client."""
+
+from __future__ import annotations
+
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from hook_daemon import HOOKS, get_socket_path, run_hook
+
+HOOKS_DIR = Path(__file__).resolve().parents[2] / "hooks"
+WEBSEARCH_PAYLOAD = json.dumps({"tool_name": "WebSearch", "tool_input": {"query": "x"}})
+
+
+@pytest.fixture
+def home_dir():
+    """Short HOME path so the Unix socket path stays within platform limits."""
+    with tempfile.TemporaryDirectory(prefix="hookd-", dir="/tmp") as tmpdir:
+        yield Path(tmpdir)
+
+
+def _env(home: Path, **extra: str) -> dict[str, str]:
+    env = {k: v for k, v in os.environ.items() if k != "PILOT_HOOK_DAEMON"}
+    env.update({"HOME": str(home), "PILOT_SESSION_ID": "t1"}, **extra)
+    return env
+
+
+def _wait_for(path: Path, timeout: float = 10.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if path.exists():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def _run_client(home: Path, hook: str, payload: str, **extra: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, str(HOOKS_DIR / "run_hook.py"), hook],
+        input=payload,
+        capture_output=True,
+        text=True,
+        env=_env(home, **extra),
+        timeout=30,
+    )
+
+
+class TestRunHook:
+    def test_registry_covers_pilot_hooks(self):
+        """Every Python hook wired in hooks.json is registered."""
+        assert {"file_checker", "tdd_enforcer", "context_monitor", "tool_redirect", "spec_stop_guard"} <= set(HOOKS)
+
+    def test_dispatches_to_registered_entry_point(self):
+        """run_hook calls the hook's entry point and returns its exit code."""
+        with patch("tool_redirect.run_tool_redirect", return_value=2) as mock_entry:
+            assert run_hook("tool_redirect") == 2
+        mock_entry.assert_called_once()
+
+    def test_unknown_hook_returns_error(self, capsys):
+        """Unknown hook names fail with exit code 1."""
+        assert run_hook("does_not_exist") == 1
+        assert "Unknown hook" in capsys.readouterr().err
+
+    def test_exception_in_hook_returns_error(self, capsys):
+        """A crashing hook reports the traceback and exits 1."""
+        with patch("tool_redirect.run_tool_redirect", side_effect=RuntimeError("boom")):
+            assert run_hook("tool_redirect") == 1
+        assert "boom" in capsys.readouterr().err
+
+    def test_system_exit_code_is_propagated(self):
+        """SystemExit raised by a hook becomes its exit code."""
+        with patch("tool_redirect.run_tool_redirect", side_effect=SystemExit(2)):
+            assert run_hook("tool_redirect") == 2
+
+    @patch.dict("os.environ", {"PILOT_SESSION_ID": "abc"})
+    def test_socket_path_is_session_scoped(self):
+        """Socket lives in the session directory."""
+        path = get_socket_path()
+        assert path.parent.name == "abc"
+        assert path.name == "hookd.sock"
+
+    def test_socket_path_matches_client(self, tmp_path, monkeypatch):
+        """The client connects where the daemon listens."""
+        import run_hook
+
+        monkeypatch.setenv("HOME", str(tmp_path))
+        monkeypatch.setenv("PILOT_SESSION_ID", "abc")
+        assert run_hook.socket_path() == get_socket_path()
+
+    def test_handler_closes_descriptors_of_a_malformed_request(self):
+        """A request without exactly three descriptors is dropped without leaking them."""
+        import socket
+
+        from hook_daemon import _HookHandler
+
+        server, client = socket.socketpair()
+        read_end, write_end = os.pipe()
+        try:
+            socket.send_fds(client, [b'{"hook": "tool_redirect"}\n'], [read_end])
+            with patch("hook_daemon.os.close", wraps=os.close) as close:
+                _HookHandler(server, None, None)
+            assert close.call_count == 1
+        finally:
+            for sock in (server, client):
+                sock.close()
+            os.close(read_end)
+            os.close(write_end)
+
+
+class TestForward:
+    def test_unreachable_daemon_falls_back(self, home_dir, monkeypatch):
+        """Without a daemon listening, the caller runs the hook itself."""
+        import run_hook
+
+        monkeypatch.setenv("HOME", str(home_dir))
+        monkeypatch.setenv("PILOT_SESSION_ID", "t1")
+        assert run_hook.forward("tool_redirect") is None
+
+    def test_lost_connection_after_handoff_is_an_error(self, home_dir, monkeypatch, capsys):
+        """Once the daemon has the descriptors, a dropped connection must not run the hook again."""
+        import socket
+        import threading
+
+        import run_hook
+
+        monkeypatch.setenv("HOME", str(home_dir))
+        monkeypatch.setenv("PILOT_SESSION_ID", "t1")
+        path = run_hook.socket_path()
+        path.parent.mkdir(parents=True)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(str(path))
+        listener.listen(1)
+
+        def drop() -> None:
+            conn, _ = listener.accept()
+            _data, fds, _flags, _addr = socket.recv_fds(conn, 1, 3)
+            for fd in fds:
+                os.close(fd)
+            conn.close()
+
+        server = threading.Thread(target=drop)
+        server.start()
+        try:
+            assert run_hook.forward("tool_redirect") == 1
+        finally:
+            server.join()
+            listener.close()
+        assert "closed the connection" in capsys.readouterr().err
+
+
+class TestDaemonRoundTrip:
+    def test_client_runs_in_process_when_daemon_disabled(self, home_dir):
+        """With the daemon disabled the hook still runs and no daemon is started."""
+        result = _run_client(home_dir, "tool_redirect", WEBSEARCH_PAYLOAD, PILOT_HOOK_DAEMON="0")
+
+        assert result.returncode == 2
+        assert "WebSearch is blocked" in result.stderr
+        assert not (home_dir / ".pilot" / "sessions" / "t1" / "hookd.sock").exists()
+
+    def test_client_records_hook_timings(self, home_dir):
+        """Every hook run appends its total and phase timings to the session's ring buffer."""
+        _run_client(home_dir, "tool_redirect", WEBSEARCH_PAYLOAD, PILOT_HOOK_DAEMON="0")
+
+        timings = home_dir / ".pilot" / "sessions" / "t1" / "timings.jsonl"
+        [record] = [json.loads(line) for line in timings.read_text().splitlines()]
+        assert (record["hook"], record["exit"]) == ("tool_redirect", 2)
+        assert record["total"] >= record["phases"]["stdin"]
+
+    def test_client_touches_session_heartbeat(self, home_dir):
+        """Every hook run marks the session live for session_end's session count."""
+        heartbeat = home_dir / ".pilot" / "sessions" / "t1" / "heartbeat"
+
+        _run_client(home_dir, "tool_redirect", WEBSEARCH_PAYLOAD, PILOT_HOOK_DAEMON="0")
+        assert heartbeat.exists()
+
+        os.utime(heartbeat, (0, 0))
+        _run_client(home_dir, "tool_redirect", WEBSEARCH_PAYLOAD, PILOT_HOOK_DAEMON="0")
+        assert heartbeat.stat().st_mtime > 0
+
+    def test_client_falls_back_and_starts_daemon(self, home_dir):
+        """First call runs in-process, starts the daemon; later calls go through it."""
+        socket_path = home_dir / ".pilot" / "sessions" / "t1" / "hookd.sock"
+
+        first = _run_client(home_dir, "tool_redirect", WEBSEARCH_PAYLOAD)
+        assert first.returncode == 2
+        assert "WebSearch is blocked" in first.stderr
+
+        try:
+            assert _wait_for(socket_path)
+
+            second = _run_client(home_dir, "tool_redirect", WEBSEARCH_PAYLOAD)
+            assert second.returncode == 2
+            assert "WebSearch is blocked" in second.stderr
+
+            allowed = _run_client(home_dir, "tool_redirect", json.dumps({"tool_name": "Read", "tool_input": {}}))
+            assert allowed.returncode == 0
+            assert allowed.stderr == ""
+        finally:
+            pid = int(socket_path.with_name("hookd.lock").read_text())
+            os.kill(pid, signal.SIGTERM)
+            _wait_for_removed(socket_path)
+
+        assert not socket_path.exists()
+
+
+def _wait_for_removed(path: Path, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while path.exists() and time.monotonic() < deadline:
+        time.sleep(0.05)
@@ -0,0 +1,83 @@
+"""Tests for the shared plan header parser."""
+
+from __future__ import annotations
+
+import json
+
+from _plan import PlanInfo, active_plan, read_plan
+
+TEMPLATE = """# Feature Implementation Plan
+
+Created: 2026-02-11
+Status: PENDING
+Approved: Yes
+Iterations: 2
+Worktree: No
+
+> **Status Lifecycle:** PENDING → COMPLETE → VERIFIED
+
+## Summary
+
+Status: COMPLETE
+"""
+
+
+def _write_active_plan(tmp_path, monkeypatch, plan_path: str) -> None:
+    monkeypatch.setenv("PILOT_SESSION_ID", "plan-test")
+    active = tmp_path / "sessions" / "plan-test" / "active_plan.json"
+    active.parent.mkdir(parents=True)
+    active.write_text(json.dumps({"plan_path": plan_path}))
+
+
+class TestReadPlan:
+    def test_parses_header_fields(self, tmp_path):
+        plan = tmp_path / "plan.md"
+        plan.write_text(TEMPLATE)
+
+        assert read_plan(plan) == PlanInfo(path=plan, status="PENDING", approved=True, iterations=2, worktree=False)
+
+    def test_stops_at_first_body_section(self, tmp_path):
+        plan = tmp_path / "plan.md"
+        plan.write_text("# Plan\n\n## Summary\n\nStatus: COMPLETE\nApproved: Yes\n")
+
+        info = read_plan(plan)
+
+        assert info is not None
+        assert info.status is None
+        assert info.approved is False
+        assert not info.is_active
+
+    def test_front_matter_keys_are_read(self, tmp_path):
+        plan = tmp_path / "plan.md"
+        plan.write_text("---\nstatus: complete\napproved: yes\n---\n\n# Plan\n")
+
+        info = read_plan(plan)
+
+        assert info is not None
+        assert (info.status, info.approved, info.is_active) == ("COMPLETE", True, True)
+
+    def test_missing_plan_gives_none(self, tmp_path):
+        assert read_plan(tmp_path / "missing.md") is None
+
+
+class TestActivePlan:
+    def test_relative_plan_path_resolves_against_project_root(self, tmp_path, monkeypatch):
+        plan = tmp_path / "project" / "docs" / "plans" / "p.md"
+        plan.parent.mkdir(parents=True)
+        plan.write_text(TEMPLATE)
+        monkeypatch.setenv("CLAUDE_PROJECT_ROOT", str(tmp_path / "project"))
+        _write_active_plan(tmp_path, monkeypatch, "docs/plans/p.md")
+
+        info = active_plan()
+
+        assert info is not None
+        assert info.path == plan
+        assert info.status == "PENDING"
+
+    def test_no_active_plan_json_gives_none(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("PILOT_SESSION_ID", "plan-test")
+        assert active_plan() is None
+
+    def test_empty_plan_path_gives_none(self, tmp_path, monkeypatch):
+        _write_active_plan(tmp_path, monkeypatch, "")
+        assert active_plan() is None
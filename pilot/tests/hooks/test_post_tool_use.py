@@ -0,0 +1,184 @@
+"""Tests for the multiplexed PostToolUse dispatcher."""
+
+from __future__ import annotations
+
+import json
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from post_tool_use import (
+    HookContext,
+    build_context,
+    file_checker_stage,
+    main,
+    merge_decisions,
+    merge_exit_codes,
+    run_stages,
+)
+
+
+def _ctx(file_path: Path | None = None) -> HookContext:
+    tool_input = {"file_path": str(file_path)} if file_path else {}
+    return build_context({"tool_name": "Write", "tool_input": tool_input})
+
+
+class TestBuildContext:
+    def test_extracts_tool_fields(self):
+        """Tool name, input and file path are decoded once into the context."""
+        ctx = build_context({"tool_name": "Edit", "tool_input": {"file_path": "/src/app.py", "old_string": "a"}})
+
+        assert ctx.tool_name == "Edit"
+        assert ctx.tool_input["old_string"] == "a"
+        assert ctx.file_path == Path("/src/app.py")
+
+    def test_tolerates_malformed_tool_input(self):
+        """Non-dict tool_input yields an empty input and no file path."""
+        ctx = build_context({"tool_name": "Write", "tool_input": "oops"})
+
+        assert ctx.tool_input == {}
+        assert ctx.file_path is None
+
+
+class TestMerging:
+    def test_blocking_exit_code_wins(self):
+        assert merge_exit_codes([0, 1, 2]) == 2
+
+    def test_error_wins_over_success(self):
+        assert merge_exit_codes([0, 1, 0]) == 1
+
+    def test_all_success(self):
+        assert merge_exit_codes([0, 0, 0]) == 0
+
+    def test_block_reasons_joined_in_order(self):
+        merged = merge_decisions(
+            [{"decision": "block", "reason": "first"}, {}, {"decision": "block", "reason": "second"}]
+        )
+        assert merged == {"decision": "block", "reason": "first; second"}
+
+    def test_clean_decisions_merge_to_empty(self):
+        assert merge_decisions([{}]) == {}
+
+
+class TestRunStages:
+    def test_stages_run_concurrently(self):
+        """Stages overlap instead of running back to back."""
+        barrier = threading.Barrier(2, timeout=5)
+
+        def stage(_ctx):
+            barrier.wait()
+            return 0, None
+
+        results = run_stages(_ctx(), [("a", stage), ("b", stage)])
+
+        assert [r.exit_code for r in results] == [0, 0]
+
+    def test_stderr_is_captured_per_stage_in_order(self):
+        """Each stage's stderr is kept separate and returned in stage order."""
+        slow_started = threading.Event()
+
+        def slow(_ctx):
+            print("slow stage", file=sys.stderr)
+            slow_started.set()
+            return 2, None
+
+        def fast(_ctx):
+            slow_started.wait(5)
+            print("fast stage", file=sys.stderr)
+            return 0, None
+
+        results = run_stages(_ctx(), [("slow", slow), ("fast", fast)])
+
+        assert [r.name for r in results] == ["slow", "fast"]
+        assert results[0].stderr == "slow stage\n"
+        assert results[1].stderr == "fast stage\n"
+
+    def test_crashing_stage_reports_error(self):
+        """A stage that raises yields exit code 1 with its traceback."""
+
+        def broken(_ctx):
+            raise RuntimeError("stage exploded")
+
+        results = run_stages(_ctx(), [("broken", broken)])
+
+        assert results[0].exit_code == 1
+        assert "stage exploded" in results[0].stderr
+
+    def test_restores_stderr(self):
+        """sys.stderr is restored after stages complete."""
+        original = sys.stderr
+        run_stages(_ctx(), [("noop", lambda _ctx: (0, None))])
+        assert sys.stderr is original
+
+
+class TestFileCheckerStage:
+    def test_returns_decision_for_supported_file(self, tmp_path):
+        py_file = tmp_path / "app.py"
+        py_file.write_text("x = 1\n")
+
+        with patch("file_checker.check_python", return_value=(2, "Python: 1 ruff in app.py")):
+            exit_code, decision = file_checker_stage(_ctx(py_file))
+
+        assert exit_code == 2
+        assert decision == {"decision": "block", "reason": "Python: 1 ruff in app.py"}
+
+    def test_skips_unsupported_file(self, tmp_path):
+        md_file = tmp_path / "notes.md"
+        md_file.write_text("# notes\n")
+
+        assert file_checker_stage(_ctx(md_file)) == (0, None)
+
+    def test_skips_missing_file(self, tmp_path):
+        assert file_checker_stage(_ctx(tmp_path / "gone.py")) == (0, None)
+
+
+class TestMain:
+    def test_decodes_stdin_once_and_merges_output(self, tmp_path, monkeypatch, capsys):
+        """All stages share one decoded payload; output is merged."""
+        payload = {"tool_name": "Edit", "tool_input": {"file_path": str(tmp_path / "app.py")}}
+        monkeypatch.setattr("sys.stdin", MagicMock(read=lambda: json.dumps(payload)))
+        seen: list[dict] = []
+
+        def checker(ctx):
+            seen.append(ctx.data)
+            print("lint output", file=sys.stderr)
+            return 2, {"decision": "block", "reason": "Python: 1 ruff in app.py"}
+
+        def tdd(ctx):
+            seen.append(ctx.data)
+            print("tdd output", file=sys.stderr)
+            return 2, None
+
+        def context(ctx):
+            seen.append(ctx.data)
+            return 0, None
+
+        with (
+            patch("post_tool_use.STAGES", [("file_checker", checker), ("tdd", tdd), ("context", context)]),
+            patch("post_tool_use.find_git_root", return_value=None),
+        ):
+            result = main()
+
+        captured = capsys.readouterr()
+        assert result == 2
+        assert seen == [payload, payload, payload]
+        assert captured.err.index("lint output") < captured.err.index("tdd output")
+        assert json.loads(captured.out) == {"decision": "block", "reason": "Python: 1 ruff in app.py"}
+
+    def test_no_json_when_no_stage_decides(self, monkeypatch, capsys):
+        """Stdout stays empty when no stage produced a decision."""
+        payload = {"tool_name": "Write", "tool_input": {"file_path": "/tmp/readme.md"}}
+        monkeypatch.setattr("sys.stdin", MagicMock(read=lambda: json.dumps(payload)))
+
+        with (
+            patch("post_tool_use.STAGES", [("noop", lambda _ctx: (0, None))]),
+            patch("post_tool_use.find_git_root", return_value=None),
+        ):
+            assert main() == 0
+
+        assert capsys.readouterr().out == ""
+
+    def test_empty_stdin_returns_zero(self, monkeypatch):
+        monkeypatch.setattr("sys.stdin", MagicMock(read=lambda: ""))
+        assert main() == 0
@@ -6,7 +6,13 @@ import json
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
-from _checkers.python import check_python, strip_python_comments
+from _checkers.python import (
+    _resident_basedpyright,
+    _run_basedpyright,
+    check_python,
+    find_python_root,
+    strip_python_comments,
+)
 
 
 class TestStripPythonComments:
@@ -143,7 +149,7 @@ class TestCheckPythonNoTools:
         with (
             patch("_checkers.python.strip_python_comments"),
             patch("_checkers.python.check_file_length"),
-            patch("_checkers.python.shutil.which", return_value=None),
+            patch("_checkers.python.which", return_value=None),
         ):
             exit_code, reason = check_python(py_file)
 
@@ -182,7 +188,7 @@ class TestCheckPythonRuffIssues:
         with (
             patch("_checkers.python.strip_python_comments"),
             patch("_checkers.python.check_file_length"),
-            patch("_checkers.python.shutil.which", side_effect=which_side_effect),
+            patch("_checkers.python.which", side_effect=which_side_effect),
             patch("_checkers.python.subprocess.run", side_effect=run_side_effect),
         ):
             exit_code, reason = check_python(py_file)
@@ -205,7 +211,7 @@ class TestCheckPythonRuffIssues:
         with (
             patch("_checkers.python.strip_python_comments"),
             patch("_checkers.python.check_file_length"),
-            patch("_checkers.python.shutil.which", side_effect=which_side_effect),
+            patch("_checkers.python.which", side_effect=which_side_effect),
             patch("_checkers.python.subprocess.run", return_value=mock_result),
         ):
             exit_code, reason = check_python(py_file)
@@ -244,7 +250,7 @@ class TestCheckPythonBasedpyrightIssues:
         with (
             patch("_checkers.python.strip_python_comments"),
             patch("_checkers.python.check_file_length"),
-            patch("_checkers.python.shutil.which", side_effect=which_side_effect),
+            patch("_checkers.python.which", side_effect=which_side_effect),
             patch("_checkers.python.subprocess.run", side_effect=run_side_effect),
         ):
             exit_code, reason = check_python(py_file)
@@ -272,7 +278,7 @@ class TestCheckPythonBasedpyrightIssues:
         with (
             patch("_checkers.python.strip_python_comments"),
             patch("_checkers.python.check_file_length"),
-            patch("_checkers.python.shutil.which", side_effect=which_side_effect),
+            patch("_checkers.python.which", side_effect=which_side_effect),
             patch("_checkers.python.subprocess.run", side_effect=run_side_effect),
         ):
             exit_code, reason = check_python(py_file)
@@ -322,7 +328,7 @@ class TestCheckPythonCombinedIssues:
         with (
             patch("_checkers.python.strip_python_comments"),
             patch("_checkers.python.check_file_length"),
-            patch("_checkers.python.shutil.which", side_effect=which_side_effect),
+            patch("_checkers.python.which", side_effect=which_side_effect),
             patch("_checkers.python.subprocess.run", side_effect=run_side_effect),
         ):
             exit_code, reason = check_python(py_file)
@@ -330,3 +336,70 @@ class TestCheckPythonCombinedIssues:
         assert exit_code == 2
         assert "ruff" in reason
         assert "basedpyright" in reason
+
+
+class TestCheckPythonResidentBasedpyright:
+    """Diagnostics from the resident language server replace the one-shot CLI run."""
+
+    def test_resident_diagnostics_used_without_cli(self, tmp_path: Path) -> None:
+        py_file = tmp_path / "app.py"
+        py_file.write_text("x = 1\n")
+        resident = {
+            "summary": {"errorCount": 1},
+            "generalDiagnostics": [{"file": str(py_file), "range": {"start": {"line": 0}}, "message": "bad"}],
+        }
+        mock_ruff = MagicMock(returncode=0, stdout="", stderr="")
+
+        def run_side_effect(cmd, **kwargs):
+            assert "basedpyright" not in cmd[0]
+            return mock_ruff
+
+        with (
+            patch("_checkers.python.strip_python_comments"),
+            patch("_checkers.python.check_file_length"),
+            patch("_checkers.python.which", side_effect=lambda name: f"/usr/bin/{name}"),
+            patch("_checkers.python.subprocess.run", side_effect=run_side_effect),
+            patch("_checkers.python._resident_basedpyright", return_value=resident),
+        ):
+            exit_code, reason = check_python(py_file)
+
+        assert exit_code == 2
+        assert "1 basedpyright" in reason
+
+    def test_error_count_comes_from_error_severity(self, tmp_path: Path) -> None:
+        """Warnings are listed but only errors are counted, like the CLI summary."""
+        py_file = tmp_path / "app.py"
+        py_file.write_text("x = 1\n")
+        diagnostics = [{"severity": "error", "message": "a"}, {"severity": "warning", "message": "b"}]
+
+        with (
+            patch("_checkers.python.which", return_value="/usr/bin/basedpyright-langserver"),
+            patch("_checkers.service.request", return_value={"diagnostics": diagnostics}),
+        ):
+            data = _resident_basedpyright(py_file)
+
+        assert data == {"summary": {"errorCount": 1}, "generalDiagnostics": diagnostics}
+
+    def test_cli_fallback_gets_only_the_time_left(self, tmp_path: Path) -> None:
+        """A resident request that used up the deadline leaves nothing for the CLI."""
+        py_file = tmp_path / "app.py"
+        py_file.write_text("x = 1\n")
+        clock = iter([100.0, 104.0, 200.0, 230.0])
+
+        with (
+            patch("_checkers.python.time.monotonic", side_effect=lambda: next(clock)),
+            patch("_checkers.python._resident_basedpyright", return_value=None),
+            patch("_checkers.python.subprocess.run", return_value=MagicMock(stdout="{}", stderr="")) as mock_run,
+        ):
+            assert _run_basedpyright("basedpyright", py_file, 10) == {}
+            assert _run_basedpyright("basedpyright", py_file, 10) is None
+
+        mock_run.assert_called_once()
+        assert mock_run.call_args.kwargs["timeout"] == 6.0
+
+    def test_finds_project_root_by_config(self, tmp_path: Path) -> None:
+        (tmp_path / "pyproject.toml").write_text("")
+        nested = tmp_path / "src" / "pkg"
+        nested.mkdir(parents=True)
+
+        assert find_python_root(nested / "mod.py") == tmp_path.resolve()
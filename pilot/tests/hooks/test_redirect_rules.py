@@ -0,0 +1,158 @@
+"""Tests for the declarative tool redirect rules."""
+
+from __future__ import annotations
+
+import io
+import json
+import re
+
+import _redirect_rules
+import pytest
+from _redirect_rules import compile_rule, find_redirect, trie_regex
+from tool_redirect import run_tool_redirect
+
+
+def _run(monkeypatch, payload: dict) -> int:
+    monkeypatch.setattr("sys.stdin", io.StringIO(json.dumps(payload)))
+    return run_tool_redirect()
+
+
+def _message(tool_name: str, tool_input: dict) -> str | None:
+    rule = find_redirect(tool_name, tool_input)
+    return rule.info["message"] if rule else None
+
+
+class TestBundledRules:
+    @pytest.mark.parametrize("tool", ["WebSearch", "WebFetch", "EnterPlanMode", "ExitPlanMode"])
+    def test_unconditional_redirects(self, tool):
+        assert find_redirect(tool, {}) is not None
+
+    @pytest.mark.parametrize(
+        ("pattern", "blocked"),
+        [
+            ("where is config loaded", True),
+            ("How Does the cache WORK", True),
+            ("def save_config", False),
+            ("where is x = 1", False),
+            ("find the \\(", False),
+            ("TODO", False),
+        ],
+    )
+    def test_grep_blocks_semantic_patterns_only(self, pattern, blocked):
+        assert (find_redirect("Grep", {"pattern": pattern}) is not None) is blocked
+
+    def test_explore_has_its_own_message(self):
+        assert _message("Task", {"subagent_type": "Explore"}) == "Task/Explore agent is BANNED (low-quality results)"
+
+    def test_task_allow_list(self):
+        assert find_redirect("Task", {"subagent_type": "pilot:plan-verifier"}) is None
+        assert _message("Task", {"subagent_type": "general-purpose"}) == "Task tool (sub-agents) is BANNED"
+        assert _message("Task", {}) == "Task tool (sub-agents) is BANNED"
+
+    def test_unlisted_tools_pass(self):
+        assert find_redirect("Read", {"file_path": "x.py"}) is None
+
+
+class TestRunToolRedirect:
+    def test_grep_example_includes_pattern(self, monkeypatch, capsys):
+        assert _run(monkeypatch, {"tool_name": "Grep", "tool_input": {"pattern": "where is auth"}}) == 2
+        assert 'vexor search "where is auth"' in capsys.readouterr().err
+
+    def test_non_dict_tool_input_is_treated_as_empty(self, monkeypatch):
+        assert _run(monkeypatch, {"tool_name": "Task", "tool_input": "Explore"}) == 2
+        assert _run(monkeypatch, {"tool_name": "Grep", "tool_input": None}) == 0
+
+    def test_allowed_tool_passes(self, monkeypatch, capsys):
+        assert _run(monkeypatch, {"tool_name": "Read", "tool_input": {}}) == 0
+        assert capsys.readouterr().err == ""
+
+
+class TestUserRules:
+    def test_org_rules_are_appended(self, tmp_path):
+        rule = {
+            "tool": "Bash",
+            "field": "command",
+            "match": "regex",
+            "values": [r"^\s*curl\b"],
+            "message": "curl is blocked",
+            "alternative": "Use the web-fetch MCP server",
+            "example": "mcp__web-fetch__fetch_url(url=...)",
+        }
+        (tmp_path / "redirect_rules.json").write_text(json.dumps({"version": 1, "rules": [rule]}))
+
+        assert _message("Bash", {"command": "curl https://example.com"}) == "curl is blocked"
+        assert find_redirect("Bash", {"command": "echo curl"}) is None
+        assert find_redirect("WebSearch", {}) is not None
+
+    def test_invalid_rules_are_skipped(self, tmp_path):
+        rules = [
+            {"tool": "Bash", "match": "fuzzy", "message": "m", "alternative": "a", "example": "e"},
+            {"tool": "Bash", "field": "command", "match": "regex", "values": ["("], "message": "m"},
+            {"tool": "Glob", "message": "Glob is blocked", "alternative": "a", "example": "e"},
+        ]
+        (tmp_path / "redirect_rules.json").write_text(json.dumps({"rules": rules}))
+
+        assert find_redirect("Bash", {"command": "ls"}) is None
+        assert _message("Glob", {}) == "Glob is blocked"
+
+    def test_rule_file_changes_are_picked_up(self, tmp_path):
+        path = tmp_path / "redirect_rules.json"
+        path.write_text(json.dumps({"rules": []}))
+        assert find_redirect("Glob", {}) is None
+
+        path.write_text(json.dumps({"rules": [{"tool": "Glob", "message": "m", "alternative": "a", "example": "e"}]}))
+
+        assert find_redirect("Glob", {}) is not None
+
+
+class TestCompiledCache:
+    def test_compiled_rules_are_reused_from_disk(self, tmp_path, monkeypatch):
+        _redirect_rules.compiled_rules()
+        assert len(list((tmp_path / "redirect-rules").glob("*.json"))) == 1
+
+        monkeypatch.setattr(_redirect_rules, "_compiled", None)
+        monkeypatch.setattr(_redirect_rules, "compile_rule", lambda raw: pytest.fail("recompiled"))
+
+        assert find_redirect("WebSearch", {}) is not None
+
+    def test_unchanged_files_are_not_reread(self, monkeypatch):
+        _redirect_rules.compiled_rules()
+        monkeypatch.setattr(_redirect_rules, "_compile_files", lambda files: pytest.fail("reloaded"))
+
+        assert find_redirect("WebFetch", {}) is not None
+
+
+class TestTrieRegex:
+    @pytest.mark.parametrize(
+        "words",
+        [
+            ["how do", "how does", "how to", "where is", "where are"],
+            ["a", "ab", "abc", "b"],
+            ["\\(", "(", "=="],
+        ],
+    )
+    def test_matches_like_any_substring(self, words):
+        pattern = re.compile(trie_regex(words))
+        samples = ["", "how", "how does it", "ab", "xbx", "a(b", "x == y", "\\(", "where", "wherever is", "abc"]
+
+        for sample in samples:
+            assert (pattern.search(sample) is not None) == any(word in sample for word in words), sample
+
+    def test_empty_set_never_matches(self):
+        assert re.search(trie_regex([]), "anything") is None
+
+    def test_contains_rule_is_compiled_to_one_pattern(self):
+        spec = compile_rule(
+            {
+                "tool": "Grep",
+                "field": "pattern",
+                "match": "contains",
+                "values": ["Where Is", "where are"],
+                "message": "m",
+                "alternative": "a",
+                "example": "e",
+            }
+        )
+
+        assert spec["pattern"] == trie_regex(["where is", "where are"])
+        assert "unless" not in spec
@@ -5,10 +5,10 @@ from __future__ import annotations
 import json
 import os
 import subprocess
+import time
 from unittest.mock import patch
 
 import pytest
-
 import session_end
 
 
@@ -104,6 +104,7 @@ def test_stops_worker_when_plan_verified(tmp_path):
         patch.dict(os.environ, {"CLAUDE_PLUGIN_ROOT": "/fake/plugin", "PILOT_SESSION_ID": "test-session"}),
         patch("session_end._sessions_base", return_value=tmp_path / "sessions"),
         patch("session_end.subprocess.run", side_effect=run_side_effect) as mock_run,
+        patch("session_end._request_worker_shutdown", return_value=False),
     ):
         result = session_end.main()
 
@@ -133,8 +134,171 @@ def test_stops_worker_when_no_plan_no_continuation(tmp_path):
         patch.dict(os.environ, {"CLAUDE_PLUGIN_ROOT": "/fake/plugin", "PILOT_SESSION_ID": "test-session"}),
         patch("session_end._sessions_base", return_value=tmp_path / "sessions"),
         patch("session_end.subprocess.run", side_effect=run_side_effect) as mock_run,
+        patch("session_end._request_worker_shutdown", return_value=False),
     ):
         result = session_end.main()
 
     assert result == 0
     assert mock_run.call_count == 2
+
+
+def _heartbeat(sessions, session_id: str, age: float = 0.0) -> None:
+    path = sessions / session_id / session_end.HEARTBEAT_NAME
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch()
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.mark.unit
+def test_session_count_from_recent_heartbeats_skips_pilot_binary(tmp_path):
+    """Other sessions with recent heartbeats are counted without forking the pilot binary."""
+    sessions = tmp_path / "sessions"
+    _heartbeat(sessions, "test-session")
+    _heartbeat(sessions, "other")
+    _heartbeat(sessions, "stale", age=session_end.SESSION_TTL + 60)
+
+    with (
+        patch.dict(os.environ, {"PILOT_SESSION_ID": "test-session"}),
+        patch("session_end._sessions_base", return_value=sessions),
+        patch("session_end.subprocess.run") as mock_run,
+    ):
+        assert session_end._get_active_session_count() == 2
+
+    mock_run.assert_not_called()
+
+
+@pytest.mark.unit
+def test_quiet_session_defers_to_pilot_binary(tmp_path):
+    """A session quiet for longer than SESSION_TTL may be idle, so the pilot binary decides."""
+    sessions = tmp_path / "sessions"
+    _heartbeat(sessions, "idle", age=session_end.SESSION_TTL + 60)
+    sessions_response = subprocess.CompletedProcess(args=[], returncode=0, stdout=json.dumps({"count": 2}), stderr="")
+
+    with (
+        patch.dict(os.environ, {"PILOT_SESSION_ID": "test-session"}),
+        patch("session_end._sessions_base", return_value=sessions),
+        patch("session_end.subprocess.run", return_value=sessions_response) as mock_run,
+    ):
+        assert session_end._get_active_session_count() == 2
+
+    assert mock_run.call_count == 1
+
+
+@pytest.mark.unit
+def test_missing_heartbeats_defer_to_pilot_binary(tmp_path):
+    """Sessions that have not run a Python hook leave no heartbeat, so its absence proves nothing."""
+    sessions = tmp_path / "sessions"
+    _heartbeat(sessions, "test-session")
+    sessions_response = subprocess.CompletedProcess(args=[], returncode=0, stdout=json.dumps({"count": 2}), stderr="")
+
+    with (
+        patch.dict(os.environ, {"PILOT_SESSION_ID": "test-session"}),
+        patch("session_end._sessions_base", return_value=sessions),
+        patch("session_end.subprocess.run", return_value=sessions_response) as mock_run,
+    ):
+        assert session_end._get_active_session_count() == 2
+
+    assert mock_run.call_count == 1
+
+
+@pytest.mark.unit
+def test_session_end_removes_own_heartbeat(tmp_path):
+    sessions = tmp_path / "sessions"
+    _heartbeat(sessions, "test-session")
+    _heartbeat(sessions, "other")
+
+    with (
+        patch.dict(os.environ, {"CLAUDE_PLUGIN_ROOT": "/fake/plugin", "PILOT_SESSION_ID": "test-session"}),
+        patch("session_end._sessions_base", return_value=sessions),
+    ):
+        assert session_end.main() == 0
+
+    assert not (sessions / "test-session" / session_end.HEARTBEAT_NAME).exists()
+
+
+@pytest.mark.unit
+def test_session_end_stops_the_running_hook_daemon(tmp_path):
+    import fcntl
+    import signal
+
+    sessions = tmp_path / "sessions"
+    lock = sessions / "test-session" / session_end.DAEMON_LOCK_NAME
+    lock.parent.mkdir(parents=True)
+    lock.write_text("4242")
+
+    with (
+        patch.dict(os.environ, {"PILOT_SESSION_ID": "test-session"}),
+        patch("session_end._sessions_base", return_value=sessions),
+        patch("session_end.os.kill") as mock_kill,
+    ):
+        session_end._stop_hook_daemon()
+        mock_kill.assert_not_called()
+
+        with lock.open("a") as held:
+            fcntl.flock(held, fcntl.LOCK_EX)
+            session_end._stop_hook_daemon()
+
+    mock_kill.assert_called_once_with(4242, signal.SIGTERM)
+
+
+@pytest.mark.unit
+def test_session_end_prunes_stale_transcript_checkpoints(tmp_path):
+    cursors = tmp_path / "transcripts"
+    cursors.mkdir(exist_ok=True)
+    stale, fresh = cursors / "stale.json", cursors / "fresh.json"
+    stale.write_text("{}")
+    fresh.write_text("{}")
+    os.utime(stale, (0, 0))
+    sessions = tmp_path / "sessions"
+    _heartbeat(sessions, "other")
+
+    with (
+        patch.dict(os.environ, {"CLAUDE_PLUGIN_ROOT": "/fake/plugin", "PILOT_SESSION_ID": "test-session"}),
+        patch("session_end._sessions_base", return_value=sessions),
+    ):
+        assert session_end.main() == 0
+
+    assert not stale.exists()
+    assert fresh.exists()
+
+
+@pytest.mark.unit
+def test_worker_is_stopped_over_http_without_bun(tmp_path):
+    """The worker's shutdown endpoint is used; the bun CLI is only a fallback."""
+    import http.server
+    import threading
+
+    requests: list[str] = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_POST(self):
+            requests.append(self.path)
+            body = b'{"status":"shutting_down"}'
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.handle_request)
+    thread.start()
+    data_dir = tmp_path / "memory"
+    data_dir.mkdir()
+    (data_dir / "worker.pid").write_text(json.dumps({"pid": 1, "port": server.server_address[1]}))
+
+    try:
+        with (
+            patch.dict(os.environ, {"CLAUDE_PILOT_DATA_DIR": str(data_dir)}),
+            patch("session_end.subprocess.run") as mock_run,
+        ):
+            assert session_end._stop_worker("/fake/plugin") == 0
+    finally:
+        thread.join(timeout=5)
+        server.server_close()
+
+    assert requests == ["/api/admin/shutdown"]
+    mock_run.assert_not_called()
@@ -0,0 +1,117 @@
+"""Tests for per-hook latency records."""
+
+from __future__ import annotations
+
+import json
+import threading
+
+import _timings
+import pytest
+from _timings import begin, finish, phase, timings_path, tool
+
+
+@pytest.fixture(autouse=True)
+def _session(monkeypatch):
+    monkeypatch.setenv("PILOT_SESSION_ID", "timed")
+    monkeypatch.delenv("PILOT_HOOK_TIMINGS", raising=False)
+    monkeypatch.setattr(_timings, "_current", None)
+
+
+def _records() -> list[dict]:
+    return [json.loads(line) for line in timings_path().read_text().splitlines()]
+
+
+class TestRecording:
+    def test_finish_appends_phases_tools_and_total(self):
+        begin("file_checker")
+        with phase("stdin"):
+            pass
+        with tool("ruff"):
+            pass
+        with tool("ruff"):
+            pass
+        finish(2)
+
+        [record] = _records()
+        assert record["hook"] == "file_checker"
+        assert record["exit"] == 2
+        assert set(record["phases"]) == {"stdin"}
+        assert set(record["tools"]) == {"ruff"}
+        assert record["total"] >= record["tools"]["ruff"] >= 0
+
+    def test_spans_without_open_record_record_nothing(self):
+        with phase("stdin"), tool("ruff"):
+            pass
+        finish(0)
+
+        assert not timings_path().exists()
+
+    def test_disabled_by_env(self, monkeypatch):
+        monkeypatch.setenv("PILOT_HOOK_TIMINGS", "0")
+
+        assert begin("tool_redirect") is None
+        finish(0)
+
+        assert not timings_path().exists()
+
+    def test_concurrent_spans_all_count(self):
+        timings = begin("post_tool_use")
+        assert timings is not None
+
+        def work():
+            for _ in range(200):
+                with tool("eslint"):
+                    pass
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert timings.tools["eslint"] > 0
+        finish(0)
+        assert len(_records()) == 1
+
+
+class TestRingBuffer:
+    def test_oldest_records_are_dropped(self, monkeypatch):
+        monkeypatch.setattr(_timings, "MAX_BYTES", 2_000)
+
+        for index in range(100):
+            begin(f"hook-{index}")
+            finish(0)
+
+        records = _records()
+        assert timings_path().stat().st_size <= 2_000
+        assert records[-1]["hook"] == "hook-99"
+        assert 10 < len(records) < 100
+        assert [r["hook"] for r in records] == [f"hook-{i}" for i in range(100 - len(records), 100)]
+
+    def test_parallel_appends_survive_trims(self, monkeypatch):
+        """Appends and trims are serialised, so parallel writers keep as many records as one writer would."""
+        monkeypatch.setattr(_timings, "MAX_BYTES", 2_000)
+        path = timings_path()
+        reference = path.with_name("reference.jsonl")
+
+        def write(target, writer: int) -> None:
+            for index in range(40):
+                _timings.append(target, {"hook": f"w{writer}", "index": f"{index:02d}"})
+
+        for writer in range(6):
+            write(reference, writer)
+        threads = [threading.Thread(target=write, args=(path, writer)) for writer in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(_records()) == len(reference.read_text().splitlines())
+
+    def test_unwritable_path_is_ignored(self, tmp_path, monkeypatch):
+        blocker = tmp_path / "blocker"
+        blocker.write_text("")
+        monkeypatch.setattr(_timings, "timings_path", lambda: blocker / "timings.jsonl")
+
+        begin("tool_redirect")
+        finish(0)
@@ -0,0 +1,161 @@
+"""Tests for incremental transcript checkpoints."""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+import _transcript
+from _transcript import TranscriptState, compact_record, read_transcript_state
+
+
+def _assistant(text: str, tool: str | None = None, message_id: str = "m", output_tokens: int = 1) -> dict:
+    content: list[dict] = [{"type": "text", "text": text}]
+    if tool:
+        content.append({"type": "tool_use", "id": "t", "name": tool, "input": {"file_path": "big"}})
+    return {
+        "type": "assistant",
+        "message": {
+            "id": message_id,
+            "content": content,
+            "usage": {"input_tokens": 10, "output_tokens": output_tokens},
+        },
+    }
+
+
+def _user(text: str) -> dict:
+    return {"type": "user", "message": {"content": text}}
+
+
+def _append(path: Path, *records: dict, partial: str = "") -> None:
+    with path.open("a") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+        f.write(partial)
+
+
+class TestCompactRecord:
+    def test_keeps_text_and_tool_use_names_only(self):
+        compact = compact_record(_assistant("hi", tool="Write"))
+        assert compact == {
+            "type": "assistant",
+            "message": {"content": [{"type": "text", "text": "hi"}, {"type": "tool_use", "name": "Write"}]},
+        }
+
+    def test_record_without_content_is_skipped(self):
+        assert compact_record({"type": "assistant", "message": {}}) is None
+        assert compact_record({"type": "user"}) is None
+
+
+class TestReadTranscriptState:
+    def test_parses_only_appended_lines(self, tmp_path, monkeypatch):
+        transcript = tmp_path / "t.jsonl"
+        _append(transcript, _user("go"), _assistant("one", tool="Read", message_id="a"))
+        first = read_transcript_state(str(transcript))
+        assert first is not None
+        assert first.last_tool_use == "Read"
+
+        parsed: list[dict] = []
+        real_apply = TranscriptState.apply
+        monkeypatch.setattr(
+            TranscriptState, "apply", lambda self, record: parsed.append(record) or real_apply(self, record)
+        )
+        _append(transcript, _assistant("two", message_id="b"))
+        second = read_transcript_state(str(transcript))
+
+        assert second is not None
+        assert [record["message"]["content"][0]["text"] for record in parsed] == ["two"]
+        assert second.last_assistant == compact_record(_assistant("two"))
+        assert second.last["user"] == compact_record(_user("go"))
+        assert second.last_tool_use == "Read"
+        assert second.usage["input_tokens"] == 20
+
+    def test_partial_trailing_line_waits_until_complete(self, tmp_path):
+        transcript = tmp_path / "t.jsonl"
+        record = json.dumps(_assistant("late"))
+        _append(transcript, _user("go"), partial=record[:20])
+
+        state = read_transcript_state(str(transcript))
+        assert state is not None
+        assert state.last_assistant is None
+
+        with transcript.open("a") as f:
+            f.write(record[20:] + "\n")
+        state = read_transcript_state(str(transcript))
+        assert state is not None
+        assert state.last_assistant == compact_record(_assistant("late"))
+
+    def test_streamed_records_of_one_message_count_usage_once(self, tmp_path):
+        transcript = tmp_path / "t.jsonl"
+        _append(
+            transcript,
+            _assistant("part 1", message_id="a", output_tokens=5),
+            _assistant("part 2", message_id="a", output_tokens=9),
+            _assistant("next", message_id="b", output_tokens=1),
+        )
+
+        state = read_transcript_state(str(transcript))
+
+        assert state is not None
+        assert state.usage["input_tokens"] == 20
+        assert state.usage["output_tokens"] == 10
+
+    def test_truncated_or_replaced_transcript_starts_over(self, tmp_path):
+        transcript = tmp_path / "t.jsonl"
+        _append(transcript, _assistant("old", tool="Bash"), _user("more"))
+        read_transcript_state(str(transcript))
+
+        transcript.write_text("")
+        _append(transcript, _assistant("new"))
+        state = read_transcript_state(str(transcript))
+
+        assert state is not None
+        assert state.last_assistant == compact_record(_assistant("new"))
+        assert "user" not in state.last
+        assert state.last_tool_use is None
+
+    def test_large_transcript_is_seeded_from_its_tail(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(_transcript, "FULL_SCAN_BYTES", 100)
+        transcript = tmp_path / "t.jsonl"
+        _append(transcript, *[_assistant(f"step {i}", tool="Edit", message_id=str(i)) for i in range(50)])
+        _append(transcript, _assistant("ask", tool="AskUserQuestion", message_id="x"), _user("answer"))
+        size = transcript.stat().st_size
+
+        state = read_transcript_state(str(transcript))
+
+        assert state is not None
+        assert state.offset == state.usage_since == size
+        assert state.last_tool_use == "AskUserQuestion"
+        assert state.last["user"] == compact_record(_user("answer"))
+        assert state.usage["input_tokens"] == 0
+
+    def test_roles_without_content_are_recorded_as_seen(self, tmp_path):
+        transcript = tmp_path / "t.jsonl"
+        _append(transcript, _user("go"), {"type": "assistant", "message": {"content": ""}})
+        read_transcript_state(str(transcript))
+
+        state = TranscriptState.load(str(transcript.resolve()))
+
+        assert state is not None
+        assert "assistant" not in state.last
+        assert set(state.seen) == {"user", "assistant"}
+
+    def test_missing_transcript_gives_none(self, tmp_path):
+        assert read_transcript_state(str(tmp_path / "missing.jsonl")) is None
+
+
+class TestPruneCursors:
+    def test_removes_only_stale_checkpoints(self, tmp_path):
+        old, new = tmp_path / "old.jsonl", tmp_path / "new.jsonl"
+        _append(old, _user("old"))
+        _append(new, _user("new"))
+        read_transcript_state(str(old))
+        read_transcript_state(str(new))
+        stale = _transcript._cursor_path(str(old.resolve()))
+        os.utime(stale, (0, 0))
+
+        assert _transcript.prune_cursors() == 1
+
+        assert not stale.exists()
+        assert _transcript._cursor_path(str(new.resolve())).exists()
@@ -8,6 +8,10 @@ from unittest.mock import MagicMock, patch
 
 from _checkers.typescript import (
     TS_EXTENSIONS,
+    _resident_lint,
+    _resident_tsc,
+    _run_eslint,
+    _run_tsc,
     check_typescript,
     find_project_root,
     find_tool,
@@ -158,21 +162,21 @@ class TestFindTool:
 
     def test_falls_back_to_which(self, tmp_path: Path) -> None:
         """Falls back to shutil.which when no local binary."""
-        with patch("_checkers.typescript.shutil.which", return_value="/usr/bin/eslint"):
+        with patch("_checkers.typescript.which", return_value="/usr/bin/eslint"):
             result = find_tool("eslint", tmp_path)
 
         assert result == "/usr/bin/eslint"
 
     def test_returns_none_when_not_found(self, tmp_path: Path) -> None:
         """Returns None when tool is not found anywhere."""
-        with patch("_checkers.typescript.shutil.which", return_value=None):
+        with patch("_checkers.typescript.which", return_value=None):
             result = find_tool("eslint", tmp_path)
 
         assert result is None
 
     def test_which_fallback_with_no_project_root(self) -> None:
         """Falls back to which when project_root is None."""
-        with patch("_checkers.typescript.shutil.which", return_value="/usr/bin/tsc"):
+        with patch("_checkers.typescript.which", return_value="/usr/bin/tsc"):
             result = find_tool("tsc", None)
 
         assert result == "/usr/bin/tsc"
@@ -424,3 +428,109 @@ class TestCheckTypescriptTsconfigDetection:
 
         tsc_calls = [c for c in calls if "tsc" in c[0]]
         assert any("--project" in c for c in tsc_calls)
+
+
+class TestResidentTsc:
+    """The resident tsserver replaces the full-project tsc run when available."""
+
+    def test_resident_errors_used_without_tsc(self, tmp_path: Path) -> None:
+        (tmp_path / "package.json").write_text("{}")
+        ts_file = tmp_path / "app.ts"
+        ts_file.write_text("const x = bad;\n")
+        calls = []
+
+        def run_side_effect(cmd, **kwargs):
+            calls.append(cmd)
+            return MagicMock(returncode=0, stdout="[]", stderr="")
+
+        with (
+            patch("_checkers.typescript.strip_typescript_comments"),
+            patch("_checkers.typescript.check_file_length"),
+            patch("_checkers.typescript.find_tool", side_effect=lambda name, _: f"/usr/bin/{name}" if name == "tsc" else None),
+            patch("_checkers.typescript.subprocess.run", side_effect=run_side_effect),
+            patch(
+                "_checkers.typescript._resident_tsc",
+                return_value=["app.ts(1,11): error TS2304: Cannot find name 'bad'."],
+            ),
+        ):
+            exit_code, reason = check_typescript(ts_file)
+
+        assert exit_code == 2
+        assert "1 tsc" in reason
+        assert not [c for c in calls if "tsc" in c[0]]
+
+    def test_requires_tsserver_next_to_tsc(self, tmp_path: Path) -> None:
+        bin_dir = tmp_path / "node_modules" / ".bin"
+        bin_dir.mkdir(parents=True)
+        (bin_dir / "tsc").write_text("")
+
+        with patch("_checkers.service.request") as mock_request:
+            assert _resident_tsc(str(bin_dir / "tsc"), tmp_path / "app.ts", tmp_path) is None
+
+        mock_request.assert_not_called()
+
+    def test_sends_edited_file_to_project_service(self, tmp_path: Path) -> None:
+        bin_dir = tmp_path / "node_modules" / ".bin"
+        bin_dir.mkdir(parents=True)
+        (bin_dir / "tsc").write_text("")
+        (bin_dir / "tsserver").write_text("")
+
+        with patch("_checkers.service.request", return_value={"errors": []}) as mock_request:
+            assert _resident_tsc(str(bin_dir / "tsc"), tmp_path / "app.ts", tmp_path) == []
+
+        kind, root, payload = mock_request.call_args.args
+        assert (kind, root) == ("tsserver", tmp_path)
+        assert payload["file"] == str(tmp_path / "app.ts")
+
+
+class TestResidentLint:
+    """ESLint and Prettier go through the warm project worker when installed locally."""
+
+    def test_global_tools_use_cli(self, tmp_path: Path) -> None:
+        with patch("_checkers.service.request") as mock_request:
+            assert _resident_lint("lint", "/usr/bin/eslint", tmp_path / "app.ts", tmp_path) is None
+
+        mock_request.assert_not_called()
+
+    def test_local_tools_use_worker(self, tmp_path: Path) -> None:
+        eslint_bin = tmp_path / "node_modules" / ".bin" / "eslint"
+
+        with (
+            patch("_checkers.typescript.which", return_value="/usr/bin/node"),
+            patch("_checkers.service.request", return_value={"result": []}) as mock_request,
+        ):
+            assert _resident_lint("lint", str(eslint_bin), tmp_path / "app.ts", tmp_path) == []
+
+        kind, root, payload = mock_request.call_args.args
+        assert (kind, root) == ("lint", tmp_path)
+        assert payload == {"node": "/usr/bin/node", "op": "lint", "file": str(tmp_path / "app.ts")}
+
+    def test_cli_fallbacks_get_only_the_time_left(self, tmp_path: Path) -> None:
+        """eslint and tsc share one deadline between the resident attempt and the CLI."""
+        ts_file = tmp_path / "app.ts"
+        clock = iter([100.0, 107.0, 200.0, 230.0])
+
+        with (
+            patch("_checkers.typescript.time.monotonic", side_effect=lambda: next(clock)),
+            patch("_checkers.typescript._resident_lint", return_value=None),
+            patch("_checkers.typescript._resident_tsc", return_value=None),
+            patch("_checkers.typescript.subprocess.run", return_value=MagicMock(stdout="[]", returncode=0)) as mock_run,
+        ):
+            assert _run_eslint("eslint", ts_file, tmp_path, 10) == {}
+            assert _run_tsc("tsc", ts_file, tmp_path, 10) == {}
+
+        mock_run.assert_called_once()
+        assert mock_run.call_args.kwargs["timeout"] == 3.0
+
+    def test_run_eslint_uses_worker_results(self, tmp_path: Path) -> None:
+        ts_file = tmp_path / "app.ts"
+        data = [{"filePath": str(ts_file), "errorCount": 1, "warningCount": 0, "messages": []}]
+
+        with (
+            patch("_checkers.typescript._resident_lint", return_value=data),
+            patch("_checkers.typescript.subprocess.run") as mock_run,
+        ):
+            results = _run_eslint("eslint", ts_file, tmp_path)
+
+        mock_run.assert_not_called()
+        assert results["eslint"] == (1, 0, data)
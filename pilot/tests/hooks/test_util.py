@@ -22,14 +22,22 @@ from _util import (  # type: ignore[import-not-found]
     NC,
     RED,
     YELLOW,
+    SessionStore,
+    SessionStoreError,
+    StderrRouter,
     _sessions_base,
+    capture_stderr,
     check_file_length,
     find_git_root,
     get_edited_file_from_stdin,
-    get_session_cache_path,
     get_session_plan_path,
+    get_session_store_path,
     is_waiting_for_user_input,
     read_hook_stdin,
+    read_last_line,
+    read_lines_reversed,
+    session_store,
+    which,
 )
 
 
@@ -58,22 +66,90 @@ def test_sessions_base_returns_path():
 
 
 @patch.dict("os.environ", {"PILOT_SESSION_ID": "test-session-123"})
-def test_get_session_cache_path_with_session_id():
-    """get_session_cache_path returns session-scoped cache path."""
-    path = get_session_cache_path()
+def test_get_session_store_path_with_session_id():
+    """get_session_store_path returns session-scoped store path."""
+    path = get_session_store_path()
     assert isinstance(path, Path)
     assert "test-session-123" in str(path)
-    assert path.name == "context-cache.json"
+    assert path.name == "state.db"
 
 
 @patch.dict("os.environ", {}, clear=True)
-def test_get_session_cache_path_defaults_to_default():
-    """get_session_cache_path uses 'default' when PILOT_SESSION_ID is missing."""
-    path = get_session_cache_path()
+def test_get_session_store_path_defaults_to_default():
+    """get_session_store_path uses 'default' when PILOT_SESSION_ID is missing."""
+    path = get_session_store_path()
     assert isinstance(path, Path)
     assert "default" in str(path)
 
 
+class TestSessionStore:
+    def test_values_round_trip_and_none_deletes(self, tmp_path):
+        store = SessionStore(tmp_path / "state.db")
+        store.set("a", {"n": 1, "items": [1, 2]})
+        assert store.get("a") == {"n": 1, "items": [1, 2]}
+        store.set("a", None)
+        assert store.get("a", "missing") == "missing"
+
+    def test_store_is_shared_across_connections(self, tmp_path):
+        SessionStore(tmp_path / "state.db").set("k", 1)
+        assert SessionStore(tmp_path / "state.db").get("k") == 1
+
+    def test_transaction_writes_keys_together_or_not_at_all(self, tmp_path):
+        store = SessionStore(tmp_path / "state.db")
+        with store.transaction() as txn:
+            txn.set("a", 1)
+            txn.set("b", 2)
+        with pytest.raises(RuntimeError), store.transaction() as txn:
+            txn.set("a", 10)
+            raise RuntimeError
+        assert (store.get("a"), store.get("b")) == (1, 2)
+
+    def test_get_does_not_wait_for_a_writer(self, tmp_path):
+        SessionStore(tmp_path / "state.db").set("k", 1)
+        writer = SessionStore(tmp_path / "state.db")
+        reader = SessionStore(tmp_path / "state.db")
+        reader._conn.execute("PRAGMA busy_timeout = 0")
+
+        with writer.transaction() as txn:
+            txn.set("k", 2)
+            assert reader.get("k") == 1
+        assert reader.get("k") == 2
+
+    def test_update_is_atomic_across_threads(self, tmp_path):
+        import threading
+
+        store = SessionStore(tmp_path / "state.db")
+        other = SessionStore(tmp_path / "state.db")
+
+        def bump(s: SessionStore) -> None:
+            for _ in range(50):
+                s.update("n", lambda n: (n or 0) + 1)
+
+        threads = [threading.Thread(target=bump, args=(s,)) for s in (store, other, store)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert store.get("n") == 150
+
+    def test_unavailable_store_reads_empty_and_drops_writes(self, tmp_path):
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+        store = SessionStore(blocker / "state.db")
+
+        store.set("k", 1)
+        assert store.get("k", 0) == 0
+        assert store.update("k", lambda v: 2) is None
+        with pytest.raises(SessionStoreError), store.transaction():
+            pass
+
+    @patch.dict("os.environ", {"PILOT_SESSION_ID": "store-test"})
+    def test_session_store_is_opened_once_per_session(self, tmp_path):
+        store = session_store()
+        assert session_store() is store
+        assert store.path == tmp_path / "sessions" / "store-test" / "state.db"
+
+
 @patch.dict("os.environ", {"PILOT_SESSION_ID": "test-session-456"})
 def test_get_session_plan_path():
     """get_session_plan_path returns session-scoped active plan path."""
@@ -106,6 +182,76 @@ def test_find_git_root_handles_exception(mock_run):
     assert result is None
 
 
+class TestDiscoveryCache:
+    @pytest.fixture(autouse=True)
+    def _enable(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("PILOT_DISCOVERY_CACHE", "1")
+        monkeypatch.setenv("PILOT_SESSION_ID", "discovery-test")
+        monkeypatch.setattr("_util._sessions_base", lambda: tmp_path / "sessions")
+
+    def _forget_in_memory(self, monkeypatch):
+        """Simulate the next hook process: only the on-disk cache survives."""
+        monkeypatch.setattr("_util._discovery", None)
+
+    def test_git_root_is_remembered_per_cwd(self, tmp_path, monkeypatch):
+        repo = tmp_path / "repo"
+        (repo / ".git").mkdir(parents=True)
+        (repo / "src").mkdir()
+        monkeypatch.chdir(repo / "src")
+
+        with patch("subprocess.run", return_value=MagicMock(returncode=0, stdout=f"{repo}\n")) as run:
+            assert find_git_root() == repo
+            self._forget_in_memory(monkeypatch)
+            assert find_git_root() == repo
+
+        assert run.call_count == 1
+        assert session_store().get("discovery")["git_roots"] == {str(repo / "src"): str(repo)}
+
+    def test_nested_repository_invalidates_remembered_root(self, tmp_path, monkeypatch):
+        repo = tmp_path / "repo"
+        (repo / ".git").mkdir(parents=True)
+        (repo / "sub").mkdir()
+        monkeypatch.chdir(repo / "sub")
+
+        with patch("subprocess.run", return_value=MagicMock(returncode=0, stdout=f"{repo}\n")) as run:
+            find_git_root()
+            (repo / "sub" / ".git").mkdir()
+            run.return_value = MagicMock(returncode=0, stdout=f"{repo / 'sub'}\n")
+            assert find_git_root() == repo / "sub"
+
+        assert run.call_count == 2
+
+    def test_which_remembers_binary_for_path(self, tmp_path, monkeypatch):
+        tool = tmp_path / "bin" / "ruff"
+        tool.parent.mkdir()
+        tool.write_text("#!/bin/sh\n")
+        tool.chmod(0o755)
+
+        with patch("shutil.which", return_value=str(tool)) as lookup:
+            assert which("ruff") == str(tool)
+            self._forget_in_memory(monkeypatch)
+            assert which("ruff") == str(tool)
+            assert lookup.call_count == 1
+
+            monkeypatch.setenv("PATH", "/somewhere/else")
+            which("ruff")
+            assert lookup.call_count == 2
+
+    def test_which_forgets_removed_binary_and_misses(self, tmp_path):
+        tool = tmp_path / "ruff"
+        tool.write_text("#!/bin/sh\n")
+        tool.chmod(0o755)
+
+        with patch("shutil.which", return_value=str(tool)):
+            which("ruff")
+        tool.unlink()
+
+        with patch("shutil.which", return_value=None) as lookup:
+            assert which("ruff") is None
+            assert which("ruff") is None
+            assert lookup.call_count == 2
+
+
 def test_read_hook_stdin_valid_json(monkeypatch):
     """read_hook_stdin parses valid JSON from stdin."""
     test_data = {"tool_name": "Write", "tool_input": {"file_path": "test.py"}}
@@ -128,6 +274,48 @@ def test_read_hook_stdin_empty(monkeypatch):
     assert result == {}
 
 
+class TestCapture:
+    def test_payloads_are_captured_with_hook_and_env(self, tmp_path, monkeypatch):
+        import _timings
+        from _capture import load_corpus
+
+        corpus = tmp_path / "corpus"
+        monkeypatch.setenv("PILOT_HOOK_CAPTURE", str(corpus))
+        monkeypatch.setenv("PILOT_SESSION_ID", "cap")
+        monkeypatch.setenv("CLAUDE_API_KEY", "secret")
+        monkeypatch.setattr(_timings, "_current", _timings.HookTimings("tool_redirect"))
+        monkeypatch.setattr("sys.stdin", MagicMock(read=lambda: '{"tool_name": "Grep"}'))
+
+        assert read_hook_stdin() == {"tool_name": "Grep"}
+
+        [entry] = load_corpus(corpus)
+        assert (entry["hook"], entry["stdin"]) == ("tool_redirect", '{"tool_name": "Grep"}')
+        assert entry["env"]["PILOT_HOOK_CAPTURE"] == str(corpus)
+        assert "CLAUDE_API_KEY" not in entry["env"]
+
+    def test_flag_captures_into_session_corpus(self, tmp_path, monkeypatch):
+        from _capture import load_corpus
+
+        monkeypatch.setenv("PILOT_HOOK_CAPTURE", "1")
+        monkeypatch.setenv("PILOT_SESSION_ID", "cap")
+        monkeypatch.setattr("sys.argv", ["run_hook.py", "file_checker"])
+        monkeypatch.setattr("sys.stdin", MagicMock(read=lambda: "not json"))
+
+        assert read_hook_stdin() == {}
+
+        [entry] = load_corpus(tmp_path / "sessions" / "cap" / "corpus")
+        assert (entry["hook"], entry["stdin"]) == ("file_checker", "not json")
+
+    def test_nothing_is_captured_by_default(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("PILOT_HOOK_CAPTURE", raising=False)
+        monkeypatch.setenv("PILOT_SESSION_ID", "cap")
+        monkeypatch.setattr("sys.stdin", MagicMock(read=lambda: "{}"))
+
+        read_hook_stdin()
+
+        assert not (tmp_path / "sessions" / "cap").exists()
+
+
 def test_get_edited_file_from_stdin_with_file_path(monkeypatch):
     """get_edited_file_from_stdin extracts file path from hook data."""
     test_data = {"tool_input": {"file_path": "/path/to/file.py"}}
@@ -213,11 +401,7 @@ class TestIsWaitingForUserInput:
         transcript = tmp_path / "transcript.jsonl"
         msg = {
             "type": "assistant",
-            "message": {
-                "content": [
-                    {"type": "tool_use", "name": "AskUserQuestion", "input": {}}
-                ]
-            },
+            "message": {"content": [{"type": "tool_use", "name": "AskUserQuestion", "input": {}}]},
         }
         transcript.write_text(json.dumps(msg) + "\n")
         assert is_waiting_for_user_input(str(transcript)) is True
@@ -227,9 +411,7 @@ class TestIsWaitingForUserInput:
         transcript = tmp_path / "transcript.jsonl"
         msg = {
             "type": "assistant",
-            "message": {
-                "content": [{"type": "tool_use", "name": "Write", "input": {}}]
-            },
+            "message": {"content": [{"type": "tool_use", "name": "Write", "input": {}}]},
         }
         transcript.write_text(json.dumps(msg) + "\n")
         assert is_waiting_for_user_input(str(transcript)) is False
@@ -249,18 +431,66 @@ class TestIsWaitingForUserInput:
         transcript = tmp_path / "transcript.jsonl"
         ask_msg = {
             "type": "assistant",
-            "message": {
-                "content": [
-                    {"type": "tool_use", "name": "AskUserQuestion", "input": {}}
-                ]
-            },
+            "message": {"content": [{"type": "tool_use", "name": "AskUserQuestion", "input": {}}]},
         }
         write_msg = {
             "type": "assistant",
-            "message": {
-                "content": [{"type": "tool_use", "name": "Write", "input": {}}]
-            },
+            "message": {"content": [{"type": "tool_use", "name": "Write", "input": {}}]},
         }
         lines = [json.dumps(ask_msg), json.dumps(write_msg)]
         transcript.write_text("\n".join(lines) + "\n")
         assert is_waiting_for_user_input(str(transcript)) is False
+
+
+class TestReadLinesReversed:
+    @pytest.mark.parametrize("chunk_size", [1, 3, 7, 64 * 1024])
+    def test_yields_lines_last_first_across_chunk_boundaries(self, tmp_path, chunk_size):
+        path = tmp_path / "t.jsonl"
+        path.write_bytes(b"first line\n\nsecond\n" + b"x" * 50 + b"\nlast-no-newline")
+
+        lines = list(read_lines_reversed(path, chunk_size))
+
+        assert lines == [b"last-no-newline", b"x" * 50, b"second", b"first line"]
+
+    def test_empty_file_yields_nothing(self, tmp_path):
+        path = tmp_path / "t.jsonl"
+        path.write_bytes(b"")
+        assert list(read_lines_reversed(path)) == []
+
+    def test_read_last_line_ignores_unterminated_tail(self, tmp_path):
+        path = tmp_path / "history.jsonl"
+        path.write_bytes(b"one\ntwo\n\nthr")
+        assert read_last_line(path) == b"two"
+
+        path.write_bytes(b"partial only")
+        assert read_last_line(path) is None
+
+
+class TestCaptureStderr:
+    """Tests for per-thread stderr capture."""
+
+    def test_captures_writes_and_restores_stderr(self):
+        """Writes inside the block are captured; sys.stderr is restored afterwards."""
+        original = sys.stderr
+        with capture_stderr() as buffer:
+            print("captured", file=sys.stderr)
+        assert buffer.getvalue() == "captured\n"
+        assert sys.stderr is original
+
+    def test_nested_capture_reuses_router(self):
+        """Inner captures stack on an installed router without leaking into the outer buffer."""
+        with capture_stderr() as outer:
+            router = sys.stderr
+            with capture_stderr() as inner:
+                print("inner", file=sys.stderr)
+            assert sys.stderr is router
+            print("outer", file=sys.stderr)
+        assert inner.getvalue() == "inner\n"
+        assert outer.getvalue() == "outer\n"
+
+    def test_router_passes_through_without_capture(self):
+        """Threads without an active capture write to the wrapped stream."""
+        target = MagicMock()
+        router = StderrRouter(target)
+        router.write("plain")
+        target.write.assert_called_once_with("plain")